@@ -0,0 +1,324 @@
+"""
+ABAQUS Result Cache
+Hashes canonicalized .inp files so repeated simulations can be skipped, and
+remembers per-mesh solver hints so parameter sweeps start warm.
+
+Two hashes are computed for every input file:
+- input_hash: the whole canonicalized model. Identical hashes give identical
+  results, so a cached run is restored instead of solving again.
+- model_hash: everything except the *Plastic data table. Runs in a material
+  sweep share it. Abaqus cannot restart (oldjob=) a job whose material
+  definition changed, so these runs are not skipped. Instead, the first time
+  increment that converged in an earlier run is reused as the initial
+  increment, which avoids repeating the same cutbacks.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+NUMBER_PATTERN = re.compile(r'^[-+]?(\d+\.?\d*|\.\d+)([EeDd][-+]?\d+)?$')
+
+# Result files copied into (and restored from) the cache, by output_files key
+CACHED_FILE_TYPES = ('odb', 'dat', 'msg', 'sta', 'results')
+
+
+def _canonical_value(value: str) -> str:
+    value = value.strip()
+    if NUMBER_PATTERN.match(value):
+        return repr(float(value.replace('D', 'E').replace('d', 'e')))
+    return value.lower()
+
+
+def canonical_inp_lines(inp_path: str) -> List[str]:
+    """
+    Canonical form of an .inp file: comments and blank lines dropped, keyword
+    parameters lower-cased and sorted, numbers normalized (50. == 50.0 == 5e1)
+    """
+    lines = []
+    with open(inp_path, 'r', errors='replace') as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped or stripped.startswith('**'):
+                continue
+
+            if stripped.startswith('*'):
+                parts = [p.strip().lower().replace(' ', '') for p in stripped.split(',')]
+                keyword, params = parts[0], sorted(p for p in parts[1:] if p)
+                lines.append(','.join([keyword] + params))
+            else:
+                lines.append(','.join(_canonical_value(v) for v in stripped.split(',')))
+    return lines
+
+
+def inp_hashes(inp_path: str) -> Dict[str, str]:
+    """input_hash over the whole canonical model, model_hash without *Plastic data"""
+    full = hashlib.sha256()
+    model = hashlib.sha256()
+    section = None
+
+    for line in canonical_inp_lines(inp_path):
+        if line.startswith('*'):
+            section = line.split(',', 1)[0]
+        elif section == '*heading':
+            # Heading text does not affect the analysis
+            continue
+
+        full.update(line.encode('utf-8') + b'\n')
+        if not (section == '*plastic' and not line.startswith('*')):
+            model.update(line.encode('utf-8') + b'\n')
+
+    return {'input_hash': full.hexdigest(), 'model_hash': model.hexdigest()}
+
+
+def initial_time_increment(inp_path: str) -> Optional[float]:
+    """Initial time increment from the first *Static data line"""
+    with open(inp_path, 'r', errors='replace') as f:
+        lines = f.readlines()
+    for i, line in enumerate(lines):
+        if line.strip().lower().startswith('*static'):
+            for data in lines[i + 1:]:
+                if data.strip().startswith('**') or not data.strip():
+                    continue
+                if data.strip().startswith('*'):
+                    return None
+                try:
+                    return float(data.split(',')[0])
+                except ValueError:
+                    return None
+    return None
+
+
+def apply_initial_time_increment(inp_path: str, increment: float, dest_path: Optional[str] = None) -> bool:
+    """
+    Write the .inp with the initial increment on the first *Static data line
+    replaced to dest_path (default: in place); False, and nothing written, if
+    there is no such line
+    """
+    with open(inp_path, 'r', errors='replace') as f:
+        lines = f.readlines()
+
+    for i, line in enumerate(lines):
+        if not line.strip().lower().startswith('*static'):
+            continue
+        for j in range(i + 1, len(lines)):
+            data = lines[j].strip()
+            if not data or data.startswith('**'):
+                continue
+            if data.startswith('*'):
+                return False
+            parts = [p.strip() for p in data.split(',')]
+            parts[0] = f"{increment:g}"
+            lines[j] = ', '.join(parts) + '\n'
+            with open(dest_path or inp_path, 'w') as f:
+                f.writelines(lines)
+            return True
+    return False
+
+
+def _link_or_copy(source: str, dest: str) -> None:
+    """Hard-link source at dest, or copy it where links are not possible (another filesystem)"""
+    if os.path.lexists(dest):
+        os.remove(dest)
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
+
+
+class SimulationResultCache:
+    """
+    On-disk cache of completed simulation results keyed by input_hash,
+    plus warm-start hints keyed by model_hash
+
+    The index is a SQLite database in the cache directory, so every worker
+    process sees the entries the others add. Result files are hard-linked in
+    and out of the cache where the filesystem allows it (copied otherwise).
+    Entries unused for ttl_seconds are evicted, and the least recently used
+    ones while the cache holds more than max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.db_path = os.path.abspath(os.path.join(cache_dir, 'index.db'))
+        os.makedirs(cache_dir, exist_ok=True)
+
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS results (
+                    input_hash TEXT PRIMARY KEY,
+                    model_hash TEXT NOT NULL,
+                    files TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS models (
+                    model_hash TEXT PRIMARY KEY,
+                    initial_time_increment REAL NOT NULL
+                )
+            ''')
+        finally:
+            conn.close()
+        self.prune()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _entry_dir(self, input_hash: str) -> str:
+        return os.path.join(self.cache_dir, input_hash)
+
+    def lookup(self, input_hash: str) -> Optional[Dict]:
+        """Cached entry for an input hash, if all of its files still exist"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT model_hash, files, metadata FROM results WHERE input_hash = ?', (input_hash,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        entry = {'model_hash': row[0], 'files': json.loads(row[1]), 'metadata': json.loads(row[2])}
+        entry_dir = self._entry_dir(input_hash)
+        if not all(os.path.exists(os.path.join(entry_dir, name)) for name in entry['files'].values()):
+            return None
+        return entry
+
+    def store(self, input_hash: str, model_hash: str, output_files: Dict[str, str], metadata: Optional[Dict] = None) -> None:
+        """Link a completed run's result files into the cache"""
+        # Filled under a private name and renamed into place, so concurrent
+        # stores of one input never mix their files
+        tmp_dir = os.path.join(self.cache_dir, f".{input_hash}.{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        files = {}
+        size = 0
+        try:
+            for file_type in CACHED_FILE_TYPES:
+                path = output_files.get(file_type)
+                if not path or not os.path.exists(path):
+                    continue
+                name = f"result.{file_type}" if file_type != 'results' else 'results.npz'
+                _link_or_copy(path, os.path.join(tmp_dir, name))
+                files[file_type] = name
+                size += os.path.getsize(path)
+            entry_dir = self._entry_dir(input_hash)
+            if os.path.exists(entry_dir):
+                # Left by an earlier store of this input, or by an interrupted prune
+                stale_dir = tmp_dir + '.old'
+                try:
+                    os.rename(entry_dir, stale_dir)
+                except OSError:
+                    pass
+                shutil.rmtree(stale_dir, ignore_errors=True)
+            try:
+                os.rename(tmp_dir, entry_dir)
+            except OSError:
+                # Stored by another run meanwhile; its files are the same results
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                return
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO results (input_hash, model_hash, files, metadata, size, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (input_hash, model_hash, json.dumps(files), json.dumps(metadata or {}), size, time.time())
+            )
+        finally:
+            conn.close()
+        logger.info(f"Cached simulation results for input {input_hash[:12]} ({', '.join(files)})")
+        self.prune()
+
+    def restore(self, input_hash: str, dest_dir: str, job_name: str) -> Dict[str, str]:
+        """Link cached files into dest_dir named after job_name; returns output_files"""
+        entry = self.lookup(input_hash)
+        if not entry:
+            return {}
+
+        output_files = {}
+        try:
+            for file_type, name in entry['files'].items():
+                suffix = '_results.npz' if file_type == 'results' else f'.{file_type}'
+                dest = os.path.join(dest_dir, f"{job_name}{suffix}")
+                _link_or_copy(os.path.join(self._entry_dir(input_hash), name), dest)
+                output_files[file_type] = dest
+        except FileNotFoundError:
+            # Evicted by another process between lookup and restore
+            for path in output_files.values():
+                os.remove(path)
+            return {}
+
+        conn = self._connect()
+        try:
+            conn.execute('UPDATE results SET last_used = ? WHERE input_hash = ?', (time.time(), input_hash))
+        finally:
+            conn.close()
+        return output_files
+
+    def prune(self) -> int:
+        """Evict expired entries, then least recently used ones over max_bytes; returns the number evicted"""
+        if self.ttl_seconds is None and self.max_bytes is None:
+            return 0
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT input_hash, size, last_used FROM results ORDER BY last_used').fetchall()
+            evicted = []
+            total = sum(row[1] for row in rows)
+            now = time.time()
+            for input_hash, size, last_used in rows:
+                expired = self.ttl_seconds is not None and now - last_used > self.ttl_seconds
+                if not expired and (self.max_bytes is None or total <= self.max_bytes):
+                    break
+                evicted.append(input_hash)
+                total -= size
+            # Out of the index first, so a concurrent lookup never finds half-removed files
+            conn.executemany('DELETE FROM results WHERE input_hash = ?', [(input_hash,) for input_hash in evicted])
+        finally:
+            conn.close()
+        for input_hash in evicted:
+            shutil.rmtree(self._entry_dir(input_hash), ignore_errors=True)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} simulation cache entries")
+        return len(evicted)
+
+    def record_increment_hint(self, model_hash: str, time_increment: float) -> None:
+        """Remember the first converged time increment for a mesh/boundary setup"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT INTO models (model_hash, initial_time_increment) VALUES (?, ?) '
+                'ON CONFLICT(model_hash) DO UPDATE SET '
+                'initial_time_increment = MIN(initial_time_increment, excluded.initial_time_increment)',
+                (model_hash, time_increment)
+            )
+        finally:
+            conn.close()
+
+    def increment_hint(self, model_hash: str) -> Optional[float]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT initial_time_increment FROM models WHERE model_hash = ?', (model_hash,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
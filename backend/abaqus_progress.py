@@ -0,0 +1,257 @@
+"""
+ABAQUS Progress Tracking
+Incrementally tails the Abaqus/Standard .sta and .msg files of a running job
+and turns them into percent-complete, increment rate and ETA figures
+"""
+
+import os
+import re
+import time
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# STEP  INC ATT SEVERE EQUIL TOTAL  TOTAL  STEP  INC OF ...
+# A "U" after the attempt number marks an attempt that did not converge (cutback)
+STA_ROW_PATTERN = re.compile(
+    r'^\s*(\d+)\s+(\d+)\s+(\d+)(U?)\s+(\d+)\s+(\d+)\s+(\d+)\s+'
+    r'([-+]?\d*\.?\d+(?:[EeDd][-+]?\d+)?)\s+'
+    r'([-+]?\d*\.?\d+(?:[EeDd][-+]?\d+)?)\s+'
+    r'([-+]?\d*\.?\d+(?:[EeDd][-+]?\d+)?)'
+)
+MSG_ATTEMPT_PATTERN = re.compile(
+    r'INCREMENT\s+(\d+)\s+STARTS\.\s+ATTEMPT NUMBER\s+(\d+),\s+TIME INCREMENT\s+([-+]?\d*\.?\d+(?:[EeDd][-+]?\d+)?)'
+)
+MSG_STEP_PATTERN = re.compile(r'^\s*S T E P\s+((?:\d\s*)+)')
+
+# Procedures whose second data-line value is the step time period
+TIME_PERIOD_PROCEDURES = (
+    '*static', '*dynamic', '*visco', '*heat transfer',
+    '*coupled temperature-displacement', '*soils'
+)
+
+
+def _to_float(value: str) -> float:
+    return float(value.replace('D', 'E').replace('d', 'e'))
+
+
+def analysis_time_period(inp_path: str) -> Optional[float]:
+    """
+    Sum of the step time periods defined in an Abaqus .inp file
+
+    Reads the data line following each procedure keyword (e.g. `*Static`),
+    whose second value is the step time period (Abaqus default: 1.0).
+    Returns None if no time-based procedure is found.
+    """
+    total = 0.0
+    found = False
+    expect_data_line = False
+
+    try:
+        with open(inp_path, 'r', errors='replace') as f:
+            for line in f:
+                stripped = line.strip()
+                if not stripped or stripped.startswith('**'):
+                    continue
+
+                if expect_data_line:
+                    expect_data_line = False
+                    if not stripped.startswith('*'):
+                        parts = [p.strip() for p in stripped.split(',')]
+                        try:
+                            total += _to_float(parts[1]) if len(parts) > 1 and parts[1] else 1.0
+                        except ValueError:
+                            total += 1.0
+                        continue
+                    total += 1.0
+
+                if stripped.lower().startswith(TIME_PERIOD_PROCEDURES):
+                    found = True
+                    expect_data_line = True
+    except OSError as e:
+        logger.warning(f"Could not read time periods from {inp_path}: {str(e)}")
+        return None
+
+    if expect_data_line:
+        total += 1.0
+
+    return total if found and total > 0 else None
+
+
+class IncrementalLineReader:
+    """Returns only the complete lines appended to a file since the last read"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self._partial = b''
+
+    def read_lines(self) -> List[str]:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+
+        # File was truncated or rewritten - start over
+        if size < self.offset:
+            self.offset = 0
+            self._partial = b''
+
+        if size == self.offset:
+            return []
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+            self.offset += len(data)
+
+        # Keep the trailing partial line (in bytes) until the solver finishes it
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()
+        return [line.decode('utf-8', errors='replace').rstrip('\r') for line in lines]
+
+
+class SimulationProgressTracker:
+    """
+    Tracks solver progress from the .sta (and optionally .msg) file of a job
+
+    Call `poll()` periodically while the job runs; each call parses only the
+    bytes appended since the previous call and returns a progress snapshot.
+    """
+
+    def __init__(
+        self,
+        sta_path: str,
+        msg_path: Optional[str] = None,
+        total_time: Optional[float] = None,
+        started_at: Optional[float] = None
+    ):
+        """
+        Initialize tracker
+
+        Args:
+            sta_path: Path to the job's .sta file (may not exist yet)
+            msg_path: Path to the job's .msg file (optional)
+            total_time: Total analysis time period, see analysis_time_period()
+            started_at: Wall-clock start of the solver; rates are measured from
+                here, otherwise from the first increment seen
+        """
+        self.total_time = total_time
+        self._sta = IncrementalLineReader(sta_path)
+        self._msg = IncrementalLineReader(msg_path) if msg_path else None
+
+        self.step = None
+        self.increment = None
+        self.completed_increments = 0
+        self.attempts = 0
+        self.cutbacks = 0
+        self.step_time = 0.0
+        self.total_time_completed = 0.0
+        self.time_increment = None
+        self.first_time_increment = None  # size of the first increment that converged
+        self.current_attempt = None
+        self.finished = None  # True/False once the .sta reports the outcome
+
+        # (wall time, completed increments, fraction complete) reference points
+        self._first_seen = (started_at, 0, 0.0) if started_at is not None else None
+        self._last_seen = None
+
+    def _parse_sta_line(self, line: str, now: float) -> None:
+        if 'HAS COMPLETED SUCCESSFULLY' in line:
+            self.finished = True
+            return
+        if 'HAS NOT BEEN COMPLETED' in line:
+            self.finished = False
+            return
+
+        match = STA_ROW_PATTERN.match(line)
+        if not match:
+            return
+
+        self.attempts += 1
+        if match.group(4):
+            self.cutbacks += 1
+            return
+
+        self.step = int(match.group(1))
+        self.increment = int(match.group(2))
+        self.completed_increments += 1
+        self.total_time_completed = _to_float(match.group(8))
+        self.step_time = _to_float(match.group(9))
+        self.time_increment = _to_float(match.group(10))
+        if self.first_time_increment is None:
+            self.first_time_increment = self.time_increment
+        self.current_attempt = None
+
+        self._last_seen = (now, self.completed_increments, self.fraction_complete or 0.0)
+        if self._first_seen is None:
+            self._first_seen = self._last_seen
+
+    def _parse_msg_line(self, line: str) -> None:
+        match = MSG_ATTEMPT_PATTERN.search(line)
+        if match:
+            self.current_attempt = {
+                'increment': int(match.group(1)),
+                'attempt': int(match.group(2)),
+                'time_increment': _to_float(match.group(3))
+            }
+            return
+
+        match = MSG_STEP_PATTERN.match(line)
+        if match:
+            self.step = int(match.group(1).replace(' ', ''))
+
+    @property
+    def fraction_complete(self) -> Optional[float]:
+        if self.finished:
+            return 1.0
+        if not self.total_time:
+            return None
+        return max(0.0, min(1.0, self.total_time_completed / self.total_time))
+
+    def poll(self, now: Optional[float] = None) -> Dict:
+        """Parse newly appended .sta/.msg lines and return the current snapshot"""
+        now = time.time() if now is None else now
+
+        for line in self._sta.read_lines():
+            self._parse_sta_line(line, now)
+
+        if self._msg:
+            for line in self._msg.read_lines():
+                self._parse_msg_line(line)
+
+        return self.snapshot(now)
+
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        now = time.time() if now is None else now
+        fraction = self.fraction_complete
+
+        increment_rate = None
+        eta_seconds = None
+        if self._first_seen and self._last_seen and self._last_seen[0] > self._first_seen[0]:
+            elapsed = self._last_seen[0] - self._first_seen[0]
+            increment_rate = (self._last_seen[1] - self._first_seen[1]) / elapsed * 60.0
+
+            gained = self._last_seen[2] - self._first_seen[2]
+            if fraction is not None and gained > 0 and not self.finished:
+                # Time since the last completed increment counts against the estimate
+                eta_seconds = max(0.0, (1.0 - fraction) * elapsed / gained - (now - self._last_seen[0]))
+        if self.finished:
+            eta_seconds = 0.0
+
+        return {
+            'step': self.step,
+            'increment': self.increment,
+            'completed_increments': self.completed_increments,
+            'attempts': self.attempts,
+            'cutbacks': self.cutbacks,
+            'step_time': self.step_time,
+            'total_time': self.total_time_completed,
+            'time_increment': self.time_increment,
+            'current_attempt': self.current_attempt,
+            'percent_complete': round(fraction * 100, 1) if fraction is not None else None,
+            'increments_per_minute': round(increment_rate, 2) if increment_rate is not None else None,
+            'eta_seconds': round(eta_seconds, 1) if eta_seconds is not None else None,
+            'finished': self.finished
+        }
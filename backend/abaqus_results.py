@@ -0,0 +1,266 @@
+"""
+ABAQUS Result Extraction
+Streams an Abaqus .dat file once after a run and turns the node-print history
+of a node set (e.g. `loading`) into compact columnar arrays: increment, time,
+displacement, reaction force and engineering stress-strain.
+"""
+
+import re
+import math
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INCREMENT_PATTERN = re.compile(r'^\s*INCREMENT\s+(\d+)\s+SUMMARY')
+TIME_PATTERN = re.compile(
+    r'STEP TIME COMPLETED\s+([-+]?\d*\.?\d+(?:[EeDd][-+]?\d+)?)\s*,\s*TOTAL TIME COMPLETED\s+([-+]?\d*\.?\d+(?:[EeDd][-+]?\d+)?)'
+)
+NODE_SET_PATTERN = re.compile(r'NODES BELONGING TO NODE SET\s+(\S+)')
+STEP_PATTERN = re.compile(r'^\s*S T E P\s+((?:\d\s*)+)')
+
+# Columns always present in an extracted result file, in order
+BASE_COLUMNS = ['step', 'increment', 'step_time', 'total_time']
+
+
+def _to_float(value: str) -> float:
+    return float(value.replace('D', 'E').replace('d', 'e'))
+
+
+def specimen_geometry(inp_path: str) -> Dict[str, Optional[float]]:
+    """
+    Cross-section area and length of a cylindrical specimen from its *Node block
+
+    The cross-section lies in the XY plane and the axis along Z (see
+    modify_abaqus_inp), so area = pi * max(r)^2 and length = z_max - z_min.
+    """
+    radius = 0.0
+    z_min = z_max = None
+    in_node_section = False
+
+    with open(inp_path, 'r', errors='replace') as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith('**'):
+                continue
+            if stripped.startswith('*'):
+                in_node_section = stripped.lower().startswith('*node') and not stripped.lower().startswith('*node print')
+                continue
+            if not in_node_section:
+                continue
+
+            parts = stripped.split(',')
+            if len(parts) < 4:
+                continue
+            try:
+                x, y, z = float(parts[1]), float(parts[2]), float(parts[3])
+            except ValueError:
+                continue
+            radius = max(radius, math.hypot(x, y))
+            z_min = z if z_min is None else min(z_min, z)
+            z_max = z if z_max is None else max(z_max, z)
+
+    return {
+        'area': math.pi * radius ** 2 if radius > 0 else None,
+        'length': (z_max - z_min) if z_max is not None and z_max > z_min else None
+    }
+
+
+def iter_node_set_history(lines: Iterable[str], nset: str = 'loading'):
+    """
+    Yield one dict per increment with the node output of `nset`
+
+    Each dict holds step, increment, step/total time and, for every printed
+    variable (U3, RF3, ...), the TOTAL row when present (totals=YES) or the
+    sum over the set's nodes, plus the mean nodal value as `<VAR>_mean`.
+    """
+    target = nset.upper()
+    step = 1
+    increment = None
+    step_time = total_time = None
+    columns: List[str] = []
+    sums: Dict[str, float] = {}
+    totals: Dict[str, float] = {}
+    node_count = 0
+    state = None  # None | 'header' | 'rows'
+    pending = None
+
+    def finish_table():
+        if not columns or (not node_count and not totals):
+            return None
+        row = {'step': step, 'increment': increment, 'step_time': step_time, 'total_time': total_time}
+        for name in columns:
+            row[name] = totals.get(name, sums.get(name, 0.0))
+            row[f'{name}_mean'] = sums.get(name, 0.0) / node_count if node_count else None
+        return row
+
+    for line in lines:
+        match = INCREMENT_PATTERN.match(line)
+        if match:
+            if pending:
+                yield pending
+                pending = None
+            increment = int(match.group(1))
+            state = None
+            continue
+
+        match = STEP_PATTERN.match(line)
+        if match:
+            step = int(match.group(1).replace(' ', ''))
+            continue
+
+        match = TIME_PATTERN.search(line)
+        if match:
+            step_time = _to_float(match.group(1))
+            total_time = _to_float(match.group(2))
+            continue
+
+        match = NODE_SET_PATTERN.search(line)
+        if match:
+            # Instance/assembly prefixes are added by Abaqus, e.g. ASSEMBLY_LOADING
+            set_name = match.group(1).upper()
+            if set_name == target or set_name.endswith('_' + target):
+                state = 'header'
+                columns, sums, totals, node_count = [], {}, {}, 0
+            else:
+                state = None
+            continue
+
+        if state is None:
+            continue
+
+        stripped = line.strip()
+        if state == 'header':
+            if stripped.startswith('NODE'):
+                tokens = stripped.split()
+                # "NODE FOOT-  U3  RF3" - variables follow the footnote column
+                columns = [t for t in tokens[1:] if t not in ('FOOT-', 'FOOT', 'NOTE')]
+                state = 'rows'
+            continue
+
+        if not stripped or stripped == 'NOTE':
+            continue
+
+        tokens = stripped.split()
+        if tokens[0] == 'TOTAL':
+            for name, value in zip(columns, tokens[1:]):
+                totals[name] = _to_float(value)
+            pending = finish_table()
+            state = None
+        elif tokens[0] in ('MAXIMUM', 'MINIMUM', 'AT'):
+            continue
+        else:
+            values = tokens[-len(columns):]
+            try:
+                numbers = [_to_float(v) for v in values]
+            except ValueError:
+                # End of the table without a TOTAL line
+                pending = finish_table()
+                state = None
+                continue
+            node_count += 1
+            for name, value in zip(columns, numbers):
+                sums[name] = sums.get(name, 0.0) + value
+
+    if state == 'rows' and not pending:
+        pending = finish_table()
+    if pending:
+        yield pending
+
+
+def extract_dat_results(
+    dat_path: str,
+    nset: str = 'loading',
+    area: Optional[float] = None,
+    length: Optional[float] = None,
+    displacement_var: str = 'U3',
+    force_var: str = 'RF3'
+) -> Dict[str, np.ndarray]:
+    """
+    Read a .dat file once and return columnar result arrays for `nset`
+
+    Args:
+        dat_path: Abaqus .dat file
+        nset: Node set whose node-print output to extract
+        area: Initial cross-section area for engineering stress (optional)
+        length: Initial specimen length for engineering strain (optional)
+        displacement_var: Displacement component printed for the set
+        force_var: Reaction-force component printed for the set
+
+    Returns:
+        Dict of equal-length NumPy arrays. Stress and strain use the Abaqus
+        sign convention (negative in compression).
+    """
+    rows = []
+    with open(dat_path, 'r', errors='replace') as f:
+        for row in iter_node_set_history(f, nset):
+            rows.append(row)
+
+    columns: Dict[str, np.ndarray] = {
+        'step': np.array([r['step'] for r in rows], dtype=np.int32),
+        'increment': np.array([r['increment'] or 0 for r in rows], dtype=np.int32),
+        'step_time': np.array([r['step_time'] or 0.0 for r in rows], dtype=np.float64),
+        'total_time': np.array([r['total_time'] or 0.0 for r in rows], dtype=np.float64)
+    }
+
+    if rows:
+        displacement = np.array([r.get(f'{displacement_var}_mean') or 0.0 for r in rows], dtype=np.float64)
+        force = np.array([r.get(force_var, 0.0) for r in rows], dtype=np.float64)
+    else:
+        displacement = np.zeros(0, dtype=np.float64)
+        force = np.zeros(0, dtype=np.float64)
+
+    columns['displacement'] = displacement
+    columns['force'] = force
+    if length:
+        columns['strain'] = displacement / length
+    if area:
+        columns['stress'] = force / area
+
+    logger.info(f"Extracted {len(rows)} increments for node set {nset} from {dat_path}")
+    return columns
+
+
+def save_results(columns: Dict[str, np.ndarray], path: str) -> str:
+    """Write result columns to a compressed .npz file"""
+    np.savez_compressed(path, **columns)
+    # np.savez appends .npz when missing
+    return path if path.endswith('.npz') else f"{path}.npz"
+
+
+def load_results(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def ordered_columns(columns: Dict[str, np.ndarray]) -> List[str]:
+    return BASE_COLUMNS + sorted(name for name in columns if name not in BASE_COLUMNS)
+
+
+def page_results(columns: Dict[str, np.ndarray], offset: int = 0, limit: int = 500, names: Optional[List[str]] = None) -> Dict:
+    """Columnar JSON page of a result file"""
+    names = [n for n in (names or ordered_columns(columns)) if n in columns]
+    total_rows = len(columns['increment']) if 'increment' in columns else 0
+    end = min(total_rows, offset + limit)
+    return {
+        'columns': names,
+        'total_rows': total_rows,
+        'offset': offset,
+        'limit': limit,
+        'next_offset': end if end < total_rows else None,
+        'data': {name: columns[name][offset:end].tolist() for name in names}
+    }
+
+
+def results_to_arrow(columns: Dict[str, np.ndarray], offset: int = 0, limit: int = 500, names: Optional[List[str]] = None) -> bytes:
+    """Arrow IPC stream of a page of results (requires pyarrow)"""
+    import pyarrow as pa
+
+    names = [n for n in (names or ordered_columns(columns)) if n in columns]
+    table = pa.table({name: columns[name][offset:offset + limit] for name in names})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
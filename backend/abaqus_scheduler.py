@@ -0,0 +1,596 @@
+"""
+ABAQUS Simulation Scheduler
+Queues solver runs and allocates cores and license tokens per job so that
+concurrent simulations never oversubscribe the machine or the token pool
+
+Under a multi-process server every worker has its own scheduler. With a
+db_path they share one queue and one core/token ledger in SQLite: any worker
+can grant resources to (or cancel) a job, and the worker that queued it
+starts (or stops) it on its next poll.
+"""
+
+import os
+import heapq
+import itertools
+import logging
+import signal
+import sqlite3
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Queue priorities are clamped to this range
+MIN_PRIORITY = -100
+MAX_PRIORITY = 100
+
+# Seconds a stopped solver gets to exit before its process group is killed
+TERMINATE_GRACE_SECONDS = 30.0
+
+
+def license_tokens_for_cpus(cpus: int) -> int:
+    """
+    Number of Abaqus analysis tokens checked out for a job on `cpus` cores
+
+    Abaqus charges int(5 * N^0.422) tokens for an N-core analysis, so
+    1 core = 5 tokens, 4 cores = 8 tokens, 8 cores = 12 tokens, etc.
+    """
+    return int(5 * max(1, cpus) ** 0.422)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists, but owned by another user
+        return True
+    return True
+
+
+def process_group_options() -> Dict:
+    """Popen arguments that start a solver launcher in its own process group"""
+    if os.name == 'nt':
+        return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True}
+
+
+def stop_process_tree(process: subprocess.Popen, force: bool = False) -> None:
+    """
+    Stop a launcher started with process_group_options() and every process it
+    started. The abaqus driver (cmd.exe on Windows) exits without its
+    standard/explicit solver children, so stopping the launcher alone leaves
+    them running.
+    """
+    if os.name == 'nt':
+        # taskkill walks the tree from the launcher, so it cannot wait for a grace period
+        if process.poll() is None:
+            subprocess.run(['taskkill', '/PID', str(process.pid), '/T', '/F'], capture_output=True)
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _process_group_alive(pgid: int) -> bool:
+    if os.path.isdir('/proc'):
+        # Exited children of a dead launcher stay zombies until init reaps them; they do not count
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            state, _, pgrp = stat[stat.rfind(')') + 2:].split()[:3]
+            if state != 'Z' and int(pgrp) == pgid:
+                return True
+        return False
+    try:
+        os.killpg(pgid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def process_tree_alive(process: subprocess.Popen) -> bool:
+    """True while the launcher or any process of its group is still running"""
+    if process.poll() is None:
+        return True
+    return os.name != 'nt' and _process_group_alive(process.pid)
+
+
+class SimulationJob:
+    """A single queued or running solver job"""
+
+    def __init__(self, job_id: str, runner: Callable, requested_cpus: int = 1, priority: int = 0,
+                 on_cancel: Optional[Callable] = None):
+        self.job_id = job_id
+        self.runner = runner
+        self.on_cancel = on_cancel
+        self.requested_cpus = max(1, int(requested_cpus))
+        self.priority = min(MAX_PRIORITY, max(MIN_PRIORITY, int(priority)))
+        self.state = 'queued'
+        self.cpus = 0
+        self.license_tokens = 0
+        self.queued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.process = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def queue_wait_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            if self.finished_at is not None:
+                return round(self.finished_at - self.queued_at, 3)
+            return round(time.time() - self.queued_at, 3)
+        return round(self.started_at - self.queued_at, 3)
+
+    @property
+    def solve_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        end = self.finished_at if self.finished_at is not None else time.time()
+        return round(end - self.started_at, 3)
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.job_id,
+            'state': self.state,
+            'priority': self.priority,
+            'requested_cpus': self.requested_cpus,
+            'cpus': self.cpus,
+            'license_tokens': self.license_tokens,
+            'queue_wait_seconds': self.queue_wait_seconds,
+            'solve_seconds': self.solve_seconds
+        }
+
+
+class SimulationScheduler:
+    """
+    Priority queue of ABAQUS jobs with core and license-token accounting
+
+    Jobs are started strictly in priority order (higher first, FIFO within a
+    priority). The job at the head of the queue gets as many of its requested
+    cores as the free cores and free license tokens allow; if not even a
+    single-core run fits, it waits until a running job releases resources.
+    The pool must hold at least one single-core run, so every job can start.
+    """
+
+    def __init__(
+        self,
+        total_cpus: Optional[int] = None,
+        license_tokens: Optional[int] = None,
+        max_cpus_per_job: Optional[int] = None,
+        max_finished_jobs: int = 256,
+        db_path: Optional[str] = None,
+        poll_interval: float = 1.0,
+        terminate_grace: float = TERMINATE_GRACE_SECONDS
+    ):
+        """
+        Initialize the scheduler
+
+        Args:
+            total_cpus: Cores available to solver jobs (default: os.cpu_count())
+            license_tokens: Size of the license-token pool (default: enough to run
+                every core as a separate single-core job)
+            max_cpus_per_job: Upper bound on cores granted to a single job
+            max_finished_jobs: Finished/cancelled jobs kept for get() (oldest dropped first)
+            db_path: SQLite ledger shared with the other worker processes (see configure())
+            poll_interval: Seconds between checks of the shared ledger for grants and cancels
+            terminate_grace: Seconds a stopped job's processes get before they are killed
+
+        Raises:
+            ValueError: If the token pool cannot run even a single-core job
+        """
+        self.total_cpus = total_cpus or os.cpu_count() or 1
+        self.license_tokens = license_tokens or license_tokens_for_cpus(1) * self.total_cpus
+        self.max_cpus_per_job = max_cpus_per_job or self.total_cpus
+        if self.license_tokens < license_tokens_for_cpus(1):
+            raise ValueError(
+                f"{self.license_tokens} license token(s) cannot run a single-core job "
+                f"({license_tokens_for_cpus(1)} needed)"
+            )
+        self.max_finished_jobs = max_finished_jobs
+        self.terminate_grace = terminate_grace
+
+        self.free_cpus = self.total_cpus
+        self.free_tokens = self.license_tokens
+
+        self._lock = threading.Lock()
+        self._queue: List = []
+        self._counter = itertools.count()
+        self._jobs: Dict[str, SimulationJob] = {}
+        self._finished = deque()
+
+        self.db_path = None
+        self.poll_interval = poll_interval
+        self._instance = uuid.uuid4().hex
+        self._poller_pid = None
+        if db_path:
+            self.configure(db_path)
+
+        logger.info(
+            f"Simulation scheduler: {self.total_cpus} cores, {self.license_tokens} license tokens, "
+            f"max {self.max_cpus_per_job} cores per job"
+        )
+
+    def configure(self, db_path: Optional[str], poll_interval: Optional[float] = None):
+        """
+        Share the queue and the core/token pool with other processes through a
+        database (or none). Every process must use the same totals.
+        """
+        with self._lock:
+            self.db_path = os.path.abspath(db_path) if db_path else None
+            if poll_interval is not None:
+                self.poll_interval = poll_interval
+            if self.db_path:
+                conn = self._connect()
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS simulation_jobs (
+                        job_id TEXT PRIMARY KEY,
+                        owner TEXT NOT NULL,
+                        pid INTEGER NOT NULL,
+                        priority INTEGER NOT NULL,
+                        requested_cpus INTEGER NOT NULL,
+                        cpus INTEGER NOT NULL DEFAULT 0,
+                        license_tokens INTEGER NOT NULL DEFAULT 0,
+                        state TEXT NOT NULL,
+                        cancel INTEGER NOT NULL DEFAULT 0,
+                        queued_at REAL NOT NULL
+                    )
+                ''')
+                conn.commit()
+                conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    @property
+    def _owner(self) -> str:
+        # Forked workers inherit the instance, so the pid tells them apart
+        return f"{os.getpid()}:{self._instance}"
+
+    def submit(self, job_id: str, runner: Callable, requested_cpus: int = 1, priority: int = 0,
+               on_cancel: Optional[Callable] = None) -> SimulationJob:
+        """
+        Queue a job. `runner(job)` is called on a worker thread once cores and
+        tokens have been allocated; it may set `job.process` (started with
+        process_group_options()) so the job can be cancelled while running, and
+        should watch `job.cancel_event`. The cores and tokens are released once
+        the runner has returned and that process group has exited.
+        `on_cancel(job)` is called in this process if the job is cancelled
+        (by any process) before it started.
+        """
+        job = SimulationJob(job_id, runner, min(requested_cpus, self.max_cpus_per_job), priority, on_cancel)
+        if self.db_path:
+            # In the ledger before the local table, so a poll never mistakes it for cancelled
+            conn = self._connect()
+            try:
+                conn.execute(
+                    'INSERT INTO simulation_jobs (job_id, owner, pid, priority, requested_cpus, state, queued_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (job_id, self._owner, os.getpid(), job.priority, job.requested_cpus, 'queued', job.queued_at)
+                )
+            finally:
+                conn.close()
+            self._ensure_poller()
+        with self._lock:
+            self._jobs[job_id] = job
+            if not self.db_path:
+                heapq.heappush(self._queue, (-job.priority, next(self._counter), job_id))
+        logger.info(f"Queued simulation {job_id} (priority={job.priority}, cpus={job.requested_cpus})")
+        self._dispatch()
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job. Returns False if the job already finished."""
+        if self.db_path:
+            return self._cancel_shared(job_id)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job.state not in ('queued', 'running'):
+                return False
+            job.cancel_event.set()
+            was_queued = job.state == 'queued'
+            if was_queued:
+                job.state = 'cancelled'
+                job.finished_at = time.time()
+                # Lazy removal: cancelled entries are skipped when popped
+                logger.info(f"Cancelled queued simulation {job_id}")
+            process = job.process
+
+        if was_queued:
+            if job.on_cancel:
+                job.on_cancel(job)
+        elif process is not None and process.poll() is None:
+            logger.info(f"Terminating running simulation {job_id}")
+            stop_process_tree(process)
+        return True
+
+    def _cancel_shared(self, job_id: str) -> bool:
+        # A queued job leaves the ledger at once; a running one is flagged and
+        # stopped by its owner (right away if that is this process)
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT state FROM simulation_jobs WHERE job_id = ?', (job_id,)).fetchone()
+            if row is None:
+                conn.execute('ROLLBACK')
+                return False
+            if row[0] == 'queued':
+                conn.execute('DELETE FROM simulation_jobs WHERE job_id = ?', (job_id,))
+                logger.info(f"Cancelled queued simulation {job_id}")
+            else:
+                conn.execute('UPDATE simulation_jobs SET cancel = 1 WHERE job_id = ?', (job_id,))
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+        self._sync()
+        return True
+
+    def get(self, job_id: str) -> Optional[SimulationJob]:
+        return self._jobs.get(job_id)
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """1-based position of a queued job, or None if it is not queued"""
+        if self.db_path:
+            conn = self._connect()
+            try:
+                queued = [row[0] for row in conn.execute(
+                    "SELECT job_id FROM simulation_jobs WHERE state = 'queued' ORDER BY priority DESC, queued_at, rowid"
+                )]
+            finally:
+                conn.close()
+            return queued.index(job_id) + 1 if job_id in queued else None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job.state != 'queued':
+                return None
+            ordered = sorted(entry for entry in self._queue if self._jobs[entry[2]].state == 'queued')
+            for position, entry in enumerate(ordered, start=1):
+                if entry[2] == job_id:
+                    return position
+        return None
+
+    def stats(self) -> Dict:
+        if self.db_path:
+            conn = self._connect()
+            try:
+                rows = conn.execute('SELECT state, cpus, license_tokens FROM simulation_jobs').fetchall()
+            finally:
+                conn.close()
+            running = [row for row in rows if row[0] == 'running']
+            return {
+                'total_cpus': self.total_cpus,
+                'free_cpus': self.total_cpus - sum(row[1] for row in running),
+                'license_tokens': self.license_tokens,
+                'free_license_tokens': self.license_tokens - sum(row[2] for row in running),
+                'queued': len(rows) - len(running),
+                'running': len(running)
+            }
+        with self._lock:
+            jobs = list(self._jobs.values())
+            return {
+                'total_cpus': self.total_cpus,
+                'free_cpus': self.free_cpus,
+                'license_tokens': self.license_tokens,
+                'free_license_tokens': self.free_tokens,
+                'queued': sum(1 for job in jobs if job.state == 'queued'),
+                'running': sum(1 for job in jobs if job.state == 'running')
+            }
+
+    @staticmethod
+    def _allocate(requested_cpus: int, free_cpus: int, free_tokens: int) -> int:
+        """Largest core count <= requested that fits in free cores and tokens (0 if none)"""
+        cpus = min(requested_cpus, free_cpus)
+        while cpus > 0 and license_tokens_for_cpus(cpus) > free_tokens:
+            cpus -= 1
+        return cpus
+
+    def _retire(self, job_id: str) -> None:
+        """Keep a job that left the queue for get(), dropping the oldest beyond max_finished_jobs"""
+        self._finished.append(job_id)
+        while len(self._finished) > self.max_finished_jobs:
+            self._jobs.pop(self._finished.popleft(), None)
+
+    def _dispatch(self) -> None:
+        """Start as many jobs from the head of the queue as resources allow"""
+        if self.db_path:
+            self._dispatch_shared()
+            return
+        to_start = []
+        with self._lock:
+            while self._queue:
+                _, _, job_id = self._queue[0]
+                job = self._jobs[job_id]
+                if job.state != 'queued':
+                    heapq.heappop(self._queue)
+                    self._retire(job_id)
+                    continue
+
+                cpus = self._allocate(job.requested_cpus, self.free_cpus, self.free_tokens)
+                if cpus == 0:
+                    break
+
+                heapq.heappop(self._queue)
+                job.cpus = cpus
+                job.license_tokens = license_tokens_for_cpus(cpus)
+                self.free_cpus -= cpus
+                self.free_tokens -= job.license_tokens
+                job.state = 'running'
+                job.started_at = time.time()
+                to_start.append(job)
+        self._start(to_start)
+
+    def _start(self, jobs: List[SimulationJob]) -> None:
+        for job in jobs:
+            logger.info(
+                f"Starting simulation {job.job_id} on {job.cpus} core(s), {job.license_tokens} token(s) "
+                f"after {job.queue_wait_seconds:.2f}s in queue"
+            )
+            thread = threading.Thread(target=self._run, args=(job,))
+            thread.daemon = True
+            thread.start()
+
+    def _dispatch_shared(self) -> None:
+        """Grant cores and tokens from the shared ledger in queue order, whichever process queued the job"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            # Workers that died (crashed or were recycled) give back what they held
+            for (pid,) in conn.execute('SELECT DISTINCT pid FROM simulation_jobs').fetchall():
+                if not _pid_alive(pid):
+                    logger.warning(f"Releasing simulations of exited worker {pid}")
+                    conn.execute('DELETE FROM simulation_jobs WHERE pid = ?', (pid,))
+            used_cpus, used_tokens = conn.execute(
+                "SELECT COALESCE(SUM(cpus), 0), COALESCE(SUM(license_tokens), 0) "
+                "FROM simulation_jobs WHERE state = 'running'"
+            ).fetchone()
+            free_cpus = self.total_cpus - used_cpus
+            free_tokens = self.license_tokens - used_tokens
+            queued = conn.execute(
+                "SELECT job_id, requested_cpus FROM simulation_jobs WHERE state = 'queued' "
+                "ORDER BY priority DESC, queued_at, rowid"
+            ).fetchall()
+            for job_id, requested_cpus in queued:
+                cpus = self._allocate(requested_cpus, free_cpus, free_tokens)
+                if cpus == 0:
+                    break
+                tokens = license_tokens_for_cpus(cpus)
+                conn.execute(
+                    "UPDATE simulation_jobs SET state = 'running', cpus = ?, license_tokens = ? WHERE job_id = ?",
+                    (cpus, tokens, job_id)
+                )
+                free_cpus -= cpus
+                free_tokens -= tokens
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+        self._sync()
+
+    def _sync(self) -> None:
+        """Start this process's jobs granted in the ledger; apply cancels made by any process"""
+        conn = self._connect()
+        try:
+            rows = {
+                row[0]: row[1:] for row in conn.execute(
+                    'SELECT job_id, state, cpus, license_tokens, cancel FROM simulation_jobs WHERE owner = ?',
+                    (self._owner,)
+                )
+            }
+            to_start, cancelled, to_stop, released = [], [], [], []
+            with self._lock:
+                for job in list(self._jobs.values()):
+                    row = rows.get(job.job_id)
+                    if job.state == 'queued':
+                        if row is None or row[3]:
+                            job.cancel_event.set()
+                            job.state = 'cancelled'
+                            job.finished_at = time.time()
+                            self._retire(job.job_id)
+                            cancelled.append(job)
+                            if row is not None:
+                                released.append(job.job_id)
+                        elif row[0] == 'running':
+                            job.state = 'running'
+                            job.cpus, job.license_tokens = row[1], row[2]
+                            job.started_at = time.time()
+                            to_start.append(job)
+                    elif job.state == 'running' and row is not None and row[3] and not job.cancel_event.is_set():
+                        job.cancel_event.set()
+                        to_stop.append(job)
+            if released:
+                conn.executemany('DELETE FROM simulation_jobs WHERE job_id = ?', [(job_id,) for job_id in released])
+        finally:
+            conn.close()
+
+        for job in cancelled:
+            logger.info(f"Cancelled queued simulation {job.job_id}")
+            if job.on_cancel:
+                job.on_cancel(job)
+        for job in to_stop:
+            process = job.process
+            if process is not None and process.poll() is None:
+                logger.info(f"Terminating running simulation {job.job_id}")
+                stop_process_tree(process)
+        self._start(to_start)
+        if released:
+            self._dispatch()
+
+    def _ensure_poller(self):
+        # Threads don't survive fork(): each worker process starts its own
+        if self._poller_pid == os.getpid():
+            return
+        with self._lock:
+            if self._poller_pid == os.getpid():
+                return
+            self._poller_pid = os.getpid()
+            thread = threading.Thread(target=self._poll_loop, args=(self._poller_pid,), daemon=True)
+            thread.start()
+
+    def _poll_loop(self, pid: int):
+        while self._poller_pid == pid and self.db_path:
+            time.sleep(self.poll_interval)
+            if not any(job.state in ('queued', 'running') for job in list(self._jobs.values())):
+                continue
+            try:
+                self._dispatch()
+            except sqlite3.Error as e:
+                logger.warning(f"Simulation queue poll failed: {e}")
+
+    def _reap(self, job: SimulationJob) -> None:
+        """Wait until every process of the job has exited, so its cores and tokens are really free"""
+        process = job.process
+        if not process_tree_alive(process):
+            return
+        # The launcher exited (or the runner gave up on it) with solver processes left
+        logger.info(f"Stopping the remaining processes of simulation {job.job_id}")
+        stop_process_tree(process)
+        deadline = time.time() + self.terminate_grace
+        while process_tree_alive(process):
+            if time.time() >= deadline:
+                logger.warning(f"Simulation {job.job_id} did not stop within {self.terminate_grace}s, killing it")
+                stop_process_tree(process, force=True)
+                try:
+                    process.wait(5)
+                except subprocess.TimeoutExpired:
+                    pass
+                break
+            time.sleep(0.1)
+
+    def _run(self, job: SimulationJob) -> None:
+        try:
+            job.runner(job)
+        except Exception as e:
+            logger.error(f"Simulation runner for {job.job_id} raised: {str(e)}", exc_info=True)
+        finally:
+            if job.process is not None:
+                self._reap(job)
+            with self._lock:
+                job.finished_at = time.time()
+                job.state = 'cancelled' if job.cancel_event.is_set() else 'finished'
+                job.process = None
+                if not self.db_path:
+                    self.free_cpus += job.cpus
+                    self.free_tokens += job.license_tokens
+                self._retire(job.job_id)
+            if self.db_path:
+                conn = self._connect()
+                try:
+                    conn.execute('DELETE FROM simulation_jobs WHERE job_id = ?', (job.job_id,))
+                finally:
+                    conn.close()
+            logger.info(f"Simulation {job.job_id} released {job.cpus} core(s), {job.license_tokens} token(s)")
+            self._dispatch()
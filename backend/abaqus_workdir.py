@@ -0,0 +1,87 @@
+"""
+Per-Job Solver Working Directories
+Abaqus used to run with cwd set to the shared outputs/ folder. Concurrent jobs
+wrote their .lck/.sta/.msg/scratch files into one directory, and two runs of
+the same .inp used the same job name and removed each other's files.
+
+Each run now gets its own directory under the scratch root (which can be a
+tmpfs such as /dev/shm), holding a copy of the .inp. When the run ends, only
+the result files are moved to a durable directory. The scratch directory,
+with everything else the solver wrote (.lck, .com, .prt, .log, scratch
+files), is removed.
+
+Warm-start edits are applied to the scratch copy, so the generated .inp
+itself is never modified.
+"""
+
+import os
+import time
+import shutil
+import logging
+from typing import Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Files kept after a run, by extension (the names the endpoints use in output_files)
+RESULT_TYPES = ('odb', 'dat', 'msg', 'sta')
+# Kept after a failed run, to see why it failed
+DIAGNOSTIC_TYPES = ('msg', 'sta', 'dat')
+
+
+def create_workdir(scratch_root: str, run_id: str, inp_path: str, job_name: str) -> str:
+    """A new directory for one run, with the .inp copied in as <job_name>.inp"""
+    workdir = os.path.abspath(os.path.join(scratch_root, run_id))
+    os.makedirs(workdir)
+    shutil.copy2(inp_path, os.path.join(workdir, f"{job_name}.inp"))
+    return workdir
+
+
+def harvest(workdir: str, job_name: str, dest_dir: str, types: Iterable[str] = RESULT_TYPES) -> Dict[str, str]:
+    """Move the result files of a finished run to dest_dir; returns {type: durable path}"""
+    os.makedirs(dest_dir, exist_ok=True)
+    output_files = {}
+    for file_type in types:
+        source = os.path.join(workdir, f"{job_name}.{file_type}")
+        if os.path.exists(source):
+            dest = os.path.abspath(os.path.join(dest_dir, f"{job_name}.{file_type}"))
+            # A rename on the same filesystem, a copy from tmpfs
+            shutil.move(source, dest)
+            output_files[file_type] = dest
+    return output_files
+
+
+def remove_workdir(workdir: str):
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _last_write(path: str) -> float:
+    latest = os.stat(path).st_mtime
+    for dirpath, dirnames, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                latest = max(latest, os.stat(os.path.join(dirpath, name)).st_mtime)
+            except OSError:
+                pass
+    return latest
+
+
+def remove_stale_workdirs(scratch_root: str, max_age_seconds: float) -> int:
+    """
+    Remove directories left by runs whose process died (nothing written for
+    max_age_seconds); a running solver keeps writing its .sta and .msg
+    """
+    if not os.path.isdir(scratch_root):
+        return 0
+    removed = 0
+    cutoff = time.time() - max_age_seconds
+    for name in os.listdir(scratch_root):
+        path = os.path.join(scratch_root, name)
+        try:
+            if os.path.isdir(path) and _last_write(path) < cutoff:
+                remove_workdir(path)
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        logger.info(f"Removed {removed} stale solver working directories from {scratch_root}")
+    return removed
@@ -1,28 +1,80 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Blueprint, request, jsonify, send_file
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity
+from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity, verify_jwt_in_request
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
+from werkzeug.datastructures import FileStorage
 import os
+import json
 import sqlite3
 import uuid
-import tempfile
 import threading
 import zipfile
+import shutil
 import subprocess
 import io
-from datetime import datetime, timedelta
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import logging
-import requests
 import time
 from dotenv import load_dotenv
-from io import BytesIO
-import pikepdf
 import base64
-from glm_vision_service import GLMVisionService
-import convertapi
-import ocrmypdf
-
+import shlex
+from abaqus_scheduler import (
+    SimulationScheduler, MIN_PRIORITY, MAX_PRIORITY, process_group_options, stop_process_tree
+)
+from abaqus_progress import SimulationProgressTracker, analysis_time_period
+from abaqus_workdir import (
+    RESULT_TYPES, DIAGNOSTIC_TYPES, create_workdir, harvest, remove_workdir, remove_stale_workdirs
+)
+from textract_stream import iter_blocks, write_blocks_jsonl
+from abaqus_cache import (
+    SimulationResultCache, inp_hashes, initial_time_increment, apply_initial_time_increment
+)
+from engines import register as register_engine, lazy_import
+from task_store import TaskStore, TERMINAL_STATES
+from config import get_config
+from ingest import IngestRequest, UploadRejected, ingest_upload, link_blob
+from chunked_upload import ChunkedUploadStore, ChunkedUploadError, CompletedUpload
+from page_selection import PageSelectionError, parse_pages, format_pages, camelot_pages, render_pages
+from ocr_profiles import OCRProfileError, DEFAULT_PROFILE, probe_tools, profile_options, profile_args
+from storage_manager import StorageManager, StorageQuotaExceeded, task_references
+
+# OCR, vision and extraction engines are imported on first use (see engines.py)
+# so auth and status requests don't wait for ocrmypdf, zhipuai, pandas or PyMuPDF
+GLMVisionService = lazy_import('glm_vision_service', 'GLMVisionService')
+specimen_geometry = lazy_import('abaqus_results', 'specimen_geometry')
+extract_dat_results = lazy_import('abaqus_results', 'extract_dat_results')
+save_results = lazy_import('abaqus_results', 'save_results')
+load_results = lazy_import('abaqus_results', 'load_results')
+ordered_columns = lazy_import('abaqus_results', 'ordered_columns')
+page_results = lazy_import('abaqus_results', 'page_results')
+results_to_arrow = lazy_import('abaqus_results', 'results_to_arrow')
+make_searchable_pdf = lazy_import('searchable_pdf', 'make_searchable_pdf')
+detect_text_blocks = lazy_import('searchable_pdf', 'detect_text_blocks')
+SpatialIndex = lazy_import('spatial_index', 'SpatialIndex')
+tables_from_blocks = lazy_import('textract_tables', 'tables_from_blocks')
+save_tables = lazy_import('textract_tables', 'save_tables')
+specimen_data_from_tables = lazy_import('textract_tables', 'specimen_data_from_tables')
+format_specimen_data = lazy_import('textract_tables', 'format_specimen_data')
+SpecimenCatalog = lazy_import('specimen_catalog', 'SpecimenCatalog')
+TextractService = lazy_import('textract_service', 'TextractService')
+LocalTextractClient = lazy_import('textract_service', 'LocalTextractClient')
+LocalS3Client = lazy_import('textract_service', 'LocalS3Client')
+query_answers = lazy_import('textract_service', 'query_answers')
+document_text = lazy_import('textract_service', 'document_text')
+split_pages = lazy_import('page_ocr', 'split_pages')
+ocr_pages = lazy_import('page_ocr', 'ocr_pages')
+finished_pages = lazy_import('page_ocr', 'finished_pages')
+merge_pages = lazy_import('page_ocr', 'merge_pages')
+merge_text = lazy_import('page_ocr', 'merge_text')
+classify_pages = lazy_import('page_classifier', 'classify_pages')
+action_counts = lazy_import('page_classifier', 'action_counts')
+TesseractPool = lazy_import('tesseract_pool', 'TesseractPool')
+pdf_word_blocks = lazy_import('tesseract_pool', 'pdf_word_blocks')
+tesseract_available = lazy_import('tesseract_pool', 'available')
 
 # Load environment variables from .env file
 load_dotenv()
@@ -32,44 +84,119 @@ GLM_API_KEY = os.getenv('GLM_API_KEY', '')
 
 # CONVERTAPI CONFIGURATION
 CONVERT_API_KEY = os.getenv('CONVERT_API_KEY', '')
-if CONVERT_API_KEY:
-    convertapi.api_credentials = CONVERT_API_KEY
+
+
+def configure_convertapi(module):
+    if CONVERT_API_KEY:
+        module.api_credentials = CONVERT_API_KEY
+
+
+convertapi = register_engine('convertapi', configure=configure_convertapi)
+
+# SEARCHABLE PDF CONFIGURATION
+SEARCHABLE_PDF_DPI = int(os.getenv('SEARCHABLE_PDF_DPI', '200'))  # only for pages that must be rasterized
+
+# AWS TEXTRACT CONFIGURATION
+# With a bucket, multi-page PDFs go through the asynchronous S3 job API;
+# without one, pages are sent one by one to the synchronous API
+TEXTRACT_S3_BUCKET = os.getenv('TEXTRACT_S3_BUCKET', '')
+TEXTRACT_S3_PREFIX = os.getenv('TEXTRACT_S3_PREFIX', 'textract-input/')
+TEXTRACT_POLL_INTERVAL = float(os.getenv('TEXTRACT_POLL_INTERVAL', '2.0'))
+TEXTRACT_MAX_WAIT = float(os.getenv('TEXTRACT_MAX_WAIT', '900'))
+# Replay a recorded response (.json or .jsonl) instead of calling AWS
+TEXTRACT_LOCAL_RESPONSE = os.getenv('TEXTRACT_LOCAL_RESPONSE', '')
+
+# PAGE OCR CONFIGURATION
+# /api/upload OCRs each page in its own ocrmypdf process, OCR_PAGE_WORKERS at a time
+OCR_PAGE_WORKERS = int(os.getenv('OCR_PAGE_WORKERS', '0')) or None  # default: all cores
+OCR_PAGE_TIMEOUT = float(os.getenv('OCR_PAGE_TIMEOUT', '300'))  # seconds per page
+# Searchable PDFs are built in one spawned pool of this many processes, shared by all requests
+SEARCHABLE_PDF_WORKERS = int(os.getenv('SEARCHABLE_PDF_WORKERS', '0')) or max(1, (os.cpu_count() or 2) // 2)
+# 'ocrmypdf' (a process per page) or 'tesseract' (warm tesserocr workers, see tesseract_pool.py)
+OCR_ENGINES = ('ocrmypdf', 'tesseract')
+OCR_ENGINE = os.getenv('OCR_ENGINE', 'ocrmypdf')
+TESSERACT_POOL_SIZE = int(os.getenv('TESSERACT_POOL_SIZE', '0')) or None  # default: all cores
+TESSDATA_PREFIX = os.getenv('TESSDATA_PREFIX', '') or None
+
+# SPECIMEN CATALOG CONFIGURATION
+# Heat/sample numbers with dimensions and certificate properties (see parsertsv.py to import)
+SPECIMEN_CATALOG_DB = os.getenv('SPECIMEN_CATALOG_DB', 'specimen_catalog.db')
+# The catalog is shared by every user, so only these accounts may import into it (comma-separated e-mails)
+CATALOG_ADMIN_EMAILS = {email.strip().lower() for email in os.getenv('CATALOG_ADMIN_EMAILS', '').split(',') if email.strip()}
+
+# RESUMABLE UPLOAD CONFIGURATION
+CHUNKED_UPLOAD_MAX_SIZE = int(os.getenv('CHUNKED_UPLOAD_MAX_SIZE', str(2 * 1024 ** 3)))
+CHUNKED_UPLOAD_EXPIRE_HOURS = float(os.getenv('CHUNKED_UPLOAD_EXPIRE_HOURS', '24'))
+
+# STORAGE CONFIGURATION
+# Files of finished jobs in uploads/ and outputs/ are evicted by age and quota (see storage_manager.py)
+GB = 1024 ** 3
+STORAGE_DB = os.getenv('STORAGE_DB', 'storage.db')
+STORAGE_MAX_BYTES = int(float(os.getenv('STORAGE_MAX_GB', '0')) * GB) or None  # default: no limit
+STORAGE_USER_MAX_BYTES = int(float(os.getenv('STORAGE_USER_MAX_GB', '0')) * GB) or None
+STORAGE_MIN_FREE_BYTES = int(float(os.getenv('STORAGE_MIN_FREE_GB', '2')) * GB)
+STORAGE_TTL_SECONDS = float(os.getenv('STORAGE_TTL_HOURS', '168')) * 3600 or None  # 0 = keep until evicted by quota
+STORAGE_GRACE_SECONDS = float(os.getenv('STORAGE_GRACE_MINUTES', '10')) * 60
+STORAGE_SWEEP_INTERVAL = float(os.getenv('STORAGE_SWEEP_MINUTES', '15')) * 60  # 0 = only sweep on upload
+
+# BATCH CONFIGURATION
+# Files of a batch run at most BATCH_WORKERS at a time (OCR engines use several cores each)
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '0')) or max(1, (os.cpu_count() or 2) // 2)
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', '500'))
+# Page OCR processes per batch file, so BATCH_WORKERS files together use about all cores
+BATCH_PAGE_WORKERS = int(os.getenv('BATCH_PAGE_WORKERS', '0')) or max(1, (os.cpu_count() or 1) // BATCH_WORKERS)
+
+# ABAQUS SOLVER CONFIGURATION
+ABAQUS_CMD = os.getenv('ABAQUS_CMD', 'abaqus')
+# Replay recorded runs with fake_abaqus.py instead of launching the real solver
+ABAQUS_FAKE = os.getenv('ABAQUS_FAKE', 'false').lower() == 'true'
+FAKE_ABAQUS_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_abaqus.py')
+ABAQUS_CPUS = int(os.getenv('ABAQUS_CPUS', '0')) or None  # default: all cores
+ABAQUS_LICENSE_TOKENS = int(os.getenv('ABAQUS_LICENSE_TOKENS', '0')) or None  # default: 5 tokens per core
+ABAQUS_MAX_CPUS_PER_JOB = int(os.getenv('ABAQUS_MAX_CPUS_PER_JOB', '0')) or None
+ABAQUS_DEFAULT_CPUS = int(os.getenv('ABAQUS_DEFAULT_CPUS', '1'))
+ABAQUS_PROGRESS_INTERVAL = float(os.getenv('ABAQUS_PROGRESS_INTERVAL', '1.0'))  # seconds between .sta polls
+# Reuse results of identical .inp files and warm-start runs on a known mesh
+ABAQUS_RESULT_CACHE = os.getenv('ABAQUS_RESULT_CACHE', 'true').lower() == 'true'
+ABAQUS_RESULT_CACHE_MAX_BYTES = int(float(os.getenv('ABAQUS_RESULT_CACHE_MAX_GB', '20')) * GB) or None  # 0 = no limit
+ABAQUS_RESULT_CACHE_TTL_SECONDS = float(os.getenv('ABAQUS_RESULT_CACHE_DAYS', '30')) * 86400 or None
+# Each run works in its own directory here (e.g. /dev/shm for tmpfs); results then move to outputs/sim_<id>
+ABAQUS_SCRATCH_DIR = os.getenv('ABAQUS_SCRATCH_DIR', os.path.join('outputs', 'sim_scratch'))
+ABAQUS_SCRATCH_MAX_AGE = float(os.getenv('ABAQUS_SCRATCH_MAX_AGE_HOURS', '24')) * 3600  # runs left by dead workers
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-app.config['JWT_SECRET_KEY'] = 'dDaysadadREfj@38u983293*#(&#*u8w'
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
-app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  
+# Routes live on a blueprint; create_app() (bottom of this file) builds the Flask app
+api = Blueprint('api', __name__)
+jwt = JWTManager()
 
-jwt = JWTManager(app)
-CORS(app, origins=["http://localhost:3000"])
 @jwt.expired_token_loader
 def expired_token_callback(jwt_header, jwt_payload):
-    print(f"JWT expired token error")
+    logger.warning("JWT expired token error")
     return jsonify({'error': 'Token has expired'}), 401
 
 @jwt.invalid_token_loader
 def invalid_token_callback(error):
-    print(f"JWT invalid token error: {error}")
+    logger.warning(f"JWT invalid token error: {error}")
     return jsonify({'error': 'Invalid token'}), 422
 
 @jwt.unauthorized_loader
 def missing_token_callback(error):
-    print(f"JWT missing token error: {error}")
+    logger.warning(f"JWT missing token error: {error}")
     return jsonify({'error': 'Authorization token is required'}), 401
 
-@app.before_request
+@api.before_app_request
 def log_request_info():
-    print(f"=== REQUEST: {request.method} {request.path} ===")
+    logger.debug(f"=== REQUEST: {request.method} {request.path} ===")
     if request.path == '/api/upload':
-        print(f"Content-Type: {request.content_type}")
-        print(f"Content-Length: {request.content_length}")
+        logger.debug(f"Content-Type: {request.content_type}")
+        logger.debug(f"Content-Length: {request.content_length}")
 
 UPLOAD_FOLDER = 'uploads'
 OUTPUT_FOLDER = 'outputs'
 ALLOWED_EXTENSIONS = {'pdf'}
+CATALOG_EXTENSIONS = {'tsv', 'csv', 'txt', 'xlsx'}
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
@@ -77,12 +204,45 @@ os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 # Task storage for tracking async processing
 task_storage = {}
 
+# Word-box indexes of recently queried Textract tasks (task_id -> SpatialIndex)
+spatial_indexes = OrderedDict()
+spatial_indexes_lock = threading.Lock()
+SPATIAL_INDEX_CACHE_SIZE = 8
+
+# Shared queue for ABAQUS solver runs (cores + license tokens)
+simulation_scheduler = SimulationScheduler(
+    total_cpus=ABAQUS_CPUS,
+    license_tokens=ABAQUS_LICENSE_TOKENS,
+    max_cpus_per_job=ABAQUS_MAX_CPUS_PER_JOB
+)
+
+# Completed simulation results keyed by canonical .inp hash
+simulation_cache = SimulationResultCache(
+    os.path.join(OUTPUT_FOLDER, 'sim_cache'),
+    max_bytes=ABAQUS_RESULT_CACHE_MAX_BYTES,
+    ttl_seconds=ABAQUS_RESULT_CACHE_TTL_SECONDS
+)
+
+# Material-certificate rows indexed by heat and sample number (opened on first use)
+specimen_catalog = None
+specimen_catalog_lock = threading.Lock()
+
+def get_specimen_catalog():
+    global specimen_catalog
+    with specimen_catalog_lock:
+        if specimen_catalog is None:
+            specimen_catalog = SpecimenCatalog(SPECIMEN_CATALOG_DB)
+        return specimen_catalog
+
 def setup_ocr_environment():
     os.environ['TESSERACT_CMD'] = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
     os.environ['PATH'] = r'C:\Program Files\gs\gs10.05.1\bin;' + os.environ.get('PATH', '')
 
+# Set at import: OCR runs the ocrmypdf/tesseract/gs commands, which never load the module below
 setup_ocr_environment()
 
+ocrmypdf = register_engine('ocrmypdf')
+
 def init_db():
     conn = sqlite3.connect('users.db')
     cursor = conn.cursor()
@@ -112,13 +272,159 @@ def init_db():
     conn.commit()
     conn.close()
 
-init_db()
+# The users database is created on the first request instead of at import
+db_ready = False
+db_ready_lock = threading.Lock()
+
+@api.before_app_request
+def ensure_db():
+    global db_ready
+    if not db_ready:
+        with db_ready_lock:
+            if not db_ready:
+                init_db()
+                db_ready = True
 
-processing_status = {}
+# Task status by task id; shared across worker processes once create_app() sets TASK_STORE_DB
+processing_status = TaskStore()
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# Resumable upload sessions (opened on first use, like the specimen catalog)
+chunked_uploads = None
+chunked_uploads_lock = threading.Lock()
+
+def get_chunked_uploads():
+    global chunked_uploads
+    with chunked_uploads_lock:
+        if chunked_uploads is None:
+            chunked_uploads = ChunkedUploadStore(
+                os.path.join(UPLOAD_FOLDER, 'chunked'),
+                max_size=CHUNKED_UPLOAD_MAX_SIZE,
+                expire_seconds=CHUNKED_UPLOAD_EXPIRE_HOURS * 3600
+            )
+        return chunked_uploads
+
+def requested_upload():
+    """The PDF of an upload request: a multipart 'file', or a finalized chunked upload ('upload_id')"""
+    if 'file' in request.files:
+        return request.files['file']
+    upload_id = request.form.get('upload_id', '').strip()
+    if upload_id:
+        return get_chunked_uploads().completed(upload_id, get_jwt_identity())
+    return None
+
+def ocr_options(form):
+    """
+    OCR + table extraction options of /api/upload (and OCR batches) from form fields.
+    'profile' picks an OCR profile (see ocr_profiles.py); deskew, clean and optimize
+    override it when given. Raises OCRProfileError.
+    """
+    options = {
+        'profile': form.get('profile', DEFAULT_PROFILE),
+        'language': form.get('language', 'eng'),
+        'force_ocr': form.get('force_ocr', 'false').lower() == 'true',
+        'extract_tables': form.get('extract_tables', 'true').lower() == 'true'
+    }
+    for key in ('deskew', 'clean'):
+        if key in form:
+            options[key] = form[key].lower() == 'true'
+    if 'optimize' in form:
+        options['optimize'] = form['optimize']
+    options['engine'] = form.get('engine', OCR_ENGINE)
+    if options['engine'] not in OCR_ENGINES:
+        raise OCRProfileError(f"Unknown OCR engine '{options['engine']}'; use one of {', '.join(OCR_ENGINES)}")
+    # A requested engine must be there; the OCR_ENGINE default falls back to ocrmypdf
+    if 'engine' in form:
+        check_engine_available(options['engine'])
+    return profile_options(options)
+
+def check_engine_available(engine):
+    """Raises OCRProfileError if a requested local OCR engine is not installed"""
+    if engine == 'tesseract' and not tesseract_available():
+        raise OCRProfileError("The tesseract engine needs the tesserocr package, which is not installed")
+
+# Warm Tesseract workers per (language, OEM), started on first use in each process
+# (threads do not survive gunicorn's fork, so never in warm_up)
+tesseract_pools = {}
+tesseract_pools_lock = threading.Lock()
+
+def get_tesseract_pool(lang='eng', oem=None):
+    """Raises ImportError if tesserocr is not installed"""
+    with tesseract_pools_lock:
+        if (lang, oem) not in tesseract_pools:
+            tesseract_pools[(lang, oem)] = TesseractPool(TESSERACT_POOL_SIZE, lang, oem, TESSDATA_PREFIX)
+        return tesseract_pools[(lang, oem)]
+
+# Eviction of old job files (opened on first use; the sweeper thread is started per process)
+storage_manager = None
+storage_manager_lock = threading.Lock()
+
+def storage_owners():
+    """(task_id, user_id, running, referenced file names) of every known task, for the storage manager"""
+    for task_id in list(processing_status):
+        try:
+            status = processing_status[task_id]
+        except KeyError:
+            continue
+        yield task_id, status.get('user_id'), status.get('status') not in TERMINAL_STATES, task_references(status)
+    # Finalized chunked uploads keep their blob until a route uses it
+    for upload_id, user_id, blob_path in get_chunked_uploads().completed_blobs():
+        yield upload_id, user_id, True, [os.path.basename(blob_path)]
+
+def get_storage():
+    global storage_manager
+    with storage_manager_lock:
+        if storage_manager is None:
+            storage_manager = StorageManager(
+                [UPLOAD_FOLDER, OUTPUT_FOLDER],
+                db_path=STORAGE_DB,
+                max_bytes=STORAGE_MAX_BYTES,
+                user_max_bytes=STORAGE_USER_MAX_BYTES,
+                ttl_seconds=STORAGE_TTL_SECONDS,
+                min_free_bytes=STORAGE_MIN_FREE_BYTES,
+                grace_seconds=STORAGE_GRACE_SECONDS,
+                skip=('chunked', 'sim_cache', 'sim_scratch'),
+                expand=('blobs',),
+                owners=storage_owners
+            )
+    storage_manager.start(STORAGE_SWEEP_INTERVAL)
+    return storage_manager
+
+@api.before_app_request
+def admit_upload():
+    """
+    Make room for a multipart body before it is parsed: IngestRequest writes the
+    file parts to disk as soon as request.files is first read. One check per
+    request, whatever the number of files in it.
+    """
+    if request.method not in ('POST', 'PUT') or request.mimetype != 'multipart/form-data':
+        return None
+    verify_jwt_in_request(optional=True)
+    user_id = get_jwt_identity()
+    if user_id is None:
+        # Not signed in: the route itself answers with 401
+        return None
+    get_storage().admit(user_id, request.content_length or 0)
+
+def store_upload(file, input_path, task_id=None):
+    """
+    Validate and store a requested upload at input_path, recorded as the task's input.
+    Raises UploadRejected. Room for it was made by admit_upload().
+    """
+    user_id = get_jwt_identity()
+    if isinstance(file, CompletedUpload):
+        upload = link_blob(file.blob, input_path)
+    else:
+        upload = ingest_upload(file, input_path, UPLOAD_FOLDER)
+    get_storage().track(input_path, task_id, user_id)
+    return upload
+
+def requested_pages(upload):
+    """Pages selected by the 'pages' form field (None: all) of a stored upload; raises PageSelectionError"""
+    return parse_pages(request.form.get('pages'), upload.get('pages'))
+
 def get_user_by_email(email):
     conn = sqlite3.connect('users.db')
     cursor = conn.cursor()
@@ -127,6 +433,14 @@ def get_user_by_email(email):
     conn.close()
     return user
 
+def is_catalog_admin(user_id):
+    conn = sqlite3.connect('users.db')
+    cursor = conn.cursor()
+    cursor.execute('SELECT email FROM users WHERE id = ?', (user_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return row is not None and row[0].lower() in CATALOG_ADMIN_EMAILS
+
 def create_user(email, password, full_name):
     try:
         conn = sqlite3.connect('users.db')
@@ -143,7 +457,7 @@ def create_user(email, password, full_name):
     except sqlite3.IntegrityError:
         return None
 
-def process_pdf_with_ocr_and_camelot(input_path, output_path, options, task_id, user_id):
+def process_pdf_with_ocr_and_camelot(input_path, output_path, options, task_id, user_id, page_workers=None):
     try:
         processing_status[task_id] = {
             'status': 'processing',
@@ -152,28 +466,46 @@ def process_pdf_with_ocr_and_camelot(input_path, output_path, options, task_id,
             'user_id': user_id
         }
         
-        import ocrmypdf
-
-        processing_status[task_id]['message'] = 'Running OCR on PDF...'
-        processing_status[task_id]['progress'] = 30
-        
-        ocr_options = {
-            'language': options.get('language', 'eng'),
-            'deskew': options.get('deskew', True),
-            'optimize': int(options.get('optimize', 1)),
-            'force_ocr': options.get('force_ocr', False),
-            'progress_bar': False
-        }
-        
-        if options.get('clean', False):
+        # Profile settings plus overrides; tools were probed once at startup
+        ocr_options = profile_options(options)
+        
+        # Each page is OCRed on its own and kept in pages_dir, so finished pages can be
+        # downloaded (/api/download_partial) while the rest are still running.
+        # Unselected pages are copied through without being rasterized or OCRed.
+        pages = options.get('pages')
+        pages_dir = os.path.join(OUTPUT_FOLDER, f"pages_{task_id}")
+        selected = split_pages(input_path, pages_dir, pages)
+        # Owned by the task, so the storage manager removes it when a failed task expires
+        get_storage().track(pages_dir, task_id, user_id)
+        # Digital pages are skipped, mixed ones get --redo-ocr, scans plain OCR
+        page_classes = classify_pages(input_path, selected, force_ocr=ocr_options.get('force_ocr', False))
+        page_actions = action_counts(page_classes)
+        status = processing_status[task_id]
+        status.update({
+            'message': f"Running OCR on {len(selected) - page_actions['skip']} of {len(selected)} page(s)...",
+            'pages_dir': pages_dir,
+            'pages_done': 0,
+            'pages_total': len(selected),
+            'page_actions': page_actions
+        })
+
+        def page_done(page):
+            status['pages_done'] += 1
+            status['progress'] = 10 + 50 * status['pages_done'] // len(selected)
+            status['message'] = f"OCR finished on {status['pages_done']} of {len(selected)} page(s)"
+
+        tesseract = None
+        if ocr_options.get('engine') == 'tesseract':
             try:
-                import subprocess
-                subprocess.run(['unpaper', '--version'], capture_output=True, timeout=5)
-                ocr_options['clean'] = True
-            except:
-                logger.warning("Unpaper not available, skipping clean option")
-        
-        ocrmypdf.ocr(input_path, output_path, **ocr_options)
+                tesseract = get_tesseract_pool(ocr_options['language'], ocr_options['oem'])
+            except ImportError:
+                logger.warning("tesserocr not available, using ocrmypdf")
+        ocr_pages(pages_dir, selected, ocr_options, workers=page_workers or OCR_PAGE_WORKERS, timeout=OCR_PAGE_TIMEOUT,
+                  on_page=page_done, actions={page: c['action'] for page, c in page_classes.items()},
+                  tesseract=tesseract)
+        merge_pages(input_path, pages_dir, output_path)
+        text_file = f"{os.path.splitext(os.path.basename(output_path))[0]}.txt"
+        merge_text(pages_dir, os.path.join(OUTPUT_FOLDER, text_file))
         
         processing_status[task_id]['message'] = 'OCR completed, extracting tables...'
         processing_status[task_id]['progress'] = 60
@@ -195,7 +527,7 @@ def process_pdf_with_ocr_and_camelot(input_path, output_path, options, task_id,
                 try:
                     tables = camelot.read_pdf(
                         output_path, 
-                        pages='all',
+                        pages=camelot_pages(pages),
                         flavor='lattice',  # Better for bordered tables
                         table_areas=None,  # Auto-detect table areas
                         columns=None,      # Auto-detect columns
@@ -214,7 +546,7 @@ def process_pdf_with_ocr_and_camelot(input_path, output_path, options, task_id,
                     # Try stream method as well for comprehensive detection
                     stream_tables = camelot.read_pdf(
                         output_path,
-                        pages='all', 
+                        pages=camelot_pages(pages),
                         flavor='stream',   # Better for tables without borders
                         table_areas=None,
                         columns=None,
@@ -235,7 +567,7 @@ def process_pdf_with_ocr_and_camelot(input_path, output_path, options, task_id,
                     try:
                         all_tables = camelot.read_pdf(
                             output_path,
-                            pages='all',
+                            pages=camelot_pages(pages),
                             flavor='stream',
                             table_areas=None,
                             columns=None,
@@ -326,19 +658,37 @@ def process_pdf_with_ocr_and_camelot(input_path, output_path, options, task_id,
             'output_file': os.path.basename(output_path),
             'tables': tables_data,
             'tables_dir': tables_dir,
+            'text_file': text_file,
+            'pages': format_pages(pages),
+            'pages_done': len(selected),
+            'pages_total': len(selected),
+            'page_actions': page_actions,
+            'profile': ocr_options['profile'],
+            'ocr_engine': 'tesseract' if tesseract else 'ocrmypdf',
             'user_id': user_id
         }
+        shutil.rmtree(pages_dir, ignore_errors=True)
         
     except Exception as e:
+        previous = processing_status.get(task_id, {})
+        pages_dir = previous.get('pages_dir')
+        if pages_dir and not finished_pages(pages_dir):
+            shutil.rmtree(pages_dir, ignore_errors=True)
+            pages_dir = None
         processing_status[task_id] = {
             'status': 'error',
             'message': f'Processing failed: {str(e)}',
             'progress': 0,
+            # Pages finished before the failure stay downloadable (/api/download_partial)
+            # until the storage manager expires them
+            'pages_dir': pages_dir,
+            'pages_done': previous.get('pages_done', 0),
+            'pages_total': previous.get('pages_total', 0),
             'user_id': user_id
         }
         logger.error(f"Processing failed: {e}")
 
-@app.route('/api/register', methods=['POST'])
+@api.route('/api/register', methods=['POST'])
 def register():
     data = request.get_json()
     
@@ -372,7 +722,7 @@ def register():
         }
     })
 
-@app.route('/api/login', methods=['POST'])
+@api.route('/api/login', methods=['POST'])
 def login():
     data = request.get_json()
     
@@ -398,7 +748,7 @@ def login():
         }
     })
 
-@app.route('/api/profile', methods=['GET'])
+@api.route('/api/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
     user_id = int(get_jwt_identity())
@@ -421,46 +771,46 @@ def get_profile():
     })
 
 
-@app.route('/api/upload', methods=['POST'])
+@api.route('/api/upload', methods=['POST'])
 @jwt_required()
 def upload_file():
-    print("=== UPLOAD ENDPOINT CALLED ===")
-    print(f"Request method: {request.method}")
-    print(f"Request content type: {request.content_type}")
-    print(f"Request headers: {dict(request.headers)}")
+    logger.debug("=== UPLOAD ENDPOINT CALLED ===")
+    logger.debug(f"Request method: {request.method}")
+    logger.debug(f"Request content type: {request.content_type}")
+    logger.debug(f"Request headers: {dict(request.headers)}")
     
     user_id = int(get_jwt_identity())
-    print(f"JWT validation successful, user_id: {user_id}")
+    logger.debug(f"JWT validation successful, user_id: {user_id}")
     
-    print(f"Upload request from user {user_id}")
-    print(f"Files in request: {list(request.files.keys())}")
-    print(f"Form data: {dict(request.form)}")
+    logger.debug(f"Upload request from user {user_id}")
+    logger.debug(f"Files in request: {list(request.files.keys())}")
+    logger.debug(f"Form data: {dict(request.form)}")
     
-    if 'file' not in request.files:
-        print("Error: No file provided")
+    file = requested_upload()
+    if file is None:
+        logger.warning("Error: No file provided")
         return jsonify({'error': 'No file provided'}), 400
     
-    file = request.files['file']
-    print(f"File received: {file.filename}")
+    logger.debug(f"File received: {file.filename}")
     
     if file.filename == '' or not allowed_file(file.filename):
-        print(f"Error: Invalid file type or empty filename: {file.filename}")
+        logger.warning(f"Error: Invalid file type or empty filename: {file.filename}")
         return jsonify({'error': 'Invalid file type. Please upload a PDF file.'}), 400
     
-    options = {
-        'language': request.form.get('language', 'eng'),
-        'deskew': request.form.get('deskew', 'true').lower() == 'true',
-        'clean': request.form.get('clean', 'false').lower() == 'true',
-        'optimize': request.form.get('optimize', '1'),
-        'force_ocr': request.form.get('force_ocr', 'false').lower() == 'true',
-        'extract_tables': request.form.get('extract_tables', 'true').lower() == 'true'
-    }
+    try:
+        options = ocr_options(request.form)
+    except OCRProfileError as e:
+        return jsonify({'error': str(e)}), 400
     task_id = str(uuid.uuid4())
     filename = secure_filename(file.filename)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     input_filename = f"{timestamp}_{filename}"
     input_path = os.path.join(UPLOAD_FOLDER, input_filename)
-    file.save(input_path)
+    try:
+        options['pages'] = requested_pages(store_upload(file, input_path, task_id))
+    except (UploadRejected, PageSelectionError) as e:
+        logger.warning(f"Rejected upload {filename}: {str(e)}")
+        return jsonify({'error': str(e)}), 400
     output_filename = f"OCR_{input_filename}"
     output_path = os.path.join(OUTPUT_FOLDER, output_filename)
 
@@ -478,31 +828,32 @@ def upload_file():
     )
     thread.start()
     
-    print(f"Processing started for task_id: {task_id}")
+    logger.debug(f"Processing started for task_id: {task_id}")
     return jsonify({
         'task_id': task_id,
         'message': 'File uploaded successfully, processing started',
-        'filename': filename
+        'filename': filename,
+        'pages': format_pages(options['pages'])
     })
 
-@app.route('/api/upload_llmwhisperer', methods=['POST'])
+@api.route('/api/upload_llmwhisperer', methods=['POST'])
 @jwt_required()
 def upload_file_llmwhisperer():
     """Upload file for LLMWhisperer text extraction"""
-    print("=== LLMWHISPERER UPLOAD ENDPOINT CALLED ===")
+    logger.debug("=== LLMWHISPERER UPLOAD ENDPOINT CALLED ===")
     
     user_id = int(get_jwt_identity())
-    print(f"JWT validation successful, user_id: {user_id}")
+    logger.debug(f"JWT validation successful, user_id: {user_id}")
     
-    if 'file' not in request.files:
-        print("Error: No file provided")
+    file = requested_upload()
+    if file is None:
+        logger.warning("Error: No file provided")
         return jsonify({'error': 'No file provided'}), 400
     
-    file = request.files['file']
-    print(f"File received: {file.filename}")
+    logger.debug(f"File received: {file.filename}")
     
     if file.filename == '' or not allowed_file(file.filename):
-        print(f"Error: Invalid file type or empty filename: {file.filename}")
+        logger.warning(f"Error: Invalid file type or empty filename: {file.filename}")
         return jsonify({'error': 'Invalid file type. Please upload a PDF file.'}), 400
     
     task_id = str(uuid.uuid4())
@@ -510,7 +861,11 @@ def upload_file_llmwhisperer():
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     input_filename = f"{timestamp}_{filename}"
     input_path = os.path.join(UPLOAD_FOLDER, input_filename)
-    file.save(input_path)
+    try:
+        store_upload(file, input_path, task_id)
+    except UploadRejected as e:
+        logger.warning(f"Rejected upload {filename}: {str(e)}")
+        return jsonify({'error': str(e)}), 400
 
     conn = sqlite3.connect('users.db')
     cursor = conn.cursor()
@@ -534,46 +889,50 @@ def upload_file_llmwhisperer():
     )
     thread.start()
     
-    print(f"LLMWhisperer processing started for task_id: {task_id}")
+    logger.debug(f"LLMWhisperer processing started for task_id: {task_id}")
     return jsonify({
         'task_id': task_id,
         'message': 'File uploaded successfully, processing with LLMWhisperer',
         'filename': filename
     })
 
-@app.route('/api/upload_textract', methods=['POST'])
-@app.route('/api/upload_direct_llm', methods=['POST'])  # Keep old endpoint for backwards compatibility
+@api.route('/api/upload_textract', methods=['POST'])
+@api.route('/api/upload_direct_llm', methods=['POST'])  # Keep old endpoint for backwards compatibility
 @jwt_required()
 def upload_file_textract():
     """Upload file for AWS Textract processing with custom queries"""
-    print("=== AWS TEXTRACT UPLOAD ENDPOINT CALLED ===")
+    logger.debug("=== AWS TEXTRACT UPLOAD ENDPOINT CALLED ===")
     
     user_id = int(get_jwt_identity())
-    print(f"JWT validation successful, user_id: {user_id}")
+    logger.debug(f"JWT validation successful, user_id: {user_id}")
     
-    if 'file' not in request.files:
-        print("Error: No file provided")
+    file = requested_upload()
+    if file is None:
+        logger.warning("Error: No file provided")
         return jsonify({'error': 'No file provided'}), 400
     
-    file = request.files['file']
-    print(f"File received: {file.filename}")
+    logger.debug(f"File received: {file.filename}")
     
     if file.filename == '' or not allowed_file(file.filename):
-        print(f"Error: Invalid file type or empty filename: {file.filename}")
+        logger.warning(f"Error: Invalid file type or empty filename: {file.filename}")
         return jsonify({'error': 'Invalid file type. Please upload a PDF file.'}), 400
     
     # Get custom query from request
     custom_query = request.form.get('custom_prompt', '')  # Keep 'custom_prompt' for backwards compatibility
     if not custom_query:
         custom_query = request.form.get('custom_query', '')
-    print(f"Custom query received: {custom_query}")
+    logger.debug(f"Custom query received: {custom_query}")
     
     task_id = str(uuid.uuid4())
     filename = secure_filename(file.filename)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     input_filename = f"{timestamp}_{filename}"
     input_path = os.path.join(UPLOAD_FOLDER, input_filename)
-    file.save(input_path)
+    try:
+        store_upload(file, input_path, task_id)
+    except UploadRejected as e:
+        logger.warning(f"Rejected upload {filename}: {str(e)}")
+        return jsonify({'error': str(e)}), 400
 
     conn = sqlite3.connect('users.db')
     cursor = conn.cursor()
@@ -597,7 +956,7 @@ def upload_file_textract():
     )
     thread.start()
     
-    print(f"AWS Textract processing started for task_id: {task_id}")
+    logger.debug(f"AWS Textract processing started for task_id: {task_id}")
     return jsonify({
         'task_id': task_id,
         'message': 'File uploaded successfully, processing with AWS Textract',
@@ -605,13 +964,98 @@ def upload_file_textract():
         'has_custom_query': bool(custom_query)
     })
 
-print("DEBUG: After upload_file_textract function, about to register searchable PDF route...")
+@api.route('/api/uploads', methods=['POST'])
+@jwt_required()
+def create_chunked_upload():
+    """Start a resumable upload: JSON {filename, length, sha256?} or tus Upload-Length/Upload-Metadata headers"""
+    user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+    filename = data.get('filename', '')
+    length = data.get('length', request.headers.get('Upload-Length'))
+    if not filename and request.headers.get('Upload-Metadata'):
+        # tus metadata: "filename <base64>,key <base64>"
+        for item in request.headers['Upload-Metadata'].split(','):
+            key, _, value = item.strip().partition(' ')
+            if key == 'filename':
+                filename = base64.b64decode(value).decode('utf-8', 'replace')
+    filename = secure_filename(filename or '')
+
+    if not filename or not allowed_file(filename):
+        return jsonify({'error': 'Invalid file type. Please upload a PDF file.'}), 400
+    try:
+        get_storage().admit(user_id, int(length))
+        session = get_chunked_uploads().create(user_id, filename, int(length), data.get('sha256'))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Upload length is required'}), 400
+    except ChunkedUploadError as e:
+        return jsonify({'error': str(e)}), e.status
+
+    response = jsonify(session)
+    response.headers['Location'] = f"/api/uploads/{session['upload_id']}"
+    response.headers['Upload-Offset'] = '0'
+    return response, 201
+
+@api.route('/api/uploads/<upload_id>', methods=['PATCH'])
+@jwt_required()
+def upload_chunk(upload_id):
+    """Write one chunk (raw body) at the byte offset given in the Upload-Offset header"""
+    try:
+        offset = int(request.headers['Upload-Offset'])
+    except (KeyError, ValueError):
+        return jsonify({'error': 'Upload-Offset header is required'}), 400
+    if request.content_length is None:
+        return jsonify({'error': 'Content-Length header is required'}), 411
+
+    try:
+        session = get_chunked_uploads().write_chunk(
+            upload_id, get_jwt_identity(), offset, request.stream, request.content_length
+        )
+    except ChunkedUploadError as e:
+        return jsonify({'error': str(e)}), e.status
+
+    response = jsonify(session)
+    response.headers['Upload-Offset'] = str(offset + request.content_length)
+    return response
+
+@api.route('/api/uploads/<upload_id>', methods=['GET'])
+@jwt_required()
+def get_chunked_upload(upload_id):
+    """Upload progress (also answers HEAD): contiguous offset, bytes received and missing ranges"""
+    try:
+        session = get_chunked_uploads().get(upload_id, get_jwt_identity())
+    except ChunkedUploadError as e:
+        return jsonify({'error': str(e)}), e.status
 
-# Register searchable PDF route
-print("DEBUG: Registering searchable PDF route...")
+    response = jsonify(session)
+    response.headers['Upload-Offset'] = str(session['offset'])
+    response.headers['Upload-Length'] = str(session['length'])
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@api.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+@jwt_required()
+def finalize_chunked_upload(upload_id):
+    """Validate the assembled PDF; afterwards any upload route accepts upload_id instead of file"""
+    try:
+        session = get_chunked_uploads().finalize(upload_id, get_jwt_identity(), UPLOAD_FOLDER)
+    except ChunkedUploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    except UploadRejected as e:
+        logger.warning(f"Rejected chunked upload {upload_id}: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+    return jsonify(session)
+
+@api.route('/api/uploads/<upload_id>', methods=['DELETE'])
+@jwt_required()
+def delete_chunked_upload(upload_id):
+    try:
+        get_chunked_uploads().delete(upload_id, get_jwt_identity())
+    except ChunkedUploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    return '', 204
 
-def process_pdf_with_glm_custom_query(input_path, task_id, user_id, custom_query):
-    """Process PDF with GLM-4.5V for custom query extraction"""
+def process_pdf_with_glm_custom_query(input_path, task_id, user_id, custom_query, pages=None):
+    """Process PDF with GLM-4.5V for custom query extraction (only the given pages, if any)"""
     try:
         processing_status[task_id] = {
             'status': 'processing',
@@ -631,7 +1075,8 @@ def process_pdf_with_glm_custom_query(input_path, task_id, user_id, custom_query
             pdf_path=input_path,
             custom_prompt=custom_query,
             model="glm-4.5v",
-            return_format="csv"  # Use csv format for better text output
+            return_format="csv",  # Use csv format for better text output
+            pages=pages
         )
         
         if not result.get('success'):
@@ -699,8 +1144,127 @@ def process_pdf_with_glm_custom_query(input_path, task_id, user_id, custom_query
         conn.commit()
         conn.close()
 
-def convert_pdf_to_searchable_ocrmypdf(input_path, task_id, user_id):
-    """Convert PDF to searchable using OCRmyPDF command-line tool"""
+def get_textract_service():
+    """Textract backend for analysis tasks; replays TEXTRACT_LOCAL_RESPONSE when set"""
+    if TEXTRACT_LOCAL_RESPONSE:
+        return TextractService(
+            textract_client=LocalTextractClient(TEXTRACT_LOCAL_RESPONSE),
+            s3_client=LocalS3Client(),
+            bucket=TEXTRACT_S3_BUCKET or 'local',
+            poll_interval=0
+        )
+    return TextractService(
+        bucket=TEXTRACT_S3_BUCKET or None,
+        prefix=TEXTRACT_S3_PREFIX,
+        poll_interval=TEXTRACT_POLL_INTERVAL,
+        max_wait=TEXTRACT_MAX_WAIT
+    )
+
+def process_pdf_with_textract(input_path, task_id, user_id, custom_query):
+    """Analyze a PDF with AWS Textract (tables, forms and custom queries)"""
+    try:
+        processing_status[task_id] = {
+            'status': 'processing',
+            'message': 'Starting AWS Textract analysis...',
+            'progress': 10,
+            'user_id': user_id
+        }
+        
+        def progress(message):
+            processing_status[task_id]['message'] = message
+            processing_status[task_id]['progress'] = min(processing_status[task_id]['progress'] + 15, 70)
+        
+        base_name = os.path.splitext(os.path.basename(input_path))[0]
+        blocks_filename = f"{base_name}-textract.jsonl"
+        blocks_path = os.path.join(OUTPUT_FOLDER, blocks_filename)
+        
+        stats = get_textract_service().analyze(input_path, blocks_path, custom_query=custom_query, progress=progress)
+        
+        processing_status[task_id]['message'] = 'Processing Textract response...'
+        processing_status[task_id]['progress'] = 80
+        
+        answers = query_answers(blocks_path)
+        extracted_text = document_text(blocks_path)
+        
+        tables_data = []
+        tables_dir = None
+        tables = tables_from_blocks(blocks_path)
+        if tables:
+            tables_dir = os.path.join(OUTPUT_FOLDER, f"tables_{task_id}")
+            tables_data = save_tables(tables, tables_dir)
+        
+        # Save the answers and the document text as text file
+        output_filename = f"{base_name}_textract_result.txt"
+        output_path = os.path.join(OUTPUT_FOLDER, output_filename)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(f"Query: {custom_query}\n\n")
+            for entry in answers:
+                best = entry['answers'][0]['text'] if entry['answers'] else '(no answer)'
+                f.write(f"{entry['query']}: {best}\n")
+            f.write("\n" + "=" * 80 + "\n\n")
+            f.write(extracted_text)
+        
+        # Same shape as the other extraction methods shown on the dashboard
+        output = {
+            entry['alias'] or entry['query']: entry['answers'][0]['text'] if entry['answers'] else ''
+            for entry in answers
+        }
+        output['Extracted Text'] = extracted_text
+        
+        conn = sqlite3.connect('users.db')
+        cursor = conn.cursor()
+        cursor.execute(
+            'UPDATE processing_jobs SET status = ?, completed_at = CURRENT_TIMESTAMP WHERE id = ?',
+            ('completed', task_id)
+        )
+        conn.commit()
+        conn.close()
+        
+        processing_status[task_id] = {
+            'status': 'completed',
+            'message': 'AWS Textract analysis completed',
+            'progress': 100,
+            'extraction_method': 'textract',
+            'unstract_data': [{
+                'file': os.path.basename(input_path),
+                'status': 'Success',
+                'result': {'output': output}
+            }],
+            'tables': tables_data,
+            'tables_dir': tables_dir,
+            'result': {
+                'output_file': output_filename,
+                'query': custom_query,
+                'answers': answers,
+                'extracted_text': extracted_text,
+                'textract_blocks': blocks_filename,
+                'textract_mode': stats['mode'],
+                'job_id': stats['job_id'],
+                'pages': stats['pages'],
+                'blocks': stats['blocks']
+            },
+            'user_id': user_id
+        }
+        
+        logger.info(f"AWS Textract analysis completed for task {task_id} ({stats['mode']}, {stats['pages']} pages)")
+        
+    except Exception as e:
+        logger.error(f"AWS Textract analysis failed for task {task_id}: {str(e)}", exc_info=True)
+        processing_status[task_id] = {
+            'status': 'failed',
+            'message': f'AWS Textract analysis failed: {str(e)}',
+            'progress': 0,
+            'user_id': user_id
+        }
+        
+        conn = sqlite3.connect('users.db')
+        cursor = conn.cursor()
+        cursor.execute('UPDATE processing_jobs SET status = ? WHERE id = ?', ('failed', task_id))
+        conn.commit()
+        conn.close()
+
+def convert_pdf_to_searchable_ocrmypdf(input_path, task_id, user_id, pages=None, profile=None, jobs=None):
+    """Convert PDF to searchable using OCRmyPDF command-line tool (OCR limited to pages, if given; jobs: ocrmypdf --jobs)"""
     try:
         processing_status[task_id] = {
             'status': 'processing',
@@ -719,15 +1283,12 @@ def convert_pdf_to_searchable_ocrmypdf(input_path, task_id, user_id):
         
         # Run ocrmypdf command-line tool
         import subprocess
-        cmd = [
-            'ocrmypdf',
-            '--language', 'eng',
-            '--deskew',
-            '--optimize', '1',
-            '--skip-text',
-            input_path,
-            output_path
-        ]
+        cmd = ['ocrmypdf', *profile_args(profile_options({'profile': profile})), '--skip-text']
+        if pages:
+            cmd += ['--pages', format_pages(pages)]
+        if jobs:
+            cmd += ['--jobs', str(jobs)]
+        cmd += [input_path, output_path]
         
         logger.info(f"Running command: {' '.join(cmd)}")
         result = subprocess.run(
@@ -766,7 +1327,9 @@ def convert_pdf_to_searchable_ocrmypdf(input_path, task_id, user_id):
                 'output_file': output_filename,
                 'original_size_kb': round(os.path.getsize(input_path) / 1024, 2),
                 'converted_size_kb': round(os.path.getsize(output_path) / 1024, 2),
-                'ocrmypdf_output': result.stdout
+                'ocrmypdf_output': result.stdout,
+                'pages': format_pages(pages),
+                'profile': profile or DEFAULT_PROFILE
             },
             'user_id': user_id
         }
@@ -902,28 +1465,124 @@ def convert_pdf_to_searchable_convertapi(input_path, task_id, user_id):
         conn.commit()
         conn.close()
 
-@app.route('/api/upload_glm_custom_query', methods=['POST'])
+def create_searchable_pdf_from_textract(input_path, task_id, user_id, textract_json_path=None, engine='textract'):
+    """Create a searchable PDF from AWS Textract WORD blocks (or the warm Tesseract pool's) with PyMuPDF"""
+    engine_name = 'Tesseract' if engine == 'tesseract' else 'AWS Textract'
+    try:
+        processing_status[task_id] = {
+            'status': 'processing',
+            'message': f'Detecting text with {engine_name}...',
+            'progress': 10,
+            'user_id': user_id
+        }
+        
+        base_name = os.path.splitext(os.path.basename(input_path))[0]
+        
+        # Blocks come from an uploaded Textract response (streamed, never loaded
+        # whole), or from Textract itself. Either way they are kept as JSON Lines
+        # for word/region queries on this task.
+        blocks_filename = f"{base_name}-textract.jsonl"
+        blocks_path = os.path.join(OUTPUT_FOLDER, blocks_filename)
+        if textract_json_path:
+            processing_status[task_id]['message'] = 'Reading Textract response...'
+            write_blocks_jsonl(iter_blocks(textract_json_path), blocks_path)
+        elif engine == 'tesseract':
+            write_blocks_jsonl(pdf_word_blocks(input_path, get_tesseract_pool()), blocks_path)
+        else:
+            write_blocks_jsonl(detect_text_blocks(input_path), blocks_path)
+        
+        processing_status[task_id]['message'] = 'Adding text layer to PDF pages...'
+        processing_status[task_id]['progress'] = 50
+        
+        output_filename = f"{base_name}-searchable.pdf"
+        output_path = os.path.join(OUTPUT_FOLDER, output_filename)
+        
+        stats = make_searchable_pdf(
+            input_path,
+            blocks_path,
+            output_path,
+            dpi=SEARCHABLE_PDF_DPI,
+            max_workers=SEARCHABLE_PDF_WORKERS
+        )
+        
+        # Analyze responses (FeatureTypes=['TABLES', ...]) also carry tables
+        tables_data = []
+        tables_dir = None
+        tables = tables_from_blocks(blocks_path)
+        if tables:
+            processing_status[task_id]['message'] = 'Writing Textract tables...'
+            processing_status[task_id]['progress'] = 90
+            tables_dir = os.path.join(OUTPUT_FOLDER, f"tables_{task_id}")
+            tables_data = save_tables(tables, tables_dir)
+        
+        conn = sqlite3.connect('users.db')
+        cursor = conn.cursor()
+        cursor.execute(
+            'UPDATE processing_jobs SET status = ?, completed_at = CURRENT_TIMESTAMP WHERE id = ?',
+            ('completed', task_id)
+        )
+        conn.commit()
+        conn.close()
+        
+        processing_status[task_id] = {
+            'status': 'completed',
+            'message': f'Searchable PDF created successfully with {engine_name}',
+            'progress': 100,
+            'extraction_method': f'{engine}_searchable_pdf',
+            'tables': tables_data,
+            'tables_dir': tables_dir,
+            'result': {
+                'output_file': output_filename,
+                'original_size_kb': round(os.path.getsize(input_path) / 1024, 2),
+                'converted_size_kb': round(os.path.getsize(output_path) / 1024, 2),
+                'textract_blocks': blocks_filename,
+                'pages': stats['pages'],
+                'words': stats['words'],
+                'reused_pages': stats['reused_pages'],
+                'rasterized_pages': stats['rasterized_pages']
+            },
+            'user_id': user_id
+        }
+        
+        logger.info(f"Searchable PDF created for task {task_id}")
+        
+    except Exception as e:
+        logger.error(f"Searchable PDF creation failed for task {task_id}: {str(e)}", exc_info=True)
+        processing_status[task_id] = {
+            'status': 'failed',
+            'message': f'Searchable PDF creation failed: {str(e)}',
+            'progress': 0,
+            'user_id': user_id
+        }
+        
+        conn = sqlite3.connect('users.db')
+        cursor = conn.cursor()
+        cursor.execute('UPDATE processing_jobs SET status = ? WHERE id = ?', ('failed', task_id))
+        conn.commit()
+        conn.close()
+
+@api.route('/api/upload_glm_custom_query', methods=['POST'])
 @jwt_required()
 def upload_file_glm_custom_query():
     """Upload PDF for GLM-4.5V custom query extraction"""
-    print("=== GLM CUSTOM QUERY UPLOAD ENDPOINT CALLED ===")
+    logger.debug("=== GLM CUSTOM QUERY UPLOAD ENDPOINT CALLED ===")
     
     user_id = int(get_jwt_identity())
-    print(f"JWT validation successful, user_id: {user_id}")
+    logger.debug(f"JWT validation successful, user_id: {user_id}")
     
     # Check if GLM API is configured
     if not GLM_API_KEY:
         return jsonify({'error': 'GLM API is not configured. Please add GLM_API_KEY to environment variables.'}), 500
     
-    if 'file' not in request.files:
-        print("Error: No file provided")
+    file = requested_upload()
+    if file is None:
+        logger.warning("Error: No file provided")
         return jsonify({'error': 'No file provided'}), 400
     
-    file = request.files['file']
-    print(f"File received: {file.filename}")
+    logger.debug(f"File received: {file.filename}")
     
     if file.filename == '' or not allowed_file(file.filename):
-        print(f"Error: Invalid file type or empty filename: {file.filename}")
+        logger.warning(f"Error: Invalid file type or empty filename: {file.filename}")
         return jsonify({'error': 'Invalid file type. Please upload a PDF file.'}), 400
     
     # Get custom query
@@ -931,14 +1590,18 @@ def upload_file_glm_custom_query():
     if not custom_query or custom_query.strip() == '':
         return jsonify({'error': 'Custom query is required for GLM extraction'}), 400
     
-    print(f"Custom query received: {custom_query}")
+    logger.debug(f"Custom query received: {custom_query}")
     
     task_id = str(uuid.uuid4())
     filename = secure_filename(file.filename)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     input_filename = f"{timestamp}_{filename}"
     input_path = os.path.join(UPLOAD_FOLDER, input_filename)
-    file.save(input_path)
+    try:
+        pages = requested_pages(store_upload(file, input_path, task_id))
+    except (UploadRejected, PageSelectionError) as e:
+        logger.warning(f"Rejected upload {filename}: {str(e)}")
+        return jsonify({'error': str(e)}), 400
 
     conn = sqlite3.connect('users.db')
     cursor = conn.cursor()
@@ -958,43 +1621,54 @@ def upload_file_glm_custom_query():
 
     thread = threading.Thread(
         target=process_pdf_with_glm_custom_query,
-        args=(input_path, task_id, user_id, custom_query)
+        args=(input_path, task_id, user_id, custom_query, pages)
     )
     thread.start()
     
-    print(f"GLM custom query extraction started for task_id: {task_id}")
+    logger.debug(f"GLM custom query extraction started for task_id: {task_id}")
     return jsonify({
         'task_id': task_id,
         'message': 'File uploaded successfully, extracting data with GLM-4.5V',
-        'filename': filename
+        'filename': filename,
+        'pages': format_pages(pages)
     })
 
-@app.route('/api/upload_ocrmypdf', methods=['POST'])
+@api.route('/api/upload_ocrmypdf', methods=['POST'])
 @jwt_required()
 def upload_file_ocrmypdf():
     """Upload scanned PDF and convert to searchable PDF using OCRmyPDF (local)"""
-    print("=== OCRMYPDF UPLOAD ENDPOINT CALLED ===")
+    logger.debug("=== OCRMYPDF UPLOAD ENDPOINT CALLED ===")
     
     user_id = int(get_jwt_identity())
-    print(f"JWT validation successful, user_id: {user_id}")
+    logger.debug(f"JWT validation successful, user_id: {user_id}")
     
-    if 'file' not in request.files:
-        print("Error: No file provided")
+    file = requested_upload()
+    if file is None:
+        logger.warning("Error: No file provided")
         return jsonify({'error': 'No file provided'}), 400
     
-    file = request.files['file']
-    print(f"File received: {file.filename}")
+    logger.debug(f"File received: {file.filename}")
     
     if file.filename == '' or not allowed_file(file.filename):
-        print(f"Error: Invalid file type or empty filename: {file.filename}")
+        logger.warning(f"Error: Invalid file type or empty filename: {file.filename}")
         return jsonify({'error': 'Invalid file type. Please upload a PDF file.'}), 400
     
+    profile = request.form.get('profile', DEFAULT_PROFILE)
+    try:
+        profile_options({'profile': profile})
+    except OCRProfileError as e:
+        return jsonify({'error': str(e)}), 400
+
     task_id = str(uuid.uuid4())
     filename = secure_filename(file.filename)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     input_filename = f"{timestamp}_{filename}"
     input_path = os.path.join(UPLOAD_FOLDER, input_filename)
-    file.save(input_path)
+    try:
+        pages = requested_pages(store_upload(file, input_path, task_id))
+    except (UploadRejected, PageSelectionError) as e:
+        logger.warning(f"Rejected upload {filename}: {str(e)}")
+        return jsonify({'error': str(e)}), 400
 
     conn = sqlite3.connect('users.db')
     cursor = conn.cursor()
@@ -1014,39 +1688,40 @@ def upload_file_ocrmypdf():
 
     thread = threading.Thread(
         target=convert_pdf_to_searchable_ocrmypdf,
-        args=(input_path, task_id, user_id)
+        args=(input_path, task_id, user_id, pages, profile)
     )
     thread.start()
     
-    print(f"OCRmyPDF conversion started for task_id: {task_id}")
+    logger.debug(f"OCRmyPDF conversion started for task_id: {task_id}")
     return jsonify({
         'task_id': task_id,
         'message': 'File uploaded successfully, converting to searchable PDF with OCRmyPDF (local)',
-        'filename': filename
+        'filename': filename,
+        'pages': format_pages(pages)
     })
 
-@app.route('/api/upload_convertapi_ocr', methods=['POST'])
+@api.route('/api/upload_convertapi_ocr', methods=['POST'])
 @jwt_required()
 def upload_file_convertapi_ocr():
     """Upload scanned PDF and convert to searchable PDF using ConvertAPI"""
-    print("=== CONVERTAPI OCR UPLOAD ENDPOINT CALLED ===")
+    logger.debug("=== CONVERTAPI OCR UPLOAD ENDPOINT CALLED ===")
     
     user_id = int(get_jwt_identity())
-    print(f"JWT validation successful, user_id: {user_id}")
+    logger.debug(f"JWT validation successful, user_id: {user_id}")
     
     # Check if ConvertAPI is configured
     if not CONVERT_API_KEY:
         return jsonify({'error': 'ConvertAPI is not configured. Please add CONVERT_API_KEY to environment variables.'}), 500
     
-    if 'file' not in request.files:
-        print("Error: No file provided")
+    file = requested_upload()
+    if file is None:
+        logger.warning("Error: No file provided")
         return jsonify({'error': 'No file provided'}), 400
     
-    file = request.files['file']
-    print(f"File received: {file.filename}")
+    logger.debug(f"File received: {file.filename}")
     
     if file.filename == '' or not allowed_file(file.filename):
-        print(f"Error: Invalid file type or empty filename: {file.filename}")
+        logger.warning(f"Error: Invalid file type or empty filename: {file.filename}")
         return jsonify({'error': 'Invalid file type. Please upload a PDF file.'}), 400
     
     task_id = str(uuid.uuid4())
@@ -1054,7 +1729,11 @@ def upload_file_convertapi_ocr():
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     input_filename = f"{timestamp}_{filename}"
     input_path = os.path.join(UPLOAD_FOLDER, input_filename)
-    file.save(input_path)
+    try:
+        store_upload(file, input_path, task_id)
+    except UploadRejected as e:
+        logger.warning(f"Rejected upload {filename}: {str(e)}")
+        return jsonify({'error': str(e)}), 400
 
     conn = sqlite3.connect('users.db')
     cursor = conn.cursor()
@@ -1078,39 +1757,59 @@ def upload_file_convertapi_ocr():
     )
     thread.start()
     
-    print(f"ConvertAPI OCR started for task_id: {task_id}")
+    logger.debug(f"ConvertAPI OCR started for task_id: {task_id}")
     return jsonify({
         'task_id': task_id,
         'message': 'File uploaded successfully, converting to searchable PDF with ConvertAPI',
         'filename': filename
     })
 
-@app.route('/api/upload_searchable_pdf', methods=['POST'])
+@api.route('/api/upload_searchable_pdf', methods=['POST'])
 @jwt_required()
 def upload_file_searchable_pdf():
-    """Upload scanned PDF and convert to searchable PDF using AWS Textract"""
-    print("=== SEARCHABLE PDF UPLOAD ENDPOINT CALLED ===")
+    """Upload scanned PDF and convert to searchable PDF using AWS Textract (or engine=tesseract)"""
+    logger.debug("=== SEARCHABLE PDF UPLOAD ENDPOINT CALLED ===")
     
     user_id = int(get_jwt_identity())
-    print(f"JWT validation successful, user_id: {user_id}")
+    logger.debug(f"JWT validation successful, user_id: {user_id}")
     
-    if 'file' not in request.files:
-        print("Error: No file provided")
+    file = requested_upload()
+    if file is None:
+        logger.warning("Error: No file provided")
         return jsonify({'error': 'No file provided'}), 400
     
-    file = request.files['file']
-    print(f"File received: {file.filename}")
+    logger.debug(f"File received: {file.filename}")
     
     if file.filename == '' or not allowed_file(file.filename):
-        print(f"Error: Invalid file type or empty filename: {file.filename}")
+        logger.warning(f"Error: Invalid file type or empty filename: {file.filename}")
         return jsonify({'error': 'Invalid file type. Please upload a PDF file.'}), 400
     
+    engine = request.form.get('engine', 'textract')
+    if engine not in ('textract', 'tesseract'):
+        return jsonify({'error': f"Unknown engine '{engine}'; use textract or tesseract"}), 400
+    try:
+        check_engine_available(engine)
+    except OCRProfileError as e:
+        return jsonify({'error': str(e)}), 400
+
     task_id = str(uuid.uuid4())
     filename = secure_filename(file.filename)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     input_filename = f"{timestamp}_{filename}"
     input_path = os.path.join(UPLOAD_FOLDER, input_filename)
-    file.save(input_path)
+    try:
+        store_upload(file, input_path, task_id)
+    except UploadRejected as e:
+        logger.warning(f"Rejected upload {filename}: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+    
+    # Optional Textract response (JSON with "Blocks", or JSON Lines of blocks) to skip the AWS call
+    textract_json_path = None
+    textract_json = request.files.get('textract_json')
+    if textract_json and textract_json.filename:
+        extension = '.jsonl' if textract_json.filename.lower().endswith('.jsonl') else '.json'
+        textract_json_path = os.path.join(UPLOAD_FOLDER, f"{timestamp}_{task_id[:8]}_textract{extension}")
+        textract_json.save(textract_json_path)
 
     conn = sqlite3.connect('users.db')
     cursor = conn.cursor()
@@ -1130,52 +1829,282 @@ def upload_file_searchable_pdf():
 
     thread = threading.Thread(
         target=create_searchable_pdf_from_textract,
-        args=(input_path, task_id, user_id)
+        args=(input_path, task_id, user_id, textract_json_path, engine)
     )
     thread.start()
     
-    print(f"Searchable PDF creation started for task_id: {task_id}")
+    logger.debug(f"Searchable PDF creation started for task_id: {task_id}")
     return jsonify({
         'task_id': task_id,
         'message': 'File uploaded successfully, creating searchable PDF',
         'filename': filename
     })
 
-@app.errorhandler(422)
-def handle_unprocessable_entity(e):
-    print(f"422 Error occurred: {str(e)}")
-    print(f"Error description: {e.description if hasattr(e, 'description') else 'No description'}")
-    return jsonify({'error': 'Unprocessable Entity', 'details': str(e)}), 422
+def get_spatial_index(task_id, blocks_path):
+    """SpatialIndex of a task's Textract blocks, built once and kept in a small LRU cache"""
+    with spatial_indexes_lock:
+        if task_id in spatial_indexes:
+            spatial_indexes.move_to_end(task_id)
+            return spatial_indexes[task_id]
+    
+    index = SpatialIndex(list(iter_blocks(blocks_path, block_types=('WORD',))))
+    
+    with spatial_indexes_lock:
+        spatial_indexes[task_id] = index
+        while len(spatial_indexes) > SPATIAL_INDEX_CACHE_SIZE:
+            spatial_indexes.popitem(last=False)
+    return index
+
+def word_to_dict(block, distance=None):
+    word = {
+        'text': block.get('Text'),
+        'page': block.get('Page', 1),
+        'confidence': block.get('Confidence'),
+        'bbox': block['Geometry']['BoundingBox']
+    }
+    if distance is not None:
+        word['distance'] = round(distance, 6)
+    return word
 
-@app.errorhandler(Exception)
-def handle_general_exception(e):
-    print(f"General exception: {str(e)}")
-    print(f"Exception type: {type(e).__name__}")
-    import traceback
-    traceback.print_exc()
-    return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+def import_certificates(paths, task_id, user_id):
+    """Bulk-import certificate files into the specimen catalog"""
+    try:
+        processing_status[task_id] = {
+            'status': 'processing',
+            'message': 'Importing certificates...',
+            'progress': 10,
+            'user_id': user_id
+        }
+        
+        def progress(rows):
+            processing_status[task_id]['message'] = f'Imported {rows} rows from {os.path.basename(path)}...'
+        
+        imported = {}
+        for number, path in enumerate(paths):
+            imported[os.path.basename(path)] = get_specimen_catalog().import_file(path, progress=progress)
+            processing_status[task_id]['progress'] = 10 + int(90 * (number + 1) / len(paths))
+        
+        conn = sqlite3.connect('users.db')
+        cursor = conn.cursor()
+        cursor.execute(
+            'UPDATE processing_jobs SET status = ?, completed_at = CURRENT_TIMESTAMP WHERE id = ?',
+            ('completed', task_id)
+        )
+        conn.commit()
+        conn.close()
+        
+        processing_status[task_id] = {
+            'status': 'completed',
+            'message': f'Imported {sum(imported.values())} certificate rows',
+            'progress': 100,
+            'extraction_method': 'catalog_import',
+            'result': {'rows': sum(imported.values()), 'files': imported},
+            'user_id': user_id
+        }
+        
+    except Exception as e:
+        logger.error(f"Certificate import failed for task {task_id}: {str(e)}", exc_info=True)
+        processing_status[task_id] = {
+            'status': 'failed',
+            'message': f'Certificate import failed: {str(e)}',
+            'progress': 0,
+            'user_id': user_id
+        }
+        
+        conn = sqlite3.connect('users.db')
+        cursor = conn.cursor()
+        cursor.execute('UPDATE processing_jobs SET status = ? WHERE id = ?', ('failed', task_id))
+        conn.commit()
+        conn.close()
 
-@app.route('/api/status/<task_id>', methods=['GET'])
+@api.route('/api/catalog/import', methods=['POST'])
 @jwt_required()
-def get_status(task_id):
-    """Get processing status"""
-    user_id = get_jwt_identity()
-    # Convert to int for comparison (handles both string and int user_ids)
-    try:
-        user_id_int = int(user_id)
-    except (ValueError, TypeError):
-        user_id_int = user_id
+def upload_catalog_import():
+    """Upload TSV/CSV/XLSX certificate exports and import them into the specimen catalog"""
+    user_id = int(get_jwt_identity())
+    # Catalog dimensions override the PDF values in every user's ABAQUS models
+    if not is_catalog_admin(user_id):
+        return jsonify({'error': 'Only catalog administrators can import certificates'}), 403
     
-    if task_id not in processing_status:
-        return jsonify({'error': 'Task not found'}), 404
+    files = [f for f in request.files.getlist('file') if f.filename]
+    if not files:
+        return jsonify({'error': 'No file provided'}), 400
     
-    status = processing_status[task_id]
-
-    # Handle both string and int user_id comparisons
-    status_user_id = status.get('user_id')
-    try:
-        status_user_id_int = int(status_user_id)
-    except (ValueError, TypeError):
+    for file in files:
+        if file.filename.rsplit('.', 1)[-1].lower() not in CATALOG_EXTENSIONS:
+            return jsonify({'error': f'Invalid file type: {file.filename}. Upload TSV, CSV or XLSX files.'}), 400
+    
+    task_id = str(uuid.uuid4())
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    paths = []
+    for file in files:
+        path = os.path.join(UPLOAD_FOLDER, f"{timestamp}_{task_id[:8]}_{secure_filename(file.filename)}")
+        file.save(path)
+        paths.append(path)
+    
+    conn = sqlite3.connect('users.db')
+    cursor = conn.cursor()
+    cursor.execute(
+        'INSERT INTO processing_jobs (id, user_id, filename, status, created_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)',
+        (task_id, user_id, ', '.join(secure_filename(f.filename) for f in files), 'processing')
+    )
+    conn.commit()
+    conn.close()
+    
+    processing_status[task_id] = {
+        'status': 'queued',
+        'message': 'Files uploaded, queued for catalog import',
+        'progress': 0,
+        'user_id': user_id
+    }
+    
+    thread = threading.Thread(target=import_certificates, args=(paths, task_id, user_id))
+    thread.start()
+    
+    return jsonify({
+        'task_id': task_id,
+        'message': 'Certificate import started',
+        'files': [f.filename for f in files]
+    }), 202
+
+@api.route('/api/catalog/<serial_number>', methods=['GET'])
+@jwt_required()
+def get_catalog_specimen(serial_number):
+    """Certificate rows and specimen dimensions for a heat or sample number"""
+    try:
+        specimens = get_specimen_catalog().lookup(heat_no=serial_number)
+        if not specimens:
+            specimens = get_specimen_catalog().lookup(sample_no=serial_number)
+        if not specimens:
+            return jsonify({'error': f'{serial_number} is not in the specimen catalog'}), 404
+        
+        return jsonify({
+            'serial_number': serial_number,
+            'dimensions': get_specimen_catalog().dimensions(serial_number),
+            'specimens': specimens
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error looking up {serial_number} in specimen catalog: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/words/<task_id>', methods=['GET'])
+@jwt_required()
+def query_words(task_id):
+    """
+    Query the Textract words of a completed searchable-PDF task
+    Coordinates are normalized to the page (0-1, origin top-left).
+    Query params:
+        page (1-based, default 1) with either
+        region=left,top,right,bottom [&contained=true] - words in a rectangle
+        x, y [&k=5] - words nearest to a point
+        or near=<token> [&k=5] - words nearest to each occurrence of a token
+    """
+    try:
+        user_id = get_jwt_identity()
+        try:
+            user_id_int = int(user_id)
+        except (ValueError, TypeError):
+            user_id_int = user_id
+        
+        if task_id not in processing_status:
+            return jsonify({'error': 'Task not found'}), 404
+        
+        status = processing_status[task_id]
+        
+        # Authorization check
+        status_user_id = status.get('user_id')
+        try:
+            status_user_id_int = int(status_user_id)
+        except (ValueError, TypeError):
+            status_user_id_int = status_user_id
+        
+        if status_user_id_int != user_id_int and str(status_user_id) != str(user_id):
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        blocks_filename = status.get('result', {}).get('textract_blocks')
+        if status.get('status') != 'completed' or not blocks_filename:
+            return jsonify({'error': 'No Textract words available for this task'}), 400
+        
+        blocks_path = os.path.join(OUTPUT_FOLDER, blocks_filename)
+        if not os.path.exists(blocks_path):
+            return jsonify({'error': 'Textract words not found'}), 404
+        
+        index = get_spatial_index(task_id, blocks_path)
+        
+        try:
+            page = int(request.args.get('page', 1))
+            k = min(100, max(1, int(request.args.get('k', 5))))
+            
+            if request.args.get('near'):
+                matches = index.nearest_to_token(request.args['near'], k)
+                return jsonify({'matches': [
+                    {
+                        'word': word_to_dict(match['block']),
+                        'neighbours': [word_to_dict(block, distance) for block, distance in match['neighbours']]
+                    }
+                    for match in matches
+                ]}), 200
+            
+            if request.args.get('region'):
+                left, top, right, bottom = [float(v) for v in request.args['region'].split(',')]
+                contained = request.args.get('contained', 'false').lower() == 'true'
+                # BoundingBox order: left, bottom, right, top
+                words = index.words_in_region(page, [left, bottom, right, top], contained=contained)
+                return jsonify({
+                    'page': page,
+                    'words': [word_to_dict(block) for block in words],
+                    'text': ' '.join(block.get('Text', '') for block in words)
+                }), 200
+            
+            if 'x' in request.args and 'y' in request.args:
+                hits = index.nearest_words(page, float(request.args['x']), float(request.args['y']), k)
+                return jsonify({'page': page, 'words': [word_to_dict(block, distance) for block, distance in hits]}), 200
+        except ValueError:
+            return jsonify({'error': 'page, k, x, y and region values must be numbers'}), 400
+        
+        return jsonify({'error': 'Provide region, x and y, or near'}), 400
+        
+    except Exception as e:
+        logger.error(f"Error querying words: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.app_errorhandler(422)
+def handle_unprocessable_entity(e):
+    logger.warning(f"422 Error occurred: {str(e)}")
+    return jsonify({'error': 'Unprocessable Entity', 'details': str(e)}), 422
+
+@api.app_errorhandler(StorageQuotaExceeded)
+def handle_storage_quota_exceeded(e):
+    logger.warning(f"Upload refused: {str(e)}")
+    return jsonify({'error': str(e)}), e.status
+
+@api.app_errorhandler(Exception)
+def handle_general_exception(e):
+    logger.exception(f"Unhandled {type(e).__name__}: {str(e)}")
+    return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+
+@api.route('/api/status/<task_id>', methods=['GET'])
+@jwt_required()
+def get_status(task_id):
+    """Get processing status"""
+    user_id = get_jwt_identity()
+    # Convert to int for comparison (handles both string and int user_ids)
+    try:
+        user_id_int = int(user_id)
+    except (ValueError, TypeError):
+        user_id_int = user_id
+    
+    if task_id not in processing_status:
+        return jsonify({'error': 'Task not found'}), 404
+    
+    status = processing_status[task_id]
+
+    # Handle both string and int user_id comparisons
+    status_user_id = status.get('user_id')
+    try:
+        status_user_id_int = int(status_user_id)
+    except (ValueError, TypeError):
         status_user_id_int = status_user_id
     
     if status_user_id_int != user_id_int and str(status_user_id) != str(user_id):
@@ -1183,7 +2112,7 @@ def get_status(task_id):
     
     return jsonify(status)
 
-@app.route('/api/download/<task_id>', methods=['GET'])
+@api.route('/api/download/<task_id>', methods=['GET'])
 @jwt_required()
 def download_file(task_id):
     user_id = get_jwt_identity()
@@ -1224,9 +2153,78 @@ def download_file(task_id):
     if not os.path.exists(output_path):
         return jsonify({'error': 'File not found'}), 404
     
+    get_storage().touch(output_path)
     return send_file(output_path, as_attachment=True, download_name=output_file)
 
-@app.route('/api/download_all/<task_id>', methods=['GET'])
+@api.route('/api/download_partial/<task_id>', methods=['GET'])
+@jwt_required()
+def download_partial(task_id):
+    """The pages of an OCR task finished so far, merged into one PDF (or text with ?format=txt)"""
+    user_id = get_jwt_identity()
+    if task_id not in processing_status:
+        return jsonify({'error': 'Task not found'}), 404
+    status = processing_status[task_id]
+    if str(status.get('user_id')) != str(user_id):
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    as_text = request.args.get('format', 'pdf').lower() == 'txt'
+    if status['status'] == 'completed':
+        # Everything is merged already
+        output_file = status.get('text_file') if as_text else status.get('output_file')
+        output_path = os.path.abspath(os.path.join(OUTPUT_FOLDER, output_file or ''))
+        if not output_file or not os.path.exists(output_path):
+            return jsonify({'error': 'File not found'}), 404
+        get_storage().touch(output_path)
+        return send_file(output_path, as_attachment=True, download_name=output_file)
+
+    pages_dir = status.get('pages_dir')
+    if not pages_dir or not finished_pages(pages_dir):
+        return jsonify({'error': 'No pages have finished yet'}), 409
+
+    partial_file = f"Partial_{task_id}.{'txt' if as_text else 'pdf'}"
+    partial_path = os.path.abspath(os.path.join(OUTPUT_FOLDER, partial_file))
+    if as_text:
+        done = merge_text(pages_dir, partial_path)
+    else:
+        done = merge_pages(None, pages_dir, partial_path, partial=True)
+    get_storage().track(partial_path, task_id, user_id)
+    response = send_file(partial_path, as_attachment=True, download_name=partial_file)
+    response.headers['X-Pages-Done'] = str(len(done))
+    response.headers['X-Pages-Total'] = str(status.get('pages_total', 0))
+    response.headers['X-Pages'] = format_pages(done)
+    return response
+
+def task_output_files(status):
+    """(path, archive name) of a finished task's output file and extracted tables"""
+    files = []
+    # Handle different status structures
+    if 'output_file' in status:
+        output_file = status['output_file']
+    elif 'result' in status and 'output_file' in status['result']:
+        output_file = status['result']['output_file']
+    else:
+        output_file = None
+
+    if output_file:
+        output_path = os.path.join(OUTPUT_FOLDER, output_file)
+        if os.path.exists(output_path):
+            files.append((output_path, output_file))
+    if status.get('text_file'):
+        text_path = os.path.join(OUTPUT_FOLDER, status['text_file'])
+        if os.path.exists(text_path):
+            files.append((text_path, status['text_file']))
+
+    if 'tables' in status and status['tables'] and status.get('tables_dir'):
+        tables_dir = status['tables_dir']
+        for table_info in status['tables']:
+            for file_key in ['csv_file', 'excel_file']:
+                if file_key in table_info:
+                    table_path = os.path.join(tables_dir, table_info[file_key])
+                    if os.path.exists(table_path):
+                        files.append((table_path, f"tables/{table_info[file_key]}"))
+    return files
+
+@api.route('/api/download_all/<task_id>', methods=['GET'])
 @jwt_required()
 def download_all(task_id):
     user_id = int(get_jwt_identity())
@@ -1245,31 +2243,13 @@ def download_all(task_id):
     zip_path = os.path.join(OUTPUT_FOLDER, zip_filename)
     
     with zipfile.ZipFile(zip_path, 'w') as zipf:
-        # Handle different status structures
-        if 'output_file' in status:
-            output_file = status['output_file']
-        elif 'result' in status and 'output_file' in status['result']:
-            output_file = status['result']['output_file']
-        else:
-            output_file = None
-            
-        if output_file:
-            output_path = os.path.join(OUTPUT_FOLDER, output_file)
-            if os.path.exists(output_path):
-                zipf.write(output_path, output_file)
-    
-        if 'tables' in status and status['tables'] and status['tables_dir']:
-            tables_dir = status['tables_dir']
-            for table_info in status['tables']:
-                for file_key in ['csv_file', 'excel_file']:
-                    if file_key in table_info:
-                        table_path = os.path.join(tables_dir, table_info[file_key])
-                        if os.path.exists(table_path):
-                            zipf.write(table_path, f"tables/{table_info[file_key]}")
+        for path, arcname in task_output_files(status):
+            zipf.write(path, arcname)
+            get_storage().touch(path)
     
     return send_file(zip_path, as_attachment=True, download_name=zip_filename)
 
-@app.route('/api/jobs', methods=['GET'])
+@api.route('/api/jobs', methods=['GET'])
 @jwt_required()
 def get_user_jobs():
     user_id = int(get_jwt_identity())
@@ -1295,6 +2275,288 @@ def get_user_jobs():
         } for job in jobs]
     })
 
+@api.route('/api/storage', methods=['GET'])
+@jwt_required()
+def get_storage_usage():
+    """Disk usage of uploads/ and outputs/: the user's bytes and quota, node totals and the last sweep"""
+    return jsonify(get_storage().usage(get_jwt_identity()))
+
+# ============================================================================
+# BATCH PROCESSING - many PDFs (or a zip), one set of options, one parent job
+# ============================================================================
+
+BATCH_METHODS = {
+    'ocr': 'OCR + table extraction',
+    'ocrmypdf': 'OCRmyPDF searchable PDF',
+    'convertapi': 'ConvertAPI searchable PDF',
+    'textract': 'AWS Textract',
+    'glm_custom_query': 'GLM-4.5V custom query',
+}
+BATCH_DONE_STATES = {'completed', 'failed', 'error', 'cancelled'}
+
+# Shared pool for batch children, created on first use (after any pre-fork warm-up)
+batch_executor = None
+batch_executor_lock = threading.Lock()
+
+def get_batch_executor():
+    global batch_executor
+    with batch_executor_lock:
+        if batch_executor is None:
+            batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='batch')
+        return batch_executor
+
+def run_batch_child(method, input_path, task_id, user_id, form):
+    """Run one file of a batch with the same worker its single-file route uses"""
+    if method == 'ocr':
+        output_path = os.path.join(OUTPUT_FOLDER, f"OCR_{os.path.basename(input_path)}")
+        process_pdf_with_ocr_and_camelot(input_path, output_path, ocr_options(form), task_id, user_id,
+                                         page_workers=BATCH_PAGE_WORKERS)
+    elif method == 'ocrmypdf':
+        convert_pdf_to_searchable_ocrmypdf(input_path, task_id, user_id, profile=form.get('profile'),
+                                           jobs=BATCH_PAGE_WORKERS)
+    elif method == 'convertapi':
+        convert_pdf_to_searchable_convertapi(input_path, task_id, user_id)
+    elif method == 'textract':
+        process_pdf_with_textract(input_path, task_id, user_id, form.get('custom_query', ''))
+    elif method == 'glm_custom_query':
+        process_pdf_with_glm_custom_query(input_path, task_id, user_id, form.get('custom_query', ''))
+
+def update_batch_status(batch_id):
+    """Recompute a batch's aggregate status and progress from its children"""
+    batch = processing_status.get(batch_id)
+    if not batch:
+        return None
+    counts = {}
+    progress = 0
+    for child in batch['children']:
+        status = processing_status.get(child['task_id'], {})
+        state = status.get('status', 'queued')
+        child['status'] = state
+        counts[state] = counts.get(state, 0) + 1
+        progress += 100 if state in BATCH_DONE_STATES else status.get('progress', 0)
+
+    total = len(batch['children'])
+    done = sum(n for state, n in counts.items() if state in BATCH_DONE_STATES)
+    completed = counts.get('completed', 0)
+    batch['counts'] = counts
+    batch['progress'] = int(progress / total) if total else 100
+    if done < total:
+        batch['status'] = 'processing'
+        batch['message'] = f"{done} of {total} files done"
+    else:
+        batch['status'] = 'completed' if completed else 'failed'
+        batch['message'] = f"{completed} of {total} files completed" + (
+            f", {total - completed} failed" if completed < total else ''
+        )
+        if not batch.get('completed_at'):
+            batch['completed_at'] = datetime.now().isoformat()
+            conn = sqlite3.connect('users.db')
+            conn.execute(
+                'UPDATE processing_jobs SET status = ?, completed_at = CURRENT_TIMESTAMP WHERE id = ?',
+                (batch['status'], batch_id)
+            )
+            conn.commit()
+            conn.close()
+    return batch
+
+def batch_uploads(user_id):
+    """
+    (filename, FileStorage) of every PDF in the request: 'files'/'file' parts and PDFs
+    inside 'archive' zips. admit_upload() only saw the compressed archives, so room for
+    the PDFs they expand to is made here, before any is extracted.
+    """
+    uploads = [(f.filename, f) for key in ('files', 'file') for f in request.files.getlist(key) if f.filename]
+    archives = []
+    expanded = 0
+    try:
+        for archive in request.files.getlist('archive'):
+            try:
+                zipf = zipfile.ZipFile(archive.stream)
+            except zipfile.BadZipFile:
+                raise UploadRejected(f"{archive.filename} is not a valid zip archive")
+            archives.append(zipf)
+            for member in zipf.infolist():
+                name = os.path.basename(member.filename)
+                if member.is_dir() or name.startswith('.') or '__MACOSX' in member.filename:
+                    continue
+                # Other files are rejected by name without being read
+                if allowed_file(name):
+                    expanded += member.file_size
+                uploads.append((name, FileStorage(stream=zipf.open(member), filename=name)))
+        if expanded > CHUNKED_UPLOAD_MAX_SIZE:
+            raise UploadRejected(f"The archives expand to more than {CHUNKED_UPLOAD_MAX_SIZE} bytes of PDFs")
+        if expanded:
+            get_storage().admit(user_id, expanded)
+    except Exception:
+        for zipf in archives:
+            zipf.close()
+        raise
+    return uploads, archives
+
+@api.route('/api/upload_batch', methods=['POST'])
+@jwt_required()
+def upload_batch():
+    """
+    Submit many PDFs (multipart 'files', and/or zip 'archive's) with one method and
+    one set of options. Returns a batch_id whose status aggregates the child tasks.
+    """
+    user_id = int(get_jwt_identity())
+    method = request.form.get('method', 'ocr')
+    if method not in BATCH_METHODS:
+        return jsonify({'error': f"Unknown method '{method}'", 'methods': BATCH_METHODS}), 400
+    if method == 'glm_custom_query' and not request.form.get('custom_query', '').strip():
+        return jsonify({'error': 'Custom query is required for GLM extraction'}), 400
+    if method in ('ocr', 'ocrmypdf'):
+        try:
+            ocr_options(request.form)
+        except OCRProfileError as e:
+            return jsonify({'error': str(e)}), 400
+
+    try:
+        uploads, archives = batch_uploads(user_id)
+    except UploadRejected as e:
+        return jsonify({'error': str(e)}), 400
+    if not uploads:
+        return jsonify({'error': 'No files provided'}), 400
+    if len(uploads) > BATCH_MAX_FILES:
+        return jsonify({'error': f'A batch can hold at most {BATCH_MAX_FILES} files'}), 400
+
+    batch_id = str(uuid.uuid4())
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    children = []
+    rejected = []
+    conn = sqlite3.connect('users.db')
+    try:
+        for original_name, file in uploads:
+            filename = secure_filename(original_name)
+            if not filename or not allowed_file(filename):
+                rejected.append({'filename': original_name, 'error': 'Not a PDF file'})
+                continue
+            task_id = str(uuid.uuid4())
+            # Keep same-named files from different folders of a zip apart
+            input_path = os.path.join(UPLOAD_FOLDER, f"{timestamp}_{task_id[:8]}_{filename}")
+            try:
+                store_upload(file, input_path, task_id)
+            except UploadRejected as e:
+                rejected.append({'filename': original_name, 'error': str(e)})
+                continue
+            conn.execute(
+                'INSERT INTO processing_jobs (id, user_id, filename, status) VALUES (?, ?, ?, ?)',
+                (task_id, user_id, filename, 'processing')
+            )
+            processing_status[task_id] = {
+                'status': 'queued',
+                'message': f"Queued in batch {batch_id[:8]}",
+                'progress': 0,
+                'user_id': user_id,
+                'batch_id': batch_id
+            }
+            children.append({'task_id': task_id, 'filename': filename, 'input_path': input_path})
+        if children:
+            conn.execute(
+                'INSERT INTO processing_jobs (id, user_id, filename, status) VALUES (?, ?, ?, ?)',
+                (batch_id, user_id, f"Batch of {len(children)} files ({BATCH_METHODS[method]})", 'processing')
+            )
+        conn.commit()
+    finally:
+        conn.close()
+        for zipf in archives:
+            zipf.close()
+
+    if not children:
+        return jsonify({'error': 'None of the files could be used', 'rejected': rejected}), 400
+
+    processing_status[batch_id] = {
+        'status': 'processing',
+        'message': f"0 of {len(children)} files done",
+        'progress': 0,
+        'user_id': user_id,
+        'batch': True,
+        'method': method,
+        'extraction_method': 'batch',
+        'children': [{'task_id': c['task_id'], 'filename': c['filename'], 'status': 'queued'} for c in children],
+        'rejected': rejected
+    }
+
+    form = request.form.to_dict()
+    executor = get_batch_executor()
+    for child in children:
+        future = executor.submit(run_batch_child, method, child['input_path'], child['task_id'], user_id, form)
+        future.add_done_callback(lambda _, batch_id=batch_id: update_batch_status(batch_id))
+
+    logger.info(f"Batch {batch_id}: {len(children)} files queued for {method}, {len(rejected)} rejected")
+    return jsonify({
+        'batch_id': batch_id,
+        'task_ids': [c['task_id'] for c in children],
+        'files': len(children),
+        'rejected': rejected,
+        'message': f"{len(children)} files queued for {BATCH_METHODS[method]}"
+    }), 202
+
+@api.route('/api/batch/<batch_id>', methods=['GET'])
+@jwt_required()
+def get_batch_status(batch_id):
+    """Aggregate batch progress plus the status of every child task"""
+    user_id = int(get_jwt_identity())
+    if batch_id not in processing_status or not processing_status[batch_id].get('batch'):
+        return jsonify({'error': 'Batch not found'}), 404
+    batch = processing_status[batch_id]
+    if batch.get('user_id') != user_id:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    batch = update_batch_status(batch_id)
+    tasks = []
+    for child in batch['children']:
+        status = processing_status.get(child['task_id'], {})
+        tasks.append({
+            'task_id': child['task_id'],
+            'filename': child['filename'],
+            'status': status.get('status', 'queued'),
+            'progress': status.get('progress', 0),
+            'message': status.get('message', ''),
+            'error': status.get('error')
+        })
+    return jsonify(dict(batch, tasks=tasks))
+
+@api.route('/api/download_batch/<batch_id>', methods=['GET'])
+@jwt_required()
+def download_batch(batch_id):
+    """One zip with the outputs of every completed file of a batch, one folder per file"""
+    user_id = int(get_jwt_identity())
+    if batch_id not in processing_status or not processing_status[batch_id].get('batch'):
+        return jsonify({'error': 'Batch not found'}), 404
+    batch = processing_status[batch_id]
+    if batch.get('user_id') != user_id:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    batch = update_batch_status(batch_id)
+    finished = [c for c in batch['children'] if c['status'] == 'completed']
+    if not finished:
+        return jsonify({'error': 'No files of this batch have completed yet'}), 400
+
+    zip_filename = f"Batch_Results_{batch_id}.zip"
+    zip_path = os.path.abspath(os.path.join(OUTPUT_FOLDER, zip_filename))
+    summary = []
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for child in batch['children']:
+            status = processing_status.get(child['task_id'], {})
+            folder = f"{os.path.splitext(child['filename'])[0]}_{child['task_id'][:8]}"
+            files = task_output_files(status) if child['status'] == 'completed' else []
+            for path, arcname in files:
+                zipf.write(path, f"{folder}/{arcname}")
+            summary.append({
+                'filename': child['filename'],
+                'task_id': child['task_id'],
+                'status': child['status'],
+                'message': status.get('message', ''),
+                'files': [f"{folder}/{arcname}" for _, arcname in files]
+            })
+        zipf.writestr('batch_summary.json', json.dumps(
+            {'batch_id': batch_id, 'method': batch['method'], 'files': summary, 'rejected': batch['rejected']},
+            indent=2
+        ))
+    return send_file(zip_path, as_attachment=True, download_name=zip_filename)
+
 # ============================================================================
 # ABAQUS FEM INTEGRATION - Extract dimensions & stress-strain, modify .inp
 # ============================================================================
@@ -1363,6 +2625,7 @@ def modify_abaqus_inp(base_inp_path, output_inp_path, dimensions, stress_strain_
         modified_lines = []
         in_node_section = False
         in_plastic_section = False
+        has_node_print = any(l.strip().lower().startswith('*node print') for l in lines)
         
         # Calculate the actual physical displacement required based on NEW scaled length
         # Displacement = Strain * New_Length
@@ -1416,6 +2679,13 @@ def modify_abaqus_inp(base_inp_path, output_inp_path, dimensions, stress_strain_
             if in_plastic_section and stress_strain_data:
                 continue 
 
+            # --- NODE PRINT FOR RESULT EXTRACTION ---
+            # Write the loading-set history to the .dat so results can be extracted without the .odb
+            if line.strip().lower().startswith('*end step') and not has_node_print:
+                modified_lines.append("*Node Print, nset=loading, totals=YES\n")
+                modified_lines.append("U3, RF3\n")
+                logger.info("Added *Node Print request for nset loading")
+            
             # --- BOUNDARY CONDITION (DISPLACEMENT) ---
             # Looks for "loading, 3, 3, -VALUE"
             if line.strip().startswith('loading, 3, 3,'):
@@ -1439,7 +2709,7 @@ def modify_abaqus_inp(base_inp_path, output_inp_path, dimensions, stress_strain_
         logger.error(f"Error modifying .inp file: {str(e)}")
         raise
 
-@app.route('/api/download_inp/<task_id>', methods=['GET'])
+@api.route('/api/download_inp/<task_id>', methods=['GET'])
 @jwt_required()
 def download_inp_file(task_id):
     """Download the generated .inp file"""
@@ -1463,6 +2733,7 @@ def download_inp_file(task_id):
         if not output_file or not os.path.exists(output_file):
             return jsonify({'error': 'Output file not found'}), 404
         
+        get_storage().touch(output_file)
         return send_file(
             output_file,
             as_attachment=True,
@@ -1475,7 +2746,7 @@ def download_inp_file(task_id):
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/download_csv/<task_id>', methods=['GET'])
+@api.route('/api/download_csv/<task_id>', methods=['GET'])
 @jwt_required()
 def download_csv_file(task_id):
     """Download the stress-strain CSV file from GLM ABAQUS generation"""
@@ -1515,6 +2786,7 @@ def download_csv_file(task_id):
         if not os.path.exists(csv_path):
             return jsonify({'error': 'CSV file not found'}), 404
         
+        get_storage().touch(csv_path)
         return send_file(
             csv_path,
             as_attachment=True,
@@ -1527,7 +2799,7 @@ def download_csv_file(task_id):
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/upload_glm_table_extraction', methods=['POST'])
+@api.route('/api/upload_glm_table_extraction', methods=['POST'])
 @jwt_required()
 def upload_glm_table_extraction():
     """
@@ -1540,10 +2812,10 @@ def upload_glm_table_extraction():
         logger.info(f"User {current_user} requested GLM table extraction")
         
         # Validate file upload
-        if 'file' not in request.files:
+        file = requested_upload()
+        if file is None:
             return jsonify({'error': 'No file uploaded'}), 400
         
-        file = request.files['file']
         if file.filename == '':
             return jsonify({'error': 'Empty filename'}), 400
         
@@ -1554,7 +2826,11 @@ def upload_glm_table_extraction():
         filename = secure_filename(file.filename)
         task_id = str(uuid.uuid4())
         pdf_path = os.path.join(UPLOAD_FOLDER, f"{task_id}_{filename}")
-        file.save(pdf_path)
+        try:
+            pages = requested_pages(store_upload(file, pdf_path, task_id))
+        except (UploadRejected, PageSelectionError) as e:
+            logger.warning(f"Rejected upload {filename}: {str(e)}")
+            return jsonify({'error': str(e)}), 400
         
         # Task status
         task_status = {
@@ -1562,7 +2838,8 @@ def upload_glm_table_extraction():
             'message': 'Converting PDF to images...',
             'progress': 0,
             'user_id': int(current_user),
-            'extraction_method': 'glm_table_extraction'
+            'extraction_method': 'glm_table_extraction',
+            'pages': format_pages(pages)
         }
         
         processing_status[task_id] = task_status
@@ -1573,10 +2850,9 @@ def upload_glm_table_extraction():
                 task_status['progress'] = 20
                 
                 # Convert PDF to images using pdf2image (same as glmextract.py)
-                from pdf2image import convert_from_path
                 import base64
                 
-                images = convert_from_path(pdf_path)
+                images = render_pages(pdf_path, pages)
                 page_count = len(images)
                 logger.info(f"Converted {page_count} PDF pages to images")
                 
@@ -1692,7 +2968,7 @@ def upload_glm_table_extraction():
 # GLM ABAQUS Generator Endpoint
 # Add this to app.py before "if __name__ == '__main__':"
 
-@app.route('/api/upload_glm_abaqus_generator', methods=['POST'])
+@api.route('/api/upload_glm_abaqus_generator', methods=['POST'])
 @jwt_required()
 def upload_glm_abaqus_generator():
     """
@@ -1703,10 +2979,10 @@ def upload_glm_abaqus_generator():
     try:
         user_id = get_jwt_identity()
         
-        if 'file' not in request.files:
+        file = requested_upload()
+        if file is None:
             return jsonify({'error': 'No file provided'}), 400
         
-        file = request.files['file']
         serial_number = request.form.get('serial_number', '').strip()  # Changed from serialNumber to serial_number
         
         if not serial_number:
@@ -1719,7 +2995,28 @@ def upload_glm_abaqus_generator():
         filename = secure_filename(file.filename)
         task_id = str(uuid.uuid4())
         pdf_path = os.path.join(UPLOAD_FOLDER, f"{task_id}_{filename}")
-        file.save(pdf_path)
+        try:
+            pages = requested_pages(store_upload(file, pdf_path, task_id))
+        except (UploadRejected, PageSelectionError) as e:
+            logger.warning(f"Rejected upload {filename}: {str(e)}")
+            return jsonify({'error': str(e)}), 400
+        
+        # Optional Textract blocks for this PDF: tables found there replace the GLM call
+        textract_blocks_path = None
+        textract_task_id = request.form.get('textract_task_id', '').strip()
+        textract_json = request.files.get('textract_json')
+        if textract_task_id:
+            textract_task = processing_status.get(textract_task_id)
+            if not textract_task or str(textract_task.get('user_id')) != str(user_id):
+                return jsonify({'error': 'Textract task not found'}), 404
+            blocks_filename = textract_task.get('result', {}).get('textract_blocks')
+            if not blocks_filename:
+                return jsonify({'error': 'Textract task has no blocks'}), 400
+            textract_blocks_path = os.path.join(OUTPUT_FOLDER, blocks_filename)
+        elif textract_json and textract_json.filename:
+            extension = '.jsonl' if textract_json.filename.lower().endswith('.jsonl') else '.json'
+            textract_blocks_path = os.path.join(UPLOAD_FOLDER, f"{task_id}_textract{extension}")
+            textract_json.save(textract_blocks_path)
         
         logger.info(f"GLM ABAQUS generator started for serial: {serial_number}")
         
@@ -1730,44 +3027,69 @@ def upload_glm_abaqus_generator():
             'progress': 10,
             'user_id': user_id,
             'serial_number': serial_number,
-            'extraction_method': 'glm_abaqus_generator'
+            'extraction_method': 'glm_abaqus_generator',
+            'pages': format_pages(pages)
         }
         
         processing_status[task_id] = task_status
         
         def process_glm_abaqus():
             try:
-                task_status['message'] = 'Converting PDF to images...'
-                task_status['progress'] = 20
-                
-                # Convert PDF to images
-                from pdf2image import convert_from_path
-                import base64
                 import re
-                
-                images = convert_from_path(pdf_path)
-                page_count = len(images)
-                logger.info(f"Converted {page_count} PDF pages to images")
-                
-                task_status['message'] = f'Extracting data for serial {serial_number}...'
-                task_status['progress'] = 30
-                
-                # Build content array with all images
-                content = []
-                for idx, img in enumerate(images):
-                    img_byte_arr = io.BytesIO()
-                    img.save(img_byte_arr, format='JPEG')
-                    base64_image = base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')
+                extracted_content = None
+                
+                # Certificate catalog dimensions take precedence over PDF values
+                catalog_dimensions = get_specimen_catalog().dimensions(serial_number)
+                
+                if textract_blocks_path:
+                    task_status['message'] = 'Reading tables from Textract blocks...'
+                    task_status['progress'] = 30
+                    specimen_data = specimen_data_from_tables(tables_from_blocks(textract_blocks_path), serial_number)
+                    if specimen_data['stress_strain'] and (catalog_dimensions or (specimen_data['length'] and specimen_data['diameter'])):
+                        extracted_content = format_specimen_data(serial_number, specimen_data)
+                        task_status['extraction_method'] = 'textract_abaqus_generator'
+                        logger.info(f"Textract tables gave {len(specimen_data['stress_strain'])} points for {serial_number}, skipping GLM")
+                    else:
+                        logger.warning(f"Textract tables incomplete for {serial_number}, falling back to GLM")
+                
+                if extracted_content is None:
+                    task_status['message'] = 'Converting PDF to images...'
+                    task_status['progress'] = 20
+                
+                    # With Textract words at hand, only the pages that mention the serial go to GLM
+                    glm_pages = pages
+                    if textract_blocks_path:
+                        index = get_spatial_index(textract_task_id or task_id, textract_blocks_path)
+                        found = [page for page in index.token_pages(serial_number) if not pages or page in pages]
+                        if found:
+                            glm_pages = found
+                            task_status['glm_pages'] = format_pages(found)
+                            logger.info(f"{serial_number} found on page(s) {format_pages(found)}, sending only those to GLM")
+                
+                    # Convert PDF to images
+                    images = render_pages(pdf_path, glm_pages)
+                    page_count = len(images)
+                    logger.info(f"Converted {page_count} PDF pages to images")
+                
+                    task_status['message'] = f'Extracting data for serial {serial_number}...'
+                    task_status['progress'] = 30
+                
+                    # Build content array with all images
+                    content = []
+                    for idx, img in enumerate(images):
+                        img_byte_arr = io.BytesIO()
+                        img.save(img_byte_arr, format='JPEG')
+                        base64_image = base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')
                     
-                    content.append({
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{base64_image}"
-                        }
-                    })
+                        content.append({
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:image/jpeg;base64,{base64_image}"
+                            }
+                        })
                 
-                # Add extraction prompt
-                prompt_text = f"""Extract the following information for specimen with serial number {serial_number}:
+                    # Add extraction prompt
+                    prompt_text = f"""Extract the following information for specimen with serial number {serial_number}:
 
 1. Stress-Strain Data Table - Extract ALL stress and strain values in CSV format with headers: Sample ID, Stress, Strain
 2. Dimensions - Extract the Length (Len) and Diameter (Dia) in mm
@@ -1782,29 +3104,29 @@ STRESS_STRAIN_DATA:
 
 Extract only data for serial number {serial_number}. Be precise with numerical values."""
                 
-                content.append({
-                    "type": "text",
-                    "text": prompt_text
-                })
+                    content.append({
+                        "type": "text",
+                        "text": prompt_text
+                    })
                 
-                # Send to GLM-4.5V
-                from zhipuai import ZhipuAI
-                client = ZhipuAI(api_key=GLM_API_KEY)
+                    # Send to GLM-4.5V
+                    from zhipuai import ZhipuAI
+                    client = ZhipuAI(api_key=GLM_API_KEY)
                 
-                task_status['progress'] = 50
+                    task_status['progress'] = 50
                 
-                response = client.chat.completions.create(
-                    model="glm-4.5v",
-                    messages=[{
-                        "role": "user",
-                        "content": content
-                    }],
-                    temperature=0.1,
-                    thinking={"type": "disabled"}
-                )
+                    response = client.chat.completions.create(
+                        model="glm-4.5v",
+                        messages=[{
+                            "role": "user",
+                            "content": content
+                        }],
+                        temperature=0.1,
+                        thinking={"type": "disabled"}
+                    )
                 
-                extracted_content = response.choices[0].message.content
-                logger.info(f"GLM extraction complete: {extracted_content[:500]}")
+                    extracted_content = response.choices[0].message.content
+                    logger.info(f"GLM extraction complete: {extracted_content[:500]}")
                 
                 task_status['progress'] = 60
                 task_status['message'] = 'Parsing extracted data...'
@@ -1813,32 +3135,16 @@ Extract only data for serial number {serial_number}. Be precise with numerical v
                 length_match = re.search(r'Length:\s*(\d+(?:\.\d+)?)', extracted_content)
                 diameter_match = re.search(r'Diameter:\s*(\d+(?:\.\d+)?)', extracted_content)
                 
-                if not length_match or not diameter_match:
-                    raise ValueError("Could not extract dimensions from PDF")
-                
-                # GLM extracted dimensions (may be incorrect in PDF)
-                extracted_length = float(length_match.group(1)) if length_match else None
-                extracted_diameter = float(diameter_match.group(1)) if diameter_match else None
-                
-                logger.info(f"GLM extracted dimensions: Length={extracted_length}mm, Diameter={extracted_diameter}mm")
-                
-                # Hardcoded actual specimen dimensions (override incorrect PDF values)
-                specimen_dimensions = {
-                    'A61146': {'diameter': 100.0, 'length': 150.0},
-                    'A61145': {'diameter': 75.0, 'length': 100.0},
-                    'A32880': {'diameter': 50.0, 'length': 100.0},
-                    'A61147': {'diameter': 80.0, 'length': 100.0}
-                }
-                
-                # Use hardcoded dimensions if available, otherwise use extracted
-                if serial_number in specimen_dimensions:
-                    length = specimen_dimensions[serial_number]['length']
-                    diameter = specimen_dimensions[serial_number]['diameter']
-                    logger.info(f"Using hardcoded dimensions for {serial_number}: Length={length}mm, Diameter={diameter}mm")
+                if catalog_dimensions:
+                    length = catalog_dimensions['length']
+                    diameter = catalog_dimensions['diameter']
+                    logger.info(f"Using catalog dimensions for {serial_number}: Length={length}mm, Diameter={diameter}mm")
                 else:
-                    length = extracted_length if extracted_length else 100.0
-                    diameter = extracted_diameter if extracted_diameter else 100.0
-                    logger.warning(f"No hardcoded dimensions for {serial_number}, using extracted/default: Length={length}mm, Diameter={diameter}mm")
+                    if not length_match or not diameter_match:
+                        raise ValueError("Could not extract dimensions from PDF")
+                    length = float(length_match.group(1))
+                    diameter = float(diameter_match.group(1))
+                    logger.warning(f"{serial_number} is not in the specimen catalog, using extracted dimensions: Length={length}mm, Diameter={diameter}mm")
                 
                 # Extract CSV data
                 csv_match = re.search(r'STRESS_STRAIN_DATA:\s*\n(.*?)(?:\n\n|$)', extracted_content, re.DOTALL)
@@ -1929,12 +3235,13 @@ Extract only data for serial number {serial_number}. Be precise with numerical v
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/run_abaqus_simulation/<task_id>', methods=['POST'])
+@api.route('/api/run_abaqus_simulation/<task_id>', methods=['POST'])
 @jwt_required()
 def run_abaqus_simulation(task_id):
     """
     Run ABAQUS simulation using the generated .inp file
-    Executes ABAQUS CLI command and streams output
+    Queues the run on the simulation scheduler, which allocates cpus= and
+    license tokens, then executes the ABAQUS CLI command and streams output
     """
     try:
         # Convert user_id for authorization
@@ -1975,99 +3282,252 @@ def run_abaqus_simulation(task_id):
         if not output_file or not os.path.exists(output_file):
             return jsonify({'error': 'Input file not found'}), 404
         
+        # Scheduling options: requested cores and queue priority
+        options = request.get_json(silent=True) or request.form
+        try:
+            requested_cpus = int(options.get('cpus', ABAQUS_DEFAULT_CPUS))
+            priority = int(options.get('priority', 0))
+        except (ValueError, TypeError):
+            return jsonify({'error': 'cpus and priority must be integers'}), 400
+        
+        if requested_cpus < 1:
+            return jsonify({'error': 'cpus must be at least 1'}), 400
+        if not MIN_PRIORITY <= priority <= MAX_PRIORITY:
+            return jsonify({'error': f'priority must be between {MIN_PRIORITY} and {MAX_PRIORITY}'}), 400
+        
+        use_cache = ABAQUS_RESULT_CACHE and str(options.get('use_cache', 'true')).lower() not in ('false', '0', 'no')
+        hashes = inp_hashes(output_file)
+        
         # Create simulation task ID
         sim_task_id = str(uuid.uuid4())
         sim_status = {
             'task_id': sim_task_id,
             'user_id': user_id,
-            'status': 'running',
-            'message': 'Starting ABAQUS simulation...',
+            'status': 'queued',
+            'message': 'Waiting for solver cores and license tokens...',
             'progress': 0,
             'output': [],
-            'inp_file': output_file
+            'inp_file': output_file,
+            'priority': priority,
+            'requested_cpus': requested_cpus,
+            'input_hash': hashes['input_hash'],
+            'model_hash': hashes['model_hash'],
+            'cache_hit': False
         }
         processing_status[sim_task_id] = sim_status
         
-        def run_simulation():
+        # An identical model (after canonicalization) was solved before: reuse its results
+        # Results of every run are kept in their own directory, so runs of one .inp never overwrite each other
+        inp_name = os.path.splitext(os.path.basename(output_file))[0]
+        results_dir = os.path.abspath(os.path.join(OUTPUT_FOLDER, f"sim_{sim_task_id}"))
+        cached = simulation_cache.lookup(hashes['input_hash']) if use_cache else None
+        restored = {}
+        if cached:
+            os.makedirs(results_dir, exist_ok=True)
+            # Empty if another worker evicted the entry meanwhile: solved again below
+            restored = simulation_cache.restore(hashes['input_hash'], results_dir, inp_name)
+        if restored:
+            sim_status['output_files'] = restored
+            if cached['metadata'].get('results_summary'):
+                sim_status['results_summary'] = cached['metadata']['results_summary']
+            sim_status['cache_hit'] = True
+            sim_status['output'].append(
+                f"Identical input already solved (hash {hashes['input_hash'][:12]}), results reused from cache\n"
+            )
+            sim_status['status'] = 'completed'
+            sim_status['message'] = 'Simulation results reused from cache'
+            sim_status['progress'] = 100
+            logger.info(f"Simulation {sim_task_id} served from result cache ({hashes['input_hash'][:12]})")
+            
+            return jsonify({
+                'simulation_task_id': sim_task_id,
+                'message': 'ABAQUS results reused from cache',
+                'status': sim_status['status'],
+                'cache_hit': True,
+                'queue_position': None
+            }), 200
+        
+        def run_simulation(job):
+            workdir = None
             try:
-                import subprocess
+                if job.cancel_event.is_set():
+                    return
                 
-                # Get the directory and filename
-                inp_dir = os.path.dirname(output_file)
-                inp_name = os.path.splitext(os.path.basename(output_file))[0]
-                inp_filename = os.path.basename(output_file)
+                # A private scratch directory with a copy of the .inp: concurrent runs never
+                # share .lck/.sta/scratch files, even for the same job name
+                remove_stale_workdirs(ABAQUS_SCRATCH_DIR, ABAQUS_SCRATCH_MAX_AGE)
+                workdir = create_workdir(ABAQUS_SCRATCH_DIR, sim_task_id, output_file, inp_name)
+                inp_filename = f"{inp_name}.inp"
+                run_inp = os.path.join(workdir, inp_filename)
                 
+                sim_status['status'] = 'running'
                 sim_status['message'] = 'Executing ABAQUS command...'
                 sim_status['progress'] = 10
+                sim_status['cpus'] = job.cpus
+                sim_status['license_tokens'] = job.license_tokens
+                sim_status['queue_wait_seconds'] = job.queue_wait_seconds
+                
+                # Same mesh/boundaries solved before with another material: start from the
+                # increment size that converged there instead of repeating its cutbacks.
+                # Only the scratch copy changes, so the generated .inp (and its hash) stays as it is.
+                increment_hint = simulation_cache.increment_hint(hashes['model_hash']) if use_cache else None
+                current_increment = initial_time_increment(output_file)
+                if increment_hint and current_increment and increment_hint < current_increment:
+                    if apply_initial_time_increment(run_inp, increment_hint):
+                        sim_status['warm_start'] = {
+                            'initial_time_increment': increment_hint,
+                            'replaced_time_increment': current_increment
+                        }
+                        sim_status['output'].append(
+                            f"Warm start: initial time increment {current_increment:g} -> {increment_hint:g} "
+                            f"(converged size from an earlier run on the same mesh)\n"
+                        )
                 
-                # ABAQUS command: abaqus job=<jobname> input=<inputfile> interactive
-                # Use shell=True on Windows to access PATH commands properly
-                # Since cwd is set to inp_dir, use only the filename for input
-                abaqus_cmd = f'abaqus job={inp_name} input="{inp_filename}" interactive ask_delete=OFF'
+                # ABAQUS command: abaqus job=<jobname> input=<inputfile> cpus=<n> interactive
+                # Since cwd is set to workdir, use only the filename for input
+                if ABAQUS_FAKE:
+                    abaqus_launcher = [sys.executable, FAKE_ABAQUS_SCRIPT]
+                else:
+                    abaqus_launcher = shlex.split(ABAQUS_CMD, posix=(os.name != 'nt'))
+                abaqus_cmd = abaqus_launcher + [
+                    f'job={inp_name}',
+                    f'input={inp_filename}',
+                    f'cpus={job.cpus}',
+                    'mp_mode=threads',
+                    f'scratch={workdir}',
+                    'interactive',
+                    'ask_delete=OFF'
+                ]
+                
+                logger.info(f"Running ABAQUS: {' '.join(abaqus_cmd)}")
+                logger.info(f"Working directory: {workdir}")
+                sim_status['output'].append(f"Command: {' '.join(abaqus_cmd)}\n")
+                sim_status['output'].append(f"Working directory: {workdir}\n")
+                sim_status['output'].append(
+                    f"Allocated {job.cpus} core(s), {job.license_tokens} license token(s) "
+                    f"after {job.queue_wait_seconds:.1f}s in queue\n"
+                )
                 
-                logger.info(f"Running ABAQUS: {abaqus_cmd}")
-                logger.info(f"Working directory: {inp_dir}")
-                sim_status['output'].append(f"Command: {abaqus_cmd}\n")
-                sim_status['output'].append(f"Working directory: {inp_dir}\n")
+                sta_file = os.path.join(workdir, f"{inp_name}.sta")
+                msg_file = os.path.join(workdir, f"{inp_name}.msg")
+                tracker = SimulationProgressTracker(
+                    sta_file,
+                    msg_file,
+                    total_time=analysis_time_period(output_file),
+                    started_at=time.time()
+                )
                 
-                # Run ABAQUS process with shell=True for Windows
+                # ABAQUS is a .bat launcher on Windows, so it needs the shell there. Its own
+                # process group lets a cancel stop the solver processes too, not just the launcher
                 process = subprocess.Popen(
                     abaqus_cmd,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.STDOUT,
                     text=True,
-                    cwd=inp_dir,
+                    cwd=workdir,
                     bufsize=1,
                     universal_newlines=True,
-                    shell=True
+                    shell=(os.name == 'nt' and not ABAQUS_FAKE),
+                    **process_group_options()
                 )
+                job.process = process
+                if job.cancel_event.is_set():
+                    stop_process_tree(process)
                 
                 sim_status['progress'] = 20
                 
+                def update_progress():
+                    snapshot = tracker.poll()
+                    sim_status['sta_progress'] = snapshot
+                    if snapshot['percent_complete'] is not None:
+                        # Map solver completion onto 20-95%, leaving room for post-processing
+                        sim_status['progress'] = 20 + int(snapshot['percent_complete'] * 0.75)
+                    if snapshot['increment'] is not None:
+                        sim_status['message'] = (
+                            f"Step {snapshot['step']}, increment {snapshot['increment']}"
+                            + (f" ({snapshot['percent_complete']}%)" if snapshot['percent_complete'] is not None else '')
+                        )
+                
+                # Poll the .sta/.msg files in the background while stdout is streamed
+                stop_tracking = threading.Event()
+                
+                def track_progress():
+                    while not stop_tracking.wait(ABAQUS_PROGRESS_INTERVAL):
+                        update_progress()
+                
+                tracking_thread = threading.Thread(target=track_progress)
+                tracking_thread.daemon = True
+                tracking_thread.start()
+                
                 # Stream output
-                for line in iter(process.stdout.readline, ''):
-                    if line:
-                        sim_status['output'].append(line)
-                        logger.info(f"ABAQUS: {line.strip()}")
-                        
-                        # Update progress based on output
-                        if 'COMPLETED' in line.upper() or 'completed successfully' in line.lower():
-                            sim_status['progress'] = 90
-                        elif 'Begin Abaqus/Standard Analysis' in line:
-                            sim_status['progress'] = 40
-                        elif 'End Abaqus/Standard Analysis' in line:
-                            sim_status['progress'] = 80
-                        elif 'Step' in line or 'Increment' in line:
-                            sim_status['progress'] = min(75, sim_status['progress'] + 5)
-                
-                process.wait()
-                
-                if process.returncode == 0:
-                    sim_status['status'] = 'completed'
-                    sim_status['message'] = 'Simulation completed successfully'
-                    sim_status['progress'] = 100
+                try:
+                    for line in iter(process.stdout.readline, ''):
+                        if line:
+                            sim_status['output'].append(line)
+                            logger.info(f"ABAQUS: {line.strip()}")
                     
-                    # Look for output files
-                    odb_file = os.path.join(inp_dir, f"{inp_name}.odb")
-                    dat_file = os.path.join(inp_dir, f"{inp_name}.dat")
-                    msg_file = os.path.join(inp_dir, f"{inp_name}.msg")
-                    sta_file = os.path.join(inp_dir, f"{inp_name}.sta")
+                    process.wait()
+                finally:
+                    stop_tracking.set()
+                    tracking_thread.join()
+                update_progress()
+                sim_status['solve_seconds'] = job.solve_seconds
+                
+                if job.cancel_event.is_set():
+                    sim_status['status'] = 'cancelled'
+                    sim_status['message'] = 'Simulation cancelled'
+                    sim_status['output'].append("\n=== Simulation cancelled ===\n")
+                elif process.returncode == 0:
+                    # Keep the result files; the rest of the working directory is removed below
+                    output_files_dict = harvest(workdir, inp_name, results_dir, RESULT_TYPES)
+                    dat_file = output_files_dict.get('dat')
                     
-                    output_files_dict = {}
-                    if os.path.exists(odb_file):
-                        output_files_dict['odb'] = odb_file
-                    if os.path.exists(dat_file):
-                        output_files_dict['dat'] = dat_file
-                    if os.path.exists(msg_file):
-                        output_files_dict['msg'] = msg_file
-                    if os.path.exists(sta_file):
-                        output_files_dict['sta'] = sta_file
+                    # Post-process: stream the .dat once into compact result arrays
+                    if 'dat' in output_files_dict:
+                        sim_status['message'] = 'Extracting results from .dat file...'
+                        try:
+                            geometry = specimen_geometry(output_file)
+                            columns = extract_dat_results(
+                                dat_file,
+                                nset='loading',
+                                area=geometry['area'],
+                                length=geometry['length']
+                            )
+                            output_files_dict['results'] = save_results(
+                                columns, os.path.join(results_dir, f"{inp_name}_results.npz")
+                            )
+                            sim_status['results_summary'] = {
+                                'rows': int(len(columns['increment'])),
+                                'columns': ordered_columns(columns),
+                                'max_abs_force': float(abs(columns['force']).max()) if len(columns['force']) else None,
+                                'max_abs_stress': float(abs(columns['stress']).max()) if 'stress' in columns and len(columns['stress']) else None
+                            }
+                        except Exception as e:
+                            logger.warning(f"Result extraction failed for {dat_file}: {str(e)}")
+                            sim_status['output'].append(f"WARNING: Result extraction failed: {str(e)}\n")
                     
                     sim_status['output_files'] = output_files_dict
                     logger.info(f"Output files found: {list(output_files_dict.keys())}")
                     
+                    if use_cache:
+                        try:
+                            simulation_cache.store(
+                                hashes['input_hash'],
+                                hashes['model_hash'],
+                                output_files_dict,
+                                {'results_summary': sim_status.get('results_summary'), 'source_task_id': sim_task_id}
+                            )
+                            if tracker.first_time_increment:
+                                simulation_cache.record_increment_hint(hashes['model_hash'], tracker.first_time_increment)
+                        except Exception as e:
+                            logger.warning(f"Could not cache results of simulation {sim_task_id}: {str(e)}")
+                    
                     sim_status['output'].append("\n=== Simulation completed successfully ===\n")
+                    sim_status['status'] = 'completed'
+                    sim_status['message'] = 'Simulation completed successfully'
+                    sim_status['progress'] = 100
                 else:
+                    sim_status['output_files'] = harvest(workdir, inp_name, results_dir, DIAGNOSTIC_TYPES)
                     sim_status['status'] = 'error'
                     sim_status['message'] = f'Simulation failed with exit code {process.returncode}'
                     sim_status['output'].append(f"\n=== Simulation failed with exit code {process.returncode} ===\n")
@@ -2082,16 +3542,23 @@ def run_abaqus_simulation(task_id):
                 sim_status['message'] = f'Simulation error: {str(e)}'
                 sim_status['output'].append(f"\nERROR: {str(e)}\n")
                 logger.error(f"ABAQUS simulation error: {str(e)}", exc_info=True)
+            finally:
+                if workdir:
+                    remove_workdir(workdir)
         
-        # Start simulation in background thread
-        thread = threading.Thread(target=run_simulation)
-        thread.daemon = True
-        thread.start()
+        def cancelled_before_start(job):
+            sim_status['status'] = 'cancelled'
+            sim_status['message'] = 'Simulation cancelled before it started'
+        
+        # Queue the simulation; the scheduler starts it once cores/tokens are free
+        job = simulation_scheduler.submit(sim_task_id, run_simulation, requested_cpus, priority,
+                                          on_cancel=cancelled_before_start)
         
         return jsonify({
             'simulation_task_id': sim_task_id,
-            'message': 'ABAQUS simulation started',
-            'status': 'running'
+            'message': 'ABAQUS simulation queued',
+            'status': sim_status['status'],
+            'queue_position': simulation_scheduler.queue_position(sim_task_id)
         }), 202
         
     except Exception as e:
@@ -2099,7 +3566,7 @@ def run_abaqus_simulation(task_id):
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/simulation_status/<sim_task_id>', methods=['GET'])
+@api.route('/api/simulation_status/<sim_task_id>', methods=['GET'])
 @jwt_required()
 def get_simulation_status(sim_task_id):
     """Get the status and output of a running ABAQUS simulation"""
@@ -2125,20 +3592,96 @@ def get_simulation_status(sim_task_id):
         if status_user_id_int != user_id_int and str(status_user_id) != str(user_id):
             return jsonify({'error': 'Unauthorized'}), 403
         
-        return jsonify({
+        response = {
             'status': sim_data.get('status'),
             'message': sim_data.get('message'),
             'progress': sim_data.get('progress', 0),
             'output': ''.join(sim_data.get('output', [])),
-            'output_files': sim_data.get('output_files', {})
-        }), 200
+            'output_files': sim_data.get('output_files', {}),
+            'cache_hit': sim_data.get('cache_hit', False),
+            'input_hash': sim_data.get('input_hash'),
+            'model_hash': sim_data.get('model_hash')
+        }
+        if sim_data.get('warm_start'):
+            response['warm_start'] = sim_data['warm_start']
+
+        # Queue/solve timing and resource allocation from the scheduler (the position is
+        # known to every worker, the job itself only to the one that queued it)
+        response['queue_position'] = simulation_scheduler.queue_position(sim_task_id)
+        job = simulation_scheduler.get(sim_task_id)
+        if job:
+            response.update({
+                'priority': job.priority,
+                'cpus': job.cpus,
+                'license_tokens': job.license_tokens,
+                'queue_wait_seconds': job.queue_wait_seconds,
+                'solve_seconds': job.solve_seconds
+            })
+        
+        # Solver progress parsed from the .sta/.msg files
+        sta_progress = sim_data.get('sta_progress')
+        if sta_progress:
+            response.update({
+                'sta_progress': sta_progress,
+                'percent_complete': sta_progress.get('percent_complete'),
+                'increments_per_minute': sta_progress.get('increments_per_minute'),
+                'eta_seconds': sta_progress.get('eta_seconds')
+            })
+        
+        return jsonify(response), 200
         
     except Exception as e:
         logger.error(f"Error getting simulation status: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/download_result/<sim_task_id>/<file_type>', methods=['GET'])
+
+@api.route('/api/cancel_simulation/<sim_task_id>', methods=['POST'])
+@jwt_required()
+def cancel_simulation(sim_task_id):
+    """Cancel a queued or running ABAQUS simulation"""
+    try:
+        user_id = get_jwt_identity()
+        try:
+            user_id_int = int(user_id)
+        except (ValueError, TypeError):
+            user_id_int = user_id
+        
+        if sim_task_id not in processing_status:
+            return jsonify({'error': 'Simulation task not found'}), 404
+        
+        sim_data = processing_status[sim_task_id]
+        
+        # Authorization check
+        status_user_id = sim_data.get('user_id')
+        try:
+            status_user_id_int = int(status_user_id)
+        except (ValueError, TypeError):
+            status_user_id_int = status_user_id
+        
+        if status_user_id_int != user_id_int and str(status_user_id) != str(user_id):
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        # The cancel goes through the scheduler ledger; the worker that owns the run
+        # writes the new status (another worker's task here is a read-only snapshot)
+        if not simulation_scheduler.cancel(sim_task_id):
+            return jsonify({'error': 'Simulation is not queued or running'}), 400
+        
+        status = processing_status.get(sim_task_id, {}).get('status')
+        return jsonify({'message': 'Simulation cancellation requested', 'status': status}), 200
+        
+    except Exception as e:
+        logger.error(f"Error cancelling simulation: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@api.route('/api/simulation_queue', methods=['GET'])
+@jwt_required()
+def get_simulation_queue():
+    """Get solver core and license-token usage for the simulation queue"""
+    return jsonify(simulation_scheduler.stats()), 200
+
+@api.route('/api/download_result/<sim_task_id>/<file_type>', methods=['GET'])
 @jwt_required()
 def download_simulation_result(sim_task_id, file_type):
     """Download ABAQUS simulation result files (.dat, .msg, .sta, etc.)"""
@@ -2173,6 +3716,7 @@ def download_simulation_result(sim_task_id, file_type):
         if not file_path or not os.path.exists(file_path):
             return jsonify({'error': f'{file_type.upper()} file not found'}), 404
         
+        get_storage().touch(file_path)
         return send_file(
             file_path,
             as_attachment=True,
@@ -2184,7 +3728,70 @@ def download_simulation_result(sim_task_id, file_type):
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/open_abaqus_viewer/<sim_task_id>', methods=['POST'])
+
+@api.route('/api/simulation_results/<sim_task_id>', methods=['GET'])
+@jwt_required()
+def get_simulation_results(sim_task_id):
+    """
+    Paginated force-displacement and stress-strain history of a completed simulation
+    Query params: offset, limit (max 5000), columns (comma-separated), format (json|arrow)
+    """
+    try:
+        user_id = get_jwt_identity()
+        try:
+            user_id_int = int(user_id)
+        except (ValueError, TypeError):
+            user_id_int = user_id
+        
+        if sim_task_id not in processing_status:
+            return jsonify({'error': 'Simulation task not found'}), 404
+        
+        sim_data = processing_status[sim_task_id]
+        
+        # Authorization check
+        status_user_id = sim_data.get('user_id')
+        try:
+            status_user_id_int = int(status_user_id)
+        except (ValueError, TypeError):
+            status_user_id_int = status_user_id
+        
+        if status_user_id_int != user_id_int and str(status_user_id) != str(user_id):
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        if sim_data.get('status') != 'completed':
+            return jsonify({'error': 'Simulation not completed'}), 400
+        
+        results_file = sim_data.get('output_files', {}).get('results')
+        if not results_file or not os.path.exists(results_file):
+            return jsonify({'error': 'No extracted results available for this simulation'}), 404
+        
+        try:
+            offset = max(0, int(request.args.get('offset', 0)))
+            limit = min(5000, max(1, int(request.args.get('limit', 500))))
+        except ValueError:
+            return jsonify({'error': 'offset and limit must be integers'}), 400
+        
+        names = [c.strip() for c in request.args.get('columns', '').split(',') if c.strip()] or None
+        columns = load_results(results_file)
+        
+        if request.args.get('format', 'json').lower() == 'arrow':
+            try:
+                payload = results_to_arrow(columns, offset, limit, names)
+            except ImportError:
+                return jsonify({'error': 'Arrow format requires pyarrow to be installed'}), 501
+            return send_file(
+                io.BytesIO(payload),
+                mimetype='application/vnd.apache.arrow.stream',
+                download_name=f"{sim_task_id}_results.arrows"
+            )
+        
+        return jsonify(page_results(columns, offset, limit, names)), 200
+        
+    except Exception as e:
+        logger.error(f"Error reading simulation results: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/open_abaqus_viewer/<sim_task_id>', methods=['POST'])
 @jwt_required()
 def open_abaqus_viewer(sim_task_id):
     """Open ABAQUS Viewer with the .odb file from the completed simulation"""
@@ -2280,5 +3887,44 @@ def open_abaqus_viewer(sim_task_id):
         return jsonify({'error': str(e)}), 500
 
 
+def create_app(config_name=None):
+    """Build the Flask app from a config object (see config.py)"""
+    config = get_config(config_name)
+    flask_app = Flask(__name__)
+    flask_app.config.from_object(config)
+    flask_app.config.setdefault('UPLOAD_FOLDER', UPLOAD_FOLDER)
+    # Uploaded files are streamed to their final location while the form is parsed
+    flask_app.request_class = IngestRequest
+
+    jwt.init_app(flask_app)
+    CORS(flask_app, origins=flask_app.config['CORS_ORIGINS'])
+    flask_app.register_blueprint(api)
+
+    processing_status.configure(flask_app.config['TASK_STORE_DB'], flask_app.config['TASK_STORE_FLUSH_INTERVAL'])
+    simulation_scheduler.configure(flask_app.config['SIMULATION_QUEUE_DB'])
+    return flask_app
+
+
+def warm_up(flask_app):
+    """
+    Do one-time work before the server forks workers (gunicorn preload_app),
+    so every worker shares the loaded modules copy-on-write instead of
+    importing them again on its first request
+    """
+    global db_ready
+    with db_ready_lock:
+        init_db()
+        db_ready = True
+    get_specimen_catalog()
+    probe_tools()
+    for name in flask_app.config['PRELOAD_ENGINES']:
+        try:
+            register_engine(name).load()
+        except ImportError as e:
+            logger.warning(f"Could not preload engine {name}: {str(e)}")
+
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5001)
+    # Development server only; importing this module builds no app (see wsgi.py)
+    app = create_app()
+    app.run(debug=app.config['DEBUG'], host='0.0.0.0', port=5001)
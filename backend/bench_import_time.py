@@ -0,0 +1,108 @@
+"""
+Server Startup Benchmark
+Starts fresh interpreters that import app.py and time the first register, login
+and status requests, then reports which engines and heavy libraries were loaded
+along the way. Auth and status should not pull in any OCR or extraction engine.
+
+Usage:
+    python bench_import_time.py --runs 5
+    python bench_import_time.py --importtime 15   # slowest imports (python -X importtime)
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HEAVY_MODULES = ('ocrmypdf', 'pikepdf', 'zhipuai', 'convertapi', 'requests', 'pandas', 'numpy', 'fitz', 'boto3')
+
+# Runs in a child interpreter so every measurement starts cold
+CHILD_SCRIPT = r'''
+import sys, time, json, uuid
+sys.path.insert(0, {backend!r})
+start = time.perf_counter()
+import app
+timings = {{'import': time.perf_counter() - start}}
+
+client = app.create_app().test_client()
+email = f'{{uuid.uuid4().hex}}@example.com'
+
+start = time.perf_counter()
+client.post('/api/register', json={{'email': email, 'password': 'secret123', 'fullName': 'Bench'}})
+timings['first register'] = time.perf_counter() - start
+
+start = time.perf_counter()
+token = client.post('/api/login', json={{'email': email, 'password': 'secret123'}}).get_json()['access_token']
+timings['first login'] = time.perf_counter() - start
+
+start = time.perf_counter()
+client.get('/api/status/missing', headers={{'Authorization': f'Bearer {{token}}'}})
+timings['first status'] = time.perf_counter() - start
+
+import engines
+print(json.dumps({{
+    'timings': timings,
+    'engines': sorted(engines.loaded_engines()),
+    'heavy': sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+'''
+
+
+def run_child(workdir):
+    script = CHILD_SCRIPT.format(backend=BACKEND_DIR, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, '-c', script], cwd=workdir, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_profile(workdir, top):
+    """Slowest modules by cumulative import time for `import app`"""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import sys; sys.path.insert(0, {BACKEND_DIR!r}); import app'],
+        cwd=workdir, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark app.py import time and first-request latency')
+    parser.add_argument('--runs', type=int, default=3, help='cold interpreter starts to average over')
+    parser.add_argument('--importtime', type=int, default=0, metavar='N', help='also list the N slowest imports')
+    args = parser.parse_args()
+
+    # Run in a scratch directory so users.db/uploads/outputs don't touch the working tree
+    workdir = tempfile.mkdtemp(prefix='bench_import_')
+    try:
+        results = [run_child(workdir) for _ in range(args.runs)]
+
+        print(f"Cold starts: {args.runs}")
+        for name in results[0]['timings']:
+            values = [r['timings'][name] * 1000 for r in results]
+            print(f"  {name:<16} mean={statistics.mean(values):8.1f}ms  min={min(values):8.1f}ms  max={max(values):8.1f}ms")
+        print(f"  engines loaded:  {', '.join(results[-1]['engines']) or 'none'}")
+        print(f"  heavy modules:   {', '.join(results[-1]['heavy']) or 'none'}")
+
+        if args.importtime:
+            print("\nSlowest imports (cumulative):")
+            for cumulative_us, self_us, name in import_profile(workdir, args.importtime):
+                print(f"  {cumulative_us / 1000:8.1f}ms  (self {self_us / 1000:6.1f}ms)  {name}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+OCR Profile Benchmark
+OCRs a corpus of PDFs once per profile (see ocr_profiles.py) through the
+per-page pipeline of /api/upload and reports pages/second and output size,
+so the speed/quality trade-off of each profile is measured, not guessed.
+
+Every page gets plain OCR (no page classification), so digital pages count
+as well. Without PDFs a synthetic corpus of scanned certificate pages is
+rendered first.
+
+Usage:
+    python bench_ocr_profiles.py scans/*.pdf --workers 4
+    python bench_ocr_profiles.py --synthetic 10 --profiles fast balanced
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+import fitz  # PyMuPDF
+
+from ocr_profiles import PROFILES, probe_tools, profile_options, profile_args
+from page_ocr import split_pages, ocr_pages, merge_pages, merge_text
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def synthetic_corpus(directory, pages, dpi=150):
+    """One PDF of image-only pages: typed certificate lines, rendered and placed as scans"""
+    text = '\n'.join(
+        f'Sample 0047-{n:03d}   Heat 8{n:04d}   Rp0.2 {300 + n} N/mm2   A {20 + n % 7}.5 %'
+        for n in range(1, 31)
+    )
+    source = fitz.open()
+    scanned = fitz.open()
+    for number in range(pages):
+        page = source.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 560, 800), f'Test certificate page {number + 1}\n\n{text}', fontsize=9)
+        pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        scanned.new_page(width=page.rect.width, height=page.rect.height).insert_image(page.rect, pixmap=pixmap)
+    path = os.path.join(directory, 'synthetic_scan.pdf')
+    scanned.save(path, deflate=True)
+    source.close()
+    scanned.close()
+    return [path]
+
+
+def run_profile(profile, pdfs, workdir, workers):
+    options = profile_options({'profile': profile})
+    pages = 0
+    size = 0
+    start = time.perf_counter()
+    for index, pdf in enumerate(pdfs):
+        pages_dir = os.path.join(workdir, f'{profile}_{index}')
+        output = os.path.join(workdir, f'{profile}_{index}.pdf')
+        selected = split_pages(pdf, pages_dir)
+        ocr_pages(pages_dir, selected, options, workers=workers, actions={page: 'ocr' for page in selected})
+        merge_pages(pdf, pages_dir, output)
+        merge_text(pages_dir, output[:-4] + '.txt')
+        pages += len(selected)
+        size += os.path.getsize(output)
+    seconds = time.perf_counter() - start
+    return {'profile': profile, 'args': ' '.join(profile_args(options)), 'pages': pages,
+            'seconds': seconds, 'size': size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark OCR profiles on a PDF corpus')
+    parser.add_argument('pdfs', nargs='*', help='PDF files (default: a synthetic scanned corpus)')
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument('--synthetic', type=int, default=6, help='pages of the synthetic corpus')
+    parser.add_argument('--workers', type=int, default=0, help='pages OCRed in parallel (0 = all cores)')
+    args = parser.parse_args()
+
+    tools = probe_tools()
+    print('Tools: ' + ', '.join(f"{name}={version or 'missing'}" for name, version in tools.items()))
+    if not tools['ocrmypdf'] or not tools['tesseract']:
+        print('ocrmypdf and tesseract are needed for this benchmark')
+        return 1
+
+    workdir = tempfile.mkdtemp(prefix='bench_ocr_')
+    try:
+        pdfs = [os.path.abspath(p) for p in args.pdfs] or synthetic_corpus(workdir, args.synthetic)
+        input_size = sum(os.path.getsize(p) for p in pdfs)
+        print(f"Corpus: {len(pdfs)} PDF(s), {input_size / 1024:.0f} KB\n")
+        print(f"  {'profile':<10} {'pages':>6} {'seconds':>9} {'pages/s':>8} {'output KB':>10} {'ratio':>6}")
+        for profile in args.profiles:
+            result = run_profile(profile, pdfs, workdir, args.workers or None)
+            print(
+                f"  {profile:<10} {result['pages']:>6} {result['seconds']:>9.2f} "
+                f"{result['pages'] / result['seconds']:>8.2f} {result['size'] / 1024:>10.0f} "
+                f"{result['size'] / input_size:>6.2f}   {result['args']}"
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+ABAQUS Simulation Load Benchmark
+Runs N concurrent simulations through the real Flask endpoints using the fake
+solver (fake_abaqus.py) and reports scheduler overhead and status-endpoint latency.
+
+Usage:
+    python bench_simulations.py --jobs 20 --total-cpus 8 --cpus-per-job 2
+"""
+
+import os
+import sys
+import time
+import uuid
+import shutil
+import argparse
+import tempfile
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(name, values, unit='ms', scale=1000.0):
+    if not values:
+        print(f"  {name:<28} n/a")
+        return
+    print(
+        f"  {name:<28} n={len(values):<5} "
+        f"mean={statistics.mean(values) * scale:9.2f}{unit} "
+        f"p50={percentile(values, 50) * scale:9.2f}{unit} "
+        f"p95={percentile(values, 95) * scale:9.2f}{unit} "
+        f"max={max(values) * scale:9.2f}{unit}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent ABAQUS simulations with the fake solver')
+    parser.add_argument('--jobs', type=int, default=10, help='number of simulations to submit')
+    parser.add_argument('--cpus-per-job', type=int, default=1, help='cores requested per simulation')
+    parser.add_argument('--total-cpus', type=int, default=4, help='cores available to the scheduler')
+    parser.add_argument('--license-tokens', type=int, default=0, help='license-token pool (0 = enough for all cores)')
+    parser.add_argument('--increment-seconds', type=float, default=0.05, help='fake solver delay per increment')
+    parser.add_argument('--poll-interval', type=float, default=0.1, help='client status polling interval')
+    args = parser.parse_args()
+
+    # Run in a scratch directory so users.db/uploads/outputs don't touch the working tree
+    workdir = tempfile.mkdtemp(prefix='bench_sim_')
+    os.chdir(workdir)
+    os.environ['ABAQUS_FAKE'] = 'true'
+    os.environ['ABAQUS_CPUS'] = str(args.total_cpus)
+    os.environ['ABAQUS_LICENSE_TOKENS'] = str(args.license_tokens)
+    os.environ['FAKE_ABAQUS_INCREMENT_SECONDS'] = str(args.increment_seconds)
+    sys.path.insert(0, BACKEND_DIR)
+
+    import logging
+    logging.disable(logging.INFO)
+    import app
+
+    client = app.create_app().test_client()
+    response = client.post('/api/register', json={
+        'email': f'bench-{uuid.uuid4().hex[:8]}@example.com',
+        'password': 'benchmark',
+        'fullName': 'Benchmark'
+    })
+    token = response.get_json()['access_token']
+    user_id = response.get_json()['user']['id']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    # Completed generator tasks to simulate (the GLM step itself is not benchmarked)
+    task_ids = []
+    for _ in range(args.jobs):
+        task_id = str(uuid.uuid4())
+        inp_filename = f"Compression_{task_id[:8]}.inp"
+        inp_path = os.path.join(app.OUTPUT_FOLDER, inp_filename)
+        shutil.copy(os.path.join(BACKEND_DIR, 'Compression.inp'), inp_path)
+        app.processing_status[task_id] = {
+            'status': 'completed',
+            'user_id': str(user_id),
+            'output_file': inp_filename,
+            'output_file_path': inp_path
+        }
+        task_ids.append(task_id)
+
+    status_latencies = []
+    submit_latencies = []
+    latency_lock = threading.Lock()
+    results = []
+
+    def run_one(task_id):
+        started = time.perf_counter()
+        response = client.post(
+            f'/api/run_abaqus_simulation/{task_id}',
+            json={'cpus': args.cpus_per_job, 'use_cache': False},
+            headers=headers
+        )
+        submitted = time.perf_counter()
+        sim_task_id = response.get_json()['simulation_task_id']
+
+        while True:
+            request_start = time.perf_counter()
+            data = client.get(f'/api/simulation_status/{sim_task_id}', headers=headers).get_json()
+            with latency_lock:
+                status_latencies.append(time.perf_counter() - request_start)
+            if data['status'] in ('completed', 'error', 'cancelled'):
+                break
+            time.sleep(args.poll_interval)
+
+        with latency_lock:
+            submit_latencies.append(submitted - started)
+        results.append({
+            'status': data['status'],
+            'end_to_end': time.perf_counter() - started,
+            'queue_wait': data.get('queue_wait_seconds') or 0.0,
+            'solve': data.get('solve_seconds') or 0.0
+        })
+
+    print(
+        f"Submitting {args.jobs} simulations ({args.cpus_per_job} cpu each) to "
+        f"{args.total_cpus} cores, {app.simulation_scheduler.license_tokens} license tokens"
+    )
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        list(executor.map(run_one, task_ids))
+    wall = time.perf_counter() - wall_start
+
+    # Overhead = time not spent queued or solving (dispatch, process start, status polling lag)
+    overhead = [max(0.0, r['end_to_end'] - r['queue_wait'] - r['solve']) for r in results]
+    failed = [r for r in results if r['status'] != 'completed']
+
+    print(f"\nCompleted {len(results) - len(failed)}/{len(results)} simulations in {wall:.2f}s")
+    summarize('submit latency', submit_latencies)
+    summarize('status latency', status_latencies)
+    summarize('queue wait', [r['queue_wait'] for r in results], unit='s', scale=1.0)
+    summarize('solve time', [r['solve'] for r in results], unit='s', scale=1.0)
+    summarize('scheduler/poll overhead', overhead)
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
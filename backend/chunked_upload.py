@@ -0,0 +1,308 @@
+"""
+Resumable Chunked Uploads
+A tus-like protocol for large scans, so a dropped connection only costs the
+chunk in flight and no worker is tied up for the length of a 100 MB+ upload:
+
+1. create   - POST  /api/uploads                  {filename, length, sha256?}
+2. chunks   - PATCH /api/uploads/<id>             Upload-Offset: <n>, raw bytes
+3. resume   - GET/HEAD /api/uploads/<id>          offset, received, missing ranges
+4. finalize - POST  /api/uploads/<id>/finalize    hash, validate, store the blob
+
+The data file is preallocated at create time. Each chunk is written with
+positional writes (os.pwrite) at its own offset, so chunks can arrive out of
+order and in parallel, from different worker processes. Received byte ranges
+are recorded in SQLite and merged on read. After finalize, the PDF is in the
+ingest blob store, and any upload route accepts the upload_id in place of a
+multipart 'file'.
+"""
+
+import os
+import json
+import time
+import uuid
+import errno
+import sqlite3
+import logging
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from ingest import ingest_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024  # suggested to clients
+WRITE_BUFFER = 1024 * 1024
+
+
+class ChunkedUploadError(Exception):
+    """Protocol error; status is the HTTP status code to answer with"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class CompletedUpload:
+    """A finalized chunked upload, usable wherever a request's FileStorage was"""
+
+    def __init__(self, upload_id: str, filename: str, blob: Dict[str, Any]):
+        self.upload_id = upload_id
+        self.filename = filename
+        self.blob = blob
+
+
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _pwrite(fd: int, data: bytes, offset: int):
+    view = memoryview(data)
+    while view:
+        if hasattr(os, 'pwrite'):
+            written = os.pwrite(fd, view, offset)
+        else:
+            # Windows: the descriptor belongs to this request only, so seek + write is safe
+            os.lseek(fd, offset, os.SEEK_SET)
+            written = os.write(fd, view)
+        view = view[written:]
+        offset += written
+
+
+def _preallocate(path: str, length: int):
+    with open(path, 'wb') as f:
+        if hasattr(os, 'posix_fallocate') and length:
+            try:
+                os.posix_fallocate(f.fileno(), 0, length)
+                return
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    raise
+                # Filesystem without fallocate support: fall back to a sparse file
+        f.truncate(length)
+
+
+class ChunkedUploadStore:
+    """Upload sessions, their data files and received ranges under one directory"""
+
+    def __init__(self, root: str, max_size: int = 2 * 1024 ** 3, expire_seconds: float = 24 * 3600):
+        self.root = root
+        self.max_size = max_size
+        self.expire_seconds = expire_seconds
+        os.makedirs(root, exist_ok=True)
+        self.db_path = os.path.join(root, 'uploads.db')
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS uploads (
+                upload_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                sha256 TEXT,
+                status TEXT NOT NULL,
+                error TEXT,
+                blob TEXT,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                upload_id TEXT NOT NULL,
+                start INTEGER NOT NULL,
+                end INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_chunks_upload ON chunks (upload_id);
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def data_path(self, upload_id: str) -> str:
+        return os.path.join(self.root, f"{upload_id}.data")
+
+    def create(self, user_id, filename: str, length: int, sha256: Optional[str] = None) -> Dict[str, Any]:
+        if length <= 0:
+            raise ChunkedUploadError('Upload length must be positive')
+        if length > self.max_size:
+            raise ChunkedUploadError(f'Upload exceeds the {self.max_size} byte limit', 413)
+        self.cleanup_expired()
+
+        upload_id = uuid.uuid4().hex
+        try:
+            _preallocate(self.data_path(upload_id), length)
+        except OSError:
+            if os.path.exists(self.data_path(upload_id)):
+                os.remove(self.data_path(upload_id))
+            raise ChunkedUploadError('Not enough disk space for this upload', 507)
+
+        conn = self._connect()
+        conn.execute(
+            'INSERT INTO uploads (upload_id, user_id, filename, length, sha256, status, created_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (upload_id, str(user_id), filename, length, (sha256 or '').lower() or None, 'uploading', time.time())
+        )
+        conn.commit()
+        conn.close()
+        logger.info(f"Chunked upload {upload_id} created: {filename}, {length} bytes")
+        return self.get(upload_id, user_id)
+
+    def get(self, upload_id: str, user_id) -> Dict[str, Any]:
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM uploads WHERE upload_id = ?', (upload_id,)).fetchone()
+            if row is None or row['user_id'] != str(user_id):
+                raise ChunkedUploadError('Upload not found', 404)
+            ranges = merge_ranges([
+                (r['start'], r['end'])
+                for r in conn.execute('SELECT start, end FROM chunks WHERE upload_id = ?', (upload_id,))
+            ])
+        finally:
+            conn.close()
+
+        length = row['length']
+        missing = []
+        position = 0
+        for start, end in ranges:
+            if start > position:
+                missing.append([position, start])
+            position = end
+        if position < length:
+            missing.append([position, length])
+        return {
+            'upload_id': upload_id,
+            'filename': row['filename'],
+            'length': length,
+            'status': row['status'],
+            'error': row['error'],
+            # Contiguous bytes from the start: where a sequential client resumes
+            'offset': ranges[0][1] if ranges and ranges[0][0] == 0 else 0,
+            'received': sum(end - start for start, end in ranges),
+            'missing': missing,
+            'complete': not missing,
+            'chunk_size': DEFAULT_CHUNK_SIZE,
+            'blob': json.loads(row['blob']) if row['blob'] else None,
+        }
+
+    def write_chunk(self, upload_id: str, user_id, offset: int, stream: BinaryIO, length: int) -> Dict[str, Any]:
+        """Write one chunk at its offset; bytes that arrived before a disconnect are kept"""
+        session = self.get(upload_id, user_id)
+        if session['status'] != 'uploading':
+            raise ChunkedUploadError(f"Upload is {session['status']}", 409)
+        if offset < 0 or offset + length > session['length']:
+            raise ChunkedUploadError(
+                f"Chunk {offset}-{offset + length} is outside the upload (0-{session['length']})", 416
+            )
+
+        written = 0
+        fd = os.open(self.data_path(upload_id), os.O_WRONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            while written < length:
+                data = stream.read(min(WRITE_BUFFER, length - written))
+                if not data:
+                    break
+                _pwrite(fd, data, offset + written)
+                written += len(data)
+        finally:
+            os.close(fd)
+
+        if written:
+            conn = self._connect()
+            conn.execute('INSERT INTO chunks (upload_id, start, end) VALUES (?, ?, ?)',
+                         (upload_id, offset, offset + written))
+            conn.commit()
+            conn.close()
+        if written < length:
+            raise ChunkedUploadError(f'Chunk ended after {written} of {length} bytes', 400)
+        return self.get(upload_id, user_id)
+
+    def finalize(self, upload_id: str, user_id, upload_dir: str = 'uploads') -> Dict[str, Any]:
+        """Hash and validate the assembled file and move it into the blob store"""
+        session = self.get(upload_id, user_id)
+        if session['status'] == 'complete':
+            return session
+        if not session['complete']:
+            raise ChunkedUploadError(f"Upload is missing {len(session['missing'])} byte ranges", 409)
+
+        conn = self._connect()
+        claimed = conn.execute(
+            "UPDATE uploads SET status = 'finalizing' WHERE upload_id = ? AND status = 'uploading'", (upload_id,)
+        ).rowcount
+        conn.commit()
+        conn.close()
+        if not claimed:
+            raise ChunkedUploadError('Upload is already being finalized', 409)
+
+        sha256 = self._expected_sha256(upload_id)
+        try:
+            blob = ingest_file(self.data_path(upload_id), upload_dir, expected_sha256=sha256)
+        except Exception as e:
+            self._set_status(upload_id, 'failed', error=str(e))
+            raise
+        self._set_status(upload_id, 'complete', blob=blob)
+        conn = self._connect()
+        conn.execute('DELETE FROM chunks WHERE upload_id = ?', (upload_id,))
+        conn.commit()
+        conn.close()
+        return self.get(upload_id, user_id)
+
+    def completed(self, upload_id: str, user_id) -> Optional[CompletedUpload]:
+        """The finalized upload, or None if it is unknown, not the user's or not finalized"""
+        try:
+            session = self.get(upload_id, user_id)
+        except ChunkedUploadError:
+            return None
+        if session['status'] != 'complete' or not os.path.exists(session['blob']['blob_path']):
+            return None
+        return CompletedUpload(upload_id, session['filename'], session['blob'])
+
+    def completed_blobs(self) -> List[Tuple[str, str, str]]:
+        """(upload_id, user_id, blob path) of finalized sessions that have not expired"""
+        conn = self._connect()
+        rows = conn.execute("SELECT upload_id, user_id, blob FROM uploads WHERE status = 'complete'").fetchall()
+        conn.close()
+        return [(row['upload_id'], row['user_id'], json.loads(row['blob'])['blob_path']) for row in rows if row['blob']]
+
+    def delete(self, upload_id: str, user_id):
+        self.get(upload_id, user_id)
+        self._remove(upload_id)
+
+    def cleanup_expired(self) -> int:
+        """Drop sessions (and unfinished data files) older than expire_seconds"""
+        conn = self._connect()
+        expired = [row['upload_id'] for row in conn.execute(
+            'SELECT upload_id FROM uploads WHERE created_at < ?', (time.time() - self.expire_seconds,)
+        )]
+        conn.close()
+        for upload_id in expired:
+            self._remove(upload_id)
+        return len(expired)
+
+    def _expected_sha256(self, upload_id: str) -> Optional[str]:
+        conn = self._connect()
+        row = conn.execute('SELECT sha256 FROM uploads WHERE upload_id = ?', (upload_id,)).fetchone()
+        conn.close()
+        return row['sha256'] if row else None
+
+    def _set_status(self, upload_id: str, status: str, error: Optional[str] = None, blob: Optional[Dict] = None):
+        conn = self._connect()
+        conn.execute('UPDATE uploads SET status = ?, error = ?, blob = ? WHERE upload_id = ?',
+                     (status, error, json.dumps(blob) if blob else None, upload_id))
+        conn.commit()
+        conn.close()
+
+    def _remove(self, upload_id: str):
+        # Finalized blobs stay in the blob store; only the session and its partial data go
+        if os.path.exists(self.data_path(upload_id)):
+            os.remove(self.data_path(upload_id))
+        conn = self._connect()
+        conn.execute('DELETE FROM chunks WHERE upload_id = ?', (upload_id,))
+        conn.execute('DELETE FROM uploads WHERE upload_id = ?', (upload_id,))
+        conn.commit()
+        conn.close()
@@ -0,0 +1,58 @@
+"""
+Flask Configuration
+Config objects for create_app(). Pick one with FLASK_CONFIG
+(development, production or testing); any value can be overridden by the
+environment variable of the same name.
+"""
+
+import os
+from datetime import timedelta
+
+
+class Config:
+    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dDaysadadREfj@38u983293*#(&#*u8w')
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=int(os.getenv('JWT_ACCESS_TOKEN_HOURS', '24')))
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', str(100 * 1024 * 1024)))
+    CORS_ORIGINS = [origin.strip() for origin in os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')]
+    DEBUG = False
+    TESTING = False
+
+    # Task status shared by all worker processes (empty = in-process dict only)
+    TASK_STORE_DB = os.getenv('TASK_STORE_DB', 'tasks.db')
+    TASK_STORE_FLUSH_INTERVAL = float(os.getenv('TASK_STORE_FLUSH_INTERVAL', '0.5'))
+    # ABAQUS queue and core/license-token ledger shared by all worker processes
+    SIMULATION_QUEUE_DB = os.getenv('SIMULATION_QUEUE_DB', TASK_STORE_DB)
+
+    # Engines imported by warm_up() before gunicorn forks (comma-separated engines.py names)
+    PRELOAD_ENGINES = [name.strip() for name in os.getenv('PRELOAD_ENGINES', '').split(',') if name.strip()]
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+
+
+class ProductionConfig(Config):
+    PRELOAD_ENGINES = [
+        name.strip() for name in os.getenv(
+            'PRELOAD_ENGINES',
+            'textract_stream,textract_tables,textract_service,searchable_pdf,spatial_index,'
+            'specimen_catalog,abaqus_results,glm_vision_service'
+        ).split(',') if name.strip()
+    ]
+
+
+class TestingConfig(Config):
+    TESTING = True
+    TASK_STORE_DB = os.getenv('TASK_STORE_DB', '')
+    SIMULATION_QUEUE_DB = os.getenv('SIMULATION_QUEUE_DB', TASK_STORE_DB)
+
+
+CONFIGS = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
+
+
+def get_config(name=None):
+    return CONFIGS[name or os.getenv('FLASK_CONFIG', 'development')]
@@ -0,0 +1,66 @@
+"""
+Shared test helpers: sample PDFs, registered users and an app client on a clean working directory
+"""
+
+import os
+import uuid
+from collections import OrderedDict
+
+import fitz  # PyMuPDF
+import pytest
+
+
+def pdf_bytes(pages=1, text=None):
+    """A digital PDF; every page shows text, or 'Page <n>' when no text is given"""
+    doc = fitz.open()
+    for n in range(pages):
+        doc.new_page().insert_text((72, 72), text or f'Page {n + 1}')
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def register(client, email=None):
+    """Registers a new user; returns (auth headers, user id)"""
+    response = client.post('/api/register', json={
+        'email': email or f'{uuid.uuid4().hex}@example.com', 'password': 'secret123', 'fullName': 'Test User'
+    })
+    assert response.status_code == 200
+    data = response.get_json()
+    return {'Authorization': f"Bearer {data['access_token']}"}, data['user']['id']
+
+
+def auth_headers(client, email=None):
+    return register(client, email)[0]
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """
+    The app module working in tmp_path. The stores app.py opens on first use are
+    reset, so each test opens its own under tmp_path instead of reusing (and
+    writing to) those of an earlier test.
+    """
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('uploads', exist_ok=True)
+    os.makedirs('outputs', exist_ok=True)
+
+    import app
+    app.init_db()
+    for name in ('storage_manager', 'chunked_uploads', 'specimen_catalog'):
+        monkeypatch.setattr(app, name, None)
+    monkeypatch.setattr(app, 'spatial_indexes', OrderedDict())
+    monkeypatch.setattr(app, 'simulation_cache', app.SimulationResultCache(str(tmp_path / 'outputs' / 'sim_cache')))
+    # Tests sweep explicitly; no background sweeper per test
+    monkeypatch.setattr(app, 'STORAGE_SWEEP_INTERVAL', 0)
+    return app
+
+
+@pytest.fixture
+def flask_app(app_module):
+    return app_module.create_app('testing')
+
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.test_client()
@@ -0,0 +1,111 @@
+"""
+Lazy Engine Registry
+Defers importing the OCR, vision and extraction engines until a request needs
+them, so the server (and the auth/status endpoints) start without paying for
+ocrmypdf, zhipuai, pandas, numpy or PyMuPDF.
+
+Engines are registered by module name with an optional configure hook that runs
+once, right after the first import (API credentials, tool paths):
+
+    ocrmypdf = register('ocrmypdf', configure=setup_ocr_environment)
+    tables_from_blocks = lazy_import('textract_tables', 'tables_from_blocks')
+
+Attribute access on a LazyModule, or calling a LazyAttribute, imports the module
+under a lock; later accesses go straight to the loaded module.
+"""
+
+import time
+import logging
+import importlib
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ENGINES: Dict[str, 'LazyModule'] = {}
+_registry_lock = threading.Lock()
+
+
+class LazyModule:
+    """Module proxy that imports (and configures) the module on first use"""
+
+    def __init__(self, name: str, configure: Optional[Callable[[Any], None]] = None):
+        self.__dict__['_name'] = name
+        self.__dict__['_configure'] = configure
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+        self.__dict__['load_seconds'] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def load(self):
+        module = self._module
+        if module is not None:
+            return module
+        with self._lock:
+            if self._module is None:
+                start = time.perf_counter()
+                module = importlib.import_module(self._name)
+                if self._configure is not None:
+                    self._configure(module)
+                self.__dict__['load_seconds'] = time.perf_counter() - start
+                self.__dict__['_module'] = module
+                logger.info(f"Loaded engine {self._name} in {self.load_seconds * 1000:.0f} ms")
+        return self._module
+
+    def __getattr__(self, attribute: str):
+        return getattr(self.load(), attribute)
+
+    def __setattr__(self, attribute: str, value):
+        setattr(self.load(), attribute, value)
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<LazyModule {self._name} ({state})>"
+
+
+class LazyAttribute:
+    """Stand-in for `from module import name`; resolves the name on first call"""
+
+    def __init__(self, module: LazyModule, attribute: str):
+        self._module = module
+        self._attribute = attribute
+
+    def resolve(self):
+        return getattr(self._module.load(), self._attribute)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, attribute: str):
+        if attribute.startswith('_'):
+            raise AttributeError(attribute)
+        return getattr(self.resolve(), attribute)
+
+    def __repr__(self):
+        return f"<LazyAttribute {self._module._name}.{self._attribute}>"
+
+
+def register(name: str, configure: Optional[Callable[[Any], None]] = None) -> LazyModule:
+    """Register an engine module (once) and return its lazy proxy"""
+    with _registry_lock:
+        engine = ENGINES.get(name)
+        if engine is None:
+            engine = ENGINES[name] = LazyModule(name, configure)
+        return engine
+
+
+def lazy_import(name: str, attribute: str) -> LazyAttribute:
+    return LazyAttribute(register(name), attribute)
+
+
+def engine(name: str):
+    """Imported module of a registered engine"""
+    return ENGINES[name].load()
+
+
+def loaded_engines() -> Dict[str, float]:
+    """Import time in seconds of every engine loaded so far"""
+    return {name: e.load_seconds for name, e in ENGINES.items() if e.loaded}
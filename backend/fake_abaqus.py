@@ -0,0 +1,255 @@
+"""
+Fake ABAQUS Solver
+Stand-in for the `abaqus` launcher so the simulation pipeline can be exercised
+and load-tested without an Abaqus install.
+
+Accepts the same arguments the app passes to Abaqus:
+    python fake_abaqus.py job=<name> input=<file.inp> cpus=<n> interactive
+
+It replays a recorded .sta/.msg timeline (fixtures/abaqus by default), echoing
+Abaqus-style lines on stdout, and writes dummy .odb/.dat/.msg/.sta/.log files
+into the working directory. The .dat contains node output for the `loading`
+node set computed from the model's dimensions, boundary displacement and
+*Plastic table.
+
+Environment:
+    FAKE_ABAQUS_TIMELINE            Directory with <name>.sta/.msg to replay (default fixtures/abaqus)
+    FAKE_ABAQUS_INCREMENT_SECONDS   Wall-clock delay per recorded attempt (default 0.2)
+    FAKE_ABAQUS_FAIL                Set to 1 to end the run with an analysis error
+"""
+
+import os
+import re
+import sys
+import math
+import time
+import glob
+
+DEFAULT_TIMELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'abaqus')
+STA_ROW_PATTERN = re.compile(r'^\s*(\d+)\s+(\d+)\s+(\d+)(U?)\s+\d+\s+\d+\s+\d+\s+(\S+)\s+(\S+)\s+(\S+)')
+
+
+def parse_args(argv):
+    """Parse Abaqus-style key=value arguments"""
+    options = {}
+    for arg in argv:
+        if '=' in arg:
+            key, value = arg.split('=', 1)
+            options[key.strip().lower()] = value.strip().strip('"')
+        else:
+            options[arg.strip().lower()] = True
+    return options
+
+
+def read_model(inp_path):
+    """Extract what the fake solver needs from the .inp file"""
+    model = {
+        'radius': 0.0,
+        'z_min': None,
+        'z_max': None,
+        'elastic_modulus': 210000.0,
+        'plastic': [],
+        'loading_nodes': [],
+        'loading_displacement': 0.0
+    }
+    section = None
+
+    with open(inp_path, 'r', errors='replace') as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped or stripped.startswith('**'):
+                continue
+
+            if stripped.startswith('*'):
+                keyword = stripped.lower().replace(' ', '')
+                if keyword.startswith('*node') and not keyword.startswith('*nodeprint'):
+                    section = 'node'
+                elif keyword.startswith('*nset') and 'nset=loading' in keyword:
+                    section = 'loading_generate' if 'generate' in keyword else 'loading'
+                elif keyword.startswith('*elastic'):
+                    section = 'elastic'
+                elif keyword.startswith('*plastic'):
+                    section = 'plastic'
+                elif keyword.startswith('*boundary'):
+                    section = 'boundary'
+                else:
+                    section = None
+                continue
+
+            parts = [p.strip() for p in stripped.split(',') if p.strip()]
+            try:
+                if section == 'node' and len(parts) >= 4:
+                    x, y, z = float(parts[1]), float(parts[2]), float(parts[3])
+                    model['radius'] = max(model['radius'], math.hypot(x, y))
+                    model['z_min'] = z if model['z_min'] is None else min(model['z_min'], z)
+                    model['z_max'] = z if model['z_max'] is None else max(model['z_max'], z)
+                elif section == 'loading_generate' and len(parts) >= 2:
+                    step = int(parts[2]) if len(parts) > 2 else 1
+                    model['loading_nodes'].extend(range(int(parts[0]), int(parts[1]) + 1, step))
+                elif section == 'loading':
+                    model['loading_nodes'].extend(int(p) for p in parts)
+                elif section == 'elastic':
+                    model['elastic_modulus'] = float(parts[0])
+                    section = None
+                elif section == 'plastic' and len(parts) >= 2:
+                    model['plastic'].append((float(parts[0]), float(parts[1])))
+                elif section == 'boundary' and parts[0].lower() == 'loading' and len(parts) >= 4:
+                    model['loading_displacement'] = float(parts[3])
+            except ValueError:
+                continue
+
+    return model
+
+
+def flow_stress(model, strain):
+    """Uniaxial stress for a total strain using the elastic modulus and *Plastic table"""
+    strain = abs(strain)
+    elastic_stress = model['elastic_modulus'] * strain
+    plastic = model['plastic']
+    if not plastic or elastic_stress <= plastic[0][0]:
+        return elastic_stress
+
+    plastic_strain = strain - plastic[0][0] / model['elastic_modulus']
+    for (s0, e0), (s1, e1) in zip(plastic, plastic[1:]):
+        if plastic_strain <= e1:
+            return s0 + (s1 - s0) * (plastic_strain - e0) / (e1 - e0) if e1 > e0 else s1
+    return plastic[-1][0]
+
+
+def load_timeline(timeline_dir):
+    """Recorded .sta rows and the .msg text of the first job in the timeline directory"""
+    sta_files = sorted(glob.glob(os.path.join(timeline_dir, '*.sta')))
+    if not sta_files:
+        raise FileNotFoundError(f"No .sta timeline found in {timeline_dir}")
+
+    with open(sta_files[0], 'r') as f:
+        sta_lines = f.read().splitlines()
+
+    msg_path = os.path.splitext(sta_files[0])[0] + '.msg'
+    msg_lines = []
+    if os.path.exists(msg_path):
+        with open(msg_path, 'r') as f:
+            msg_lines = f.read().splitlines()
+
+    return sta_lines, msg_lines
+
+
+def write_dat_increment(dat, model, increment, step_time, total_time, time_increment):
+    """Append one increment summary with node output for the loading set"""
+    length = (model['z_max'] or 0.0) - (model['z_min'] or 0.0)
+    area = math.pi * model['radius'] ** 2
+    nodes = model['loading_nodes'] or [1]
+
+    u3 = model['loading_displacement'] * total_time
+    strain = u3 / length if length else 0.0
+    force = math.copysign(flow_stress(model, strain) * area, u3)
+    rf3 = force / len(nodes)
+
+    dat.write(f"\n\n                                       INCREMENT {increment:5d} SUMMARY\n\n\n")
+    dat.write(f" TIME INCREMENT COMPLETED  {time_increment:10.3E},  FRACTION OF STEP COMPLETED  {step_time:10.3E}\n")
+    dat.write(f" STEP TIME COMPLETED       {step_time:10.3E},  TOTAL TIME COMPLETED        {total_time:10.3E}\n\n\n")
+    dat.write("                                       N O D E   O U T P U T\n\n\n")
+    dat.write(" THE FOLLOWING TABLE IS PRINTED FOR NODES BELONGING TO NODE SET ASSEMBLY_LOADING\n\n")
+    dat.write("    NODE FOOT-  U3           RF3\n")
+    dat.write("         NOTE\n\n")
+    for node in nodes:
+        dat.write(f" {node:8d}      {u3:12.4E} {rf3:12.4E}\n")
+    dat.write("\n MAXIMUM       {0:12.4E} {1:12.4E}\n".format(u3, rf3))
+    dat.write(" AT NODE       {0:12d} {0:12d}\n\n".format(nodes[-1]))
+    dat.write(" MINIMUM       {0:12.4E} {1:12.4E}\n".format(u3, rf3))
+    dat.write(" AT NODE       {0:12d} {0:12d}\n\n".format(nodes[0]))
+    dat.write(f" TOTAL         {u3 * len(nodes):12.4E} {force:12.4E}\n")
+
+
+def emit(line, log):
+    print(line, flush=True)
+    log.write(line + '\n')
+    log.flush()
+
+
+def run(argv):
+    options = parse_args(argv)
+    job = options.get('job')
+    if not job:
+        print("Abaqus Error: job name is required (job=<name>)", file=sys.stderr)
+        return 1
+
+    inp_file = options.get('input') or f"{job}.inp"
+    if not inp_file.lower().endswith('.inp') and not os.path.exists(inp_file):
+        inp_file += '.inp'
+    if not os.path.exists(inp_file):
+        print(f"Abaqus Error: The input file {inp_file} could not be found", file=sys.stderr)
+        return 1
+
+    delay = float(os.getenv('FAKE_ABAQUS_INCREMENT_SECONDS', '0.2'))
+    fail = os.getenv('FAKE_ABAQUS_FAIL', '') == '1'
+    sta_lines, msg_lines = load_timeline(os.getenv('FAKE_ABAQUS_TIMELINE', DEFAULT_TIMELINE))
+    model = read_model(inp_file)
+
+    with open(f"{job}.log", 'w') as log:
+        emit(f"Abaqus JOB {job}", log)
+        emit("Abaqus Version 2023 (fake solver)", log)
+        emit(f"Abaqus License Manager checked out the license. cpus={options.get('cpus', 1)}", log)
+        emit("Begin Analysis Input File Processor", log)
+        emit(time.strftime('%a %b %d %H:%M:%S %Y'), log)
+        emit("Run pre", log)
+        emit("End Analysis Input File Processor", log)
+        emit("Begin Abaqus/Standard Analysis", log)
+        emit("Run standard", log)
+
+        # Replay the timeline: each .sta row becomes visible after `delay` seconds
+        with open(f"{job}.sta", 'w') as sta, open(f"{job}.msg", 'w') as msg, open(f"{job}.dat", 'w') as dat:
+            dat.write(f"\n   Abaqus 2023 (fake solver)          JOB {job}\n")
+            msg_index = 0
+            for line in sta_lines:
+                if 'COMPLETED' in line:
+                    break
+
+                match = STA_ROW_PATTERN.match(line)
+                if match:
+                    time.sleep(delay)
+                    # Advance the .msg up to the end of this attempt
+                    while msg_index < len(msg_lines):
+                        msg.write(msg_lines[msg_index] + '\n')
+                        msg_index += 1
+                        if 'TOTAL TIME COMPLETED' in msg_lines[msg_index - 1] or 'DIVERGING' in msg_lines[msg_index - 1]:
+                            break
+                    msg.flush()
+
+                    if not match.group(4):
+                        write_dat_increment(
+                            dat, model,
+                            increment=int(match.group(2)),
+                            step_time=float(match.group(6)),
+                            total_time=float(match.group(5)),
+                            time_increment=float(match.group(7))
+                        )
+                        dat.flush()
+
+                sta.write(line + '\n')
+                sta.flush()
+
+            if fail:
+                sta.write(" THE ANALYSIS HAS NOT BEEN COMPLETED\n")
+                msg.write(" ***ERROR: TOO MANY ATTEMPTS MADE FOR THIS INCREMENT\n")
+                dat.write("\n          THE ANALYSIS HAS NOT BEEN COMPLETED\n")
+            else:
+                sta.write(" THE ANALYSIS HAS COMPLETED SUCCESSFULLY\n")
+                for remaining in msg_lines[msg_index:]:
+                    msg.write(remaining + '\n')
+                dat.write("\n          THE ANALYSIS HAS BEEN COMPLETED\n")
+
+        with open(f"{job}.odb", 'wb') as odb:
+            odb.write(b'FAKE-ODB\x00' + job.encode('utf-8'))
+
+        if fail:
+            emit("Abaqus/Analysis exited with errors", log)
+            return 1
+
+        emit("End Abaqus/Standard Analysis", log)
+        emit(f"Abaqus JOB {job} COMPLETED", log)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(run(sys.argv[1:]))
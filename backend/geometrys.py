@@ -1,6 +1,8 @@
 '''
 '''
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
 
 # classes
 # -------
@@ -77,4 +79,194 @@ class BoundingBox():
 
     @property
     def height(self) -> float:
-        return abs(self.bounds[3]-self.bounds[1])
\ No newline at end of file
+        return abs(self.bounds[3]-self.bounds[1])
+
+
+class BoundingBoxArray():
+    '''
+    Columnar collection of bounding boxes. Bounds are stored in a single (n, 4) 
+    float64 array with the same [left, bottom, right, top] layout and Textract 
+    convention as BoundingBox (bottom=top+height), so a whole page of words can 
+    be scaled and queried with NumPy instead of one Python object per word.
+    '''
+    __slots__ = ('bounds', 'pages', 'block_indices')
+
+    # constructors
+    def __init__(
+        self,
+        bounds: np.ndarray,
+        pages: Optional[np.ndarray] = None,
+        block_indices: Optional[np.ndarray] = None,
+    ) -> None:
+        '''
+        constructor. pages holds the 1-based page of each box and block_indices 
+        the position of each box's block in the list it was built from.
+        '''
+        self.bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        n = len(self.bounds)
+        self.pages = np.ones(n, dtype=np.int32) if pages is None else np.asarray(pages, dtype=np.int32)
+        self.block_indices = np.arange(n, dtype=np.int64) if block_indices is None else np.asarray(block_indices, dtype=np.int64)
+
+    @classmethod
+    def from_textract_blocks(
+        cls,
+        textract_blocks: Sequence[Dict[str, Any]],
+        block_types: Iterable[str] = ('WORD',),
+    ) -> 'BoundingBoxArray':
+        '''
+        Construct a BoundingBoxArray from the blocks of an AWS Textract output json, 
+        keeping blocks whose BlockType is in block_types. Blocks without a Page 
+        (single-page synchronous responses) are put on page 1.
+        '''
+        block_types = set(block_types)
+        indices = []
+        pages = []
+        values = []
+        for i, block in enumerate(textract_blocks):
+            if block.get('BlockType') not in block_types:
+                continue
+            bbox = block['Geometry']['BoundingBox']
+            indices.append(i)
+            pages.append(block.get('Page', 1))
+            values.extend((bbox['Left'], bbox['Top'], bbox['Width'], bbox['Height']))
+
+        boxes = np.array(values, dtype=np.float64).reshape(-1, 4)
+        bounds = np.column_stack((
+            boxes[:, 0],
+            boxes[:, 1] + boxes[:, 3],
+            boxes[:, 0] + boxes[:, 2],
+            boxes[:, 1],
+        ))
+        pages = np.array(pages, dtype=np.int32)
+        return cls(bounds, pages, np.array(indices, dtype=np.int64))
+
+    @classmethod
+    def from_bounding_boxes(cls, bboxes: Iterable[BoundingBox]) -> 'BoundingBoxArray':
+        '''
+        Construct a BoundingBoxArray from BoundingBox objects
+        '''
+        return cls(np.array([bbox.bounds for bbox in bboxes], dtype=np.float64))
+
+    # class methods
+    def scale(self, x_scale: float, y_scale: Optional[float] = None) -> None:
+        '''
+        Scale all bounding boxes by a x and y factor. If y is not defined, the 
+        bboxes are scaled by x in all directions
+        '''
+        if not y_scale:
+            y_scale = x_scale
+        self.bounds[:, [0, 2]] *= x_scale
+        self.bounds[:, [1, 3]] *= y_scale
+
+    def copy(self) -> 'BoundingBoxArray':
+        return BoundingBoxArray(self.bounds.copy(), self.pages.copy(), self.block_indices.copy())
+
+    def on_page(self, page: int) -> 'BoundingBoxArray':
+        '''
+        Boxes of one (1-based) page
+        '''
+        return self[self.pages == page]
+
+    def intersection_area(self, bbox: Union[BoundingBox, Sequence[float]]) -> np.ndarray:
+        '''
+        Area of the overlap of every box with bbox (0 where they do not overlap)
+        '''
+        x_low, y_low, x_high, y_high = _bounds_of(bbox)
+        widths = np.minimum(self._x_high, x_high) - np.maximum(self._x_low, x_low)
+        heights = np.minimum(self._y_high, y_high) - np.maximum(self._y_low, y_low)
+        return np.clip(widths, 0, None) * np.clip(heights, 0, None)
+
+    def intersects(self, bbox: Union[BoundingBox, Sequence[float]]) -> np.ndarray:
+        '''
+        Boolean mask of the boxes that overlap bbox
+        '''
+        return self.intersection_area(bbox) > 0
+
+    def contained_in(self, bbox: Union[BoundingBox, Sequence[float]]) -> np.ndarray:
+        '''
+        Boolean mask of the boxes lying entirely inside bbox
+        '''
+        x_low, y_low, x_high, y_high = _bounds_of(bbox)
+        return (
+            (self._x_low >= x_low) & (self._x_high <= x_high)
+            & (self._y_low >= y_low) & (self._y_high <= y_high)
+        )
+
+    def contains_point(self, x: float, y: float) -> np.ndarray:
+        '''
+        Boolean mask of the boxes containing the point (x, y)
+        '''
+        return (
+            (self._x_low <= x) & (x <= self._x_high)
+            & (self._y_low <= y) & (y <= self._y_high)
+        )
+
+    # overload methods
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def __getitem__(self, key) -> Union[BoundingBox, 'BoundingBoxArray']:
+        '''
+        An integer returns a BoundingBox; a slice, index array or boolean mask 
+        returns a BoundingBoxArray
+        '''
+        if isinstance(key, (int, np.integer)):
+            return BoundingBox(*self.bounds[key].tolist())
+        return BoundingBoxArray(self.bounds[key], self.pages[key], self.block_indices[key])
+
+    def __iter__(self):
+        for bounds in self.bounds.tolist():
+            yield BoundingBox(*bounds)
+
+    # getters
+    @property
+    def left(self) -> np.ndarray:
+        return self.bounds[:, 0]
+
+    @property
+    def bottom(self) -> np.ndarray:
+        return self.bounds[:, 1]
+
+    @property
+    def right(self) -> np.ndarray:
+        return self.bounds[:, 2]
+
+    @property
+    def top(self) -> np.ndarray:
+        return self.bounds[:, 3]
+
+    # extents independent of the y-axis orientation
+    @property
+    def _x_low(self) -> np.ndarray:
+        return np.minimum(self.bounds[:, 0], self.bounds[:, 2])
+
+    @property
+    def _x_high(self) -> np.ndarray:
+        return np.maximum(self.bounds[:, 0], self.bounds[:, 2])
+
+    @property
+    def _y_low(self) -> np.ndarray:
+        return np.minimum(self.bounds[:, 1], self.bounds[:, 3])
+
+    @property
+    def _y_high(self) -> np.ndarray:
+        return np.maximum(self.bounds[:, 1], self.bounds[:, 3])
+
+    @property
+    def width(self) -> np.ndarray:
+        return np.abs(self.bounds[:, 0]-self.bounds[:, 2])
+
+    @property
+    def height(self) -> np.ndarray:
+        return np.abs(self.bounds[:, 3]-self.bounds[:, 1])
+
+
+# functions
+# ---------
+def _bounds_of(bbox: Union[BoundingBox, Sequence[float]]) -> List[float]:
+    '''
+    [x_low, y_low, x_high, y_high] of a BoundingBox or a plain 
+    [left, bottom, right, top] sequence, whatever the y-axis orientation
+    '''
+    left, bottom, right, top = [float(v) for v in (bbox.bounds if isinstance(bbox, BoundingBox) else bbox)]
+    return [min(left, right), min(bottom, top), max(left, right), max(bottom, top)]
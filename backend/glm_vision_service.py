@@ -79,19 +79,22 @@ class GLMVisionService:
         pdf_path: str,
         custom_prompt: Optional[str] = None,
         model: str = "glm-4.5v",
-        return_format: str = "csv"
+        return_format: str = "csv",
+        pages: Optional[List[int]] = None
     ) -> Dict:
-        """Extract tables directly from PDF file using ZhipuAI SDK by converting to images"""
+        """Extract tables directly from PDF file using ZhipuAI SDK by converting to images
+
+        Only the given 1-based pages are rendered and sent (default: all pages).
+        """
         if not self.api_key:
             raise ValueError("GLM API key not configured")
         
         try:
-            # Import pdf2image for converting PDF to images
-            from pdf2image import convert_from_path
+            from page_selection import render_pages
             
             # Step 1: Convert PDF pages to images
             logger.info(f"Converting PDF to images: {pdf_path}")
-            images = convert_from_path(pdf_path)
+            images = render_pages(pdf_path, pages)
             
             if not images:
                 return {
@@ -0,0 +1,30 @@
+"""
+Gunicorn settings for the Flask backend
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Every value can be overridden with the matching GUNICORN_* environment variable.
+Background OCR/Textract/ABAQUS jobs run in threads of the worker that accepted
+the upload, so workers use the threaded (gthread) class. Task status is shared
+between workers through TASK_STORE_DB (see task_store.py), and the ABAQUS
+cores/license tokens through SIMULATION_QUEUE_DB (see abaqus_scheduler.py).
+"""
+
+import gc
+import os
+import multiprocessing
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5001')
+workers = int(os.getenv('GUNICORN_WORKERS', '0')) or multiprocessing.cpu_count()
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+# Import app.py (and the preloaded engines) once in the master before forking
+preload_app = True
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the GC's generations, so collections
+    # in the workers don't touch (and copy) the shared pages
+    gc.freeze()
+    server.log.info(f"Preloaded app, {gc.get_freeze_count()} objects frozen before fork")
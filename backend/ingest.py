@@ -0,0 +1,237 @@
+"""
+Upload Ingestion
+Streams uploaded PDFs straight to their content-addressed location while the
+multipart body is parsed, instead of letting Werkzeug spool the request to a
+temp file that file.save() then copies again.
+
+While the bytes are written, the same pass computes the SHA-256 and size and
+checks the %PDF- header. A file without the header is no longer written to
+disk. After the part is complete, ingest_upload() opens the PDF with pikepdf.
+This reads the trailer, cross-reference table and page tree, not the page
+content. It rejects damaged or encrypted files and counts the pages before
+the upload takes a worker thread.
+
+Blobs are stored once per content hash under <upload_dir>/blobs/ab/abcd...pdf.
+Each task's input path (uploads/<timestamp>_<name>.pdf) is a hard link to
+its blob, so output naming is unchanged and re-uploads cost no disk space.
+"""
+
+import os
+import uuid
+import shutil
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+from flask import Request, current_app
+
+from engines import register as register_engine
+
+logger = logging.getLogger(__name__)
+
+pikepdf = register_engine('pikepdf')
+
+PDF_MAGIC = b'%PDF-'
+HEADER_WINDOW = 1024  # the PDF header may follow some leading junk
+COPY_CHUNK = 1024 * 1024
+
+
+class UploadRejected(ValueError):
+    """The upload is not a usable PDF; the message is safe to show to the user"""
+
+
+class IngestStream:
+    """
+    Writable/readable file for one multipart file part. Writes go to a .part
+    file next to the blob store and update the hash as they happen.
+    """
+
+    def __init__(self, incoming_dir: str, check_pdf: bool = True):
+        os.makedirs(incoming_dir, exist_ok=True)
+        self.part_path = os.path.join(incoming_dir, f"{uuid.uuid4().hex}.part")
+        self._file = open(self.part_path, 'w+b')
+        self._sha256 = hashlib.sha256()
+        self._head = b''
+        self.size = 0
+        self.check_pdf = check_pdf
+        self.is_pdf = None  # unknown until HEADER_WINDOW bytes (or the end) were seen
+        self.claimed = False
+
+    @classmethod
+    def from_file(cls, path: str) -> 'IngestStream':
+        """Hash and check a file already on disk; the file itself becomes the part"""
+        stream = cls.__new__(cls)
+        stream.part_path = path
+        stream._sha256 = hashlib.sha256()
+        stream._head = b''
+        stream.size = 0
+        stream.check_pdf = True
+        stream.is_pdf = None
+        stream.claimed = False
+        stream._file = open(path, 'rb')
+        while True:
+            chunk = stream._file.read(COPY_CHUNK)
+            if not chunk:
+                break
+            stream._update(chunk)
+        return stream
+
+    def _update(self, data: bytes):
+        self.size += len(data)
+        self._sha256.update(data)
+        if self.check_pdf and self.is_pdf is None:
+            self._head += data[:HEADER_WINDOW]
+            if PDF_MAGIC in self._head[:HEADER_WINDOW]:
+                self.is_pdf = True
+            elif len(self._head) >= HEADER_WINDOW:
+                self.is_pdf = False
+
+    def write(self, data: bytes) -> int:
+        self._update(data)
+        if self.is_pdf is False:
+            # Not a PDF: keep hashing/counting for the error message, skip the disk
+            return len(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    def finish(self) -> Dict[str, Any]:
+        """Flush the part file and return what was learned while streaming"""
+        if self.check_pdf and self.is_pdf is None:
+            self.is_pdf = PDF_MAGIC in self._head
+        self._file.flush()
+        return {'sha256': self.sha256, 'size': self.size, 'is_pdf': bool(self.is_pdf)}
+
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+    def close(self):
+        # Called by Werkzeug at the end of the request: drop parts nobody claimed
+        if not self.claimed:
+            self.discard()
+        elif not self._file.closed:
+            self._file.close()
+
+    def __getattr__(self, name):
+        # read/seek/tell/readline/... for FileStorage.save() and friends
+        if name == '_file':
+            raise AttributeError(name)
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+
+class IngestRequest(Request):
+    """Request class that streams file parts through IngestStream"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        upload_dir = current_app.config.get('UPLOAD_FOLDER', 'uploads')
+        check_pdf = bool(filename) and filename.lower().endswith('.pdf')
+        return IngestStream(os.path.join(upload_dir, 'blobs', '.incoming'), check_pdf=check_pdf)
+
+
+def blob_path(blob_dir: str, sha256: str) -> str:
+    return os.path.join(blob_dir, sha256[:2], f"{sha256}.pdf")
+
+
+def inspect_pdf(path: str) -> int:
+    """Page count of a PDF; raises UploadRejected for files pikepdf cannot use"""
+    try:
+        with pikepdf.open(path) as pdf:
+            pages = len(pdf.pages)
+    except pikepdf.PasswordError:
+        raise UploadRejected('The PDF is password-protected')
+    except pikepdf.PdfError as e:
+        raise UploadRejected(f'The PDF is damaged and cannot be read ({e})')
+    if pages == 0:
+        raise UploadRejected('The PDF has no pages')
+    return pages
+
+
+def _link(source: str, destination: str):
+    """Hard-link source to destination (replacing it), copying where links are unsupported"""
+    tmp = f"{destination}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copyfile(source, tmp)
+    os.replace(tmp, destination)
+
+
+def _spool(file_storage, incoming_dir: str) -> IngestStream:
+    # The stream came from somewhere else (e.g. a plain Flask request): copy it through once
+    stream = IngestStream(incoming_dir)
+    file_storage.stream.seek(0)
+    while True:
+        chunk = file_storage.stream.read(COPY_CHUNK)
+        if not chunk:
+            break
+        stream.write(chunk)
+    return stream
+
+
+def _store_blob(stream: IngestStream, blob_dir: str, expected_sha256: Optional[str] = None) -> Dict[str, Any]:
+    """Validate a finished part and move it into the blob store (or drop it as a duplicate)"""
+    info = stream.finish()
+    try:
+        if expected_sha256 and expected_sha256 != info['sha256']:
+            raise UploadRejected(f"Checksum mismatch: received data hashes to {info['sha256']}")
+        if info['size'] == 0:
+            raise UploadRejected('The uploaded file is empty')
+        if not info['is_pdf']:
+            raise UploadRejected('The uploaded file is not a PDF (missing %PDF- header)')
+
+        target = blob_path(blob_dir, info['sha256'])
+        duplicate = os.path.exists(target)
+        if duplicate:
+            stream.discard()
+            pages = inspect_pdf(target)
+        else:
+            stream.close()
+            pages = inspect_pdf(stream.part_path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(stream.part_path, target)
+    except UploadRejected:
+        stream.discard()
+        raise
+    return {'blob_path': target, 'sha256': info['sha256'], 'size': info['size'], 'pages': pages,
+            'duplicate': duplicate}
+
+
+def link_blob(blob: Dict[str, Any], input_path: str) -> Dict[str, Any]:
+    """Make a stored blob available at a task's input path"""
+    _link(blob['blob_path'], input_path)
+    logger.info(
+        f"Ingested {os.path.basename(input_path)}: {blob['size']} bytes, {blob['pages']} pages, "
+        f"sha256 {blob['sha256'][:12]}{' (duplicate)' if blob['duplicate'] else ''}"
+    )
+    return dict(blob, path=input_path)
+
+
+def ingest_file(path: str, upload_dir: str = 'uploads', expected_sha256: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Validate a PDF that is already on disk (e.g. an assembled chunked upload) and
+    move it into the blob store. The file is read once, to hash it.
+    Returns {blob_path, sha256, size, pages, duplicate}; raises UploadRejected.
+    """
+    stream = IngestStream.from_file(path)
+    stream.claimed = True
+    return _store_blob(stream, os.path.join(upload_dir, 'blobs'), expected_sha256)
+
+
+def ingest_upload(file_storage, input_path: str, upload_dir: str = 'uploads') -> Dict[str, Any]:
+    """
+    Validate an uploaded PDF and store it under its content hash, linked at input_path.
+    Returns {path, blob_path, sha256, size, pages, duplicate}; raises UploadRejected.
+    """
+    blob_dir = os.path.join(upload_dir, 'blobs')
+    stream = file_storage.stream
+    if not isinstance(stream, IngestStream):
+        stream = _spool(file_storage, os.path.join(blob_dir, '.incoming'))
+    stream.claimed = True
+    return link_blob(_store_blob(stream, blob_dir), input_path)
@@ -0,0 +1,137 @@
+"""
+OCR Profiles
+Named bundles of OCRmyPDF/Tesseract settings, so a job asks for a trade-off
+("fast", "balanced", "archival") instead of passing deskew/clean/optimize
+flags one by one:
+
+             OEM   PSM  DPI   deskew clean rotate optimize output
+  fast       LSTM  3    -     no     no    no     0        pdf    (no PDF/A pass)
+  balanced   -     -    -     yes    no    no     1        pdfa   (the previous defaults)
+  archival   LSTM  3    300   yes    yes   yes    2        pdfa-2
+
+DPI is ocrmypdf --oversample: pages scanned below it are upsampled before
+OCR. Explicit request options (deskew, clean, optimize, force_ocr) override
+the profile's values.
+
+The helper programs (unpaper, pngquant, Ghostscript, ...) are probed once per
+process, in warm_up() at startup or on first use, instead of once per job.
+Settings whose program is missing are dropped with a single warning.
+Measured trade-offs: python bench_ocr_profiles.py <pdfs>.
+"""
+
+import shutil
+import logging
+import threading
+import subprocess
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = 'balanced'
+
+PROFILES = {
+    'fast': {
+        'oem': 1, 'psm': 3, 'oversample': None,
+        'deskew': False, 'clean': False, 'rotate_pages': False,
+        'optimize': 0, 'output_type': 'pdf',
+    },
+    'balanced': {
+        'oem': None, 'psm': None, 'oversample': None,
+        'deskew': True, 'clean': False, 'rotate_pages': False,
+        'optimize': 1, 'output_type': None,
+    },
+    'archival': {
+        'oem': 1, 'psm': 3, 'oversample': 300,
+        'deskew': True, 'clean': True, 'rotate_pages': True,
+        'optimize': 2, 'output_type': 'pdfa-2',
+    },
+}
+
+TOOLS = ('ocrmypdf', 'tesseract', 'gs', 'unpaper', 'pngquant', 'jbig2')
+
+_tools = None
+_tools_lock = threading.Lock()
+_warned = set()
+
+
+class OCRProfileError(ValueError):
+    """Unknown profile or invalid option value; the message is safe to show to the user"""
+
+
+def _version(path: str) -> str:
+    try:
+        result = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return ''
+    output = (result.stdout or result.stderr).strip()
+    return output.splitlines()[0] if output else ''
+
+
+def probe_tools(refresh: bool = False) -> Dict[str, Optional[str]]:
+    """Version line (or None if missing) of each OCR helper program, probed once per process"""
+    global _tools
+    with _tools_lock:
+        if _tools is None or refresh:
+            tools = {}
+            for name in TOOLS:
+                path = shutil.which(name)
+                tools[name] = (_version(path) or 'unknown version') if path else None
+            _tools = tools
+            found = ', '.join(f"{name}={version or 'missing'}" for name, version in tools.items())
+            logger.info(f"OCR tools: {found}")
+        return _tools
+
+
+def _warn_once(key: str, message: str):
+    if key not in _warned:
+        _warned.add(key)
+        logger.warning(message)
+
+
+def profile_options(options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Full OCR options: the profile named by options['profile'] (default balanced)
+    with the options' own values on top, minus settings whose tool is missing.
+    Raises OCRProfileError.
+    """
+    options = dict(options or {})
+    name = options.get('profile') or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise OCRProfileError(f"Unknown OCR profile '{name}'; use one of {', '.join(PROFILES)}")
+    resolved = dict(PROFILES[name], profile=name)
+    resolved.update({key: value for key, value in options.items() if value is not None})
+    try:
+        resolved['optimize'] = int(resolved['optimize'])
+    except ValueError:
+        resolved['optimize'] = -1
+    if not 0 <= resolved['optimize'] <= 3:
+        raise OCRProfileError(f"optimize must be 0-3, not '{options.get('optimize')}'")
+
+    tools = probe_tools()
+    if resolved['clean'] and not tools['unpaper']:
+        _warn_once('unpaper', "unpaper not available, skipping clean option")
+        resolved['clean'] = False
+    if resolved['optimize'] >= 2 and not tools['pngquant']:
+        _warn_once('pngquant', "pngquant not available, optimizing at level 1")
+        resolved['optimize'] = 1
+    if resolved['output_type'] != 'pdf' and not tools['gs']:
+        _warn_once('gs', "Ghostscript not available, writing plain PDF instead of PDF/A")
+        resolved['output_type'] = 'pdf'
+    return resolved
+
+
+def profile_args(options: Dict[str, Any]) -> List[str]:
+    """ocrmypdf CLI arguments of resolved options (see profile_options)"""
+    args = ['--language', options.get('language', 'eng'), '--optimize', str(options['optimize'])]
+    if options['oem'] is not None:
+        args += ['--tesseract-oem', str(options['oem'])]
+    if options['psm'] is not None:
+        args += ['--tesseract-pagesegmode', str(options['psm'])]
+    if options['oversample']:
+        args += ['--oversample', str(options['oversample'])]
+    if options['output_type']:
+        args += ['--output-type', options['output_type']]
+    for key, flag in (('deskew', '--deskew'), ('clean', '--clean'), ('rotate_pages', '--rotate-pages')):
+        if options[key]:
+            args.append(flag)
+    return args
@@ -0,0 +1,114 @@
+"""
+Page Classifier
+Decides per page how much OCR a page needs, from what PyMuPDF can read
+without rendering it:
+
+- text coverage:  area of the visible text spans / page area
+- image coverage: area of the placed images / page area (overlaps counted twice, capped at 1)
+- fonts:          whether the page uses fonts at all, and whether its text is
+                  invisible (render mode 3 or opacity 0, i.e. an existing OCR layer)
+- unreadable:     share of characters without a Unicode mapping (U+FFFD)
+
+Actions, cheapest first:
+
+- skip:  digital page, or one that already has an OCR layer; copied as it is
+- redo:  digital text plus a large image area (a scan pasted into a report):
+         ocrmypdf --redo-ocr OCRs the image areas and keeps the visible text
+- ocr:   no text at all (a scan); plain OCR
+- force: text whose characters cannot be mapped to Unicode; ocrmypdf --force-ocr
+         rasterizes the page so it becomes searchable at all
+
+Mixed documents then only spend OCR time on the pages that need it.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+import fitz
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ('skip', 'redo', 'ocr', 'force')
+
+INVISIBLE_TEXT = 3  # texttrace span type of render mode 3
+# A page with visible text is "mixed" when images cover this much of it
+# while its text covers less than MIXED_MAX_TEXT_COVERAGE
+MIXED_MIN_IMAGE_COVERAGE = 0.3
+MIXED_MAX_TEXT_COVERAGE = 0.05
+# More unmapped characters than this and the text layer is useless
+MAX_UNREADABLE = 0.3
+
+
+def _area(rect) -> float:
+    x0, y0, x1, y1 = rect
+    return max(0.0, x1 - x0) * max(0.0, y1 - y0)
+
+
+def _clipped_area(bbox, page_rect: fitz.Rect) -> float:
+    return _area(fitz.Rect(bbox) & page_rect)
+
+
+def page_features(page: fitz.Page) -> Dict[str, Any]:
+    """Text/image coverage and font facts of one page (no rendering)"""
+    page_rect = page.rect
+    page_area = _area(page_rect) or 1.0
+
+    visible_chars = invisible_chars = unreadable = 0
+    text_area = 0.0
+    for span in page.get_texttrace():
+        chars = span['chars']
+        unreadable += sum(1 for c in chars if c[0] == 0xFFFD)
+        if span['type'] == INVISIBLE_TEXT or span['opacity'] == 0:
+            invisible_chars += len(chars)
+        else:
+            visible_chars += len(chars)
+            text_area += _clipped_area(span['bbox'], page_rect)
+
+    image_area = sum(_clipped_area(image['bbox'], page_rect) for image in page.get_image_info())
+    chars = visible_chars + invisible_chars
+    return {
+        'text_coverage': round(min(1.0, text_area / page_area), 4),
+        'image_coverage': round(min(1.0, image_area / page_area), 4),
+        'fonts': len(page.get_fonts()),
+        'visible_chars': visible_chars,
+        'invisible_chars': invisible_chars,
+        'unreadable': round(unreadable / chars, 4) if chars else 0.0,
+    }
+
+
+def classify_features(features: Dict[str, Any], force_ocr: bool = False) -> str:
+    """OCR action for a page's features (see ACTIONS)"""
+    if force_ocr:
+        return 'force'
+    if not features['fonts'] or not (features['visible_chars'] or features['invisible_chars']):
+        return 'ocr'
+    if features['unreadable'] > MAX_UNREADABLE:
+        return 'force'
+    if not features['visible_chars']:
+        # Only an invisible text layer: OCRed before
+        return 'skip'
+    if (features['image_coverage'] >= MIXED_MIN_IMAGE_COVERAGE
+            and features['text_coverage'] < MIXED_MAX_TEXT_COVERAGE):
+        return 'redo'
+    return 'skip'
+
+
+def classify_pages(pdf_path: str, pages: Optional[Iterable[int]] = None,
+                   force_ocr: bool = False) -> Dict[int, Dict[str, Any]]:
+    """Features and action of each selected 1-based page (default: all)"""
+    classes = {}
+    with fitz.open(pdf_path) as doc:
+        for number in (sorted(set(pages)) if pages else range(1, doc.page_count + 1)):
+            features = page_features(doc[number - 1])
+            features['action'] = classify_features(features, force_ocr)
+            classes[number] = features
+    counts = action_counts(classes)
+    logger.info(f"Page classes of {pdf_path}: {counts}")
+    return classes
+
+
+def action_counts(classes: Dict[int, Dict[str, Any]]) -> Dict[str, int]:
+    counts = {action: 0 for action in ACTIONS}
+    for features in classes.values():
+        counts[features['action']] += 1
+    return counts
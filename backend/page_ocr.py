@@ -0,0 +1,228 @@
+"""
+Incremental Page OCR
+Runs OCRmyPDF on each page separately, so a page's searchable PDF and text
+are on disk when that page finishes instead of when the whole document does:
+
+    outputs/pages_<task_id>/
+        source_0003.pdf   single-page input cut from the upload
+        page_0003.pdf     searchable page (renamed into place once complete)
+        page_0003.txt     its text layer (OCRmyPDF sidecar)
+
+Pages run in parallel, one `ocrmypdf --jobs 1` process each, the same CLI
+that convert_pdf_to_searchable_ocrmypdf runs. Each page can get its own
+action from page_classifier (skip, redo, ocr or force); skipped pages are
+copied through without starting ocrmypdf. With a TesseractPool (engine
+'tesseract', see tesseract_pool.py) pages are recognized by warm tesserocr
+workers instead, and the text layer is written by searchable_pdf. merge_pages() assembles the
+finished pages at any time: partial=True gives only the finished pages (for
+an early download), otherwise the whole document with every page that was
+not OCRed copied from the source.
+"""
+
+import os
+import re
+import uuid
+import shutil
+import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import fitz
+
+from page_selection import page_ranges
+from ocr_profiles import profile_options, profile_args
+from searchable_pdf import group_word_blocks, build_searchable_pages
+from tesseract_pool import DEFAULT_DPI, pixmap_image, word_blocks
+
+logger = logging.getLogger(__name__)
+
+OCRMYPDF_CMD = os.getenv('OCRMYPDF_CMD', 'ocrmypdf')
+PRIOR_OCR_FOUND = 6  # ocrmypdf exit code: the page already has text
+PAGE_FILE = re.compile(r'^page_(\d+)\.pdf$')
+ACTION_ARGS = {'ocr': [], 'redo': ['--redo-ocr'], 'force': ['--force-ocr']}
+# ocrmypdf refuses these together with --redo-ocr
+REDO_INCOMPATIBLE = {'--deskew', '--clean-final', '--remove-background'}
+
+
+class PageOCRError(Exception):
+    def __init__(self, page: int, message: str):
+        super().__init__(f'OCR failed on page {page}: {message}')
+        self.page = page
+
+
+def page_files(pages_dir: str, page: int) -> Dict[str, str]:
+    name = f'{page:04d}'
+    return {
+        'source': os.path.join(pages_dir, f'source_{name}.pdf'),
+        'pdf': os.path.join(pages_dir, f'page_{name}.pdf'),
+        'text': os.path.join(pages_dir, f'page_{name}.txt'),
+    }
+
+
+def ocrmypdf_args(options: Dict[str, Any]) -> List[str]:
+    """CLI arguments for OCR options (a profile plus overrides, see ocr_profiles), minus the action"""
+    return ['--quiet', '--jobs', '1', *profile_args(profile_options(options))]
+
+
+def split_pages(input_path: str, pages_dir: str, pages: Optional[Iterable[int]] = None) -> List[int]:
+    """Write each selected page (default: all) to its own PDF; returns the page numbers"""
+    os.makedirs(pages_dir, exist_ok=True)
+    with fitz.open(input_path) as doc:
+        selected = sorted(set(pages)) if pages else list(range(1, doc.page_count + 1))
+        for page in selected:
+            source = page_files(pages_dir, page)['source']
+            if os.path.exists(source):
+                continue
+            single = fitz.open()
+            single.insert_pdf(doc, from_page=page - 1, to_page=page - 1)
+            single.save(f'{source}.tmp')
+            single.close()
+            os.replace(f'{source}.tmp', source)
+    return selected
+
+
+def finished_pages(pages_dir: str) -> List[int]:
+    """Page numbers whose searchable PDF is complete"""
+    if not os.path.isdir(pages_dir):
+        return []
+    return sorted(int(m.group(1)) for m in map(PAGE_FILE.match, os.listdir(pages_dir)) if m)
+
+
+def _keep_page(files: Dict[str, str], pdf_part: str, text_part: str):
+    # The page stays as it is; its text comes from the existing text layer
+    with fitz.open(files['source']) as doc, open(text_part, 'w', encoding='utf-8') as f:
+        f.write(doc[0].get_text() + '\f')
+    shutil.copyfile(files['source'], pdf_part)
+
+
+def _tesseract_page(files: Dict[str, str], pdf_part: str, text_part: str, tesseract, dpi: int,
+                    psm: Optional[int] = None):
+    with fitz.open(files['source']) as doc:
+        pixmap = doc[0].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        result = tesseract.recognize(pixmap_image(pixmap), dpi, psm)
+        words = group_word_blocks(word_blocks(result))
+        out, _ = build_searchable_pages(doc, [0], words, dpi=dpi)
+    out.save(pdf_part, garbage=3, deflate=True)
+    out.close()
+    with open(text_part, 'w', encoding='utf-8') as f:
+        f.write(result['text'])
+
+
+def ocr_page(pages_dir: str, page: int, args: List[str], timeout: Optional[float] = None, action: str = 'ocr',
+             tesseract=None, dpi: int = DEFAULT_DPI, psm: Optional[int] = None):
+    """OCR one split page; its PDF appears under the final name only when complete"""
+    files = page_files(pages_dir, page)
+    pdf_part = files['pdf'][:-4] + '.part.pdf'
+    text_part = files['text'][:-4] + '.part.txt'
+    if action == 'skip':
+        _keep_page(files, pdf_part, text_part)
+    elif tesseract is not None and action != 'redo':
+        # Mixed pages stay on ocrmypdf --redo-ocr: a full-page text layer over
+        # their visible text would make every word show up twice in searches
+        _tesseract_page(files, pdf_part, text_part, tesseract, dpi, psm)
+    else:
+        if action == 'redo':
+            args = [arg for arg in args if arg not in REDO_INCOMPATIBLE]
+        result = subprocess.run(
+            [OCRMYPDF_CMD, *args, *ACTION_ARGS[action], '--sidecar', text_part, files['source'], pdf_part],
+            capture_output=True, text=True, timeout=timeout
+        )
+        if result.returncode == PRIOR_OCR_FOUND:
+            # Has a text layer after all (plain OCR does not replace text)
+            _keep_page(files, pdf_part, text_part)
+        elif result.returncode != 0:
+            raise PageOCRError(page, (result.stderr or result.stdout or 'Unknown error').strip())
+    os.replace(text_part, files['text'])
+    os.replace(pdf_part, files['pdf'])
+
+
+def ocr_pages(pages_dir: str, pages: List[int], options: Dict[str, Any], workers: Optional[int] = None,
+              timeout: Optional[float] = None, on_page: Optional[Callable[[int], None]] = None,
+              actions: Optional[Dict[int, str]] = None, tesseract=None) -> List[int]:
+    """
+    OCR split pages in parallel, calling on_page(page) (in this thread) as each one finishes
+
+    actions maps pages to their action (see page_classifier); without one a
+    page gets 'force' if options['force_ocr'] is set, else 'ocr'. With a
+    TesseractPool, 'ocr' and 'force' pages go to its warm workers instead of
+    ocrmypdf; 'redo' pages still use ocrmypdf. Pages finished by an earlier run are not OCRed again. The
+    first failing page raises an exception; pages not yet started are cancelled.
+    """
+    args = ocrmypdf_args(options)
+    resolved = profile_options(options)
+    dpi = resolved['oversample'] or DEFAULT_DPI
+    default_action = 'force' if options.get('force_ocr', False) else 'ocr'
+    actions = actions or {}
+    done = set(finished_pages(pages_dir))
+    for page in pages:
+        if page in done and on_page:
+            on_page(page)
+
+    pool = ThreadPoolExecutor(max_workers=(tesseract.size if tesseract else workers) or os.cpu_count() or 1)
+    try:
+        futures = {
+            pool.submit(ocr_page, pages_dir, page, args, timeout, actions.get(page, default_action),
+                        tesseract, dpi, resolved['psm']): page
+            for page in pages if page not in done
+        }
+        for future in as_completed(futures):
+            future.result()
+            if on_page:
+                on_page(futures[future])
+    except BaseException:
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    pool.shutdown()
+    return finished_pages(pages_dir)
+
+
+def merge_pages(input_path: str, pages_dir: str, output_path: str, partial: bool = False) -> List[int]:
+    """
+    Assemble the searchable pages finished so far into output_path
+
+    partial=True writes only the finished pages; otherwise the output has
+    every page of input_path, OCRed where available. Returns the OCRed pages
+    included.
+    """
+    done = finished_pages(pages_dir)
+    merged = fitz.open()
+    if partial:
+        for page in done:
+            with fitz.open(page_files(pages_dir, page)['pdf']) as doc:
+                merged.insert_pdf(doc)
+    else:
+        with fitz.open(input_path) as source:
+            ocred = set(done)
+            untouched = [n for n in range(1, source.page_count + 1) if n not in ocred]
+            runs = {first: last for first, last in page_ranges(untouched)}
+            page = 1
+            while page <= source.page_count:
+                if page in runs:
+                    merged.insert_pdf(source, from_page=page - 1, to_page=runs[page] - 1)
+                    page = runs[page] + 1
+                else:
+                    with fitz.open(page_files(pages_dir, page)['pdf']) as doc:
+                        merged.insert_pdf(doc)
+                    page += 1
+    # Every OCRed page carries its own copy of the text-layer font: deduplicate
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp = f'{output_path}.{uuid.uuid4().hex}.tmp'
+    merged.save(tmp, garbage=3, deflate=True)
+    merged.close()
+    os.replace(tmp, output_path)
+    return done
+
+
+def merge_text(pages_dir: str, output_path: str) -> List[int]:
+    """Concatenate the text layers of the finished pages (form feed between pages)"""
+    done = finished_pages(pages_dir)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp = f'{output_path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as out:
+        for page in done:
+            with open(page_files(pages_dir, page)['text'], encoding='utf-8') as f:
+                text = f.read()
+            out.write(text if text.endswith('\f') else text + '\f')
+    os.replace(tmp, output_path)
+    return done
@@ -0,0 +1,100 @@
+"""
+Page Selection
+Parses the 'pages' form field of the upload routes ("3-5", "1,4,10-", "all")
+and hands the selection to each engine in the form it understands. Each engine
+then skips the pages that were not selected, instead of every page being
+decoded and discarded later:
+
+- ocrmypdf:  pages="3-5"   (unselected pages are copied through without OCR)
+- camelot:   pages="3,4,5"
+- pdf2image: first_page/last_page per contiguous run (pdftoppm renders only those)
+
+Page numbers are 1-based, as users see them. None means all pages.
+"""
+
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PageSelectionError(ValueError):
+    """The 'pages' value is malformed or outside the document; safe to show to the user"""
+
+
+def parse_pages(spec: Optional[str], page_count: Optional[int] = None) -> Optional[List[int]]:
+    """
+    Sorted, unique 1-based page numbers of a selection such as "3-5,8,10-"
+
+    Returns None for an empty value or "all". An open range ("10-") runs to
+    page_count; without a page count it is an error. When page_count is
+    given, pages past the end of the document are an error too.
+    """
+    spec = (spec or '').strip().lower()
+    if spec in ('', 'all'):
+        return None
+
+    pages = set()
+    for part in spec.replace(' ', '').split(','):
+        if not part:
+            continue
+        first, dash, last = part.partition('-')
+        try:
+            first = int(first) if first else 1
+            if dash and not last:
+                if page_count is None:
+                    raise PageSelectionError(f'Open page range "{part}" needs a page count')
+                last = page_count
+            else:
+                last = int(last) if dash else first
+        except ValueError:
+            raise PageSelectionError(f'Invalid page selection "{part}"; use e.g. 3-5,8')
+        if first < 1 or last < first:
+            raise PageSelectionError(f'Invalid page range "{part}"')
+        if page_count is not None and last > page_count:
+            raise PageSelectionError(f'Page {last} is outside the document ({page_count} pages)')
+        pages.update(range(first, last + 1))
+
+    if not pages:
+        raise PageSelectionError('No pages selected')
+    if page_count is not None and len(pages) == page_count:
+        return None
+    return sorted(pages)
+
+
+def page_ranges(pages: Iterable[int]) -> List[Tuple[int, int]]:
+    """Contiguous (first, last) runs of a page selection"""
+    ranges = []
+    for page in sorted(set(pages)):
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], page)
+        else:
+            ranges.append((page, page))
+    return ranges
+
+
+def format_pages(pages: Optional[Iterable[int]]) -> str:
+    """Compact form of a selection ("3-5,8"), or "all" for None"""
+    if pages is None:
+        return 'all'
+    return ','.join(str(first) if first == last else f'{first}-{last}' for first, last in page_ranges(pages))
+
+
+def camelot_pages(pages: Optional[Iterable[int]]) -> str:
+    """Camelot's pages argument: "all" or a comma-separated list"""
+    if pages is None:
+        return 'all'
+    return ','.join(str(page) for page in sorted(set(pages)))
+
+
+def render_pages(pdf_path: str, pages: Optional[Iterable[int]] = None, **kwargs) -> list:
+    """PIL images of the selected pages (in order); other pages are never rasterized"""
+    from pdf2image import convert_from_path
+
+    if pages is None:
+        return convert_from_path(pdf_path, **kwargs)
+    images = []
+    for first, last in page_ranges(pages):
+        images.extend(convert_from_path(pdf_path, first_page=first, last_page=last, **kwargs))
+    logger.info(f"Rendered {len(images)} selected page(s) of {pdf_path}")
+    return images
@@ -1,4 +1,5 @@
 import csv
+import sys
 
 def parse_tsv(filepath):
     data = []
@@ -10,7 +11,16 @@ def parse_tsv(filepath):
     return data
 
 # Example usage:
-# Assuming 'example.tsv' exists with tab-separated data
-parsed_data = parse_tsv('manuf.tsv')
-for record in parsed_data:
-    print(record)
\ No newline at end of file
+#   python parsertsv.py manuf.tsv                 - print the rows
+#   python parsertsv.py --import manuf.tsv ...    - import certificates into the specimen catalog
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == '--import':
+        from specimen_catalog import SpecimenCatalog
+        catalog = SpecimenCatalog()
+        for path in args[1:]:
+            print(f"{path}: {catalog.import_file(path)} rows")
+    else:
+        parsed_data = parse_tsv(args[0] if args else 'manuf.tsv')
+        for record in parsed_data:
+            print(record)
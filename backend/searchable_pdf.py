@@ -0,0 +1,321 @@
+"""
+Searchable PDF Builder
+Adds an invisible text layer built from AWS Textract WORD blocks to a scanned
+PDF with PyMuPDF.
+
+- WORD blocks are grouped by their `Page` (1-based; single-page responses
+  from the synchronous API have no `Page` and go to the first page).
+- Scanned pages (images only, no text) are copied as they are, so the original
+  image stream is kept instead of being rasterized and re-encoded. Other pages
+  are rendered at `dpi` so an existing text layer is not duplicated.
+- Font sizes are computed for all words of a page at once from a glyph-width
+  table, and each page's text is written with a single TextWriter.
+- Page ranges are processed in parallel worker processes, each opening the
+  source PDF by path and returning the finished pages as PDF bytes. All calls
+  in a process share one pool, started with 'spawn' (forking from request
+  threads could copy locks held by other threads).
+"""
+
+import os
+import math
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import fitz
+import numpy as np
+
+from geometrys import BoundingBoxArray
+from textract_stream import BlockSource, iter_pages
+
+logger = logging.getLogger(__name__)
+
+FONT_NAME = 'helv'
+BBOX_COLOR = (220 / 255, 20 / 255, 60 / 255)  # red-ish color
+# Below this many pages the process pool costs more than it saves
+MIN_PAGES_FOR_WORKERS = 4
+
+_font = None
+_advances = None
+
+# Shared worker pool (created on first use; a forked child creates its own)
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _glyph_advances() -> Tuple[fitz.Font, np.ndarray]:
+    """Helvetica advance widths (at fontsize 1) for code points 0-255"""
+    global _font, _advances
+    if _advances is None:
+        _font = fitz.Font(FONT_NAME)
+        _advances = np.array([_font.glyph_advance(c) for c in range(256)], dtype=np.float64)
+        # Characters the table does not cover are measured as an average glyph
+        _advances[_advances == 0] = _advances[32:127].mean()
+    return _font, _advances
+
+
+def text_lengths(texts: List[str]) -> np.ndarray:
+    """Width of each text at fontsize 1, i.e. fitz.get_text_length(text, 'helv', 1)"""
+    _, advances = _glyph_advances()
+    if not texts:
+        return np.zeros(0, dtype=np.float64)
+
+    codes = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32)
+    widths = advances[np.minimum(codes, 255)]
+    widths[codes > 255] = advances[32:127].mean()
+
+    counts = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    lengths = np.zeros(len(texts), dtype=np.float64)
+    nonempty = counts > 0
+    if nonempty.any():
+        lengths[nonempty] = np.add.reduceat(widths, starts[nonempty])
+    return lengths
+
+
+def group_word_blocks(textract_blocks: BlockSource) -> Dict[int, Dict[str, Any]]:
+    """
+    Collect WORD blocks per page (0-based page index)
+
+    `textract_blocks` may be a list of blocks or any source accepted by
+    textract_stream.iter_blocks; blocks are read page by page and only the
+    text and geometry of the words are kept.
+
+    Returns {page_index: {'texts': [...], 'boxes': BoundingBoxArray}} with
+    boxes in normalized Textract coordinates
+    """
+    groups: Dict[int, Dict[str, Any]] = {}
+    for page, blocks in iter_pages(textract_blocks, block_types=('WORD',)):
+        words = [block for block in blocks if block.get('Text')]
+        if not words:
+            continue
+        texts = [block['Text'] for block in words]
+        boxes = BoundingBoxArray.from_textract_blocks(words)
+
+        if page - 1 in groups:
+            # Page split across non-contiguous runs of blocks
+            previous = groups[page - 1]
+            texts = previous['texts'] + texts
+            boxes = BoundingBoxArray(
+                np.vstack((previous['boxes'].bounds, boxes.bounds)),
+                np.concatenate((previous['boxes'].pages, boxes.pages))
+            )
+        groups[page - 1] = {'texts': texts, 'boxes': boxes}
+    return groups
+
+
+def detect_text_blocks(pdf_path: str, textract_client=None) -> List[Dict[str, Any]]:
+    """
+    Run Textract DetectDocumentText on every page of a PDF
+
+    The synchronous API only accepts single-page documents, so each page is
+    copied into its own one-page PDF (no rasterization) and its blocks are
+    tagged with the 1-based `Page` number.
+    """
+    if textract_client is None:
+        import boto3
+        textract_client = boto3.client('textract')
+
+    blocks: List[Dict[str, Any]] = []
+    with fitz.open(pdf_path) as src_doc:
+        for page_number in range(src_doc.page_count):
+            single_page = fitz.open()
+            single_page.insert_pdf(src_doc, from_page=page_number, to_page=page_number)
+            response = textract_client.detect_document_text(Document={'Bytes': single_page.tobytes()})
+            single_page.close()
+
+            for block in response.get('Blocks', []):
+                block['Page'] = page_number + 1
+                blocks.append(block)
+    return blocks
+
+
+def is_scanned_page(page: fitz.Page) -> bool:
+    """True if the page holds images but no extractable text"""
+    return bool(page.get_images(full=False)) and not page.get_text('text').strip()
+
+
+def _add_text_layer(
+    page: fitz.Page,
+    words: Dict[str, Any],
+    add_word_bbox: bool = False,
+    show_selectable_char: bool = False
+) -> int:
+    """Write one page's words as (invisible) text; returns the number of words written"""
+    font, _ = _glyph_advances()
+    rect = page.rect
+    texts = words['texts']
+    boxes = words['boxes'].copy()
+    boxes.scale(rect.width, rect.height)
+
+    left = boxes.left
+    top = boxes.top
+    width = boxes.width
+    height = boxes.height
+
+    # Stretch each word to its box width, as insert_textbox did with
+    # fontsize = width / get_text_length(text, fontsize=1)
+    lengths = text_lengths(texts)
+    fontsizes = np.where(lengths > 0, width / np.where(lengths > 0, lengths, 1.0), 0.0)
+    fontsizes = np.minimum(fontsizes, height * 2.0)
+    baselines = top + height + font.descender * fontsizes
+
+    writer = fitz.TextWriter(rect)
+    written = 0
+    for text, x, y, size in zip(texts, left.tolist(), baselines.tolist(), fontsizes.tolist()):
+        if size < 0.5:
+            continue
+        writer.append((x, y), text, font=font, fontsize=size)
+        written += 1
+
+    if written:
+        writer.write_text(
+            page,
+            color=BBOX_COLOR,
+            render_mode=0 if show_selectable_char else 3  # 3 = invisible
+        )
+
+    if add_word_bbox:
+        shape = page.new_shape()
+        for x0, y0, w, h in zip(left.tolist(), top.tolist(), width.tolist(), height.tolist()):
+            shape.draw_rect(fitz.Rect(x0, y0, x0 + w, y0 + h))
+        shape.finish(color=BBOX_COLOR, fill=None, width=0.7)
+        shape.commit(overlay=True)
+
+    return written
+
+
+def build_searchable_pages(
+    src_doc: fitz.Document,
+    page_numbers: List[int],
+    words_by_page: Dict[int, Dict[str, Any]],
+    dpi: int = 200,
+    reuse_images: bool = True,
+    add_word_bbox: bool = False,
+    show_selectable_char: bool = False
+) -> Tuple[fitz.Document, Dict[str, int]]:
+    """Build a new document holding `page_numbers` of src_doc with text layers"""
+    out_doc = fitz.open()
+    stats = {'pages': 0, 'reused_pages': 0, 'rasterized_pages': 0, 'words': 0}
+
+    for page_number in page_numbers:
+        src_page = src_doc[page_number]
+        if reuse_images and is_scanned_page(src_page):
+            out_doc.insert_pdf(src_doc, from_page=page_number, to_page=page_number)
+            page = out_doc[-1]
+            stats['reused_pages'] += 1
+        else:
+            pixmap = src_page.get_pixmap(dpi=dpi, colorspace='RGB')
+            page = out_doc.new_page(width=src_page.rect.width, height=src_page.rect.height)
+            page.insert_image(page.rect, pixmap=pixmap)
+            stats['rasterized_pages'] += 1
+
+        words = words_by_page.get(page_number)
+        if words:
+            stats['words'] += _add_text_layer(page, words, add_word_bbox, show_selectable_char)
+        stats['pages'] += 1
+
+    return out_doc, stats
+
+
+def _build_page_range(args) -> Tuple[bytes, Dict[str, int]]:
+    """Worker entry point: build a page range from the PDF at `pdf_path`, return PDF bytes"""
+    pdf_path, page_numbers, words_by_page, options = args
+    with fitz.open(pdf_path) as src_doc:
+        out_doc, stats = build_searchable_pages(src_doc, page_numbers, words_by_page, **options)
+    data = out_doc.tobytes()
+    out_doc.close()
+    return data, stats
+
+
+def _shared_pool(workers: int) -> ProcessPoolExecutor:
+    """The process-wide pool; its size is fixed by the first call that needs it"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def make_searchable_pdf(
+    input_pdf: str,
+    textract_blocks: BlockSource,
+    output_pdf: str,
+    dpi: int = 200,
+    reuse_images: bool = True,
+    add_word_bbox: bool = False,
+    show_selectable_char: bool = False,
+    max_workers: Optional[int] = None,
+    pages_per_worker: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Create a searchable copy of `input_pdf` from Textract blocks
+
+    Args:
+        input_pdf: Scanned source PDF
+        textract_blocks: Textract `Blocks` (all pages), or a response file / list
+            of files to stream them from (see textract_stream.iter_blocks)
+        output_pdf: Path of the searchable PDF to write
+        dpi: Resolution for pages that have to be rasterized
+        reuse_images: Copy image-only pages instead of rasterizing them
+        add_word_bbox: Draw a rectangle around each word
+        show_selectable_char: Make the text layer visible (for debugging)
+        max_workers: Size of the shared worker pool (default: os.cpu_count();
+            1 = in-process). Concurrent calls split their pages over the same pool.
+        pages_per_worker: Pages per worker task (default: split evenly)
+
+    Returns:
+        Dict with page, word, reused/rasterized page counts
+    """
+    words_by_page = group_word_blocks(textract_blocks)
+    with fitz.open(input_pdf) as src_doc:
+        page_count = src_doc.page_count
+
+    ignored = [page + 1 for page in words_by_page if page >= page_count]
+    if ignored:
+        logger.warning(f"Textract blocks reference pages {ignored} beyond the {page_count}-page PDF")
+
+    options = {
+        'dpi': dpi,
+        'reuse_images': reuse_images,
+        'add_word_bbox': add_word_bbox,
+        'show_selectable_char': show_selectable_char
+    }
+    pool_size = max(1, max_workers or os.cpu_count() or 1)
+    workers = min(pool_size, page_count)
+    if page_count < MIN_PAGES_FOR_WORKERS:
+        workers = 1
+
+    chunk = pages_per_worker or math.ceil(page_count / workers)
+    ranges = [list(range(start, min(start + chunk, page_count))) for start in range(0, page_count, chunk)]
+    tasks = [
+        (input_pdf, pages, {p: words_by_page[p] for p in pages if p in words_by_page}, options)
+        for pages in ranges
+    ]
+
+    if workers == 1:
+        results = [_build_page_range(task) for task in tasks]
+    else:
+        results = list(_shared_pool(pool_size).map(_build_page_range, tasks))
+
+    stats = {'pages': 0, 'reused_pages': 0, 'rasterized_pages': 0, 'words': 0}
+    out_doc = fitz.open()
+    for data, part_stats in results:
+        with fitz.open('pdf', data) as part:
+            out_doc.insert_pdf(part)
+        for key in stats:
+            stats[key] += part_stats[key]
+
+    out_doc.save(output_pdf, garbage=3, deflate=True)
+    out_doc.close()
+
+    stats['workers'] = workers
+    logger.info(
+        f"Searchable PDF {output_pdf}: {stats['pages']} pages ({stats['reused_pages']} reused, "
+        f"{stats['rasterized_pages']} rasterized), {stats['words']} words, {workers} worker(s)"
+    )
+    return stats
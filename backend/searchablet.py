@@ -1,14 +1,17 @@
 import boto3
-import json
+from textract_stream import write_blocks_jsonl
 
-textract_client = boto3.client("textract")
+if __name__ == "__main__":
+    textract_client = boto3.client("textract")
 
-with open("4340_spec.pdf", "rb") as document_file:
-    print(document_file)
-    document_bytes = document_file.read()
+    with open("4340_spec.pdf", "rb") as document_file:
+        print(document_file)
+        document_bytes = document_file.read()
 
     response = textract_client.analyze_document(
         Document={"Bytes": document_bytes}, FeatureTypes=['TABLES','FORMS']
     )
 
-    json.dump(response, open("response.json", "w"))
\ No newline at end of file
+    # One block per line, so readers can stream it (see textract_stream.iter_blocks)
+    count = write_blocks_jsonl(response["Blocks"], "response.jsonl")
+    print(f"wrote {count} blocks to response.jsonl")
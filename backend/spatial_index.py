@@ -0,0 +1,225 @@
+"""
+Spatial Index over OCR Word Boxes
+Uniform-grid index per page for "words inside this rectangle" and "words
+nearest to this point/token" queries over Textract (or OCR) word boxes,
+so extraction code does not have to scan every block of a document.
+
+Coordinates are those of the BoundingBoxArray the index is built from,
+normally normalized Textract page coordinates (0-1, origin top-left).
+"""
+
+import math
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from geometrys import BoundingBox, BoundingBoxArray
+
+logger = logging.getLogger(__name__)
+
+# Average number of boxes per grid cell the grid is sized for
+BOXES_PER_CELL = 4
+# Ignored around words matched by token_pages ("A61146," matches "A61146")
+TOKEN_PUNCTUATION = ',;:.()[]'
+
+
+class PageGridIndex:
+    """Grid of cells over one page; each cell lists the boxes overlapping it"""
+
+    __slots__ = ('boxes', 'x0', 'y0', 'cell_w', 'cell_h', 'nx', 'ny', '_cell_start', '_cell_items')
+
+    def __init__(self, boxes: BoundingBoxArray):
+        self.boxes = boxes
+        n = len(boxes)
+        x_low = np.minimum(boxes.left, boxes.right)
+        x_high = np.maximum(boxes.left, boxes.right)
+        y_low = np.minimum(boxes.top, boxes.bottom)
+        y_high = np.maximum(boxes.top, boxes.bottom)
+
+        self.x0 = float(x_low.min()) if n else 0.0
+        self.y0 = float(y_low.min()) if n else 0.0
+        span_x = max(float(x_high.max()) - self.x0, 1e-9) if n else 1.0
+        span_y = max(float(y_high.max()) - self.y0, 1e-9) if n else 1.0
+
+        cells = max(1, n // BOXES_PER_CELL)
+        self.nx = max(1, int(round(math.sqrt(cells * span_x / span_y))))
+        self.ny = max(1, int(math.ceil(cells / self.nx)))
+        self.cell_w = span_x / self.nx
+        self.cell_h = span_y / self.ny
+
+        # Cell range covered by every box
+        cx0 = self._clip_x(np.floor((x_low - self.x0) / self.cell_w))
+        cx1 = self._clip_x(np.floor((x_high - self.x0) / self.cell_w))
+        cy0 = self._clip_y(np.floor((y_low - self.y0) / self.cell_h))
+        cy1 = self._clip_y(np.floor((y_high - self.y0) / self.cell_h))
+
+        # (cell, box) pairs, grouped by cell in CSR form
+        cell_ids = []
+        box_ids = []
+        spans_x = cx1 - cx0 + 1
+        spans_y = cy1 - cy0 + 1
+        simple = (spans_x == 1) & (spans_y == 1)
+        cell_ids.append(cy0[simple] * self.nx + cx0[simple])
+        box_ids.append(np.nonzero(simple)[0])
+        for i in np.nonzero(~simple)[0].tolist():
+            xs = np.arange(cx0[i], cx1[i] + 1)
+            ys = np.arange(cy0[i], cy1[i] + 1)
+            cell_ids.append((ys[:, None] * self.nx + xs[None, :]).ravel())
+            box_ids.append(np.full(len(xs) * len(ys), i))
+
+        cell_ids = np.concatenate(cell_ids).astype(np.int64)
+        box_ids = np.concatenate(box_ids).astype(np.int64)
+        order = np.argsort(cell_ids, kind='stable')
+        self._cell_items = box_ids[order]
+        counts = np.bincount(cell_ids, minlength=self.nx * self.ny)
+        self._cell_start = np.concatenate(([0], np.cumsum(counts)))
+
+    def _clip_x(self, values: np.ndarray) -> np.ndarray:
+        return np.clip(values, 0, self.nx - 1).astype(np.int64)
+
+    def _clip_y(self, values: np.ndarray) -> np.ndarray:
+        return np.clip(values, 0, self.ny - 1).astype(np.int64)
+
+    def _candidates(self, cx0: int, cx1: int, cy0: int, cy1: int) -> np.ndarray:
+        """Box ids registered in the cells of a cell rectangle (may repeat)"""
+        parts = []
+        for cy in range(cy0, cy1 + 1):
+            start = self._cell_start[cy * self.nx + cx0]
+            end = self._cell_start[cy * self.nx + cx1 + 1]
+            if end > start:
+                parts.append(self._cell_items[start:end])
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts))
+
+    def query(self, region: Union[BoundingBox, Sequence[float]], contained: bool = False) -> np.ndarray:
+        """
+        Positions (within this page's boxes) of the boxes overlapping `region`,
+        or lying entirely inside it when `contained` is set, in reading order
+        """
+        if not len(self.boxes):
+            return np.zeros(0, dtype=np.int64)
+        left, bottom, right, top = region.bounds if isinstance(region, BoundingBox) else region
+        x_low, x_high = min(left, right), max(left, right)
+        y_low, y_high = min(bottom, top), max(bottom, top)
+
+        cx0, cx1 = self._clip_x(np.floor((np.array([x_low, x_high]) - self.x0) / self.cell_w))
+        cy0, cy1 = self._clip_y(np.floor((np.array([y_low, y_high]) - self.y0) / self.cell_h))
+        candidates = self._candidates(int(cx0), int(cx1), int(cy0), int(cy1))
+        if not len(candidates):
+            return candidates
+
+        subset = self.boxes[candidates]
+        mask = subset.contained_in(region) if contained else subset.intersects(region)
+        return candidates[mask]
+
+    def nearest(self, x: float, y: float, k: int = 5, max_distance: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        The k boxes closest to (x, y), as (position, distance) pairs. Distance
+        is measured to the box edge (0 inside the box). Rings of cells around
+        the point are searched until the k-th distance is closer than the ring.
+        """
+        n = len(self.boxes)
+        if not n or k <= 0:
+            return []
+
+        px = int(np.clip(math.floor((x - self.x0) / self.cell_w), 0, self.nx - 1))
+        py = int(np.clip(math.floor((y - self.y0) / self.cell_h), 0, self.ny - 1))
+        max_ring = max(self.nx, self.ny)
+
+        found = np.zeros(0, dtype=np.int64)
+        for ring in range(max_ring + 1):
+            found = self._candidates(
+                max(0, px - ring), min(self.nx - 1, px + ring),
+                max(0, py - ring), min(self.ny - 1, py + ring)
+            )
+            if len(found) >= k or len(found) == n:
+                distances = self._distances(found, x, y)
+                kth = np.partition(distances, min(k, len(found)) - 1)[min(k, len(found)) - 1]
+                # Anything outside the searched rings is at least this far away
+                reach = ring * min(self.cell_w, self.cell_h)
+                if kth <= reach or ring == max_ring or len(found) == n:
+                    break
+
+        distances = self._distances(found, x, y)
+        order = np.argsort(distances, kind='stable')[:k]
+        result = [(int(found[i]), float(distances[i])) for i in order]
+        if max_distance is not None:
+            result = [(i, d) for i, d in result if d <= max_distance]
+        return result
+
+    def _distances(self, positions: np.ndarray, x: float, y: float) -> np.ndarray:
+        subset = self.boxes[positions]
+        x_low = np.minimum(subset.left, subset.right)
+        x_high = np.maximum(subset.left, subset.right)
+        y_low = np.minimum(subset.top, subset.bottom)
+        y_high = np.maximum(subset.top, subset.bottom)
+        dx = np.maximum(np.maximum(x_low - x, x - x_high), 0.0)
+        dy = np.maximum(np.maximum(y_low - y, y - y_high), 0.0)
+        return np.hypot(dx, dy)
+
+
+class SpatialIndex:
+    """Per-page grid indexes over the word boxes of a whole Textract response"""
+
+    def __init__(self, textract_blocks: List[Dict[str, Any]], block_types: Sequence[str] = ('WORD',)):
+        self.blocks = textract_blocks
+        boxes = BoundingBoxArray.from_textract_blocks(textract_blocks, block_types=block_types)
+        self.pages: Dict[int, PageGridIndex] = {
+            page: PageGridIndex(boxes.on_page(page)) for page in np.unique(boxes.pages).tolist()
+        }
+        logger.info(f"Spatial index: {len(boxes)} boxes on {len(self.pages)} page(s)")
+
+    def _blocks_at(self, page: int, positions) -> List[Dict[str, Any]]:
+        indices = self.pages[page].boxes.block_indices
+        return [self.blocks[int(indices[p])] for p in positions]
+
+    def words_in_region(
+        self,
+        page: int,
+        region: Union[BoundingBox, Sequence[float]],
+        contained: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Blocks on a 1-based page overlapping (or inside) region, in reading order"""
+        if page not in self.pages:
+            return []
+        positions = self.pages[page].query(region, contained=contained)
+        return self._blocks_at(page, np.sort(positions).tolist())
+
+    def nearest_words(self, page: int, x: float, y: float, k: int = 5) -> List[Tuple[Dict[str, Any], float]]:
+        """The k blocks on a page closest to (x, y), with their distances"""
+        if page not in self.pages:
+            return []
+        hits = self.pages[page].nearest(x, y, k)
+        blocks = self._blocks_at(page, [position for position, _ in hits])
+        return [(block, distance) for block, (_, distance) in zip(blocks, hits)]
+
+    def nearest_to_token(self, token: str, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        For every word matching `token` (case-insensitive), the k other words
+        closest to it, e.g. the value printed next to a "Heat" or "Sample" label
+        """
+        matches = []
+        for page, block in self._matching(token):
+            bbox = block['Geometry']['BoundingBox']
+            center = (bbox['Left'] + bbox['Width'] / 2, bbox['Top'] + bbox['Height'] / 2)
+            neighbours = [
+                (neighbour, distance)
+                for neighbour, distance in self.nearest_words(page, center[0], center[1], k + 1)
+                if neighbour is not block
+            ][:k]
+            matches.append({'page': page, 'block': block, 'neighbours': neighbours})
+        return matches
+
+    def token_pages(self, token: str) -> List[int]:
+        """1-based pages with a word matching `token` (case-insensitive, surrounding punctuation ignored)"""
+        return sorted({page for page, _ in self._matching(token, strip=TOKEN_PUNCTUATION)})
+
+    def _matching(self, token: str, strip: Optional[str] = None):
+        token = token.strip().lower()
+        for page, grid in self.pages.items():
+            for block_index in grid.boxes.block_indices.tolist():
+                block = self.blocks[block_index]
+                if (block.get('Text') or '').strip().strip(strip or '').lower() == token:
+                    yield page, block
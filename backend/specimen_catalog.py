@@ -0,0 +1,601 @@
+"""
+Specimen Catalog
+Persistent SQLite store of material-certificate rows (heat number, sample
+number, dimensions and mechanical properties), bulk-imported from TSV/CSV/XLSX
+exports such as manuf.tsv in chunks. Heat and sample numbers are indexed, so the ABAQUS
+generator looks dimensions up with a B-tree search instead of asking the
+vision model.
+
+Certificate exports are often misaligned: rows carry more cells than the
+header, with surplus empty cells where the source table had merged columns.
+Such rows are compacted to their non-empty cells, and each value goes to the
+first following column whose value check accepts it (see align_row).
+"""
+
+import os
+import re
+import csv
+import math
+import sqlite3
+import logging
+import threading
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Specimen dimensions used before the catalog existed (previously hardcoded in
+# the ABAQUS generator); seeded so existing serial numbers keep working
+SEED_DIMENSIONS = {
+    'A61146': {'diameter': 100.0, 'length': 150.0},
+    'A61145': {'diameter': 75.0, 'length': 100.0},
+    'A32880': {'diameter': 50.0, 'length': 100.0},
+    'A61147': {'diameter': 80.0, 'length': 100.0}
+}
+
+ID_PATTERN = re.compile(r'^[A-Z]{1,4}[-/]?\d{3,}[A-Z0-9/-]*$', re.IGNORECASE)
+
+HARDNESS_FIELDS = ('hardness_hrc', 'hardness_hb', 'hardness_hv')
+
+
+def _number(value: str) -> Optional[float]:
+    value = value.strip().replace(' ', '')
+    if ',' in value and '.' not in value:
+        value = value.replace(',', '.')  # decimal comma
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _numbers(values: pd.Series) -> pd.Series:
+    """Vectorized _number (NaN where it would return None)"""
+    numbers = pd.to_numeric(values, errors='coerce')
+    # Only cells pd.to_numeric rejected are cleaned up (spaces, decimal commas) and retried
+    retry = numbers.isna().to_numpy() & values.fillna('').ne('').to_numpy()
+    if retry.any():
+        cleaned = values[retry].astype(str).str.replace(' ', '', regex=False)
+        cleaned = cleaned.where(cleaned.str.contains('.', regex=False), cleaned.str.replace(',', '.', regex=False))
+        numbers = numbers.astype(float)
+        numbers[retry] = pd.to_numeric(cleaned, errors='coerce')
+    return numbers.where(np.isfinite(numbers))
+
+
+class _Range:
+    """
+    Value check: a number within [low, high]
+
+    Called with one string, or through .series with a Series of stripped,
+    non-empty strings (and optionally their _numbers).
+    """
+
+    def __init__(self, low: float, high: float, integer: bool = False):
+        self.low = low
+        self.high = high
+        self.integer = integer
+
+    def __call__(self, value: str) -> bool:
+        number = _number(value)
+        return (number is not None and self.low <= number <= self.high
+                and (not self.integer or number == int(number)))
+
+    def series(self, values: pd.Series, numbers: Optional[pd.Series] = None) -> pd.Series:
+        if numbers is None:
+            numbers = _numbers(values)
+        ok = numbers.between(self.low, self.high)
+        if self.integer:
+            ok &= numbers.mod(1).eq(0)
+        return ok
+
+
+class _Identifier:
+    """Value check: a heat or sample number"""
+
+    def __call__(self, value: str) -> bool:
+        return bool(ID_PATTERN.match(value.strip()))
+
+    def series(self, values: pd.Series, numbers: Optional[pd.Series] = None) -> pd.Series:
+        return values.str.match(ID_PATTERN)
+
+
+class _Temperature(_Range):
+    """Value check: RT (room temperature) or degrees Celsius"""
+
+    def __init__(self):
+        super().__init__(-273, 1500)
+
+    def __call__(self, value: str) -> bool:
+        return value.strip().upper() == 'RT' or super().__call__(value)
+
+    def series(self, values: pd.Series, numbers: Optional[pd.Series] = None) -> pd.Series:
+        return values.isin(['RT', 'rt', 'Rt']) | super().series(values, numbers)
+
+
+_is_id = _Identifier()
+
+
+# field -> (header pattern, value check, SQL type)
+# Header patterns are matched in this order against lower-cased header cells.
+FIELDS: Dict[str, Tuple[str, Any, str]] = {
+    'heat_no': (r'heat', _is_id, 'TEXT'),
+    'sample_no': (r'sample|specimen\s*no|serial', _is_id, 'TEXT'),
+    'diameter': (r'^dia', _Range(0.1, 5000), 'REAL'),
+    'size': (r'^size', _Range(0.1, 5000), 'REAL'),
+    # Lengths below 20 mm are bundle counts or weights shifted into the column
+    'length': (r'^len', _Range(20, 100000), 'REAL'),
+    'bundles': (r'bundle', _Range(0, 1e9, integer=True), 'INTEGER'),
+    'weight': (r'weight', _Range(0, 1e9), 'REAL'),
+    'yield_strength': (r'r_?p\s*0?[.,]?2|rp|yield|r[eE]h', _Range(20, 5000), 'REAL'),
+    'tensile_strength': (r'^r_?m\b|^rm|tensile', _Range(20, 5000), 'REAL'),
+    'elongation': (r'^a\b|^a\s*%|^a\s*\(|elong', _Range(0, 100), 'REAL'),
+    'reduction_of_area': (r'^z\b|^z\s*%|^z\s*\(|reduction', _Range(0, 100), 'REAL'),
+    'hardness_hrc': (r'hrc', _Range(10, 75), 'REAL'),
+    'hardness_hb': (r'^hb', _Range(50, 700), 'REAL'),
+    'hardness_hv': (r'^hv', _Range(50, 1500), 'REAL'),
+    'impact_kv': (r'^kv', _Range(0, 500), 'REAL'),
+    'impact_ku': (r'^ku', _Range(0, 500), 'REAL'),
+    'test_temperature': (r'temp', _Temperature(), 'TEXT'),
+}
+
+NUMERIC_FIELDS = [name for name, (_, _, sql_type) in FIELDS.items() if sql_type != 'TEXT']
+TEXT_FIELDS = [name for name, (_, _, sql_type) in FIELDS.items() if sql_type == 'TEXT']
+
+CHUNK_ROWS = 50000            # rows per chunk and per upsert transaction
+MAX_ROW_WIDTH = 2             # data rows may have up to twice as many cells as the header
+POOL_MIN_BYTES = 4 * 1024 * 1024  # smaller files are converted without a process pool
+
+
+def map_header(header: List[str]) -> List[Optional[str]]:
+    """Catalog field of every header cell (None for unknown or repeated columns)"""
+    mapped: List[Optional[str]] = []
+    used = set()
+    for cell in header:
+        # NFKC folds exports like "Rₚ₀.₂ (N/mm²)" to "Rp0.2 (N/mm2)"
+        text = unicodedata.normalize('NFKC', cell).strip().lower()
+        field = None
+        for name, (pattern, _, _) in FIELDS.items():
+            if name not in used and re.search(pattern, text):
+                field = name
+                break
+        if field:
+            used.add(field)
+        mapped.append(field)
+    return mapped
+
+
+def _align_values(values: List[str], fields: List[Optional[str]]) -> Optional[List[Tuple[int, List[int]]]]:
+    """
+    Greedy column assignment of compacted values
+
+    Returns, per value, its column and the columns whose checks rejected it
+    before that, or None if a value fits no remaining column.
+    """
+    assignment = []
+    column = 0
+    has_hardness = False
+    for value in values:
+        rejected = []
+        while column < len(fields):
+            field = fields[column]
+            column += 1
+            if field is None or (field in HARDNESS_FIELDS and has_hardness):
+                continue
+            if FIELDS[field][1](value):
+                assignment.append((column - 1, rejected))
+                has_hardness = has_hardness or field in HARDNESS_FIELDS
+                break
+            rejected.append(column - 1)
+        else:
+            return None
+    return assignment
+
+
+def align_row(row: List[str], fields: List[Optional[str]]) -> Optional[Dict[str, str]]:
+    """
+    Map one data row onto header fields
+
+    Rows no longer than the header are mapped by position. Longer rows are
+    compacted to their non-empty cells; each value then goes to the first
+    following column whose check accepts it. At most one hardness scale is
+    filled per row. Returns None if a value fits no remaining column.
+    """
+    if len(row) <= len(fields):
+        return {field: value.strip() for field, value in zip(fields, row) if field and value.strip()}
+
+    values = [cell.strip() for cell in row if cell.strip()]
+    assignment = _align_values(values, fields)
+    if assignment is None:
+        return None
+    return {fields[column]: value for value, (column, _) in zip(values, assignment)}
+
+
+def _typed(frame: pd.DataFrame, converted: bool = False) -> pd.DataFrame:
+    """
+    Catalog types for string columns: numbers via _numbers, upper-case heat and
+    sample numbers, None for empty text. Rows without a valid heat number are
+    dropped. `converted` frames already hold numbers and stripped strings.
+    """
+    if 'heat_no' not in frame:
+        return frame.iloc[:0]
+    heat = frame['heat_no'].fillna('')
+    if not converted:
+        heat = heat.str.strip()
+    valid = heat.str.match(ID_PATTERN).to_numpy()
+    frame = frame[valid].copy()
+    frame['heat_no'] = heat[valid].str.upper()
+    if 'sample_no' in frame:
+        sample = frame['sample_no'].fillna('')
+        frame['sample_no'] = (sample if converted else sample.str.strip()).str.upper()
+    else:
+        frame['sample_no'] = ''
+
+    for field in frame.columns:
+        if field in NUMERIC_FIELDS and not converted:
+            frame[field] = _numbers(frame[field])
+        elif field in TEXT_FIELDS and field not in ('heat_no', 'sample_no'):
+            values = frame[field].fillna('')
+            if not converted:
+                values = values.str.strip()
+            frame[field] = values.where(values.ne(''), None)
+    return frame
+
+
+def _align_surplus_rows(cells: pd.DataFrame, filled: np.ndarray, fields: List[Optional[str]]) -> pd.DataFrame:
+    """
+    align_row for many rows at once
+
+    Rows with the same non-empty cell positions usually align the same way,
+    so the greedy assignment is computed for one row of each such group and
+    then verified for the whole group with vectorized checks: every value must
+    pass its column's check and fail the checks of the columns skipped before
+    it. Rows that fail verification are aligned one by one.
+    """
+    # Hash the packed cell masks; np.unique(axis=0) would sort the whole matrix
+    packed = np.ascontiguousarray(np.packbits(filled, axis=1))
+    group_of, _ = pd.factorize(packed.view(f'S{packed.shape[1]}').ravel())
+    parts = []
+    for group in range(group_of.max() + 1):
+        members = np.flatnonzero(group_of == group)
+        positions = np.flatnonzero(filled[members[0]])
+        group_cells = cells.iloc[members, positions]
+        assignment = _align_values(list(group_cells.iloc[0]), fields)
+
+        verified = pd.Series(assignment is not None, index=group_cells.index)
+        columns = {}
+        if assignment is not None:
+            for value_index, (column, rejected) in enumerate(assignment):
+                field = fields[column]
+                values = group_cells.iloc[:, value_index].str.strip()
+                checks = [FIELDS[fields[c]][1] for c in [column] + rejected]
+                numbers = _numbers(values) if any(isinstance(check, _Range) for check in checks) else None
+                verified &= FIELDS[field][1].series(values, numbers)
+                for skipped in rejected:
+                    verified &= ~FIELDS[fields[skipped]][1].series(values, numbers)
+                # The checks' conversions are the typed values
+                columns[field] = numbers if field in NUMERIC_FIELDS else values
+            ok = verified.to_numpy()
+            parts.append(_typed(pd.DataFrame(columns)[ok], converted=True))
+
+        leftovers = group_cells[~verified.to_numpy()]
+        if len(leftovers):
+            rows = []
+            for values in leftovers.itertuples(index=False):
+                row_assignment = _align_values(list(values), fields) or []
+                rows.append({fields[column]: value for value, (column, _) in zip(values, row_assignment)})
+            parts.append(_typed(pd.DataFrame(rows, index=leftovers.index)))
+    parts = [part for part in parts if len(part)]
+    return pd.concat(parts) if parts else pd.DataFrame(index=cells.index[:0])
+
+
+def _read_chunks(path: str, chunksize: int) -> Tuple[List[str], Iterator[pd.DataFrame]]:
+    """
+    Header cells and raw string chunks of a TSV/CSV/XLSX file
+
+    CSV/TSV chunks come from pandas' C parser. Its column count is fixed, so
+    it is set to MAX_ROW_WIDTH times the header width to leave room for
+    surplus empty cells. The delimiter is the most frequent of tab, comma and
+    semicolon in the header line, because csv.Sniffer gives up on misaligned
+    rows. XLSX sheets are streamed with openpyxl in read-only mode.
+    """
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportError('Importing .xlsx certificates requires openpyxl')
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = ['' if v is None else str(v) for v in next(rows, ())]
+
+        def xlsx_chunks():
+            try:
+                batch = []
+                for row in rows:
+                    batch.append(['' if v is None else str(v) for v in row])
+                    if len(batch) == chunksize:
+                        yield pd.DataFrame(batch)
+                        batch = []
+                if batch:
+                    yield pd.DataFrame(batch)
+            finally:
+                workbook.close()
+
+        return header, xlsx_chunks()
+
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        header_line = f.readline()
+    if not header_line.strip():
+        return [], iter(())
+    delimiter = max('\t,;', key=header_line.count)
+    header = next(csv.reader([header_line], delimiter=delimiter))
+
+    chunks = pd.read_csv(
+        path, sep=delimiter, header=None, skiprows=1, names=range(len(header) * MAX_ROW_WIDTH),
+        dtype=str, keep_default_na=False, encoding='utf-8-sig', chunksize=chunksize
+    )
+    return header, iter(chunks)
+
+
+def convert_chunk(raw: pd.DataFrame, fields: List[Optional[str]]) -> pd.DataFrame:
+    """
+    Typed catalog rows of one raw chunk
+
+    Rows whose last non-empty cell lies within the header are mapped by
+    position in one step; longer rows go through _align_surplus_rows. Both
+    are typed column-wise by _typed (pd.to_numeric, decimal commas accepted)
+    and rows without a valid heat number are dropped.
+    """
+    # Padding columns of the C parser are NaN throughout
+    cells = raw.dropna(axis=1, how='all').fillna('')
+    cells.columns = range(cells.shape[1])
+    filled = cells.ne('').to_numpy()
+    widths = np.where(filled.any(axis=1), filled.shape[1] - np.argmax(filled[:, ::-1], axis=1), 0)
+
+    n_fields = len(fields)
+    positional = cells.iloc[widths <= n_fields, :n_fields]
+    positional = positional.reindex(columns=range(n_fields), fill_value='')
+    positional.columns = [field or f'_unmapped_{i}' for i, field in enumerate(fields)]
+    positional = positional[[field for field in fields if field]]
+
+    frame = _typed(positional)
+    surplus_rows = widths > n_fields
+    if surplus_rows.any():
+        surplus = _align_surplus_rows(cells[surplus_rows], filled[surplus_rows], fields)
+        frame = pd.concat([part for part in (frame, surplus) if len(part)] or [frame]).sort_index()
+    return frame.reindex(columns=[field for field in FIELDS if field in frame.columns])
+
+
+def iter_certificate_frames(path: str, chunksize: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Typed catalog rows of a certificate file, chunk by chunk (see convert_chunk)"""
+    header, chunks = _read_chunks(path, chunksize)
+    fields = map_header(header)
+    if header and 'heat_no' not in fields:
+        raise ValueError(f"{path}: no heat number column in header {header}")
+    for raw in chunks:
+        yield convert_chunk(raw, fields)
+
+
+def parse_certificate(path: str) -> List[Dict[str, Any]]:
+    """Certificate rows as dicts without the empty fields; rows without a valid heat number are skipped"""
+    records = []
+    for frame in iter_certificate_frames(path):
+        for record in frame.to_dict('records'):
+            records.append({key: value for key, value in record.items() if value is not None and not pd.isna(value)})
+    return records
+
+
+class SpecimenCatalog:
+    """SQLite catalog of certificate rows, unique per (heat_no, sample_no)"""
+
+    COLUMNS = ['heat_no', 'sample_no'] + [name for name in FIELDS if name not in ('heat_no', 'sample_no')] + ['source']
+
+    def __init__(self, db_path: str = 'specimen_catalog.db', seed: bool = True):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._init_db()
+        if seed:
+            self.seed_defaults()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        columns = ',\n'.join(
+            f'{name} {FIELDS[name][2]}' for name in self.COLUMNS if name in FIELDS and name not in ('heat_no', 'sample_no')
+        )
+        conn = self._connect()
+        conn.executescript(f'''
+            CREATE TABLE IF NOT EXISTS specimens (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                heat_no TEXT NOT NULL,
+                sample_no TEXT NOT NULL DEFAULT '',
+                {columns},
+                source TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (heat_no, sample_no)
+            );
+            CREATE INDEX IF NOT EXISTS idx_specimens_sample_no ON specimens (sample_no);
+        ''')
+        # UNIQUE (heat_no, sample_no) already gives an index led by heat_no
+        conn.commit()
+        conn.close()
+
+    def _upsert_sql(self) -> str:
+        updates = ', '.join(
+            f'{name} = COALESCE(excluded.{name}, {name})' for name in self.COLUMNS if name not in ('heat_no', 'sample_no')
+        )
+        return (
+            f"INSERT INTO specimens ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' for _ in self.COLUMNS)}) "
+            f"ON CONFLICT (heat_no, sample_no) DO UPDATE SET {updates}, updated_at = CURRENT_TIMESTAMP"
+        )
+
+    @classmethod
+    def _rows(cls, frame: pd.DataFrame, source: Optional[str]) -> List[tuple]:
+        frame = frame.reindex(columns=cls.COLUMNS)
+        if source is not None:
+            frame['source'] = frame['source'].fillna(source)
+        # SQLite stores NaN as NULL
+        return list(frame.itertuples(index=False, name=None))
+
+    def upsert_frame(self, frame: pd.DataFrame, source: Optional[str] = None, conn: Optional[sqlite3.Connection] = None) -> int:
+        """
+        Insert or update rows in one transaction; values missing from a row keep
+        what the catalog already has for that heat/sample. Heat and sample
+        numbers must already be upper-case (as convert_chunk returns them).
+        Returns the row count.
+        """
+        if frame.empty:
+            return 0
+        rows = self._rows(frame, source)
+        with self._lock:
+            own_connection = conn is None
+            if own_connection:
+                conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(self._upsert_sql(), rows)
+            finally:
+                if own_connection:
+                    conn.close()
+        return len(rows)
+
+    def upsert(self, records: Iterable[Dict[str, Any]], source: Optional[str] = None) -> int:
+        """upsert_frame for a list of record dicts"""
+        frame = pd.DataFrame(list(records))
+        if frame.empty:
+            return 0
+        frame['heat_no'] = frame['heat_no'].str.strip().str.upper()
+        frame['sample_no'] = frame.get('sample_no', pd.Series('', index=frame.index)).fillna('').str.strip().str.upper()
+        return self.upsert_frame(frame, source)
+
+    def import_file(self, path: str, workers: Optional[int] = None, chunksize: int = CHUNK_ROWS,
+                    progress: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Bulk-import a TSV/CSV/XLSX certificate export; returns the rows imported
+
+        Raw chunks are read in this process and converted in a process pool
+        (files smaller than POOL_MIN_BYTES are converted inline), keeping at
+        most two chunks per worker in flight. Each chunk is upserted in one
+        transaction. `progress` gets the running row count.
+        """
+        source = os.path.basename(path)
+        header, chunks = _read_chunks(path, chunksize)
+        fields = map_header(header)
+        if header and 'heat_no' not in fields:
+            raise ValueError(f"{path}: no heat number column in header {header}")
+
+        workers = workers or os.cpu_count() or 1
+        if os.path.getsize(path) < POOL_MIN_BYTES:
+            workers = 1
+
+        conn = self._connect()
+        conn.execute('PRAGMA synchronous = NORMAL')
+        total = 0
+
+        def write(frame):
+            nonlocal total
+            total += self.upsert_frame(frame, source, conn)
+            if progress:
+                progress(total)
+
+        try:
+            if workers == 1:
+                for raw in chunks:
+                    write(convert_chunk(raw, fields))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    pending = deque()
+                    for raw in chunks:
+                        pending.append(executor.submit(convert_chunk, raw, fields))
+                        if len(pending) >= workers * 2:
+                            write(pending.popleft().result())
+                    while pending:
+                        write(pending.popleft().result())
+        finally:
+            conn.close()
+
+        logger.info(f"Imported {total} specimen row(s) from {path}")
+        return total
+
+    def seed_defaults(self):
+        """Add SEED_DIMENSIONS for heat numbers that have no dimensions yet"""
+        conn = self._connect()
+        known = {
+            row['heat_no'] for row in conn.execute(
+                'SELECT DISTINCT heat_no FROM specimens WHERE diameter IS NOT NULL AND length IS NOT NULL'
+            )
+        }
+        conn.close()
+        missing = [
+            {'heat_no': heat_no, 'sample_no': '', **dimensions}
+            for heat_no, dimensions in SEED_DIMENSIONS.items() if heat_no not in known
+        ]
+        if missing:
+            self.upsert(missing, source='seed')
+
+    def lookup(self, heat_no: Optional[str] = None, sample_no: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Rows for a heat number and/or sample number (both indexed)"""
+        if not heat_no and not sample_no:
+            raise ValueError('heat_no or sample_no is required')
+        conditions, params = [], []
+        if heat_no:
+            conditions.append('heat_no = ?')
+            params.append(heat_no.strip().upper())
+        if sample_no:
+            conditions.append('sample_no = ?')
+            params.append(sample_no.strip().upper())
+
+        conn = self._connect()
+        rows = conn.execute(
+            f"SELECT * FROM specimens WHERE {' AND '.join(conditions)} ORDER BY heat_no, sample_no", params
+        ).fetchall()
+        conn.close()
+        return [{key: row[key] for key in row.keys() if row[key] is not None} for row in rows]
+
+    def dimensions(self, serial_number: str) -> Optional[Dict[str, float]]:
+        """
+        Specimen diameter and length for a heat or sample number
+
+        The first row (by sample number) that has both is used, so a heat-level
+        entry (empty sample number) wins over individual samples.
+        """
+        serial = serial_number.strip().upper()
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT diameter, length FROM specimens '
+            'WHERE (heat_no = ? OR sample_no = ?) AND diameter IS NOT NULL AND length IS NOT NULL '
+            'ORDER BY sample_no LIMIT 1',
+            (serial, serial)
+        ).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return {'diameter': row['diameter'], 'length': row['length']}
+
+
+if __name__ == "__main__":
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Bulk-import certificate exports into the specimen catalog')
+    parser.add_argument('files', nargs='+', help='TSV, CSV or XLSX certificate files')
+    parser.add_argument('--db', default=os.getenv('SPECIMEN_CATALOG_DB', 'specimen_catalog.db'), help='catalog database')
+    parser.add_argument('--workers', type=int, default=0, help='conversion processes (0 = all cores)')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS, help='rows per chunk / transaction')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    catalog = SpecimenCatalog(args.db)
+    for path in args.files:
+        started = time.perf_counter()
+        count = catalog.import_file(path, workers=args.workers or None, chunksize=args.chunksize)
+        elapsed = time.perf_counter() - started
+        print(f"{path}: {count} rows in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.0f} rows/s)")
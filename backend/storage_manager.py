@@ -0,0 +1,457 @@
+"""
+Storage Manager
+Every job leaves files behind in uploads/ and outputs/: the original PDF,
+OCR_* outputs, pages_*/tables_* directories, CSV/TXT pairs, zip archives and
+the .odb/.dat/.msg/.sta files the solver writes next to its .inp. Nothing
+removed them, so a busy node eventually filled its disk.
+
+StorageManager treats every top-level file or directory of its roots as one
+entry and evicts entries:
+- older than ttl_seconds since their last access (TTL)
+- least recently accessed first, while a user is over user_max_bytes
+- least recently accessed first, while the total is over max_bytes or the
+  disk has less than min_free_bytes left
+
+An entry belongs to a task if it was tracked for it (track(), e.g. uploads),
+is named in its status (output_file, tables_dir, ...) or contains its task id.
+Entries of tasks that are still running are never evicted, and neither is
+anything written to within grace_seconds. Entries sharing a name stem with a
+kept entry stay too (the .inp of a running solver job, next to its .sta).
+
+Last access is the file's atime: touch() sets it when a result is
+downloaded, so the LRU order is shared by all worker processes.
+Directories in `skip` are cleaned up by their owners: chunked upload
+sessions expire, solver scratch directories go when their run ends (or
+goes stale), and the simulation cache evicts its least recently used
+results past its own size limit and TTL. They are counted in usage() and
+against max_bytes but never evicted here. The files of
+directories in `expand` are entries of their own: a blob of the upload blob
+store is kept while a task input still links it, and evicted like any other
+entry afterwards.
+
+admit() runs on every upload, so it works from the totals of the last scan
+(at most usage_max_age seconds old, plus the uploads admitted since) and
+only scans and sweeps again when those totals leave no room.
+"""
+
+import os
+import time
+import shutil
+import sqlite3
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (task_id, user_id, active, names referenced by the task)
+TaskFiles = Tuple[str, Any, bool, Iterable[str]]
+
+
+class StorageQuotaExceeded(Exception):
+    """No room for a new upload even after eviction; the message is safe to show to the user"""
+
+    def __init__(self, message: str, status: int = 507):
+        super().__init__(message)
+        self.status = status
+
+
+def task_references(status: Any) -> List[str]:
+    """Base names of every string in a task status (output_file, tables_dir, output_files, ...)"""
+    names = []
+    stack = [status]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, str) and value and len(value) < 512 and '\n' not in value:
+            name = os.path.basename(value.rstrip('/\\'))
+            if name:
+                names.append(name)
+    return names
+
+
+def _stem(name: str) -> str:
+    return name.split('.', 1)[0]
+
+
+def _size(stat: os.stat_result, seen: set) -> int:
+    # Hard links (task inputs of one blob) are counted once
+    if stat.st_nlink > 1:
+        if (stat.st_dev, stat.st_ino) in seen:
+            return 0
+        seen.add((stat.st_dev, stat.st_ino))
+    return stat.st_size
+
+
+def _measure(path: str, seen: set) -> Tuple[int, float, float]:
+    """(bytes, last modification, last access) of a file or directory tree"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 0, 0.0, 0.0
+    if not os.path.isdir(path):
+        return _size(stat, seen), stat.st_mtime, stat.st_atime
+    size, mtime = 0, stat.st_mtime
+    for dirpath, dirnames, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                child = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            size += _size(child, seen)
+            mtime = max(mtime, child.st_mtime)
+    return size, mtime, stat.st_atime
+
+
+def _remove(path: str):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class StorageManager:
+    """Quota, TTL and LRU eviction of job files, with disk-usage metrics"""
+
+    def __init__(self, roots: Iterable[str], db_path: Optional[str] = None,
+                 max_bytes: Optional[int] = None, user_max_bytes: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None, min_free_bytes: int = 0,
+                 grace_seconds: float = 600, skip: Iterable[str] = (), expand: Iterable[str] = (),
+                 owners: Optional[Callable[[], Iterable[TaskFiles]]] = None, usage_max_age: float = 60):
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.max_bytes = max_bytes
+        self.user_max_bytes = user_max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.min_free_bytes = min_free_bytes
+        self.grace_seconds = grace_seconds
+        self.skip = set(skip)
+        self.expand = set(expand)
+        self.owners = owners or (lambda: ())
+        self.usage_max_age = usage_max_age
+        # Bytes in use at the last scan, with the uploads admitted since: {'at', 'total', 'users'}
+        self._totals: Optional[Dict[str, Any]] = None
+        self.db_path = os.path.abspath(db_path) if db_path else None
+        self._tracked: Dict[str, Tuple[Optional[str], Any]] = {}  # without a database
+        self._lock = threading.Lock()
+        self._sweeper_pid = None
+        self.last_sweep: Optional[Dict[str, Any]] = None
+        self.evicted_total = 0
+        self.freed_total = 0
+        for root in self.roots:
+            os.makedirs(root, exist_ok=True)
+        if self.db_path:
+            conn = self._connect()
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS storage_files (
+                    path TEXT PRIMARY KEY,
+                    task_id TEXT,
+                    user_id TEXT,
+                    tracked_at REAL
+                )
+            ''')
+            conn.commit()
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _entry_path(self, path: str) -> Optional[str]:
+        """The top-level entry (file or directory directly in a root) containing path"""
+        path = os.path.abspath(path)
+        for root in self.roots:
+            if os.path.dirname(path) == root:
+                return path
+            if path.startswith(root + os.sep):
+                return os.path.join(root, os.path.relpath(path, root).split(os.sep)[0])
+        return None
+
+    def track(self, path: str, task_id: Optional[str] = None, user_id: Any = None):
+        """Record the task and user a stored file belongs to"""
+        entry = self._entry_path(path)
+        if entry is None:
+            return
+        user = str(user_id) if user_id is not None else None
+        if not self.db_path:
+            with self._lock:
+                self._tracked[entry] = (task_id, user)
+            return
+        conn = self._connect()
+        conn.execute('INSERT OR REPLACE INTO storage_files (path, task_id, user_id, tracked_at) VALUES (?, ?, ?, ?)',
+                     (entry, task_id, user, time.time()))
+        conn.commit()
+        conn.close()
+
+    def touch(self, path: str):
+        """Mark a file as just used (downloaded), moving it to the back of the LRU order"""
+        entry = self._entry_path(path)
+        if entry is None:
+            return
+        try:
+            stat = os.stat(entry)
+            os.utime(entry, (time.time(), stat.st_mtime))
+        except OSError:
+            pass
+
+    def _tracked_entries(self) -> Dict[str, Tuple[Optional[str], Any]]:
+        if not self.db_path:
+            with self._lock:
+                return dict(self._tracked)
+        conn = self._connect()
+        try:
+            return {row[0]: (row[1], row[2]) for row in conn.execute('SELECT path, task_id, user_id FROM storage_files')}
+        finally:
+            conn.close()
+
+    def _forget(self, paths: List[str]):
+        if not paths:
+            return
+        if not self.db_path:
+            with self._lock:
+                for path in paths:
+                    self._tracked.pop(path, None)
+            return
+        conn = self._connect()
+        conn.executemany('DELETE FROM storage_files WHERE path = ?', [(path,) for path in paths])
+        conn.commit()
+        conn.close()
+
+    def scan(self) -> List[Dict[str, Any]]:
+        """Every entry of the roots with its size, owner and whether it may be evicted"""
+        tracked = self._tracked_entries()
+        tasks = {}
+        referenced = {}
+        for task_id, user_id, active, names in self.owners():
+            tasks[task_id] = (str(user_id) if user_id is not None else None, active)
+            for name in names:
+                referenced.setdefault(name, task_id)
+
+        paths = []
+        expanded = set()
+        for root in self.roots:
+            try:
+                names = sorted(os.listdir(root))
+            except OSError:
+                continue
+            for name in names:
+                path = os.path.join(root, name)
+                if name in self.expand and os.path.isdir(path):
+                    for dirpath, dirnames, filenames in os.walk(path):
+                        expanded.update(os.path.join(dirpath, filename) for filename in filenames)
+                else:
+                    paths.append(path)
+
+        now = time.time()
+        seen = set()
+        entries = []
+        # Expanded files last: a blob linked at a task input is counted with the input
+        for path in paths + sorted(expanded):
+            name = os.path.basename(path)
+            size, mtime, atime = _measure(path, seen)
+            task_id, user_id = tracked.get(path, (None, None))
+            task_id = task_id or referenced.get(name)
+            if task_id is None:
+                task_id = next((known for known in tasks if known in name), None)
+            owner, active = tasks.get(task_id, (None, False))
+            if path in expanded:
+                # A blob still linked at a task input goes with that input
+                try:
+                    active = active or os.stat(path).st_nlink > 1
+                except OSError:
+                    pass
+            entries.append({
+                'path': path,
+                'name': name,
+                'size': size,
+                'modified': mtime,
+                'accessed': max(atime, mtime),
+                'task_id': task_id,
+                'user_id': user_id or owner,
+                'managed': name in self.skip,
+                'pinned': name in self.skip or active or now - mtime < self.grace_seconds,
+            })
+
+        # Files next to a kept file stay with it (job.inp beside the running job's job.sta)
+        pinned_stems = {_stem(entry['name']) for entry in entries if entry['pinned'] and not entry['managed']}
+        for entry in entries:
+            if _stem(entry['name']) in pinned_stems:
+                entry['pinned'] = True
+
+        stale = [path for path in tracked if not os.path.lexists(path)]
+        self._forget(stale)
+        return entries
+
+    def _remember(self, entries: List[Dict[str, Any]]) -> None:
+        users = {}
+        for entry in entries:
+            if entry['user_id'] is not None:
+                users[entry['user_id']] = users.get(entry['user_id'], 0) + entry['size']
+        with self._lock:
+            self._totals = {'at': time.time(), 'total': sum(entry['size'] for entry in entries), 'users': users}
+
+    def _fits(self, user: str, incoming: int) -> bool:
+        """True if the remembered totals leave room for incoming bytes of user; reserves them if so"""
+        with self._lock:
+            totals = self._totals
+            if totals is None or time.time() - totals['at'] > self.usage_max_age:
+                return False
+            if self.user_max_bytes is not None and totals['users'].get(user, 0) + incoming > self.user_max_bytes:
+                return False
+            limit = self._global_limit(totals['total'])
+            if limit is not None and totals['total'] + incoming > limit:
+                return False
+            totals['total'] += incoming
+            totals['users'][user] = totals['users'].get(user, 0) + incoming
+            return True
+
+    def _global_limit(self, used: int) -> Optional[int]:
+        """Bytes the roots may use: max_bytes, lowered when the disk runs short of min_free_bytes"""
+        limit = self.max_bytes
+        if self.min_free_bytes and self.roots:
+            free = shutil.disk_usage(self.roots[0]).free
+            room = used + free - self.min_free_bytes
+            limit = room if limit is None else min(limit, room)
+        return limit
+
+    def sweep(self, incoming: int = 0, user_id: Any = None) -> Dict[str, Any]:
+        """
+        Evict expired and over-quota entries. incoming bytes (of user_id) are
+        reserved first, so an upload gets room before it is written.
+        """
+        start = time.time()
+        entries = self.scan()
+        user = str(user_id) if user_id is not None else None
+        evicted = []
+
+        def evict(entry):
+            _remove(entry['path'])
+            entry['evicted'] = True
+            evicted.append(entry)
+
+        def live():
+            return [entry for entry in entries if not entry.get('evicted')]
+
+        def candidates():
+            # Least recently accessed first
+            return sorted((entry for entry in live() if not entry['pinned']), key=lambda entry: entry['accessed'])
+
+        if self.ttl_seconds is not None:
+            for entry in candidates():
+                if start - entry['accessed'] > self.ttl_seconds:
+                    evict(entry)
+
+        if self.user_max_bytes is not None:
+            usage = {}
+            for entry in live():
+                if entry['user_id'] is not None:
+                    usage[entry['user_id']] = usage.get(entry['user_id'], 0) + entry['size']
+            if user is not None:
+                usage[user] = usage.get(user, 0) + incoming
+            for owner, used in usage.items():
+                for entry in candidates():
+                    if used <= self.user_max_bytes:
+                        break
+                    if entry['user_id'] == owner:
+                        used -= entry['size']
+                        evict(entry)
+
+        limit = self._global_limit(sum(entry['size'] for entry in entries))
+        if limit is not None:
+            used = sum(entry['size'] for entry in live()) + incoming
+            for entry in candidates():
+                if used <= limit:
+                    break
+                used -= entry['size']
+                evict(entry)
+
+        self._forget([entry['path'] for entry in evicted])
+        freed = sum(entry['size'] for entry in evicted)
+        self.evicted_total += len(evicted)
+        self.freed_total += freed
+        self.last_sweep = {
+            'at': start,
+            'seconds': round(time.time() - start, 3),
+            'evicted': len(evicted),
+            'freed_bytes': freed,
+        }
+        if evicted:
+            logger.info(f"Storage sweep evicted {len(evicted)} entries ({freed / 1024 ** 2:.1f} MB)")
+        self._remember(live())
+        return dict(self.last_sweep, entries=live())
+
+    def admit(self, user_id: Any, incoming: int = 0):
+        """Make room for an upload of incoming bytes; raises StorageQuotaExceeded if there is none"""
+        if self.max_bytes is None and self.user_max_bytes is None and not self.min_free_bytes:
+            return
+        if self._fits(str(user_id), incoming):
+            return
+        self.sweep(incoming, user_id)
+        if self._fits(str(user_id), incoming):
+            return
+        with self._lock:
+            over_user_quota = (self.user_max_bytes is not None and
+                               self._totals['users'].get(str(user_id), 0) + incoming > self.user_max_bytes)
+        if over_user_quota:
+            raise StorageQuotaExceeded(
+                f"Storage quota of {self.user_max_bytes / 1024 ** 2:.0f} MB reached by running jobs; "
+                f"try again when they finish"
+            )
+        raise StorageQuotaExceeded('Server storage is full; try again later')
+
+    def usage(self, user_id: Any = None) -> Dict[str, Any]:
+        """Disk-usage metrics: totals per root and user, evictable bytes, free disk, last sweep"""
+        entries = self.scan()
+        self._remember(entries)
+        roots = {}
+        users = {}
+        for entry in entries:
+            root = os.path.basename(os.path.dirname(entry['path']))
+            roots[root] = roots.get(root, 0) + entry['size']
+            if entry['user_id'] is not None:
+                users[entry['user_id']] = users.get(entry['user_id'], 0) + entry['size']
+        disk = shutil.disk_usage(self.roots[0]) if self.roots else None
+        metrics = {
+            'total_bytes': sum(entry['size'] for entry in entries),
+            'entries': len(entries),
+            'pinned_bytes': sum(entry['size'] for entry in entries if entry['pinned']),
+            'untracked_bytes': sum(entry['size'] for entry in entries if entry['user_id'] is None),
+            'roots': roots,
+            'max_bytes': self.max_bytes,
+            'user_max_bytes': self.user_max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'disk_total_bytes': disk.total if disk else None,
+            'disk_free_bytes': disk.free if disk else None,
+            'last_sweep': self.last_sweep,
+            'evicted_total': self.evicted_total,
+            'freed_total_bytes': self.freed_total,
+        }
+        if user_id is not None:
+            metrics['user_bytes'] = users.get(str(user_id), 0)
+        else:
+            metrics['users'] = users
+        return metrics
+
+    def start(self, interval: float):
+        """Sweep every interval seconds in a background thread (one per process)"""
+        # Threads don't survive fork(): each worker process starts its own
+        if interval <= 0 or self._sweeper_pid == os.getpid():
+            return
+        with self._lock:
+            if self._sweeper_pid == os.getpid():
+                return
+            self._sweeper_pid = os.getpid()
+            thread = threading.Thread(target=self._sweep_loop, args=(self._sweeper_pid, interval), daemon=True)
+            thread.start()
+
+    def _sweep_loop(self, pid: int, interval: float):
+        while self._sweeper_pid == pid:
+            time.sleep(interval)
+            try:
+                self.sweep()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Storage sweep failed: {e}")
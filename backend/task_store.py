@@ -0,0 +1,195 @@
+"""
+Shared Task Store
+processing_status used to be a plain dict, so a task could only be polled from
+the process that started it. Under a multi-process server (gunicorn workers)
+the status request usually lands on a different worker.
+
+TaskStore keeps the dict interface the endpoints and workers already use:
+- Tasks started in this process stay live dicts. Workers keep mutating them
+  in place (status['progress'] = 60, status['output'].append(...)).
+- A background thread writes changed tasks to SQLite every flush_interval
+  seconds. New tasks are written immediately.
+- Tasks owned by another process are read from SQLite as snapshots.
+
+Without a db_path the store behaves like the old in-process dict.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = {'completed', 'failed', 'cancelled', 'error'}
+
+
+class TaskStore(MutableMapping):
+    """Task-id -> status dict, shared across worker processes through SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None, flush_interval: float = 0.5):
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._saved: Dict[str, str] = {}  # task_id -> JSON last written
+        self._final = set()  # terminal tasks already written in their final form
+        self._lock = threading.RLock()
+        self._flusher_pid = None
+        self.db_path = None
+        self.flush_interval = flush_interval
+        if db_path:
+            self.configure(db_path, flush_interval)
+
+    def configure(self, db_path: Optional[str], flush_interval: Optional[float] = None):
+        """Point the store at a database (or none); live tasks are written there on the next flush"""
+        with self._lock:
+            self.db_path = os.path.abspath(db_path) if db_path else None
+            if flush_interval is not None:
+                self.flush_interval = flush_interval
+            self._saved.clear()
+            self._final.clear()
+            if self.db_path:
+                conn = self._connect()
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS tasks (
+                        task_id TEXT PRIMARY KEY,
+                        user_id TEXT,
+                        status TEXT,
+                        data TEXT NOT NULL,
+                        pid INTEGER,
+                        updated_at REAL
+                    )
+                ''')
+                conn.commit()
+                conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _load(self, task_id: str) -> Optional[Dict[str, Any]]:
+        if not self.db_path:
+            return None
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT data FROM tasks WHERE task_id = ?', (task_id,)).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def __getitem__(self, task_id: str) -> Dict[str, Any]:
+        task = self._tasks.get(task_id)
+        if task is not None:
+            return task
+        # Started by another worker: a read-only snapshot
+        task = self._load(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        return task
+
+    def __setitem__(self, task_id: str, task: Dict[str, Any]):
+        with self._lock:
+            self._tasks[task_id] = task
+            self._final.discard(task_id)
+        self.flush(task_id)
+        self._ensure_flusher()
+
+    def __delitem__(self, task_id: str):
+        with self._lock:
+            found = self._tasks.pop(task_id, None) is not None
+            self._saved.pop(task_id, None)
+            self._final.discard(task_id)
+        if self.db_path:
+            conn = self._connect()
+            found = conn.execute('DELETE FROM tasks WHERE task_id = ?', (task_id,)).rowcount > 0 or found
+            conn.commit()
+            conn.close()
+        if not found:
+            raise KeyError(task_id)
+
+    def __contains__(self, task_id) -> bool:
+        if task_id in self._tasks:
+            return True
+        if not self.db_path:
+            return False
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT 1 FROM tasks WHERE task_id = ?', (task_id,)).fetchone() is not None
+        finally:
+            conn.close()
+
+    def __iter__(self) -> Iterator[str]:
+        task_ids = list(self._tasks)
+        if self.db_path:
+            conn = self._connect()
+            known = set(task_ids)
+            task_ids += [row[0] for row in conn.execute('SELECT task_id FROM tasks') if row[0] not in known]
+            conn.close()
+        return iter(task_ids)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def flush(self, task_id: Optional[str] = None) -> int:
+        """Write live tasks that changed since the last flush; returns the number written"""
+        if not self.db_path:
+            return 0
+        with self._lock:
+            if task_id is not None:
+                candidates = [task_id] if task_id in self._tasks else []
+            else:
+                candidates = [t for t in self._tasks if t not in self._final]
+            pid = os.getpid()
+            now = time.time()
+            rows = []
+            for tid in candidates:
+                task = self._tasks[tid]
+                try:
+                    data = json.dumps(task, default=str)
+                except (TypeError, ValueError, RuntimeError) as e:
+                    # Mutated by its worker while serializing; picked up on the next flush
+                    logger.debug(f"Task {tid} not serializable yet: {e}")
+                    continue
+                if data == self._saved.get(tid):
+                    # Finished and unchanged for a full interval: stop re-serializing it
+                    if task.get('status') in TERMINAL_STATES:
+                        self._final.add(tid)
+                    continue
+                self._saved[tid] = data
+                rows.append((tid, str(task.get('user_id', '')), task.get('status'), data, pid, now))
+            if not rows:
+                return 0
+            conn = self._connect()
+            try:
+                conn.executemany('''
+                    INSERT INTO tasks (task_id, user_id, status, data, pid, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(task_id) DO UPDATE SET
+                        user_id = excluded.user_id, status = excluded.status, data = excluded.data,
+                        pid = excluded.pid, updated_at = excluded.updated_at
+                ''', rows)
+                conn.commit()
+            finally:
+                conn.close()
+            return len(rows)
+
+    def _ensure_flusher(self):
+        # Threads don't survive fork(): each worker process starts its own
+        if not self.db_path or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            thread = threading.Thread(target=self._flush_loop, args=(self._flusher_pid,), daemon=True)
+            thread.start()
+
+    def _flush_loop(self, pid: int):
+        while self._flusher_pid == pid and self.db_path:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.warning(f"Task store flush failed: {e}")
@@ -0,0 +1,196 @@
+"""
+Warm Tesseract Worker Pool
+OCRmyPDF starts a new tesseract process for every page, which loads the
+language model again each time. On short documents that startup dominates.
+TesseractPool keeps `size` worker threads, each holding one tesserocr API
+that was initialized once with its language. Page images are fed to the
+workers through a queue. tesserocr releases the GIL while recognizing, so
+the workers run in parallel.
+
+Results are Textract-style WORD blocks (normalized Geometry.BoundingBox,
+Text, Confidence, Page). The rest of the pipeline already reads that format:
+
+- searchable PDFs:  searchable_pdf.make_searchable_pdf / build_searchable_pages
+- word queries:     spatial_index, /api/words
+- /api/upload:      page_ocr with engine 'tesseract' writes each page through
+                    build_searchable_pages, and Camelot then reads the merged output
+
+tesserocr is optional (pip install tesserocr). Without it the pool raises
+ImportError when it starts, and OCR stays on ocrmypdf.
+
+Worker threads do not survive fork(). Pools are created on first use in
+each worker process, never in warm_up().
+"""
+
+import os
+import queue
+import logging
+import threading
+import importlib.util
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import fitz
+
+from engines import register as register_engine
+
+logger = logging.getLogger(__name__)
+
+tesserocr = register_engine('tesserocr')
+
+DEFAULT_DPI = 300
+_STOP = object()
+
+
+def available() -> bool:
+    """Whether tesserocr is installed (checked without importing it)"""
+    return tesserocr.loaded or importlib.util.find_spec('tesserocr') is not None
+
+
+def create_api(lang: str = 'eng', oem: Optional[int] = None, path: Optional[str] = None):
+    """A tesserocr API with the language model loaded"""
+    kwargs = {'lang': lang}
+    if oem is not None:
+        kwargs['oem'] = tesserocr.OEM(oem)
+    if path:
+        kwargs['path'] = path
+    return tesserocr.PyTessBaseAPI(**kwargs)
+
+
+def recognize(api, image, dpi: int = DEFAULT_DPI, psm: Optional[int] = None) -> Dict[str, Any]:
+    """Words (pixel boxes) and text of one page image on a warm API"""
+    if psm is not None:
+        api.SetPageSegMode(tesserocr.PSM(psm))
+    api.SetImage(image)
+    api.SetSourceResolution(dpi)
+    api.Recognize()
+    level = tesserocr.RIL.WORD
+    words = []
+    for word in tesserocr.iterate_level(api.GetIterator(), level):
+        text = word.GetUTF8Text(level)
+        box = word.BoundingBox(level)
+        if text and text.strip() and box:
+            words.append({'text': text.strip(), 'confidence': word.Confidence(level), 'box': box})
+    return {'text': api.GetUTF8Text(), 'words': words, 'width': image.width, 'height': image.height}
+
+
+def pixmap_image(pixmap: fitz.Pixmap):
+    from PIL import Image
+
+    mode = {1: 'L', 3: 'RGB'}[pixmap.n]
+    return Image.frombytes(mode, (pixmap.width, pixmap.height), pixmap.samples)
+
+
+def word_blocks(result: Dict[str, Any], page: int = 1) -> List[Dict[str, Any]]:
+    """Textract WORD blocks of a recognize() result"""
+    width, height = float(result['width']), float(result['height'])
+    blocks = []
+    for index, word in enumerate(result['words']):
+        x0, y0, x1, y1 = word['box']
+        blocks.append({
+            'BlockType': 'WORD',
+            'Id': f'tesseract-{page}-{index}',
+            'Page': page,
+            'Text': word['text'],
+            'Confidence': float(word['confidence']),
+            'Geometry': {'BoundingBox': {
+                'Left': x0 / width, 'Top': y0 / height,
+                'Width': (x1 - x0) / width, 'Height': (y1 - y0) / height
+            }},
+        })
+    return blocks
+
+
+class TesseractPool:
+    """Warm tesserocr workers fed from one queue"""
+
+    def __init__(self, size: Optional[int] = None, lang: str = 'eng', oem: Optional[int] = None,
+                 path: Optional[str] = None, api_factory: Optional[Callable[[], Any]] = None):
+        self.size = size or os.cpu_count() or 1
+        self.lang = lang
+        self.api_factory = api_factory or (lambda: create_api(lang, oem, path))
+        self.tasks: queue.Queue = queue.Queue()
+        self.pages_done = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Barrier(self.size + 1)
+        self._errors: List[BaseException] = []
+        self._threads = [
+            threading.Thread(target=self._work, name=f'tesseract-{lang}-{n}', daemon=True)
+            for n in range(self.size)
+        ]
+        for thread in self._threads:
+            thread.start()
+        # Every worker has loaded its model (or failed) before the pool is used
+        self._ready.wait()
+        if self._errors:
+            self.close()
+            raise self._errors[0]
+        logger.info(f"Tesseract pool started: {self.size} worker(s), language {lang}")
+
+    def _work(self):
+        try:
+            api = self.api_factory()
+        except BaseException as e:
+            self._errors.append(e)
+            self._ready.wait()
+            return
+        self._ready.wait()
+        try:
+            while True:
+                task = self.tasks.get()
+                if task is _STOP:
+                    return
+                future, image, dpi, psm = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(recognize(api, image, dpi, psm))
+                except BaseException as e:
+                    future.set_exception(e)
+                with self._lock:
+                    self.pages_done += 1
+        finally:
+            end = getattr(api, 'End', None)
+            if end:
+                end()
+
+    def submit(self, image, dpi: int = DEFAULT_DPI, psm: Optional[int] = None) -> Future:
+        future = Future()
+        self.tasks.put((future, image, dpi, psm))
+        return future
+
+    def recognize(self, image, dpi: int = DEFAULT_DPI, psm: Optional[int] = None) -> Dict[str, Any]:
+        return self.submit(image, dpi, psm).result()
+
+    def close(self):
+        for _ in self._threads:
+            self.tasks.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout=10)
+
+
+def pdf_word_blocks(pdf_path: str, pool: TesseractPool, dpi: int = DEFAULT_DPI,
+                    pages: Optional[Iterable[int]] = None, psm: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Textract WORD blocks for the pages of a PDF (1-based, default all), OCRed by the pool
+
+    Pages are rendered here and queued as they are rendered, so the workers
+    start while later pages are still being rasterized. At most pool.size
+    page images are waiting or being recognized at a time; rendering pauses
+    until a worker finishes one.
+    """
+    futures = []
+    in_flight = threading.BoundedSemaphore(pool.size)
+    with fitz.open(pdf_path) as doc:
+        numbers = sorted(set(pages)) if pages else range(1, doc.page_count + 1)
+        for number in numbers:
+            in_flight.acquire()
+            pixmap = doc[number - 1].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+            future = pool.submit(pixmap_image(pixmap), dpi, psm)
+            del pixmap
+            future.add_done_callback(lambda _: in_flight.release())
+            futures.append((number, future))
+    blocks = []
+    for number, future in futures:
+        blocks.extend(word_blocks(future.result(), number))
+    return blocks
@@ -0,0 +1,114 @@
+"""
+Test .inp canonicalization, hashing and the simulation result cache
+Run with: python -m pytest test_abaqus_cache.py
+"""
+
+import os
+
+from abaqus_cache import (
+    SimulationResultCache, inp_hashes, initial_time_increment, apply_initial_time_increment
+)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_INP = os.path.join(BACKEND_DIR, 'Compression.inp')
+
+
+def write_variant(tmp_path, name, replacements):
+    with open(BASE_INP) as f:
+        content = f.read()
+    for old, new in replacements:
+        assert old in content
+        content = content.replace(old, new)
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+
+def test_formatting_changes_keep_the_input_hash(tmp_path):
+    original = inp_hashes(BASE_INP)
+    reformatted = write_variant(tmp_path, 'reformatted.inp', [
+        ('*Static\n1., 1., 1e-05, 1.', '** reformatted\n*STATIC\n1.0,  1.0, 1.0E-05, 1.0'),
+        ('40., 0.02', '40.0, 2e-2')
+    ])
+    assert inp_hashes(reformatted) == original
+
+
+def test_plastic_change_keeps_only_the_model_hash(tmp_path):
+    original = inp_hashes(BASE_INP)
+    softer = inp_hashes(write_variant(tmp_path, 'softer.inp', [('40., 0.02', '38., 0.02')]))
+    assert softer['model_hash'] == original['model_hash']
+    assert softer['input_hash'] != original['input_hash']
+
+    longer = inp_hashes(write_variant(tmp_path, 'load.inp', [('loading, 3, 3, -50.', 'loading, 3, 3, -60.')]))
+    assert longer['model_hash'] != original['model_hash']
+
+
+def test_initial_increment_rewrite(tmp_path):
+    path = write_variant(tmp_path, 'job.inp', [])
+    assert initial_time_increment(path) == 1.0
+    assert apply_initial_time_increment(path, 0.0625)
+    assert initial_time_increment(path) == 0.0625
+    with open(path) as f:
+        assert '0.0625, 1., 1e-05, 1.' in f.read()
+
+    # Into a copy: the original is left alone
+    copy = str(tmp_path / 'warm.inp')
+    assert apply_initial_time_increment(path, 0.03125, copy)
+    assert initial_time_increment(path) == 0.0625 and initial_time_increment(copy) == 0.03125
+
+
+def test_result_cache_store_restore(tmp_path):
+    run_dir = tmp_path / 'run'
+    run_dir.mkdir()
+    (run_dir / 'Job-1.dat').write_text('dat')
+    (run_dir / 'Job-1.odb').write_bytes(b'odb')
+
+    cache = SimulationResultCache(str(tmp_path / 'cache'))
+    hashes = inp_hashes(BASE_INP)
+    assert cache.lookup(hashes['input_hash']) is None
+
+    cache.store(hashes['input_hash'], hashes['model_hash'], {
+        'dat': str(run_dir / 'Job-1.dat'),
+        'odb': str(run_dir / 'Job-1.odb'),
+        'msg': str(run_dir / 'missing.msg')
+    }, {'results_summary': {'rows': 9}})
+    cache.record_increment_hint(hashes['model_hash'], 0.25)
+    cache.record_increment_hint(hashes['model_hash'], 0.0625)
+
+    # A new instance reads the persisted index
+    reloaded = SimulationResultCache(str(tmp_path / 'cache'))
+    assert reloaded.lookup(hashes['input_hash'])['metadata']['results_summary'] == {'rows': 9}
+    assert reloaded.increment_hint(hashes['model_hash']) == 0.0625
+
+    output_files = reloaded.restore(hashes['input_hash'], str(run_dir), 'Job-2')
+    assert set(output_files) == {'dat', 'odb'}
+    assert (run_dir / 'Job-2.dat').read_text() == 'dat'
+
+
+def test_result_cache_is_shared_linked_and_bounded(tmp_path):
+    run_dir = tmp_path / 'run'
+    run_dir.mkdir()
+    for n in range(3):
+        (run_dir / f'Job-{n}.odb').write_bytes(b'x' * 100)
+
+    # Two workers on one cache directory
+    first = SimulationResultCache(str(tmp_path / 'cache'), max_bytes=250)
+    second = SimulationResultCache(str(tmp_path / 'cache'), max_bytes=250)
+    first.store('a', 'm', {'odb': str(run_dir / 'Job-0.odb')})
+    second.store('b', 'm', {'odb': str(run_dir / 'Job-1.odb')})
+    first.record_increment_hint('m', 0.5)
+    second.record_increment_hint('m', 0.25)
+    assert first.lookup('b') and second.lookup('a') and first.increment_hint('m') == 0.25
+
+    # Restored as a link, not a copy, and marked as recently used
+    output_files = second.restore('a', str(run_dir), 'Restored')
+    assert os.path.samefile(output_files['odb'], run_dir / 'Job-0.odb')
+
+    # Over 250 bytes: the least recently used entry goes
+    first.store('c', 'm', {'odb': str(run_dir / 'Job-2.odb')})
+    assert second.lookup('b') is None and not os.path.exists(tmp_path / 'cache' / 'b')
+    assert first.lookup('a') and first.lookup('c')
+    assert second.restore('b', str(run_dir), 'Gone') == {}
+
+    expiring = SimulationResultCache(str(tmp_path / 'cache'), ttl_seconds=-1)
+    assert expiring.lookup('a') is None and expiring.lookup('c') is None
@@ -0,0 +1,88 @@
+"""
+Test ABAQUS .sta/.msg progress tracking against recorded solver output
+Run with: python -m pytest test_abaqus_progress.py
+"""
+
+import os
+import shutil
+
+from abaqus_progress import SimulationProgressTracker, analysis_time_period
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'abaqus')
+STA_FIXTURE = os.path.join(FIXTURES, 'Compression.sta')
+MSG_FIXTURE = os.path.join(FIXTURES, 'Compression.msg')
+
+
+def test_analysis_time_period_from_inp():
+    inp = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Compression.inp')
+    assert analysis_time_period(inp) == 1.0
+
+
+def test_complete_sta_file():
+    tracker = SimulationProgressTracker(STA_FIXTURE, MSG_FIXTURE, total_time=1.0, started_at=0.0)
+    snapshot = tracker.poll(now=90.0)
+
+    assert snapshot['step'] == 1
+    assert snapshot['increment'] == 9
+    assert snapshot['completed_increments'] == 9
+    assert snapshot['attempts'] == 12
+    assert snapshot['cutbacks'] == 3
+    assert snapshot['finished'] is True
+    assert snapshot['percent_complete'] == 100.0
+    assert snapshot['eta_seconds'] == 0.0
+    assert snapshot['increments_per_minute'] == 6.0
+
+
+def test_incremental_tailing(tmp_path):
+    sta_path = str(tmp_path / 'job.sta')
+    with open(STA_FIXTURE, 'rb') as f:
+        data = f.read()
+
+    tracker = SimulationProgressTracker(sta_path, total_time=1.0, started_at=0.0)
+    assert tracker.poll(now=0.0)['completed_increments'] == 0  # file not written yet
+
+    # Replay the recorded file up to (and partway into) the row for increment 4
+    cut = data.index(b'   1     4   1') + 20
+    with open(sta_path, 'wb') as f:
+        f.write(data[:cut])
+    snapshot = tracker.poll(now=30.0)
+    assert snapshot['increment'] == 3
+    assert snapshot['cutbacks'] == 2
+    assert snapshot['percent_complete'] == 21.9
+    assert snapshot['finished'] is None
+    # 0.219 of the analysis in 30 s -> about 107 s remaining
+    assert 100 < snapshot['eta_seconds'] < 110
+
+    with open(sta_path, 'ab') as f:
+        f.write(data[cut:])
+    snapshot = tracker.poll(now=90.0)
+    assert snapshot['increment'] == 9
+    assert snapshot['attempts'] == 12
+    assert snapshot['finished'] is True
+
+
+def test_msg_reports_attempt_in_progress(tmp_path):
+    sta_path = str(tmp_path / 'job.sta')
+    msg_path = str(tmp_path / 'job.msg')
+    with open(MSG_FIXTURE, 'r') as f:
+        msg = f.read()
+    with open(msg_path, 'w') as f:
+        f.write(msg[:msg.index(' INCREMENT     1 STARTS. ATTEMPT NUMBER  3')])
+
+    tracker = SimulationProgressTracker(sta_path, msg_path, total_time=1.0)
+    snapshot = tracker.poll()
+    assert snapshot['step'] == 1
+    assert snapshot['current_attempt'] == {'increment': 1, 'attempt': 2, 'time_increment': 0.25}
+    assert snapshot['percent_complete'] == 0.0
+
+
+def test_truncated_file_restarts(tmp_path):
+    sta_path = str(tmp_path / 'job.sta')
+    shutil.copy(STA_FIXTURE, sta_path)
+    tracker = SimulationProgressTracker(sta_path, total_time=1.0)
+    tracker.poll()
+
+    with open(sta_path, 'w') as f:
+        f.write('   1     1   1     0     4     4  0.0625     0.0625     0.06250\n')
+    snapshot = tracker.poll()
+    assert snapshot['total_time'] == 0.0625
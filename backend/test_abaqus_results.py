@@ -0,0 +1,70 @@
+"""
+Test .dat result extraction using output written by the fake solver
+Run with: python -m pytest test_abaqus_results.py
+"""
+
+import os
+import sys
+import math
+import shutil
+import subprocess
+
+import pytest
+
+from abaqus_results import (
+    specimen_geometry, extract_dat_results, save_results, load_results, page_results
+)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_INP = os.path.join(BACKEND_DIR, 'Compression.inp')
+
+
+@pytest.fixture(scope='module')
+def dat_file(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp('dat')
+    shutil.copy(BASE_INP, workdir / 'Job-1.inp')
+    subprocess.run(
+        [sys.executable, os.path.join(BACKEND_DIR, 'fake_abaqus.py'), 'job=Job-1', 'input=Job-1.inp', 'interactive'],
+        cwd=workdir, capture_output=True, timeout=30, check=True,
+        env={**os.environ, 'FAKE_ABAQUS_INCREMENT_SECONDS': '0'}
+    )
+    return str(workdir / 'Job-1.dat')
+
+
+def test_specimen_geometry():
+    geometry = specimen_geometry(BASE_INP)
+    assert geometry['length'] == pytest.approx(150.0)
+    assert geometry['area'] == pytest.approx(math.pi * 50.0 ** 2, rel=1e-3)
+
+
+def test_extract_loading_history(dat_file):
+    geometry = specimen_geometry(BASE_INP)
+    columns = extract_dat_results(dat_file, 'loading', geometry['area'], geometry['length'])
+
+    assert columns['increment'].tolist() == list(range(1, 10))
+    assert columns['total_time'][-1] == pytest.approx(1.0)
+    # Boundary displacement is -50 mm on a 150 mm specimen
+    assert columns['displacement'][-1] == pytest.approx(-50.0, rel=1e-3)
+    assert columns['strain'][-1] == pytest.approx(-1.0 / 3.0, rel=1e-3)
+    # Plastic strain ~0.333 lies between the (59, 0.2) and (60, 0.5) *Plastic points
+    assert columns['stress'][-1] == pytest.approx(-59.444, rel=1e-3)
+
+
+def test_unknown_node_set_is_empty(dat_file):
+    columns = extract_dat_results(dat_file, 'fixed')
+    assert len(columns['increment']) == 0
+    assert 'stress' not in columns
+
+
+def test_round_trip_and_pagination(dat_file, tmp_path):
+    columns = extract_dat_results(dat_file, 'loading', area=1.0, length=1.0)
+    path = save_results(columns, str(tmp_path / 'results'))
+    assert path.endswith('.npz')
+
+    loaded = load_results(path)
+    page = page_results(loaded, offset=4, limit=3, names=['increment', 'stress'])
+    assert page['total_rows'] == 9
+    assert page['columns'] == ['increment', 'stress']
+    assert page['data']['increment'] == [5, 6, 7]
+    assert page['next_offset'] == 7
+    assert page_results(loaded, offset=6, limit=3)['next_offset'] is None
@@ -0,0 +1,195 @@
+"""
+Test the ABAQUS simulation scheduler (priority order, token accounting, cancel)
+Run with: python -m pytest test_abaqus_scheduler.py
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from abaqus_scheduler import (
+    SimulationScheduler, license_tokens_for_cpus, process_group_options, process_tree_alive, MAX_PRIORITY
+)
+
+
+class Runner:
+    """Records the order jobs start in; each job runs until released"""
+
+    def __init__(self):
+        self.started = []
+        self.release = {}
+
+    def __call__(self, job):
+        self.started.append(job.job_id)
+        event = self.release.setdefault(job.job_id, threading.Event())
+        while not event.wait(0.01):
+            if job.cancel_event.is_set():
+                return
+
+    def finish(self, job_id):
+        self.release.setdefault(job_id, threading.Event()).set()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_license_tokens_for_cpus():
+    assert [license_tokens_for_cpus(n) for n in (1, 4, 8)] == [5, 8, 12]
+
+
+def test_rejects_pool_without_room_for_one_core():
+    with pytest.raises(ValueError):
+        SimulationScheduler(total_cpus=4, license_tokens=4)
+
+
+def test_jobs_start_in_priority_order():
+    scheduler = SimulationScheduler(total_cpus=1, license_tokens=5)
+    runner = Runner()
+    scheduler.submit('busy', runner)
+    wait_until(lambda: runner.started == ['busy'])
+
+    scheduler.submit('low', runner, priority=-1)
+    scheduler.submit('first', runner, priority=5)
+    scheduler.submit('second', runner, priority=5)
+    scheduler.submit('top', runner, priority=10 ** 6)
+    assert scheduler.get('top').priority == MAX_PRIORITY
+    assert [scheduler.queue_position(job) for job in ('top', 'first', 'second', 'low')] == [1, 2, 3, 4]
+
+    for job_id in ('busy', 'top', 'first', 'second', 'low'):
+        wait_until(lambda: runner.started[-1] == job_id)
+        runner.finish(job_id)
+    assert runner.started == ['busy', 'top', 'first', 'second', 'low']
+
+
+def test_cores_are_limited_by_free_tokens():
+    # 8 cores but only 13 tokens: a 4-core job (8 tokens) leaves room for one single-core job
+    scheduler = SimulationScheduler(total_cpus=8, license_tokens=13)
+    runner = Runner()
+    big = scheduler.submit('big', runner, requested_cpus=4)
+    small = scheduler.submit('small', runner, requested_cpus=2)
+    waiting = scheduler.submit('waiting', runner, requested_cpus=1)
+    wait_until(lambda: len(runner.started) == 2)
+
+    assert (big.cpus, big.license_tokens) == (4, 8)
+    assert (small.cpus, small.license_tokens) == (1, 5)
+    assert waiting.state == 'queued'
+    assert scheduler.stats()['free_license_tokens'] == 0 and scheduler.stats()['free_cpus'] == 3
+
+    runner.finish('big')
+    wait_until(lambda: waiting.state == 'running')
+    runner.finish('small')
+    runner.finish('waiting')
+    wait_until(lambda: scheduler.stats()['running'] == 0)
+    assert scheduler.stats()['free_license_tokens'] == 13 and scheduler.stats()['free_cpus'] == 8
+
+
+def test_cancel_queued_and_running_jobs():
+    scheduler = SimulationScheduler(total_cpus=1, license_tokens=5, max_finished_jobs=1)
+    runner = Runner()
+    running = scheduler.submit('running', runner)
+    queued = scheduler.submit('queued', runner)
+    wait_until(lambda: runner.started == ['running'])
+
+    assert scheduler.cancel('queued')
+    assert queued.state == 'cancelled' and scheduler.queue_position('queued') is None
+    assert scheduler.cancel('running')
+    wait_until(lambda: running.state == 'cancelled')
+    assert not scheduler.cancel('running')
+    assert runner.started == ['running']
+
+    # Only the job that left the queue last is kept
+    wait_until(lambda: scheduler.get('running') is None)
+    assert scheduler.get('queued') is queued and scheduler.stats()['free_cpus'] == 1
+
+
+def running(pid):
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except OSError:
+        return False
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc'), reason='reads process states from /proc')
+def test_cancel_stops_the_solver_children_before_releasing_tokens():
+    scheduler = SimulationScheduler(total_cpus=1, license_tokens=5, terminate_grace=1.0)
+    children = []
+
+    def launcher(job):
+        # Like the abaqus driver: the launcher dies on SIGTERM, its solver child ignores it
+        process = subprocess.Popen(['sh', '-c', "sh -c 'trap \"\" TERM; sleep 30' & echo $!; wait"],
+                                   stdout=subprocess.PIPE, text=True, **process_group_options())
+        job.process = process
+        children.append(int(process.stdout.readline()))
+        process.wait()
+
+    job = scheduler.submit('solver', launcher)
+    wait_until(lambda: children and running(children[0]))
+    launcher_process = job.process
+    assert scheduler.cancel('solver')
+    wait_until(lambda: launcher_process.poll() is not None)
+
+    # The solver still runs, so its tokens stay taken until it is killed
+    assert running(children[0]) and scheduler.stats()['free_license_tokens'] == 0
+    wait_until(lambda: job.state == 'cancelled')
+    assert not running(children[0]) and not process_tree_alive(launcher_process)
+    assert scheduler.stats()['free_license_tokens'] == 5
+
+
+def test_workers_share_one_pool(tmp_path):
+    # Two workers of one server: one ledger of 2 cores and 5 tokens
+    db_path = str(tmp_path / 'queue.db')
+    first, second = (SimulationScheduler(total_cpus=2, license_tokens=5, db_path=db_path, poll_interval=0.02)
+                     for _ in range(2))
+    runner = Runner()
+    cancelled = []
+    running = first.submit('running', runner, requested_cpus=2)
+    wait_until(lambda: runner.started == ['running'])
+    assert (running.cpus, running.license_tokens) == (1, 5)
+
+    # No tokens left for the other worker's jobs
+    waiting = second.submit('waiting', runner, on_cancel=cancelled.append)
+    queued = second.submit('queued', runner)
+    assert waiting.state == 'queued' and first.queue_position('queued') == 2
+    assert first.stats() == {'total_cpus': 2, 'free_cpus': 1, 'license_tokens': 5, 'free_license_tokens': 0,
+                             'queued': 2, 'running': 1}
+
+    # Cancelled from the worker that did not queue it
+    assert first.cancel('waiting')
+    wait_until(lambda: waiting.state == 'cancelled')
+    assert cancelled == [waiting]
+
+    # Released by the first worker, started by the second
+    runner.finish('running')
+    wait_until(lambda: runner.started == ['running', 'queued'])
+    assert queued.state == 'running'
+    assert first.cancel('queued')
+    wait_until(lambda: queued.state == 'cancelled')
+    assert not second.cancel('queued')
+    assert first.stats()['free_license_tokens'] == 5
+
+
+def test_exited_worker_releases_its_jobs(tmp_path):
+    db_path = str(tmp_path / 'queue.db')
+    scheduler = SimulationScheduler(total_cpus=1, license_tokens=5, db_path=db_path, poll_interval=0.02)
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO simulation_jobs (job_id, owner, pid, priority, requested_cpus, cpus, license_tokens, "
+                 "state, queued_at) VALUES ('orphan', 'gone', ?, 0, 1, 1, 5, 'running', 0)", (process.pid,))
+    conn.commit()
+    conn.close()
+
+    runner = Runner()
+    job = scheduler.submit('next', runner)
+    wait_until(lambda: job.state == 'running')
+    runner.finish('next')
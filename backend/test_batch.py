@@ -0,0 +1,155 @@
+"""
+Test batch submission: fan-out to child tasks, aggregate status, combined archive
+Run with: python -m pytest test_batch.py
+"""
+
+import io
+import os
+import json
+import time
+import zipfile
+
+import pytest
+
+from conftest import pdf_bytes, auth_headers
+
+
+@pytest.fixture
+def client(app_module, flask_app, monkeypatch):
+    app = app_module
+
+    def fake_textract(input_path, task_id, user_id, custom_query):
+        if input_path.endswith('_b.pdf'):
+            app.processing_status[task_id] = {'status': 'failed', 'error': 'Textract failed', 'user_id': user_id}
+            return
+        output_file = f"{task_id}_textract_result.txt"
+        with open(os.path.join(app.OUTPUT_FOLDER, output_file), 'w') as f:
+            f.write(f"{os.path.basename(input_path)}: {custom_query}")
+        app.processing_status[task_id] = {
+            'status': 'completed', 'progress': 100, 'user_id': user_id,
+            'result': {'output_file': output_file}
+        }
+
+    monkeypatch.setattr(app, 'process_pdf_with_textract', fake_textract)
+    return app, flask_app.test_client()
+
+
+def wait_for_batch(client, headers, batch_id):
+    for _ in range(100):
+        batch = client.get(f'/api/batch/{batch_id}', headers=headers).get_json()
+        if batch['status'] != 'processing':
+            return batch
+        time.sleep(0.05)
+    raise AssertionError('batch did not finish')
+
+
+def test_files_and_zip_fan_out_to_child_tasks(client):
+    app, client = client
+    headers = auth_headers(client)
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zipf:
+        zipf.writestr('certs/c.pdf', pdf_bytes(text='C'))
+        zipf.writestr('certs/notes.txt', 'not a pdf')
+        zipf.writestr('other/a.pdf', pdf_bytes(text='A again'))
+    archive.seek(0)
+
+    response = client.post('/api/upload_batch', headers=headers, content_type='multipart/form-data', data={
+        'method': 'textract',
+        'custom_query': 'Heat number?',
+        'files': [(io.BytesIO(pdf_bytes(text='A')), 'a.pdf'), (io.BytesIO(pdf_bytes(text='broken')), 'b.pdf'),
+                  (io.BytesIO(b'junk'), 'd.pdf')],
+        'archive': (archive, 'certs.zip'),
+    })
+    assert response.status_code == 202
+    submitted = response.get_json()
+    assert submitted['files'] == 4
+    assert sorted(r['filename'] for r in submitted['rejected']) == ['d.pdf', 'notes.txt']
+
+    batch = wait_for_batch(client, headers, submitted['batch_id'])
+    assert batch['status'] == 'completed' and batch['progress'] == 100
+    assert batch['counts'] == {'completed': 3, 'failed': 1}
+    assert [t['filename'] for t in batch['tasks']] == ['a.pdf', 'b.pdf', 'c.pdf', 'a.pdf']
+
+    response = client.get(f"/api/download_batch/{submitted['batch_id']}", headers=headers)
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.data)) as zipf:
+        summary = json.loads(zipf.read('batch_summary.json'))
+        outputs = [name for name in zipf.namelist() if name.endswith('_textract_result.txt')]
+    assert len(outputs) == 3 and len({name.split('/')[0] for name in outputs}) == 3
+    assert [f['status'] for f in summary['files']] == ['completed', 'failed', 'completed', 'completed']
+
+
+def test_batch_is_private_and_validates_method(client):
+    app, client = client
+    headers = auth_headers(client)
+    assert client.post('/api/upload_batch', headers=headers, data={'method': 'nope'}).status_code == 400
+
+    response = client.post('/api/upload_batch', headers=headers, content_type='multipart/form-data', data={
+        'method': 'textract', 'files': [(io.BytesIO(pdf_bytes(text='A')), 'a.pdf')]
+    })
+    batch_id = response.get_json()['batch_id']
+    assert client.get(f'/api/batch/{batch_id}', headers=auth_headers(client)).status_code == 403
+
+
+def test_quota_is_checked_once_before_the_body_is_stored(client, monkeypatch):
+    app, client = client
+    headers = auth_headers(client)
+    monkeypatch.setattr(app, 'STORAGE_USER_MAX_BYTES', 2000)
+    storage = app.get_storage()
+    admitted = []
+    real_admit = storage.admit
+    monkeypatch.setattr(storage, 'admit', lambda user_id, incoming=0: admitted.append(incoming) or real_admit(user_id, incoming))
+    tasks_before = len(app.processing_status)
+
+    response = client.post('/api/upload_batch', headers=headers, content_type='multipart/form-data', data={
+        'method': 'textract', 'files': [(io.BytesIO(pdf_bytes(text=str(n))), f'{n}.pdf') for n in range(3)]
+    })
+    assert response.status_code == 507
+    assert len(admitted) == 1 and admitted[0] > 2000
+    # Refused before any part reached the disk, and no task was started
+    stored = [files for _, _, files in os.walk(os.path.join('uploads', 'blobs'))]
+    assert not any(stored)
+    assert len(app.processing_status) == tasks_before
+
+
+def test_batch_files_share_the_cores_for_their_pages(client, monkeypatch):
+    app, client = client
+    headers = auth_headers(client)
+    monkeypatch.setattr(app, 'BATCH_PAGE_WORKERS', 3)
+    used = []
+
+    def fake_ocr(input_path, output_path, options, task_id, user_id, page_workers=None):
+        used.append(page_workers)
+        app.processing_status[task_id] = {'status': 'completed', 'progress': 100, 'user_id': user_id, 'result': {}}
+
+    monkeypatch.setattr(app, 'process_pdf_with_ocr_and_camelot', fake_ocr)
+    response = client.post('/api/upload_batch', headers=headers, content_type='multipart/form-data', data={
+        'method': 'ocr', 'files': [(io.BytesIO(pdf_bytes(text=str(n))), f'{n}.pdf') for n in range(2)]
+    })
+    assert response.status_code == 202
+    wait_for_batch(client, headers, response.get_json()['batch_id'])
+    assert used == [3, 3]
+
+
+def test_zip_members_count_against_the_quota_before_extraction(client, monkeypatch):
+    app, client = client
+    headers = auth_headers(client)
+    monkeypatch.setattr(app, 'STORAGE_USER_MAX_BYTES', 20000)
+
+    def post_archive():
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for n in range(3):
+                zipf.writestr(f'{n}.pdf', b'%PDF-1.4\n' + b'0' * 10000)
+        archive.seek(0)
+        return client.post('/api/upload_batch', headers=headers, content_type='multipart/form-data', data={
+            'method': 'textract', 'archive': (archive, 'small.zip')
+        })
+
+    # The compressed archive fits, the 30 kB it expands to does not
+    assert post_archive().status_code == 507
+    monkeypatch.setattr(app, 'CHUNKED_UPLOAD_MAX_SIZE', 20000)
+    assert post_archive().status_code == 400
+    stored = [files for _, _, files in os.walk('uploads') if any(f.endswith('.pdf') for f in files)]
+    assert not stored
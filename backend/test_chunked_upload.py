@@ -0,0 +1,97 @@
+"""
+Test resumable chunked uploads (out-of-order chunks, resume info, finalize)
+Run with: python -m pytest test_chunked_upload.py
+"""
+
+import io
+import os
+import hashlib
+
+import pytest
+
+from chunked_upload import ChunkedUploadStore, ChunkedUploadError, merge_ranges
+from conftest import pdf_bytes, auth_headers
+from ingest import UploadRejected
+
+
+def test_merge_ranges():
+    assert merge_ranges([(10, 20), (0, 5), (5, 10), (30, 40)]) == [(0, 20), (30, 40)]
+
+
+def test_out_of_order_chunks_resume_and_finalize(tmp_path):
+    store = ChunkedUploadStore(str(tmp_path / 'chunked'))
+    data = pdf_bytes(4, 'x' * 200)
+    size = 1000
+    session = store.create(7, 'scan.pdf', len(data), hashlib.sha256(data).hexdigest())
+    upload_id = session['upload_id']
+    # Preallocated to the full length
+    assert os.path.getsize(store.data_path(upload_id)) == len(data)
+
+    chunks = [(offset, data[offset:offset + size]) for offset in range(0, len(data), size)]
+    for offset, chunk in reversed(chunks[1:]):
+        store.write_chunk(upload_id, 7, offset, io.BytesIO(chunk), len(chunk))
+
+    # A dropped connection: only part of the first chunk arrived
+    with pytest.raises(ChunkedUploadError):
+        store.write_chunk(upload_id, 7, 0, io.BytesIO(chunks[0][1][:300]), len(chunks[0][1]))
+    session = store.get(upload_id, 7)
+    assert session['missing'] == [[300, size]] and session['offset'] == 300
+    with pytest.raises(ChunkedUploadError) as e:
+        store.finalize(upload_id, 7, str(tmp_path / 'uploads'))
+    assert e.value.status == 409
+
+    store.write_chunk(upload_id, 7, 300, io.BytesIO(data[300:size]), size - 300)
+    session = store.finalize(upload_id, 7, str(tmp_path / 'uploads'))
+    assert session['status'] == 'complete' and session['blob']['pages'] == 4
+    assert open(session['blob']['blob_path'], 'rb').read() == data
+
+    completed = store.completed(upload_id, 7)
+    assert completed.filename == 'scan.pdf'
+    assert store.completed(upload_id, 8) is None
+
+
+def test_bad_requests_are_rejected(tmp_path):
+    store = ChunkedUploadStore(str(tmp_path / 'chunked'), max_size=10000)
+    with pytest.raises(ChunkedUploadError) as e:
+        store.create(1, 'big.pdf', 10001)
+    assert e.value.status == 413
+
+    upload_id = store.create(1, 'a.pdf', 100, sha256='0' * 64)['upload_id']
+    with pytest.raises(ChunkedUploadError) as e:
+        store.write_chunk(upload_id, 1, 90, io.BytesIO(b'x' * 20), 20)
+    assert e.value.status == 416
+    with pytest.raises(ChunkedUploadError) as e:
+        store.get(upload_id, 2)
+    assert e.value.status == 404
+
+    store.write_chunk(upload_id, 1, 0, io.BytesIO(b'%PDF-' + b'x' * 95), 100)
+    with pytest.raises(UploadRejected):
+        store.finalize(upload_id, 1, str(tmp_path / 'uploads'))
+    assert store.get(upload_id, 1)['status'] == 'failed'
+
+
+def test_upload_routes_accept_upload_id(tmp_path, app_module, flask_app, client):
+    app = app_module
+    headers = auth_headers(client)
+
+    data = pdf_bytes(pages=2)
+    response = client.post('/api/uploads', json={'filename': 'scan.pdf', 'length': len(data)}, headers=headers)
+    assert response.status_code == 201
+    upload_id = response.get_json()['upload_id']
+
+    half = len(data) // 2
+    for offset, chunk in ((half, data[half:]), (0, data[:half])):
+        response = client.patch(f'/api/uploads/{upload_id}', data=chunk,
+                                headers=dict(headers, **{'Upload-Offset': str(offset)}))
+        assert response.status_code == 200
+    response = client.head(f'/api/uploads/{upload_id}', headers=headers)
+    assert response.headers['Upload-Offset'] == str(len(data))
+
+    response = client.post(f'/api/uploads/{upload_id}/finalize', headers=headers)
+    assert response.status_code == 200 and response.get_json()['blob']['pages'] == 2
+
+    with flask_app.test_request_context('/', method='POST', data={'upload_id': upload_id}, headers=headers):
+        from flask_jwt_extended import verify_jwt_in_request
+        verify_jwt_in_request()
+        info = app.store_upload(app.requested_upload(), str(tmp_path / 'input.pdf'))
+    assert open(info['path'], 'rb').read() == data
@@ -0,0 +1,44 @@
+"""
+Test the lazy engine registry and that app.py starts without the heavy engines
+Run with: python -m pytest test_engines.py
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+import engines
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_module_is_imported_and_configured_once(tmp_path, monkeypatch):
+    (tmp_path / 'fake_engine.py').write_text('def loads():\n    return 0\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    configured = []
+
+    module = engines.register('fake_engine', configure=configured.append)
+    decode = engines.lazy_import('fake_engine', 'loads')
+    assert engines.register('fake_engine') is module
+    assert not module.loaded and 'fake_engine' not in sys.modules
+
+    assert decode() == 0
+    module.api_key = 'secret'
+    assert module.loaded and len(configured) == 1
+    assert sys.modules['fake_engine'].api_key == 'secret'
+    assert 'fake_engine' in engines.loaded_engines()
+
+    monkeypatch.delitem(engines.ENGINES, 'fake_engine')
+    monkeypatch.delitem(sys.modules, 'fake_engine')
+
+
+def test_app_import_skips_heavy_engines(tmp_path):
+    script = (
+        f"import sys, json; sys.path.insert(0, {BACKEND_DIR!r}); import app\n"
+        "print(json.dumps(sorted(m for m in ('ocrmypdf', 'zhipuai', 'pandas', 'numpy', 'fitz') if m in sys.modules)))"
+    )
+    output = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, capture_output=True, text=True, check=True)
+    assert json.loads(output.stdout.strip().splitlines()[-1]) == []
+    # users.db is created on the first request, not at import
+    assert not (tmp_path / 'users.db').exists()
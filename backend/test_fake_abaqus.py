@@ -0,0 +1,221 @@
+"""
+End-to-end test of the ABAQUS simulation endpoints using the fake solver
+Run with: python -m pytest test_fake_abaqus.py
+"""
+
+import os
+import sys
+import time
+import uuid
+import shutil
+import subprocess
+
+import pytest
+
+from abaqus_cache import inp_hashes
+from conftest import register
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+FAKE_ABAQUS = os.path.join(BACKEND_DIR, 'fake_abaqus.py')
+BASE_INP = os.path.join(BACKEND_DIR, 'Compression.inp')
+
+
+@pytest.fixture
+def client(app_module, flask_app, monkeypatch):
+    monkeypatch.setenv('FAKE_ABAQUS_INCREMENT_SECONDS', '0.01')
+    monkeypatch.setattr(app_module, 'ABAQUS_FAKE', True)
+    monkeypatch.setattr(app_module, 'ABAQUS_PROGRESS_INTERVAL', 0.05)
+    return flask_app.test_client()
+
+
+def seed_generator_task(user_id):
+    """Stand in for a completed GLM ABAQUS generator task"""
+    import app
+    task_id = str(uuid.uuid4())
+    inp_filename = f"Compression_{task_id[:8]}.inp"
+    inp_path = os.path.join(app.OUTPUT_FOLDER, inp_filename)
+    shutil.copy(BASE_INP, inp_path)
+    app.processing_status[task_id] = {
+        'status': 'completed',
+        'user_id': str(user_id),
+        'output_file': inp_filename,
+        'output_file_path': inp_path
+    }
+    return task_id
+
+
+def wait_for(client, headers, sim_task_id, states=('completed', 'error', 'cancelled'), timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        data = client.get(f'/api/simulation_status/{sim_task_id}', headers=headers).get_json()
+        if data['status'] in states:
+            return data
+        time.sleep(0.05)
+    raise AssertionError(f"Simulation {sim_task_id} did not finish: {data}")
+
+
+def test_fake_solver_writes_result_files(tmp_path):
+    shutil.copy(BASE_INP, tmp_path / 'Job-1.inp')
+    result = subprocess.run(
+        [sys.executable, FAKE_ABAQUS, 'job=Job-1', 'input=Job-1.inp', 'cpus=2', 'interactive'],
+        cwd=tmp_path, capture_output=True, text=True, timeout=30,
+        env={**os.environ, 'FAKE_ABAQUS_INCREMENT_SECONDS': '0'}
+    )
+    assert result.returncode == 0
+    assert 'Abaqus JOB Job-1 COMPLETED' in result.stdout
+    for ext in ('odb', 'dat', 'msg', 'sta', 'log'):
+        assert (tmp_path / f'Job-1.{ext}').exists()
+    assert 'COMPLETED SUCCESSFULLY' in (tmp_path / 'Job-1.sta').read_text()
+    assert 'NODE SET ASSEMBLY_LOADING' in (tmp_path / 'Job-1.dat').read_text()
+
+
+def test_fake_solver_failure(tmp_path):
+    shutil.copy(BASE_INP, tmp_path / 'Job-1.inp')
+    result = subprocess.run(
+        [sys.executable, FAKE_ABAQUS, 'job=Job-1', 'input=Job-1.inp', 'interactive'],
+        cwd=tmp_path, capture_output=True, text=True, timeout=30,
+        env={**os.environ, 'FAKE_ABAQUS_INCREMENT_SECONDS': '0', 'FAKE_ABAQUS_FAIL': '1'}
+    )
+    assert result.returncode == 1
+    assert 'HAS NOT BEEN COMPLETED' in (tmp_path / 'Job-1.sta').read_text()
+
+
+def test_simulation_through_endpoints(client):
+    headers, user_id = register(client)
+    task_id = seed_generator_task(user_id)
+
+    response = client.post(f'/api/run_abaqus_simulation/{task_id}', json={'cpus': 1}, headers=headers)
+    assert response.status_code == 202
+    sim_task_id = response.get_json()['simulation_task_id']
+
+    data = wait_for(client, headers, sim_task_id)
+    assert data['status'] == 'completed', data['message']
+    assert data['progress'] == 100
+    assert data['percent_complete'] == 100.0
+    assert data['sta_progress']['cutbacks'] == 3
+    assert data['cpus'] == 1
+    assert data['solve_seconds'] > 0
+    assert set(data['output_files']) >= {'odb', 'dat', 'msg', 'sta'}
+
+    response = client.get(f'/api/download_result/{sim_task_id}/dat', headers=headers)
+    assert response.status_code == 200
+    assert b'N O D E   O U T P U T' in response.data
+
+    assert data['output_files']['results'].endswith('_results.npz')
+    response = client.get(f'/api/simulation_results/{sim_task_id}?limit=5&columns=strain,stress', headers=headers)
+    assert response.status_code == 200
+    page = response.get_json()
+    assert page['total_rows'] == 9
+    assert page['next_offset'] == 5
+    assert len(page['data']['stress']) == 5
+
+
+def test_cancel_running_simulation(client, monkeypatch):
+    monkeypatch.setenv('FAKE_ABAQUS_INCREMENT_SECONDS', '1')
+    headers, user_id = register(client)
+    task_id = seed_generator_task(user_id)
+
+    sim_task_id = client.post(f'/api/run_abaqus_simulation/{task_id}', headers=headers).get_json()['simulation_task_id']
+    wait_for(client, headers, sim_task_id, states=('running',))
+
+    response = client.post(f'/api/cancel_simulation/{sim_task_id}', headers=headers)
+    assert response.status_code == 200
+    assert wait_for(client, headers, sim_task_id)['status'] == 'cancelled'
+
+
+def test_cancel_queued_simulation(client, monkeypatch):
+    monkeypatch.setenv('FAKE_ABAQUS_INCREMENT_SECONDS', '1')
+    headers, user_id = register(client)
+    task_id = seed_generator_task(user_id)
+
+    # One core: the second run waits in the queue
+    running, queued = (client.post(f'/api/run_abaqus_simulation/{task_id}', json={'use_cache': False},
+                                   headers=headers).get_json()['simulation_task_id'] for _ in range(2))
+    wait_for(client, headers, running, states=('running',))
+
+    response = client.post(f'/api/cancel_simulation/{queued}', headers=headers)
+    assert response.status_code == 200 and response.get_json()['status'] == 'cancelled'
+    assert client.get(f'/api/simulation_status/{queued}', headers=headers).get_json()['status'] == 'cancelled'
+    client.post(f'/api/cancel_simulation/{running}', headers=headers)
+    assert wait_for(client, headers, running)['status'] == 'cancelled'
+
+
+def test_repeated_simulation_reuses_cache(client):
+    import app
+    headers, user_id = register(client)
+
+    first = client.post(f'/api/run_abaqus_simulation/{seed_generator_task(user_id)}', headers=headers)
+    assert wait_for(client, headers, first.get_json()['simulation_task_id'])['status'] == 'completed'
+
+    # Identical model under another job name: served from the cache without queueing
+    response = client.post(f'/api/run_abaqus_simulation/{seed_generator_task(user_id)}', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['cache_hit'] is True
+    data = wait_for(client, headers, response.get_json()['simulation_task_id'])
+    assert data['status'] == 'completed'
+    assert app.simulation_scheduler.get(response.get_json()['simulation_task_id']) is None
+    assert os.path.exists(data['output_files']['results'])
+
+    # Only the *Plastic table changed: solved again, starting from the converged increment
+    task_id = seed_generator_task(user_id)
+    inp_path = app.processing_status[task_id]['output_file_path']
+    with open(inp_path) as f:
+        content = f.read()
+    with open(inp_path, 'w') as f:
+        f.write(content.replace('39.,   0.', '41.,   0.'))
+    input_hash = inp_hashes(inp_path)['input_hash']
+
+    response = client.post(f'/api/run_abaqus_simulation/{task_id}', headers=headers)
+    assert response.status_code == 202
+    data = wait_for(client, headers, response.get_json()['simulation_task_id'])
+    assert data['status'] == 'completed'
+    assert data['model_hash'] == app.processing_status[first.get_json()['simulation_task_id']]['model_hash']
+    assert data['warm_start']['replaced_time_increment'] == 1.0
+    assert data['warm_start']['initial_time_increment'] < 1.0
+    # The generated .inp (and so its hash) is unchanged; only the scratch copy was edited
+    assert inp_hashes(inp_path)['input_hash'] == input_hash == data['input_hash']
+
+
+def test_concurrent_runs_of_one_input_are_isolated(client):
+    import app
+    headers, user_id = register(client)
+    task_id = seed_generator_task(user_id)
+    inp_path = app.processing_status[task_id]['output_file_path']
+    with open(inp_path) as f:
+        original = f.read()
+
+    # Same .inp, so the same job name, running side by side
+    sim_ids = [
+        client.post(f'/api/run_abaqus_simulation/{task_id}', json={'cpus': 1, 'use_cache': False},
+                    headers=headers).get_json()['simulation_task_id']
+        for _ in range(2)
+    ]
+    results = [wait_for(client, headers, sim_id) for sim_id in sim_ids]
+    assert [data['status'] for data in results] == ['completed', 'completed']
+
+    dirs = {os.path.dirname(data['output_files']['odb']) for data in results}
+    assert len(dirs) == 2
+    for data in results:
+        assert set(os.listdir(os.path.dirname(data['output_files']['odb']))) == {
+            os.path.basename(path) for path in data['output_files'].values()
+        }
+    # Nothing is left in scratch, and the generated .inp is untouched
+    assert os.listdir(app.ABAQUS_SCRATCH_DIR) == []
+    assert not any(name.endswith(('.lck', '.log', '.sta')) for name in os.listdir(app.OUTPUT_FOLDER))
+    with open(inp_path) as f:
+        assert f.read() == original
+
+
+def test_stale_working_directories_are_removed(tmp_path):
+    from abaqus_workdir import create_workdir, remove_stale_workdirs
+    stale = create_workdir(str(tmp_path), 'dead-run', BASE_INP, 'Job-1')
+    live = create_workdir(str(tmp_path), 'live-run', BASE_INP, 'Job-1')
+    old = time.time() - 2 * 86400
+    for path in (stale, os.path.join(stale, 'Job-1.inp'), live, os.path.join(live, 'Job-1.inp')):
+        os.utime(path, (old, old))
+    # The live run is still writing its .sta
+    with open(os.path.join(live, 'Job-1.sta'), 'w') as f:
+        f.write('SUMMARY OF JOB INFORMATION\n')
+
+    assert remove_stale_workdirs(str(tmp_path), 86400) == 1
+    assert not os.path.exists(stale) and os.path.exists(live)
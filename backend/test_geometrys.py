@@ -0,0 +1,55 @@
+"""
+Test BoundingBoxArray against the per-word BoundingBox
+Run with: python -m pytest test_geometrys.py
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from geometrys import BoundingBox, BoundingBoxArray
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module')
+def textract_blocks():
+    with open(os.path.join(BACKEND_DIR, 'response.json')) as f:
+        return json.load(f)['Blocks']
+
+
+def test_matches_bounding_box(textract_blocks):
+    boxes = BoundingBoxArray.from_textract_blocks(textract_blocks)
+    words = [b for b in textract_blocks if b['BlockType'] == 'WORD']
+    assert len(boxes) == len(words)
+    assert (boxes.pages == 1).all()
+
+    boxes.scale(595, 842)
+    for i in (0, len(words) // 2, len(words) - 1):
+        expected = BoundingBox.from_textract_bbox(words[i]['Geometry']['BoundingBox'])
+        expected.scale(595, 842)
+        assert boxes[i].bounds == pytest.approx(expected.bounds)
+        assert boxes.width[i] == pytest.approx(expected.width)
+        assert boxes.height[i] == pytest.approx(expected.height)
+        assert textract_blocks[boxes.block_indices[i]] is words[i]
+
+
+def test_region_queries():
+    # Textract convention: bottom = top + height
+    boxes = BoundingBoxArray(np.array([
+        [0.1, 0.2, 0.3, 0.1],
+        [0.5, 0.6, 0.7, 0.5],
+        [0.25, 0.25, 0.55, 0.15]
+    ]), pages=[1, 1, 2])
+
+    region = [0.0, 0.3, 0.4, 0.0]
+    assert boxes.contained_in(region).tolist() == [True, False, False]
+    assert boxes.intersects(region).tolist() == [True, False, True]
+    assert boxes.intersection_area(region)[2] == pytest.approx(0.15 * 0.1)
+    assert boxes.intersects(BoundingBox(0.6, 0.55, 0.65, 0.52)).tolist() == [False, True, False]
+    assert boxes.contains_point(0.6, 0.55).tolist() == [False, True, False]
+
+    page_two = boxes.on_page(2)
+    assert len(page_two) == 1 and page_two.block_indices.tolist() == [2]
@@ -4,9 +4,10 @@ import sys
 try:
     import app
     print(f"✓ App imported successfully")
-    print(f"Total routes: {len(list(app.app.url_map.iter_rules()))}")
+    flask_app = app.create_app()
+    print(f"Total routes: {len(list(flask_app.url_map.iter_rules()))}")
     
-    routes = [str(r) for r in app.app.url_map.iter_rules()]
+    routes = [str(r) for r in flask_app.url_map.iter_rules()]
     print("\nAll routes:")
     for r in sorted(routes):
         print(f"  {r}")
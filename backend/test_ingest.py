@@ -0,0 +1,72 @@
+"""
+Test streaming upload ingestion (hashing, PDF checks, content-addressed storage)
+Run with: python -m pytest test_ingest.py
+"""
+
+import io
+import os
+import hashlib
+
+from flask import Flask, request, jsonify
+
+from conftest import pdf_bytes
+from ingest import IngestRequest, UploadRejected, ingest_upload
+
+
+def make_client(upload_dir):
+    app = Flask(__name__)
+    app.config['UPLOAD_FOLDER'] = upload_dir
+    app.request_class = IngestRequest
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        file = request.files['file']
+        try:
+            info = ingest_upload(file, os.path.join(upload_dir, request.form['name']), upload_dir)
+        except UploadRejected as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(info)
+
+    return app.test_client()
+
+
+def post(client, data, name, filename='doc.pdf'):
+    return client.post('/upload', data={'file': (io.BytesIO(data), filename), 'name': name},
+                       content_type='multipart/form-data')
+
+
+def leftover_parts(upload_dir):
+    incoming = os.path.join(upload_dir, 'blobs', '.incoming')
+    return os.listdir(incoming) if os.path.isdir(incoming) else []
+
+
+def test_pdf_is_stored_once_by_hash(tmp_path):
+    upload_dir = str(tmp_path)
+    client = make_client(upload_dir)
+    data = pdf_bytes(pages=3)
+
+    first = post(client, data, 'a.pdf').get_json()
+    assert first['sha256'] == hashlib.sha256(data).hexdigest()
+    assert first['size'] == len(data) and first['pages'] == 3 and not first['duplicate']
+    assert open(first['path'], 'rb').read() == data
+
+    second = post(client, data, 'b.pdf').get_json()
+    assert second['duplicate'] and second['blob_path'] == first['blob_path']
+    # Both task inputs are links to the same blob
+    assert os.stat(first['path']).st_ino == os.stat(second['path']).st_ino == os.stat(first['blob_path']).st_ino
+    assert leftover_parts(upload_dir) == []
+
+
+def test_bad_files_are_rejected_without_leftovers(tmp_path):
+    upload_dir = str(tmp_path)
+    client = make_client(upload_dir)
+
+    response = post(client, b'<html>not a pdf</html>' * 100, 'x.pdf')
+    assert response.status_code == 400 and 'not a PDF' in response.get_json()['error']
+
+    response = post(client, b'%PDF-1.7\n' + b'garbage' * 50, 'y.pdf')
+    assert response.status_code == 400
+
+    assert post(client, b'', 'z.pdf').status_code == 400
+    assert leftover_parts(upload_dir) == []
+    assert not os.path.exists(tmp_path / 'x.pdf') and not os.path.exists(tmp_path / 'y.pdf')
@@ -0,0 +1,54 @@
+"""
+Test OCR profiles (resolution, overrides, missing tools, CLI arguments)
+Run with: python -m pytest test_ocr_profiles.py
+"""
+
+import pytest
+
+import ocr_profiles
+from ocr_profiles import OCRProfileError, profile_options, profile_args
+
+ALL_TOOLS = {name: '1.0' for name in ocr_profiles.TOOLS}
+
+
+@pytest.fixture
+def tools(monkeypatch):
+    found = dict(ALL_TOOLS)
+    monkeypatch.setattr(ocr_profiles, '_tools', found)
+    return found
+
+
+def test_profiles_and_overrides(tools):
+    fast = profile_options({'profile': 'fast'})
+    assert profile_args(fast) == ['--language', 'eng', '--optimize', '0', '--tesseract-oem', '1',
+                                  '--tesseract-pagesegmode', '3', '--output-type', 'pdf']
+
+    # The default keeps the old /api/upload settings
+    assert profile_args(profile_options()) == ['--language', 'eng', '--optimize', '1', '--deskew']
+
+    archival = profile_options({'profile': 'archival', 'clean': False, 'optimize': '3', 'language': 'deu'})
+    assert archival['clean'] is False and archival['optimize'] == 3
+    assert '--oversample' in profile_args(archival) and '--rotate-pages' in profile_args(archival)
+    # Resolving again changes nothing
+    assert profile_options(archival) == archival
+
+    for options in ({'profile': 'ultra'}, {'optimize': '9'}, {'optimize': 'max'}):
+        with pytest.raises(OCRProfileError):
+            profile_options(options)
+
+
+def test_missing_tools_are_dropped(tools):
+    tools.update(unpaper=None, pngquant=None, gs=None)
+    archival = profile_options({'profile': 'archival'})
+    assert archival['clean'] is False and archival['optimize'] == 1 and archival['output_type'] == 'pdf'
+
+
+def test_tools_are_probed_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ocr_profiles, '_tools', None)
+    monkeypatch.setattr(ocr_profiles.shutil, 'which', lambda name: calls.append(name))
+    for _ in range(3):
+        profile_options({'profile': 'archival'})
+    assert calls == list(ocr_profiles.TOOLS)
+    ocr_profiles.probe_tools(refresh=True)
+    assert len(calls) == 2 * len(ocr_profiles.TOOLS)
@@ -0,0 +1,47 @@
+"""
+Test the per-page OCR classifier (skip / redo / ocr / force)
+Run with: python -m pytest test_page_classifier.py
+"""
+
+import fitz  # PyMuPDF
+
+from page_classifier import classify_pages, classify_features, action_counts
+
+
+def scan(page, rect=None):
+    page.insert_image(rect or page.rect, pixmap=fitz.Pixmap(fitz.csGRAY, (0, 0, 40, 40), 0))
+
+
+def test_mixed_document(tmp_path):
+    doc = fitz.open()
+    # 1: digital report page
+    page = doc.new_page()
+    for n in range(30):
+        page.insert_text((72, 72 + n * 20), 'Specimen 0047-001 tensile test results ' * 2)
+    # 2: scanned appendix
+    scan(doc.new_page())
+    # 3: scanned page with an earlier OCR layer
+    page = doc.new_page()
+    scan(page)
+    page.insert_text((72, 72), 'Heat number 12345', render_mode=3)
+    # 4: digital caption above a pasted-in scan
+    page = doc.new_page()
+    page.insert_text((72, 40), 'Figure 3')
+    scan(page, fitz.Rect(0, 100, page.rect.width, page.rect.height))
+    path = str(tmp_path / 'mixed.pdf')
+    doc.save(path)
+    doc.close()
+
+    classes = classify_pages(path)
+    assert [classes[n]['action'] for n in (1, 2, 3, 4)] == ['skip', 'ocr', 'skip', 'redo']
+    assert classes[2]['image_coverage'] == 1.0 and classes[2]['fonts'] == 0
+    assert classes[3]['invisible_chars'] and not classes[3]['visible_chars']
+
+    assert action_counts(classify_pages(path, [2, 4])) == {'skip': 0, 'redo': 1, 'ocr': 1, 'force': 0}
+    assert set(c['action'] for c in classify_pages(path, force_ocr=True).values()) == {'force'}
+
+
+def test_unmapped_text_is_forced():
+    features = {'text_coverage': 0.2, 'image_coverage': 0.0, 'fonts': 1,
+                'visible_chars': 100, 'invisible_chars': 0, 'unreadable': 0.8}
+    assert classify_features(features) == 'force'
@@ -0,0 +1,168 @@
+"""
+Test per-page incremental OCR (split, parallel pages, partial and full merges)
+Run with: python -m pytest test_page_ocr.py
+"""
+
+import os
+import sys
+import uuid
+
+import fitz  # PyMuPDF
+import pytest
+
+import page_ocr
+from page_ocr import PageOCRError, split_pages, ocr_pages, finished_pages, merge_pages, merge_text
+from conftest import register
+
+# Stands in for ocrmypdf: copies the page and writes its text as the sidecar
+FAKE_OCRMYPDF = '''
+import sys, shutil, fitz
+args = sys.argv[1:]
+sidecar = args[args.index('--sidecar') + 1]
+source, output = args[-2], args[-1]
+with fitz.open(source) as doc:
+    text = doc[0].get_text()
+if 'fail' in text:
+    sys.exit(2)
+shutil.copyfile(source, output)
+open(sidecar, 'w').write('OCR ' + text + '\\f')
+'''
+
+
+def write_pdf(path, texts):
+    """One page per text; None makes an image-only (scanned) page"""
+    doc = fitz.open()
+    for text in texts:
+        page = doc.new_page()
+        if text is None:
+            page.insert_image(page.rect, pixmap=fitz.Pixmap(fitz.csGRAY, (0, 0, 40, 40), 0))
+        else:
+            page.insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+
+
+@pytest.fixture
+def fake_ocrmypdf(tmp_path, monkeypatch):
+    script = tmp_path / 'fake_ocrmypdf.py'
+    script.write_text(FAKE_OCRMYPDF)
+    launcher = tmp_path / 'ocrmypdf'
+    launcher.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+    launcher.chmod(0o755)
+    monkeypatch.setattr(page_ocr, 'OCRMYPDF_CMD', str(launcher))
+
+
+def test_pages_finish_one_by_one_and_merge(tmp_path, fake_ocrmypdf):
+    input_path = tmp_path / 'report.pdf'
+    write_pdf(input_path, [f'Page {n}' for n in range(1, 7)])
+    pages_dir = str(tmp_path / 'pages')
+
+    selected = split_pages(str(input_path), pages_dir, [2, 3, 5])
+    assert selected == [2, 3, 5] and finished_pages(pages_dir) == []
+
+    seen = []
+    ocr_pages(pages_dir, selected, {'language': 'eng'}, workers=2, on_page=seen.append)
+    assert sorted(seen) == [2, 3, 5] and finished_pages(pages_dir) == [2, 3, 5]
+
+    partial = str(tmp_path / 'partial.pdf')
+    assert merge_pages(None, pages_dir, partial, partial=True) == [2, 3, 5]
+    with fitz.open(partial) as doc:
+        assert [page.get_text().strip() for page in doc] == ['Page 2', 'Page 3', 'Page 5']
+
+    # The full output keeps the unselected pages from the source
+    full = str(tmp_path / 'full.pdf')
+    merge_pages(str(input_path), pages_dir, full)
+    with fitz.open(full) as doc:
+        assert [page.get_text().strip() for page in doc] == [f'Page {n}' for n in range(1, 7)]
+
+    text = str(tmp_path / 'full.txt')
+    merge_text(pages_dir, text)
+    assert open(text).read() == 'OCR Page 2\n\fOCR Page 3\n\fOCR Page 5\n\f'
+
+
+def test_failed_page_keeps_finished_pages(tmp_path, fake_ocrmypdf):
+    input_path = tmp_path / 'report.pdf'
+    write_pdf(input_path, ['Page 1', 'Page 2', 'fail'])
+    pages_dir = str(tmp_path / 'pages')
+
+    with pytest.raises(PageOCRError) as e:
+        ocr_pages(pages_dir, split_pages(str(input_path), pages_dir), {}, workers=1)
+    assert e.value.page == 3
+    assert finished_pages(pages_dir) == [1, 2]
+    assert not [name for name in os.listdir(pages_dir) if '.part.' in name]
+
+
+def test_download_partial(tmp_path, app_module, client, fake_ocrmypdf):
+    app = app_module
+    headers, user_id = register(client)
+
+    write_pdf(tmp_path / 'report.pdf', ['Page 1', 'Page 2', 'Page 3'])
+    pages_dir = str(tmp_path / 'pages')
+    ocr_pages(pages_dir, split_pages(str(tmp_path / 'report.pdf'), pages_dir, [1, 3]), {})
+
+    task_id = str(uuid.uuid4())
+    app.processing_status[task_id] = {'status': 'processing', 'user_id': user_id,
+                                      'pages_dir': str(tmp_path / 'empty'), 'pages_total': 3}
+    assert client.get(f'/api/download_partial/{task_id}', headers=headers).status_code == 409
+
+    app.processing_status[task_id] = dict(app.processing_status[task_id], pages_dir=pages_dir)
+    response = client.get(f'/api/download_partial/{task_id}', headers=headers)
+    assert response.status_code == 200
+    assert response.headers['X-Pages'] == '1,3' and response.headers['X-Pages-Total'] == '3'
+    with fitz.open(stream=response.data, filetype='pdf') as doc:
+        assert doc.page_count == 2
+
+    response = client.get(f'/api/download_partial/{task_id}?format=txt', headers=headers)
+    assert response.data.decode() == 'OCR Page 1\n\fOCR Page 3\n\f'
+
+
+def test_ocr_task_reports_pages(tmp_path, app_module, fake_ocrmypdf):
+    app = app_module
+    write_pdf(tmp_path / 'report.pdf', ['Page 1', None, 'Page 3', None])
+
+    task_id = str(uuid.uuid4())
+    output_path = os.path.join(app.OUTPUT_FOLDER, 'OCR_report.pdf')
+    options = {'extract_tables': False, 'pages': [2, 3]}
+    app.process_pdf_with_ocr_and_camelot(str(tmp_path / 'report.pdf'), output_path, options, task_id, 1)
+
+    status = app.processing_status[task_id]
+    assert status['status'] == 'completed', status['message']
+    assert status['pages_done'] == status['pages_total'] == 2
+    # The scanned page is OCRed, the digital one copied as it is
+    assert status['page_actions'] == {'skip': 1, 'redo': 0, 'ocr': 1, 'force': 0}
+    assert open(os.path.join(app.OUTPUT_FOLDER, status['text_file'])).read() == 'OCR \fPage 3\n\f'
+    with fitz.open(output_path) as doc:
+        assert doc.page_count == 4
+    assert not os.path.exists(os.path.join(app.OUTPUT_FOLDER, f'pages_{task_id}'))
+
+
+def test_failed_task_pages_expire(tmp_path, app_module, monkeypatch, fake_ocrmypdf):
+    app = app_module
+    monkeypatch.setattr(app, 'STORAGE_TTL_SECONDS', 3600)
+    monkeypatch.setattr(app, 'STORAGE_GRACE_SECONDS', 0)
+    storage = app.get_storage()
+    write_pdf(tmp_path / 'report.pdf', ['Page 1', 'fail'])
+    write_pdf(tmp_path / 'broken.pdf', ['fail'])
+
+    kept, dropped = str(uuid.uuid4()), str(uuid.uuid4())
+    # Forced, so the digital test pages are OCRed (and fail) rather than skipped
+    options = {'extract_tables': False, 'force_ocr': True}
+    monkeypatch.setattr(app, 'OCR_PAGE_WORKERS', 1)
+    app.process_pdf_with_ocr_and_camelot(str(tmp_path / 'report.pdf'), 'outputs/OCR_report.pdf', options, kept, 1)
+    app.process_pdf_with_ocr_and_camelot(str(tmp_path / 'broken.pdf'), 'outputs/OCR_broken.pdf', options, dropped, 1)
+
+    # Finished pages stay for /api/download_partial; nothing to keep for the other task
+    pages_dir = app.processing_status[kept]['pages_dir']
+    assert app.processing_status[kept]['status'] == 'error' and finished_pages(pages_dir) == [1]
+    assert app.processing_status[dropped]['pages_dir'] is None
+    assert not os.path.exists(os.path.join('outputs', f'pages_{dropped}'))
+    assert storage.usage(1)['user_bytes'] > 0
+
+    storage.sweep()
+    assert os.path.exists(pages_dir)
+    then = os.path.getmtime(pages_dir) - 7200
+    for root, _, files in os.walk(pages_dir):
+        for path in [root] + [os.path.join(root, name) for name in files]:
+            os.utime(path, (then, then))
+    storage.sweep()
+    assert not os.path.exists(pages_dir)
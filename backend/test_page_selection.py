@@ -0,0 +1,52 @@
+"""
+Test the 'pages' selection (parsing, engine arguments, upload routes)
+Run with: python -m pytest test_page_selection.py
+"""
+
+import io
+import time
+
+import pytest
+
+from conftest import pdf_bytes, auth_headers
+from page_selection import PageSelectionError, parse_pages, page_ranges, format_pages, camelot_pages
+
+
+def test_parse_pages():
+    assert parse_pages(None) is None and parse_pages(' ALL ') is None
+    assert parse_pages('8, 3-5,4') == [3, 4, 5, 8]
+    assert parse_pages('-2,10-', page_count=11) == [1, 2, 10, 11]
+    # Selecting every page is the same as no selection
+    assert parse_pages('1-3', page_count=3) is None
+
+    for spec, page_count in (('0', None), ('5-3', None), ('a-b', None), ('10-', None), (',', None), ('4', 3)):
+        with pytest.raises(PageSelectionError):
+            parse_pages(spec, page_count)
+
+
+def test_engine_arguments():
+    assert page_ranges([8, 3, 4, 5, 10]) == [(3, 5), (8, 8), (10, 10)]
+    assert format_pages([3, 4, 5, 8]) == '3-5,8' and format_pages(None) == 'all'
+    assert camelot_pages([5, 3, 4]) == '3,4,5' and camelot_pages(None) == 'all'
+
+
+def test_upload_passes_pages_to_ocr(app_module, client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(app_module, 'process_pdf_with_ocr_and_camelot', lambda *args: calls.append(args))
+    headers = auth_headers(client)
+
+    def upload(pages):
+        return client.post('/api/upload', headers=headers, content_type='multipart/form-data', data={
+            'file': (io.BytesIO(pdf_bytes(6)), 'report.pdf'), 'pages': pages
+        })
+
+    response = upload('3-5')
+    assert response.status_code == 200 and response.get_json()['pages'] == '3-5'
+    response = upload('5-9')
+    assert response.status_code == 400 and '6 pages' in response.get_json()['error']
+
+    for _ in range(100):
+        if calls:
+            break
+        time.sleep(0.01)
+    assert len(calls) == 1 and calls[0][2]['pages'] == [3, 4, 5]
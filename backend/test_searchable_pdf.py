@@ -0,0 +1,104 @@
+"""
+Test the PyMuPDF searchable-PDF builder with synthetic scanned pages
+Run with: python -m pytest test_searchable_pdf.py
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+import pytest
+
+import searchable_pdf
+from searchable_pdf import text_lengths, group_word_blocks, make_searchable_pdf
+
+
+def scanned_pdf(path, pages):
+    """PDF whose pages are a single full-page image and no text"""
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 280), False)
+    pixmap.clear_with(230)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page(width=595, height=842)
+        page.insert_image(page.rect, pixmap=pixmap)
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+def word(text, page, left, top, width=0.2, height=0.03):
+    return {
+        'BlockType': 'WORD',
+        'Text': text,
+        'Page': page,
+        'Geometry': {'BoundingBox': {'Left': left, 'Top': top, 'Width': width, 'Height': height}}
+    }
+
+
+def test_text_lengths_match_pymupdf():
+    texts = ['Yield', 'Rp0.2', '', 'Zugfestigkeit 4340']
+    expected = [fitz.get_text_length(t, fontname='helv', fontsize=1) for t in texts]
+    assert text_lengths(texts) == pytest.approx(expected)
+
+
+def test_blocks_are_grouped_by_page():
+    blocks = [word('a', 1, 0.1, 0.1), word('b', 3, 0.1, 0.1), {'BlockType': 'LINE', 'Text': 'a'}]
+    groups = group_word_blocks(blocks)
+    assert sorted(groups) == [0, 2]
+    assert len(groups[2]['boxes']) == 1
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_words_land_on_their_pages(tmp_path, max_workers):
+    input_pdf = scanned_pdf(tmp_path / 'scan.pdf', pages=5)
+    blocks = [
+        word('TENSILE', 1, 0.1, 0.1),
+        word('STRENGTH', 2, 0.4, 0.5),
+        word('HEAT', 5, 0.2, 0.8)
+    ]
+
+    stats = make_searchable_pdf(input_pdf, blocks, str(tmp_path / 'out.pdf'), max_workers=max_workers)
+    assert stats['pages'] == 5
+    assert stats['words'] == 3
+    assert stats['reused_pages'] == 5
+    assert stats['rasterized_pages'] == 0
+
+    with fitz.open(tmp_path / 'out.pdf') as doc:
+        assert doc.page_count == 5
+        assert 'TENSILE' in doc[0].get_text()
+        assert 'STRENGTH' in doc[1].get_text()
+        assert doc[2].get_text().strip() == ''
+        assert 'HEAT' in doc[4].get_text()
+
+        hits = doc[1].search_for('STRENGTH')
+        assert hits and abs(hits[0].x0 - 0.4 * 595) < 5
+
+
+def test_calls_share_one_spawned_pool(tmp_path):
+    input_pdf = scanned_pdf(tmp_path / 'scan.pdf', pages=4)
+    blocks = [word('HEAT', 1, 0.1, 0.1)]
+
+    with ThreadPoolExecutor(max_workers=3) as threads:
+        stats = list(threads.map(
+            lambda n: make_searchable_pdf(input_pdf, blocks, str(tmp_path / f'out{n}.pdf'), max_workers=2),
+            range(3)
+        ))
+    assert all(s['words'] == 1 and s['workers'] == 2 for s in stats)
+
+    pool = searchable_pdf._pool
+    assert pool is not None and pool._max_workers == 2
+    assert pool._mp_context.get_start_method() == 'spawn'
+    make_searchable_pdf(input_pdf, blocks, str(tmp_path / 'again.pdf'), max_workers=2)
+    assert searchable_pdf._pool is pool
+
+
+def test_pages_with_text_are_rasterized(tmp_path):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), 'existing text layer')
+    doc.save(tmp_path / 'text.pdf')
+    doc.close()
+
+    stats = make_searchable_pdf(str(tmp_path / 'text.pdf'), [word('NEW', 1, 0.1, 0.5)], str(tmp_path / 'out.pdf'))
+    assert stats['rasterized_pages'] == 1
+    with fitz.open(tmp_path / 'out.pdf') as out:
+        text = out[0].get_text()
+    assert 'NEW' in text and 'existing' not in text
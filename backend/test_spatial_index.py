@@ -0,0 +1,99 @@
+"""
+Test grid-index region and nearest-word queries against brute force
+Run with: python -m pytest test_spatial_index.py
+"""
+
+import io
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+from conftest import pdf_bytes, auth_headers
+from geometrys import BoundingBoxArray
+from spatial_index import PageGridIndex, SpatialIndex
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module')
+def textract_blocks():
+    with open(os.path.join(BACKEND_DIR, 'response.json')) as f:
+        return json.load(f)['Blocks']
+
+
+def test_region_queries_match_brute_force(textract_blocks):
+    boxes = BoundingBoxArray.from_textract_blocks(textract_blocks)
+    grid = PageGridIndex(boxes)
+    rng = np.random.default_rng(0)
+
+    for _ in range(200):
+        x0, x1 = sorted(rng.uniform(0, 1, 2))
+        y0, y1 = sorted(rng.uniform(0, 1, 2))
+        region = [x0, y1, x1, y0]
+        for contained in (False, True):
+            expected = np.nonzero(boxes.contained_in(region) if contained else boxes.intersects(region))[0]
+            assert sorted(grid.query(region, contained=contained).tolist()) == expected.tolist()
+
+
+def test_nearest_matches_brute_force(textract_blocks):
+    boxes = BoundingBoxArray.from_textract_blocks(textract_blocks)
+    grid = PageGridIndex(boxes)
+    rng = np.random.default_rng(1)
+
+    for x, y in rng.uniform(0, 1, (100, 2)):
+        hits = grid.nearest(x, y, k=5)
+        brute = sorted(grid._distances(np.arange(len(boxes)), x, y))[:5]
+        assert [d for _, d in hits] == pytest.approx(brute)
+
+
+def test_document_index(textract_blocks):
+    index = SpatialIndex(textract_blocks)
+    assert list(index.pages) == [1]
+
+    words = index.words_in_region(1, [0.0, 1.0, 1.0, 0.0])
+    assert len(words) == sum(1 for b in textract_blocks if b['BlockType'] == 'WORD')
+
+    label = next(b for b in textract_blocks if b['BlockType'] == 'WORD' and b['Text'] == 'Department')
+    match = next(m for m in index.nearest_to_token('department', k=3) if m['block'] is label)
+    assert len(match['neighbours']) == 3
+    assert all(block is not label for block, _ in match['neighbours'])
+    assert index.words_in_region(2, [0.0, 1.0, 1.0, 0.0]) == []
+
+
+def test_token_pages():
+    def word(text, page):
+        return {'BlockType': 'WORD', 'Text': text, 'Page': page,
+                'Geometry': {'BoundingBox': {'Left': 0.1, 'Top': 0.1, 'Width': 0.1, 'Height': 0.02}}}
+
+    index = SpatialIndex([word('Heat', 1), word('A61146,', 2), word('a61146', 4), word('A611467', 3)])
+    assert index.token_pages('A61146') == [2, 4]
+    assert index.token_pages('B1') == []
+
+
+def test_generator_sends_only_serial_pages_to_glm(app_module, client, monkeypatch):
+    app = app_module
+    rendered = []
+
+    def stop_at_render(pdf_path, pages=None, **kwargs):
+        rendered.append(pages)
+        raise RuntimeError('stop before GLM')
+
+    monkeypatch.setattr(app, 'render_pages', stop_at_render)
+    headers = auth_headers(client)
+
+    words = [{'BlockType': 'WORD', 'Text': text, 'Page': page,
+              'Geometry': {'BoundingBox': {'Left': 0.1, 'Top': 0.1, 'Width': 0.1, 'Height': 0.02}}}
+             for text, page in (('Sample', 1), ('A61146', 2), ('A61147', 3))]
+    response = client.post('/api/upload_glm_abaqus_generator', headers=headers, content_type='multipart/form-data', data={
+        'file': (io.BytesIO(pdf_bytes(3)), 'cert.pdf'), 'serial_number': 'A61146',
+        'textract_json': (io.BytesIO(json.dumps({'Blocks': words}).encode()), 'cert.json')
+    })
+    task_id = response.get_json()['task_id']
+    for _ in range(100):
+        if app.processing_status[task_id]['status'] != 'processing':
+            break
+        time.sleep(0.05)
+    assert rendered == [[2]]
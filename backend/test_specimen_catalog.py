@@ -0,0 +1,119 @@
+"""
+Test certificate import and heat/sample lookups in the specimen catalog
+Run with: python -m pytest test_specimen_catalog.py
+"""
+
+import os
+import sqlite3
+
+from conftest import auth_headers
+from specimen_catalog import SpecimenCatalog, parse_certificate, map_header, align_row
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+MANUF_TSV = os.path.join(BACKEND_DIR, 'manuf.tsv')
+
+
+def test_misaligned_tsv_rows_are_compacted():
+    records = parse_certificate(MANUF_TSV)
+    # The "Total=" row has no heat number
+    assert [r['heat_no'] for r in records] == ['A61146', 'A61145', 'A32880', 'A61147', 'A61147']
+
+    first = records[0]
+    assert first['sample_no'] == 'MP2150201'
+    assert first['size'] == 30 and first['bundles'] == 12 and first['weight'] == 17240
+    assert first['yield_strength'] == 898 and first['tensile_strength'] == 993
+    assert first['hardness_hb'] == 297 and first['impact_kv'] == 90
+    assert first['test_temperature'] == 'RT'
+    assert 'length' not in first
+
+    # The comma-separated copy gives the same rows
+    assert parse_certificate(os.path.join(BACKEND_DIR, 'manuf')) == records
+
+
+def test_aligned_rows_map_by_position():
+    fields = map_header(['Heat No.', 'Dia (mm)', 'Len (mm)', 'Rₘ (N/mm²)'])
+    assert fields == ['heat_no', 'diameter', 'length', 'tensile_strength']
+    assert align_row(['B100', '12', '', '650'], fields) == {'heat_no': 'B100', 'diameter': '12', 'tensile_strength': '650'}
+
+
+def test_import_and_lookup(tmp_path):
+    catalog = SpecimenCatalog(str(tmp_path / 'catalog.db'))
+    assert catalog.import_file(MANUF_TSV) == 5
+
+    # Seeded dimensions and imported properties live side by side
+    assert catalog.dimensions('a61146') == {'diameter': 100.0, 'length': 150.0}
+    rows = catalog.lookup(heat_no='A61147')
+    assert [r['sample_no'] for r in rows] == ['', 'MP2150092', 'MP2150093']
+    assert catalog.lookup(sample_no='MP2150093')[0]['tensile_strength'] == 1000
+
+    # Re-importing updates rows in place and keeps values the new file lacks
+    path = tmp_path / 'update.csv'
+    path.write_text('Heat No.,Sample no.,Dia mm,Len mm\nA61147,MP2150093,48,120\n')
+    catalog.import_file(str(path))
+    row = catalog.lookup(sample_no='MP2150093')[0]
+    assert row['diameter'] == 48 and row['tensile_strength'] == 1000
+    assert len(catalog.lookup(heat_no='A61147')) == 3
+    assert catalog.dimensions('MP2150093') == {'diameter': 48.0, 'length': 120.0}
+
+
+def test_lookups_use_indexes(tmp_path):
+    catalog = SpecimenCatalog(str(tmp_path / 'catalog.db'))
+    conn = sqlite3.connect(catalog.db_path)
+    for column in ('heat_no', 'sample_no'):
+        plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT * FROM specimens WHERE {column} = 'X'").fetchall()
+        assert 'USING INDEX' in plan[0][-1]
+    conn.close()
+
+
+def test_chunked_import_matches_align_row(tmp_path):
+    # Mixed aligned and misaligned rows, split across several chunks
+    lines = open(MANUF_TSV, encoding='utf-8').read().splitlines()
+    header, rows = lines[0], lines[1:6]
+    path = tmp_path / 'big.tsv'
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(header + '\n')
+        for i in range(250):
+            cells = rows[i % 5].split('\t')
+            cells[0] = f'H{1000 + i}'
+            if i % 7 == 0:
+                # Aligned row with a decimal comma and padding spaces
+                cells = [f'H{1000 + i}', '30,5', '', '3', '100', f' S{i:04d} ', '800']
+            f.write('\t'.join(cells) + '\n')
+
+    # Reference: align_row on every line
+    expected = {}
+    fields = map_header(header.split('\t'))
+    for line in open(path, encoding='utf-8').read().splitlines()[1:]:
+        record = align_row(line.split('\t'), fields)
+        key = (record['heat_no'], record.get('sample_no', '').strip())
+        expected[key] = {
+            field: value.strip() if field in ('sample_no', 'test_temperature') else float(value.replace(',', '.'))
+            for field, value in record.items() if field != 'heat_no'
+        }
+
+    catalog = SpecimenCatalog(str(tmp_path / 'catalog.db'), seed=False)
+    progress = []
+    assert catalog.import_file(str(path), workers=1, chunksize=40, progress=progress.append) == 250
+    assert progress[-1] == 250 and len(progress) == 7
+
+    assert catalog.lookup(heat_no='H1007')[0]['size'] == 30.5
+    assert catalog.lookup(sample_no='S0007')[0]['heat_no'] == 'H1007'
+    for (heat_no, sample_no), record in expected.items():
+        row = catalog.lookup(heat_no=heat_no, sample_no=sample_no)[0]
+        assert {key: row.get(key) for key in record} == record
+
+
+def test_import_route_is_limited_to_admins(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, 'CATALOG_ADMIN_EMAILS', {'admin@example.com'})
+    imported = []
+    monkeypatch.setattr(app_module, 'import_certificates', lambda paths, task_id, user_id: imported.append(paths))
+
+    def upload(email=None):
+        headers = auth_headers(client, email)
+        with open(MANUF_TSV, 'rb') as f:
+            return client.post('/api/catalog/import', headers=headers, content_type='multipart/form-data',
+                               data={'file': (f, 'manuf.tsv')})
+
+    assert upload().status_code == 403
+    assert upload('Admin@example.com').status_code == 202
+    assert len(imported) == 1
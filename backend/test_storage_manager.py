@@ -0,0 +1,135 @@
+"""
+Test the storage manager (TTL/LRU eviction, quotas, running jobs, blobs, metrics)
+Run with: python -m pytest test_storage_manager.py
+"""
+
+import os
+import time
+
+import pytest
+
+from storage_manager import StorageManager, StorageQuotaExceeded, task_references
+
+HOUR = 3600
+
+
+def write(path, size, age=0.0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    then = time.time() - age
+    os.utime(path, (then, then))
+    return path
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    return str(tmp_path / 'uploads'), str(tmp_path / 'outputs')
+
+
+def manager(dirs, tmp_path, tasks=(), **kwargs):
+    return StorageManager(dirs, db_path=str(tmp_path / 'storage.db'), owners=lambda: tasks, **kwargs)
+
+
+def test_ttl_spares_running_jobs_and_recent_files(dirs, tmp_path):
+    uploads, outputs = dirs
+    old = write(os.path.join(outputs, 'OCR_old.pdf'), 100, age=48 * HOUR)
+    new = write(os.path.join(outputs, 'OCR_new.pdf'), 100)
+    running = write(os.path.join(uploads, '20240101_running.pdf'), 100, age=48 * HOUR)
+    # The solver's .sta is still being written, so its .inp stays with it
+    inp = write(os.path.join(outputs, 'Compression_7.inp'), 100, age=48 * HOUR)
+    write(os.path.join(outputs, 'Compression_7.sta'), 10)
+    table = write(os.path.join(outputs, 'tables_t2', 'table_1.csv'), 100, age=48 * HOUR)
+    then = time.time() - 48 * HOUR
+    os.utime(os.path.dirname(table), (then, then))
+
+    storage = manager(dirs, tmp_path, tasks=[('t1', 1, True, []), ('t2', 2, False, ['tables_t2'])],
+                      ttl_seconds=24 * HOUR)
+    storage.track(running, 't1', 1)
+    result = storage.sweep()
+
+    assert not os.path.exists(old) and not os.path.exists(table)
+    assert os.path.exists(new) and os.path.exists(running) and os.path.exists(inp)
+    assert result['evicted'] == 2 and result['freed_bytes'] == 200
+
+
+def test_user_quota_evicts_least_recently_used(dirs, tmp_path):
+    uploads, outputs = dirs
+    files = [write(os.path.join(outputs, f'result_{n}.pdf'), 400, age=(10 - n) * HOUR) for n in range(3)]
+    other = write(os.path.join(outputs, 'other.pdf'), 400, age=20 * HOUR)
+    storage = manager(dirs, tmp_path, user_max_bytes=1000)
+    for path in files:
+        storage.track(path, None, 1)
+    storage.track(other, None, 2)
+    # Downloading the oldest file makes it the most recently used
+    storage.touch(files[0])
+
+    storage.sweep()
+    assert [os.path.exists(path) for path in files] == [True, False, True]
+    assert os.path.exists(other)
+    assert storage.usage(1)['user_bytes'] == 800
+
+
+def test_admit_refuses_when_running_jobs_fill_the_quota(dirs, tmp_path):
+    uploads, outputs = dirs
+    busy = write(os.path.join(outputs, 'busy.pdf'), 900, age=HOUR)
+    idle = write(os.path.join(outputs, 'idle.pdf'), 900, age=2 * HOUR)
+    storage = manager(dirs, tmp_path, tasks=[('busy', 1, True, ['busy.pdf'])], max_bytes=1000)
+
+    storage.admit(1, 50)
+    assert not os.path.exists(idle) and os.path.exists(busy)
+    with pytest.raises(StorageQuotaExceeded) as e:
+        storage.admit(1, 200)
+    assert e.value.status == 507
+
+
+def test_admit_scans_only_when_remembered_totals_are_full(dirs, tmp_path, monkeypatch):
+    uploads, outputs = dirs
+    busy = write(os.path.join(outputs, 'busy.pdf'), 500, age=HOUR)
+    storage = manager(dirs, tmp_path, tasks=[('busy', 1, True, ['busy.pdf'])], user_max_bytes=1000)
+    scans = []
+    real_scan = storage.scan
+    monkeypatch.setattr(storage, 'scan', lambda: scans.append(1) or real_scan())
+
+    storage.admit(1, 100)
+    storage.admit(1, 100)
+    storage.admit(2, 900)
+    assert len(scans) == 1
+    # 500 on disk + 200 admitted leave no room for 400 more: scanned again, where
+    # the admitted uploads have not been written
+    storage.admit(1, 400)
+    assert len(scans) == 2
+    with pytest.raises(StorageQuotaExceeded):
+        storage.admit(1, 600)
+    assert len(scans) == 3 and os.path.exists(busy)
+
+
+def test_blobs_are_kept_while_linked(dirs, tmp_path):
+    uploads, outputs = dirs
+    linked = write(os.path.join(uploads, 'blobs', 'ab', 'ab12.pdf'), 500, age=48 * HOUR)
+    orphan = write(os.path.join(uploads, 'blobs', 'cd', 'cd34.pdf'), 500, age=48 * HOUR)
+    input_path = os.path.join(uploads, '20240101_cert.pdf')
+    os.link(linked, input_path)
+    tasks = [('t1', 1, True, [])]
+    storage = manager(dirs, tmp_path, tasks, ttl_seconds=24 * HOUR, expand=('blobs',), skip=('chunked',))
+    write(os.path.join(uploads, 'chunked', 'u1.data'), 300, age=48 * HOUR)
+    storage.track(input_path, 't1', 1)
+
+    # The input and its blob are one file on disk
+    assert storage.usage()['total_bytes'] == 500 + 500 + 300
+    storage.sweep()
+    assert os.path.exists(linked) and not os.path.exists(orphan)
+    assert os.path.exists(os.path.join(uploads, 'chunked', 'u1.data'))
+
+    # Once the task finished, its input goes, and its blob on the next sweep
+    tasks[0] = ('t1', 1, False, [])
+    storage.sweep()
+    assert not os.path.exists(input_path)
+    storage.sweep()
+    assert not os.path.exists(linked)
+
+
+def test_task_references():
+    status = {'output_file': 'OCR_a.pdf', 'tables_dir': 'outputs/tables_t1',
+              'tables': [{'csv_file': 'table_1.csv'}], 'message': 'Processing completed!\nFound 1 table'}
+    assert sorted(task_references(status)) == ['OCR_a.pdf', 'table_1.csv', 'tables_t1']
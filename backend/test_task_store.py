@@ -0,0 +1,45 @@
+"""
+Test the SQLite-backed task store shared by worker processes
+Run with: python -m pytest test_task_store.py
+"""
+
+from task_store import TaskStore
+
+
+def test_tasks_are_visible_to_other_stores(tmp_path):
+    db_path = str(tmp_path / 'tasks.db')
+    worker = TaskStore(db_path, flush_interval=60)
+    other = TaskStore(db_path)
+
+    status = {'status': 'processing', 'progress': 0, 'user_id': 7, 'output': []}
+    worker['t1'] = status
+    # New tasks are written immediately
+    assert 't1' in other and other['t1']['progress'] == 0
+
+    # In-place updates by the worker thread reach the database on flush
+    status['progress'] = 60
+    status['output'].append('line\n')
+    assert worker['t1'] is status
+    assert worker.flush() == 1
+    assert other['t1']['progress'] == 60 and other['t1']['output'] == ['line\n']
+    assert worker.flush() == 0
+
+    assert set(other) == {'t1'} and 'missing' not in other
+    del other['t1']
+    assert 't1' not in TaskStore(db_path)
+
+
+def test_finished_tasks_stop_being_serialized(tmp_path):
+    store = TaskStore(str(tmp_path / 'tasks.db'), flush_interval=60)
+    store['t1'] = status = {'status': 'completed', 'result': {'output_file': 'out.pdf'}}
+    assert store.flush() == 0
+    # Unchanged for one flush while finished: skipped from then on
+    status['late_field'] = True
+    assert store.flush() == 0
+
+
+def test_without_database_behaves_like_a_dict():
+    store = TaskStore()
+    store['t1'] = {'status': 'processing'}
+    assert dict(store) == {'t1': {'status': 'processing'}}
+    assert store.get('t2') is None and store.flush() == 0
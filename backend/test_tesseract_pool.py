@@ -0,0 +1,151 @@
+"""
+Test the warm Tesseract worker pool (model loaded once per worker, WORD blocks, page OCR engine)
+Run with: python -m pytest test_tesseract_pool.py
+The recognition itself is replaced by a stand-in where tesserocr is not installed.
+"""
+
+import shutil
+import subprocess
+import threading
+
+import fitz  # PyMuPDF
+import pytest
+
+import page_ocr
+import tesseract_pool
+from tesseract_pool import TesseractPool, pdf_word_blocks, word_blocks
+from page_ocr import split_pages, ocr_pages, merge_pages
+from conftest import auth_headers
+
+
+class FakeAPI:
+    created = 0
+    lock = threading.Lock()
+
+    def __init__(self):
+        with FakeAPI.lock:
+            FakeAPI.created += 1
+        self.pages = 0
+
+
+def fake_recognize(api, image, dpi=300, psm=None):
+    api.pages += 1
+    return {'text': 'Heat 12345\n', 'width': image.width, 'height': image.height,
+            'words': [{'text': 'Heat', 'confidence': 91.0, 'box': (0, 0, image.width // 2, image.height // 10)}]}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    if not tesseract_pool.tesserocr.loaded:
+        try:
+            tesseract_pool.tesserocr.load()
+        except ImportError:
+            monkeypatch.setattr(tesseract_pool, 'recognize', fake_recognize)
+    FakeAPI.created = 0
+    factory = FakeAPI if tesseract_pool.recognize is fake_recognize else None
+    pool = TesseractPool(size=2, api_factory=factory)
+    yield pool
+    pool.close()
+
+
+def scanned_pdf(path, pages):
+    doc = fitz.open()
+    for n in range(pages):
+        text = fitz.open()
+        text.new_page().insert_text((72, 72), f'Heat 1234{n}', fontsize=24)
+        pixmap = text[0].get_pixmap(dpi=100, colorspace=fitz.csGRAY)
+        doc.new_page().insert_image(fitz.Rect(0, 0, 595, 842), pixmap=pixmap)
+    doc.save(str(path))
+    doc.close()
+
+
+def test_workers_load_once_and_return_word_blocks(tmp_path, pool):
+    scanned_pdf(tmp_path / 'scan.pdf', 5)
+    blocks = pdf_word_blocks(str(tmp_path / 'scan.pdf'), pool, dpi=100)
+    assert [block['Page'] for block in blocks if block['Text'] == 'Heat'] == [1, 2, 3, 4, 5]
+    box = blocks[0]['Geometry']['BoundingBox']
+    assert 0 <= box['Left'] < 1 and 0 < box['Width'] <= 1
+    assert pool.pages_done == 5
+    if tesseract_pool.recognize is fake_recognize:
+        assert FakeAPI.created == 2
+
+
+def test_word_blocks_are_normalized():
+    result = {'width': 200, 'height': 100, 'text': '', 'words': [{'text': 'A', 'confidence': 90, 'box': (20, 10, 60, 30)}]}
+    box = word_blocks(result, page=3)[0]['Geometry']['BoundingBox']
+    assert box == {'Left': 0.1, 'Top': 0.1, 'Width': 0.2, 'Height': 0.2}
+
+
+def test_page_ocr_with_pool(tmp_path, pool):
+    scanned_pdf(tmp_path / 'scan.pdf', 3)
+    pages_dir = str(tmp_path / 'pages')
+    ocr_pages(pages_dir, split_pages(str(tmp_path / 'scan.pdf'), pages_dir), {'profile': 'fast'}, tesseract=pool)
+    merge_pages(str(tmp_path / 'scan.pdf'), pages_dir, str(tmp_path / 'out.pdf'))
+    with fitz.open(str(tmp_path / 'out.pdf')) as doc:
+        assert doc.page_count == 3 and all('Heat' in page.get_text() for page in doc)
+
+
+def test_failed_start_raises():
+    def broken():
+        raise RuntimeError('Failed loading language eng')
+    with pytest.raises(RuntimeError):
+        TesseractPool(size=2, api_factory=broken)
+
+
+def test_pages_in_flight_are_bounded(tmp_path, pool, monkeypatch):
+    scanned_pdf(tmp_path / 'scan.pdf', 8)
+    pending, peak = [], []
+    submit = pool.submit
+
+    def tracking_submit(image, dpi=300, psm=None):
+        future = submit(image, dpi, psm)
+        pending.append(future)
+        peak.append(sum(1 for f in pending if not f.done()))
+        return future
+
+    monkeypatch.setattr(pool, 'submit', tracking_submit)
+    blocks = pdf_word_blocks(str(tmp_path / 'scan.pdf'), pool, dpi=100)
+    assert len({block['Page'] for block in blocks}) == 8
+    assert max(peak) <= pool.size
+
+
+def test_mixed_pages_stay_on_ocrmypdf(tmp_path, monkeypatch):
+    class RefusingPool:
+        size = 1
+
+        def recognize(self, *args):
+            raise AssertionError('redo page sent to the Tesseract pool')
+
+    runs = []
+
+    def fake_run(cmd, **kwargs):
+        runs.append(cmd)
+        shutil.copyfile(cmd[-2], cmd[-1])
+        with open(cmd[cmd.index('--sidecar') + 1], 'w') as f:
+            f.write('Heat 12345\f')
+        return subprocess.CompletedProcess(cmd, 0, '', '')
+
+    monkeypatch.setattr(page_ocr.subprocess, 'run', fake_run)
+    scanned_pdf(tmp_path / 'scan.pdf', 1)
+    pages_dir = str(tmp_path / 'pages')
+    ocr_pages(pages_dir, split_pages(str(tmp_path / 'scan.pdf'), pages_dir), {}, actions={1: 'redo'},
+              tesseract=RefusingPool())
+    assert len(runs) == 1 and '--redo-ocr' in runs[0]
+
+
+def test_requested_engine_must_be_installed(tmp_path, app_module, client, monkeypatch):
+    app = app_module
+    monkeypatch.setattr(app, 'tesseract_available', lambda: False)
+    headers = auth_headers(client)
+    scanned_pdf(tmp_path / 'scan.pdf', 1)
+
+    # Both routes refuse an explicit engine=tesseract
+    for route in ('/api/upload', '/api/upload_searchable_pdf'):
+        response = client.post(route, headers=headers, content_type='multipart/form-data', data={
+            'file': (open(tmp_path / 'scan.pdf', 'rb'), 'scan.pdf'), 'engine': 'tesseract'
+        })
+        assert response.status_code == 400 and 'tesserocr' in response.get_json()['error']
+
+    # The configured default is accepted; the job itself falls back to ocrmypdf
+    monkeypatch.setattr(app, 'OCR_ENGINE', 'tesseract')
+    assert app.ocr_options({})['engine'] == 'tesseract'
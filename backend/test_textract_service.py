@@ -0,0 +1,94 @@
+"""
+Test Textract analysis through the local Textract/S3 stand-ins
+Run with: python -m pytest test_textract_service.py
+"""
+
+import os
+
+from conftest import pdf_bytes
+from textract_stream import iter_blocks
+from textract_service import (
+    TextractService, LocalTextractClient, LocalS3Client, TextractJobError,
+    build_queries, query_answers, document_text
+)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+RESPONSE_JSON = os.path.join(BACKEND_DIR, 'response.json')
+
+
+def make_pdf(path, pages=3):
+    with open(path, 'wb') as f:
+        f.write(pdf_bytes(pages))
+    return path
+
+
+def query_blocks(pages=3):
+    blocks = []
+    for page in range(1, pages + 1):
+        blocks.append({'BlockType': 'LINE', 'Id': f'l{page}', 'Page': page, 'Text': f'Heat No A6114{page}'})
+        blocks.append({'BlockType': 'QUERY', 'Id': f'q{page}', 'Page': page,
+                       'Query': {'Text': 'What is the heat number?', 'Alias': 'heat'},
+                       'Relationships': [{'Type': 'ANSWER', 'Ids': [f'a{page}']}]})
+        blocks.append({'BlockType': 'QUERY_RESULT', 'Id': f'a{page}', 'Page': page,
+                       'Text': f'A6114{page}', 'Confidence': 90.0 + page})
+    return blocks
+
+
+def test_async_job_pages_through_all_results(tmp_path):
+    expected = list(iter_blocks(RESPONSE_JSON))
+    textract = LocalTextractClient(RESPONSE_JSON, max_results=100, pending_polls=2)
+    s3 = LocalS3Client()
+    service = TextractService(textract, s3, bucket='docs', poll_interval=0, prefetch_pages=2)
+
+    output = str(tmp_path / 'blocks.jsonl')
+    stats = service.analyze(make_pdf(str(tmp_path / 'in.pdf')), output, custom_query='Heat number?\n\nYield?')
+
+    assert stats['mode'] == 'async'
+    assert stats['blocks'] == len(expected)
+    assert stats['result_pages'] == -(-len(expected) // 100)
+    assert [b['Id'] for b in iter_blocks(output)] == [b['Id'] for b in expected]
+
+    job = next(iter(textract.jobs.values()))
+    assert job['feature_types'] == ['TABLES', 'FORMS', 'QUERIES']
+    assert job['QueriesConfig'] == {'Queries': [{'Text': 'Heat number?'}, {'Text': 'Yield?'}]}
+    assert textract.calls.count('get_document_analysis') == 2 + stats['result_pages']
+    # The uploaded PDF is removed once the job is done
+    assert s3.objects == {}
+
+
+def test_failed_job_raises(tmp_path):
+    class FailingClient(LocalTextractClient):
+        def get_document_analysis(self, JobId, MaxResults=None, NextToken=None):
+            return {'JobStatus': 'FAILED', 'StatusMessage': 'Unsupported document'}
+
+    s3 = LocalS3Client()
+    service = TextractService(FailingClient([]), s3, bucket='docs', poll_interval=0)
+    try:
+        service.analyze(make_pdf(str(tmp_path / 'in.pdf')), str(tmp_path / 'out.jsonl'))
+        assert False, 'expected TextractJobError'
+    except TextractJobError as e:
+        assert 'Unsupported document' in str(e)
+    assert s3.objects == {}
+
+
+def test_sync_fallback_tags_pages_in_order(tmp_path):
+    textract = LocalTextractClient(RESPONSE_JSON)
+    service = TextractService(textract, page_workers=3)
+
+    output = str(tmp_path / 'blocks.jsonl')
+    stats = service.analyze(make_pdf(str(tmp_path / 'in.pdf'), pages=4), output)
+
+    assert stats['mode'] == 'sync' and stats['pages'] == 4
+    assert textract.calls == ['analyze_document'] * 4
+    pages = [b['Page'] for b in iter_blocks(output)]
+    assert pages == sorted(pages) and set(pages) == {1, 2, 3, 4}
+
+
+def test_query_answers_and_text():
+    answers = query_answers(query_blocks())
+    assert len(answers) == 1
+    assert answers[0]['alias'] == 'heat'
+    assert [a['text'] for a in answers[0]['answers']] == ['A61143', 'A61142', 'A61141']
+    assert document_text(query_blocks(pages=2)) == 'Heat No A61141\n\nHeat No A61142'
+
+    assert build_queries('a\n  \nb', limit=1) == [{'Text': 'a'}]
@@ -0,0 +1,61 @@
+"""
+Test streaming Textract block reading and the lazy relationship graph
+Run with: python -m pytest test_textract_stream.py
+"""
+
+import json
+import os
+
+from textract_stream import iter_blocks, iter_pages, write_blocks_jsonl, BlockGraph, iter_page_graphs
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+RESPONSE_JSON = os.path.join(BACKEND_DIR, 'response.json')
+
+
+def multi_page_blocks(pages=3):
+    blocks = []
+    for page in range(1, pages + 1):
+        word_ids = [f'w{page}-{i}' for i in range(2)]
+        blocks.append({'BlockType': 'PAGE', 'Id': f'p{page}', 'Page': page,
+                       'Relationships': [{'Type': 'CHILD', 'Ids': [f'l{page}']}]})
+        blocks.append({'BlockType': 'LINE', 'Id': f'l{page}', 'Page': page, 'Text': f'line {page}',
+                       'Relationships': [{'Type': 'CHILD', 'Ids': word_ids}]})
+        for i, word_id in enumerate(word_ids):
+            blocks.append({'BlockType': 'WORD', 'Id': word_id, 'Page': page, 'Text': f'word{page}{i}'})
+    return blocks
+
+
+def test_json_and_jsonl_sources_agree(tmp_path):
+    with open(RESPONSE_JSON) as f:
+        expected = json.load(f)['Blocks']
+
+    jsonl_path = str(tmp_path / 'response.jsonl')
+    assert write_blocks_jsonl(iter_blocks(RESPONSE_JSON), jsonl_path) == len(expected)
+
+    words = [b['Text'] for b in expected if b['BlockType'] == 'WORD']
+    assert [b['Text'] for b in iter_blocks(jsonl_path, block_types=['WORD'])] == words
+    assert [b['Text'] for b in iter_blocks(RESPONSE_JSON, block_types=['WORD'])] == words
+
+
+def test_pages_are_yielded_in_order(tmp_path):
+    blocks = multi_page_blocks()
+    # Async jobs return their result in several responses
+    write_blocks_jsonl(blocks[:5], str(tmp_path / 'part1.jsonl'))
+    write_blocks_jsonl(blocks[5:], str(tmp_path / 'part2.jsonl'))
+
+    pages = list(iter_pages([str(tmp_path / 'part1.jsonl'), str(tmp_path / 'part2.jsonl')], block_types=['WORD']))
+    assert [page for page, _ in pages] == [1, 2, 3]
+    assert [b['Text'] for b in pages[1][1]] == ['word20', 'word21']
+
+
+def test_relationships_resolve_lazily():
+    graph = BlockGraph(multi_page_blocks(pages=1))
+    assert graph._by_id is None
+
+    line = graph.of_type('LINE')[0]
+    assert [w['Text'] for w in graph.children(line)] == ['word10', 'word11']
+    assert graph._by_id is not None
+    assert graph.text(graph.get('p1')) == ''
+
+    page, graph = next(iter_page_graphs(multi_page_blocks()))
+    assert page == 1 and len(graph.blocks) == 4
@@ -0,0 +1,110 @@
+"""
+Test table reconstruction from Textract TABLE/CELL/MERGED_CELL blocks
+Run with: python -m pytest test_textract_tables.py
+"""
+
+import os
+import re
+
+import pandas as pd
+
+from textract_tables import tables_from_blocks, save_tables, specimen_data_from_tables, format_specimen_data, _number
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def table_blocks(rows, table_id='t1', page=1, merged=None):
+    """TABLE, CELL and WORD blocks for a grid of strings; merged = [(row, col, row_span, col_span)]"""
+    blocks = []
+    cell_ids = []
+    cell_at = {}
+    for r, row in enumerate(rows, start=1):
+        for c, text in enumerate(row, start=1):
+            cell_id = f'{table_id}-c{r}-{c}'
+            cell = {'BlockType': 'CELL', 'Id': cell_id, 'Page': page, 'RowIndex': r, 'ColumnIndex': c,
+                    'RowSpan': 1, 'ColumnSpan': 1}
+            if text:
+                word_ids = []
+                for i, word in enumerate(text.split()):
+                    word_ids.append(f'{cell_id}-w{i}')
+                    blocks.append({'BlockType': 'WORD', 'Id': word_ids[-1], 'Page': page, 'Text': word})
+                cell['Relationships'] = [{'Type': 'CHILD', 'Ids': word_ids}]
+            blocks.append(cell)
+            cell_ids.append(cell_id)
+            cell_at[(r, c)] = cell_id
+
+    relationships = [{'Type': 'CHILD', 'Ids': cell_ids}]
+    merged_ids = []
+    for n, (row, col, row_span, col_span) in enumerate(merged or []):
+        merged_id = f'{table_id}-m{n}'
+        children = [cell_at[(r, c)] for r in range(row, row + row_span) for c in range(col, col + col_span)]
+        blocks.append({'BlockType': 'MERGED_CELL', 'Id': merged_id, 'Page': page, 'RowIndex': row,
+                       'ColumnIndex': col, 'RowSpan': row_span, 'ColumnSpan': col_span,
+                       'Relationships': [{'Type': 'CHILD', 'Ids': children}]})
+        merged_ids.append(merged_id)
+    if merged_ids:
+        relationships.append({'Type': 'MERGED_CELL', 'Ids': merged_ids})
+
+    blocks.insert(0, {'BlockType': 'TABLE', 'Id': table_id, 'Page': page, 'Confidence': 97.5,
+                      'Relationships': relationships})
+    return blocks
+
+
+CERTIFICATE = (
+    table_blocks([
+        ['Heat No', 'Dia (mm)', 'Len (mm)'],
+        ['A61146', '100', '150'],
+        ['A32880', '50', '100'],
+    ], table_id='dims')
+    + table_blocks([
+        ['Sample ID', 'Stress (MPa)', 'Strain'],
+        ['A61146', '39.0', '0'],
+        ['', '40.5', '0.02'],
+        ['A32880', '41.0', '0'],
+    ], table_id='curve', page=2, merged=[(2, 1, 2, 1)])
+)
+
+
+def test_merged_cells_are_copied_into_spanned_cells():
+    tables = tables_from_blocks(CERTIFICATE)
+    assert [t['page'] for t in tables] == [1, 2]
+
+    curve = tables[1]['dataframe']
+    assert curve.shape == (4, 3)
+    assert curve[0].tolist() == ['Sample ID', 'A61146', 'A61146', 'A32880']
+
+    unmerged = tables_from_blocks(CERTIFICATE, fill_merged=False)[1]['dataframe']
+    assert unmerged.iat[2, 0] == ''
+
+
+def test_tables_are_written_like_camelot(tmp_path):
+    tables_data = save_tables(tables_from_blocks(CERTIFICATE), str(tmp_path))
+    assert [t['csv_file'] for t in tables_data] == ['table_1.csv', 'table_2.csv']
+    assert tables_data[0]['accuracy'] == '97.5%'
+
+    df = pd.read_csv(tmp_path / 'table_1.csv', dtype=str)
+    assert list(df.columns) == ['0', '1', '2']
+    assert df.iloc[1].tolist() == ['A61146', '100', '150']
+
+
+def test_specimen_data_matches_generator_format():
+    data = specimen_data_from_tables(tables_from_blocks(CERTIFICATE), 'A61146')
+    assert data['length'] == 150 and data['diameter'] == 100
+    assert data['stress_strain'] == [{'stress': 39.0, 'strain': 0.0}, {'stress': 40.5, 'strain': 0.02}]
+
+    # Same patterns the ABAQUS generator applies to the GLM answer
+    content = format_specimen_data('A61146', data)
+    assert re.search(r'Length:\s*(\d+(?:\.\d+)?)', content).group(1) == '150'
+    csv = re.search(r'STRESS_STRAIN_DATA:\s*\n(.*?)(?:\n\n|$)', content, re.DOTALL).group(1)
+    assert csv.splitlines() == ['A61146,39,0', 'A61146,40.5,0.02']
+
+
+def test_thousands_and_decimal_separators():
+    assert [_number(text) for text in ('1,234', '12,500,000', '1,234.5', '1.234,5')] == [1234, 12500000, 1234.5, 1234.5]
+    assert [_number(text) for text in ('0,25', '0,250', '12,5', '-0,5')] == [0.25, 0.25, 12.5, -0.5]
+
+
+def test_real_response_tables():
+    tables = tables_from_blocks(os.path.join(BACKEND_DIR, 'response.json'))
+    assert len(tables) == 5
+    assert tables[1]['dataframe'].iat[0, 1] == 'E2180157'
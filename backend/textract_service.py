@@ -0,0 +1,338 @@
+"""
+AWS Textract Analysis Service
+Runs AnalyzeDocument on whole (multi-page) PDFs:
+
+- With an S3 bucket configured, the PDF is uploaded and analysed with the
+  asynchronous StartDocumentAnalysis / GetDocumentAnalysis APIs. Result pages
+  are fetched by a background thread while earlier pages are written out, so
+  network round trips overlap with disk writes.
+- Without a bucket, each page is sent to the synchronous AnalyzeDocument API as
+  its own one-page PDF, several pages at a time.
+
+Blocks are always written as JSON Lines (see textract_stream), so callers never
+hold the full response in memory.
+
+LocalTextractClient / LocalS3Client replay a recorded response with the same
+call signatures as the boto3 clients, for tests and offline development.
+"""
+
+import os
+import time
+import uuid
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import fitz  # PyMuPDF
+
+from textract_stream import Block, BlockSource, iter_blocks, iter_page_graphs, write_blocks_jsonl
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEATURE_TYPES = ('TABLES', 'FORMS')
+MAX_QUERIES_SYNC = 15
+MAX_QUERIES_ASYNC = 30
+MAX_QUERY_LENGTH = 200
+
+
+class TextractJobError(Exception):
+    """Raised when an asynchronous Textract job fails or times out"""
+
+
+def build_queries(custom_query: str, limit: int = MAX_QUERIES_ASYNC) -> List[Dict[str, str]]:
+    """One Textract query per non-empty line of the user's query text"""
+    queries = []
+    for line in (custom_query or '').splitlines():
+        text = line.strip()
+        if not text:
+            continue
+        if len(queries) == limit:
+            logger.warning(f"Textract accepts at most {limit} queries; ignoring the rest")
+            break
+        queries.append({'Text': text[:MAX_QUERY_LENGTH]})
+    return queries
+
+
+class TextractService:
+    """AnalyzeDocument for multi-page PDFs, asynchronous through S3 when a bucket is set"""
+
+    def __init__(self, textract_client=None, s3_client=None, bucket: Optional[str] = None,
+                 prefix: str = 'textract-input/', poll_interval: float = 2.0, max_wait: float = 900.0,
+                 page_workers: int = 4, prefetch_pages: int = 4):
+        if textract_client is None:
+            import boto3
+            textract_client = boto3.client('textract')
+        if bucket and s3_client is None:
+            import boto3
+            s3_client = boto3.client('s3')
+
+        self.textract = textract_client
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+        self.page_workers = max(1, page_workers)
+        self.prefetch_pages = max(1, prefetch_pages)
+
+    def analyze(self, pdf_path: str, output_path: str, custom_query: str = '',
+                feature_types: Iterable[str] = DEFAULT_FEATURE_TYPES,
+                progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Analyze a PDF and write its blocks to `output_path` as JSON Lines
+
+        Returns stats: mode ('async' or 'sync'), job_id, pages, blocks and
+        result_pages (GetDocumentAnalysis responses or AnalyzeDocument calls).
+        """
+        if self.bucket:
+            return self._analyze_async(pdf_path, output_path, custom_query, feature_types, progress)
+        return self._analyze_sync(pdf_path, output_path, custom_query, feature_types, progress)
+
+    @staticmethod
+    def _request_options(custom_query: str, feature_types: Iterable[str], max_queries: int) -> Dict[str, Any]:
+        features = list(feature_types)
+        options: Dict[str, Any] = {}
+        queries = build_queries(custom_query, max_queries)
+        if queries:
+            features.append('QUERIES')
+            options['QueriesConfig'] = {'Queries': queries}
+        options['FeatureTypes'] = features
+        return options
+
+    # Asynchronous API
+
+    def _analyze_async(self, pdf_path, output_path, custom_query, feature_types, progress) -> Dict[str, Any]:
+        key = f"{self.prefix}{uuid.uuid4().hex}/{os.path.basename(pdf_path)}"
+        if progress:
+            progress('Uploading PDF to S3...')
+        self.s3.upload_file(pdf_path, self.bucket, key)
+
+        try:
+            response = self.textract.start_document_analysis(
+                DocumentLocation={'S3Object': {'Bucket': self.bucket, 'Name': key}},
+                **self._request_options(custom_query, feature_types, MAX_QUERIES_ASYNC)
+            )
+            job_id = response['JobId']
+            logger.info(f"Started Textract job {job_id} for {pdf_path}")
+
+            if progress:
+                progress('Waiting for AWS Textract to analyze the document...')
+            first = self._wait_for_job(job_id)
+
+            if progress:
+                progress('Downloading Textract results...')
+            stats = {'mode': 'async', 'job_id': job_id,
+                     'pages': first.get('DocumentMetadata', {}).get('Pages', 0),
+                     'result_pages': 0}
+            stats['blocks'] = write_blocks_jsonl(self._iter_job_blocks(job_id, first, stats), output_path)
+            return stats
+        finally:
+            try:
+                self.s3.delete_object(Bucket=self.bucket, Key=key)
+            except Exception as e:
+                logger.warning(f"Could not delete s3://{self.bucket}/{key}: {str(e)}")
+
+    def _wait_for_job(self, job_id: str) -> Dict[str, Any]:
+        """Poll until the job leaves IN_PROGRESS; returns its first result page"""
+        deadline = time.monotonic() + self.max_wait
+        delay = self.poll_interval
+        while True:
+            response = self.textract.get_document_analysis(JobId=job_id)
+            status = response.get('JobStatus')
+            if status in ('SUCCEEDED', 'PARTIAL_SUCCESS'):
+                if status == 'PARTIAL_SUCCESS':
+                    logger.warning(f"Textract job {job_id} partially succeeded: {response.get('Warnings')}")
+                return response
+            if status != 'IN_PROGRESS':
+                raise TextractJobError(f"Textract job {job_id} {status}: {response.get('StatusMessage', '')}")
+            if time.monotonic() + delay > deadline:
+                raise TextractJobError(f"Textract job {job_id} did not finish within {self.max_wait:.0f}s")
+            time.sleep(delay)
+            delay = min(delay * 1.5, self.poll_interval * 8)
+
+    def _iter_job_blocks(self, job_id: str, first: Dict[str, Any], stats: Dict[str, Any]) -> Iterator[Block]:
+        """
+        Blocks of every result page, in order
+
+        NextToken pagination is sequential, so a producer thread walks the
+        tokens and hands responses over a bounded queue: the next page is
+        already in flight while this one is being written.
+        """
+        pages: queue.Queue = queue.Queue(maxsize=self.prefetch_pages)
+        done = object()
+        stop = threading.Event()
+
+        def fetch():
+            response = first
+            try:
+                while True:
+                    pages.put(response)
+                    token = response.get('NextToken')
+                    if not token or stop.is_set():
+                        break
+                    response = self.textract.get_document_analysis(JobId=job_id, NextToken=token)
+                pages.put(done)
+            except Exception as e:
+                pages.put(e)
+
+        producer = threading.Thread(target=fetch, daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = pages.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                stats['result_pages'] += 1
+                yield from item.get('Blocks', [])
+        finally:
+            stop.set()
+            # Unblock a producer waiting on a full queue
+            while producer.is_alive():
+                try:
+                    pages.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+    # Synchronous API, one page per call
+
+    def _analyze_sync(self, pdf_path, output_path, custom_query, feature_types, progress) -> Dict[str, Any]:
+        options = self._request_options(custom_query, feature_types, MAX_QUERIES_SYNC)
+        with fitz.open(pdf_path) as src_doc:
+            page_bytes = []
+            for page_number in range(src_doc.page_count):
+                single_page = fitz.open()
+                single_page.insert_pdf(src_doc, from_page=page_number, to_page=page_number)
+                page_bytes.append(single_page.tobytes())
+                single_page.close()
+
+        if progress:
+            progress(f'Analyzing {len(page_bytes)} page(s) with AWS Textract...')
+
+        def analyze_page(page_number: int) -> List[Block]:
+            response = self.textract.analyze_document(Document={'Bytes': page_bytes[page_number]}, **options)
+            blocks = response.get('Blocks', [])
+            for block in blocks:
+                block['Page'] = page_number + 1
+            return blocks
+
+        with ThreadPoolExecutor(max_workers=min(self.page_workers, max(1, len(page_bytes)))) as executor:
+            # map() yields in page order, so the JSON Lines file stays page-sorted
+            results = executor.map(analyze_page, range(len(page_bytes)))
+            count = write_blocks_jsonl((block for blocks in results for block in blocks), output_path)
+
+        return {'mode': 'sync', 'job_id': None, 'pages': len(page_bytes),
+                'blocks': count, 'result_pages': len(page_bytes)}
+
+
+def query_answers(source: BlockSource) -> List[Dict[str, Any]]:
+    """
+    Answers to QUERIES, merged across pages
+
+    Returns [{'query', 'alias', 'answers': [{'text', 'confidence', 'page'}]}]
+    in the order the queries first appear, best answer first.
+    """
+    by_query: Dict[str, Dict[str, Any]] = {}
+    for page, graph in iter_page_graphs(source, block_types=('QUERY', 'QUERY_RESULT')):
+        for block in graph.of_type('QUERY'):
+            query = block.get('Query', {})
+            entry = by_query.setdefault(query.get('Text', ''), {
+                'query': query.get('Text', ''),
+                'alias': query.get('Alias'),
+                'answers': []
+            })
+            for answer in graph.related(block, 'ANSWER'):
+                entry['answers'].append({
+                    'text': answer.get('Text', ''),
+                    'confidence': answer.get('Confidence'),
+                    'page': page
+                })
+
+    for entry in by_query.values():
+        entry['answers'].sort(key=lambda a: a['confidence'] or 0, reverse=True)
+    return list(by_query.values())
+
+
+def document_text(source: BlockSource) -> str:
+    """Plain text of the LINE blocks, pages separated by a blank line"""
+    pages = []
+    for _, graph in iter_page_graphs(source, block_types=('LINE',)):
+        pages.append('\n'.join(block.get('Text', '') for block in graph.blocks))
+    return '\n\n'.join(pages)
+
+
+class LocalTextractClient:
+    """
+    Offline stand-in for boto3.client('textract')
+
+    Replays recorded blocks: asynchronous jobs report IN_PROGRESS for
+    `pending_polls` polls, then page through the blocks `max_results` at a
+    time. AnalyzeDocument returns the blocks of page 1 without a Page key,
+    like the real synchronous API.
+    """
+
+    def __init__(self, source: BlockSource, max_results: int = 1000, pending_polls: int = 1):
+        self.blocks = list(iter_blocks(source))
+        self.max_results = max_results
+        self.pending_polls = pending_polls
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.calls: List[str] = []
+        self._lock = threading.Lock()
+
+    def _record(self, name: str):
+        with self._lock:
+            self.calls.append(name)
+
+    def _pages(self) -> int:
+        return max((int(block.get('Page', 1)) for block in self.blocks), default=0)
+
+    def analyze_document(self, Document, FeatureTypes, **kwargs):
+        self._record('analyze_document')
+        if not Document.get('Bytes'):
+            raise ValueError('InvalidParameterException: Document.Bytes is empty')
+        blocks = [{k: v for k, v in block.items() if k != 'Page'}
+                  for block in self.blocks if int(block.get('Page', 1)) == 1]
+        return {'DocumentMetadata': {'Pages': 1}, 'Blocks': blocks}
+
+    def start_document_analysis(self, DocumentLocation, FeatureTypes, **kwargs):
+        self._record('start_document_analysis')
+        job_id = uuid.uuid4().hex
+        self.jobs[job_id] = {'polls': 0, 'location': DocumentLocation, 'feature_types': FeatureTypes, **kwargs}
+        return {'JobId': job_id}
+
+    def get_document_analysis(self, JobId, MaxResults=None, NextToken=None):
+        self._record('get_document_analysis')
+        if JobId not in self.jobs:
+            raise ValueError(f'InvalidJobIdException: {JobId}')
+        job = self.jobs[JobId]
+        job['polls'] += 1
+        if NextToken is None and job['polls'] <= self.pending_polls:
+            return {'JobStatus': 'IN_PROGRESS'}
+
+        limit = min(MaxResults or self.max_results, self.max_results)
+        start = int(NextToken or 0)
+        response = {
+            'JobStatus': 'SUCCEEDED',
+            'DocumentMetadata': {'Pages': self._pages()},
+            'Blocks': self.blocks[start:start + limit]
+        }
+        if start + limit < len(self.blocks):
+            response['NextToken'] = str(start + limit)
+        return response
+
+
+class LocalS3Client:
+    """Offline stand-in for boto3.client('s3') with the calls TextractService makes"""
+
+    def __init__(self):
+        self.objects: Dict[tuple, str] = {}
+
+    def upload_file(self, Filename, Bucket, Key):
+        self.objects[(Bucket, Key)] = Filename
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+        return {}
@@ -0,0 +1,159 @@
+"""
+Streaming Textract Response Reader
+Reads Textract blocks one at a time instead of json.load-ing the whole
+response, groups them page by page and resolves block relationships lazily.
+
+Supported sources:
+- Textract JSON responses ({"Blocks": [...]}), streamed with ijson when it is
+  installed (falls back to json.load otherwise)
+- JSON Lines files with one block per line (.jsonl), always streamed
+- A list of such paths (e.g. the result pages of an async Textract job)
+- Any iterable of block dicts
+"""
+
+import os
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    import ijson
+except ImportError:  # optional dependency
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+Block = Dict[str, Any]
+BlockSource = Union[str, Sequence[str], Iterable[Block]]
+
+
+def _iter_file_blocks(path: str) -> Iterator[Block]:
+    if path.endswith('.jsonl'):
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    if ijson is not None:
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, 'Blocks.item', use_float=True)
+        return
+
+    logger.warning(f"ijson is not installed; loading {path} into memory")
+    with open(path, 'r') as f:
+        blocks = json.load(f).get('Blocks', [])
+    yield from blocks
+
+
+def iter_blocks(source: BlockSource, block_types: Optional[Iterable[str]] = None) -> Iterator[Block]:
+    """Yield blocks from a file, a list of files or an iterable of blocks, optionally by BlockType"""
+    if isinstance(source, str):
+        blocks = _iter_file_blocks(source)
+    elif isinstance(source, (list, tuple)) and source and all(isinstance(p, str) for p in source):
+        blocks = (block for path in source for block in _iter_file_blocks(path))
+    else:
+        blocks = iter(source)
+
+    wanted = set(block_types) if block_types else None
+    for block in blocks:
+        if wanted is None or block.get('BlockType') in wanted:
+            yield block
+
+
+def iter_pages(source: BlockSource, block_types: Optional[Iterable[str]] = None) -> Iterator[Tuple[int, List[Block]]]:
+    """
+    Yield (page, blocks) for consecutive runs of blocks on the same 1-based page
+
+    Textract returns blocks in page order, so only one page is held in memory.
+    Blocks without a Page (synchronous single-page responses) are on page 1.
+    """
+    current_page = None
+    page_blocks: List[Block] = []
+    seen = set()
+
+    for block in iter_blocks(source, block_types):
+        page = int(block.get('Page', 1))
+        if page != current_page:
+            if page_blocks:
+                yield current_page, page_blocks
+            if page in seen:
+                logger.warning(f"Textract blocks for page {page} are not contiguous")
+            seen.add(page)
+            current_page = page
+            page_blocks = []
+        page_blocks.append(block)
+
+    if page_blocks:
+        yield current_page, page_blocks
+
+
+def write_blocks_jsonl(blocks: Iterable[Block], path: str) -> int:
+    """Write blocks as JSON Lines (one block per line); returns the block count"""
+    count = 0
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        for block in blocks:
+            f.write(json.dumps(block, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+class BlockGraph:
+    """
+    Relationship graph of one page (or document) of blocks
+
+    The id -> block index is only built when a relationship is first
+    resolved, so pages that are only scanned for WORD geometry never pay for it.
+    """
+
+    def __init__(self, blocks: List[Block]):
+        self.blocks = blocks
+        self._by_id: Optional[Dict[str, Block]] = None
+
+    @property
+    def by_id(self) -> Dict[str, Block]:
+        if self._by_id is None:
+            self._by_id = {block['Id']: block for block in self.blocks if 'Id' in block}
+        return self._by_id
+
+    def get(self, block_id: str) -> Optional[Block]:
+        return self.by_id.get(block_id)
+
+    def related(self, block: Block, relationship_type: str = 'CHILD') -> List[Block]:
+        """Blocks linked from `block` by relationships of the given type"""
+        result = []
+        for relationship in block.get('Relationships') or []:
+            if relationship.get('Type') != relationship_type:
+                continue
+            for block_id in relationship.get('Ids', []):
+                related = self.by_id.get(block_id)
+                if related is not None:
+                    result.append(related)
+        return result
+
+    def children(self, block: Block) -> List[Block]:
+        return self.related(block, 'CHILD')
+
+    def text(self, block: Block) -> str:
+        """Text of a block from its WORD (and selected SELECTION_ELEMENT) children"""
+        if block.get('BlockType') in ('WORD', 'LINE'):
+            return block.get('Text', '')
+        parts = []
+        for child in self.children(block):
+            if child.get('BlockType') == 'WORD':
+                parts.append(child.get('Text', ''))
+            elif child.get('BlockType') == 'SELECTION_ELEMENT' and child.get('SelectionStatus') == 'SELECTED':
+                parts.append('X')
+        return ' '.join(parts)
+
+    def of_type(self, block_type: str) -> List[Block]:
+        return [block for block in self.blocks if block.get('BlockType') == block_type]
+
+
+def iter_page_graphs(source: BlockSource, block_types: Optional[Iterable[str]] = None) -> Iterator[Tuple[int, BlockGraph]]:
+    """Yield (page, BlockGraph) page by page"""
+    for page, blocks in iter_pages(source, block_types):
+        yield page, BlockGraph(blocks)
@@ -0,0 +1,208 @@
+"""
+Textract Table Reconstruction
+Turns TABLE / CELL / MERGED_CELL / WORD blocks into pandas DataFrames and
+writes them in the same layout as the Camelot path (table_<n>.csv with
+integer column headers, index=False), so Textract output can feed the table
+downloads and the ABAQUS generator without another GLM call.
+"""
+
+import os
+import re
+import logging
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from textract_stream import BlockSource, iter_page_graphs, BlockGraph
+
+logger = logging.getLogger(__name__)
+
+TABLE_BLOCK_TYPES = ('TABLE', 'CELL', 'MERGED_CELL', 'WORD', 'SELECTION_ELEMENT')
+NUMBER_PATTERN = re.compile(r'[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?')
+# Groups of exactly three digits after a comma, and no leading zero: "1,234", not "0,250" or "1,25"
+THOUSANDS_PATTERN = re.compile(r'(?<![\d,])[1-9]\d{0,2}(?:,\d{3})+(?![\d,])')
+
+
+def _table_from_graph(graph: BlockGraph, table: Dict[str, Any], fill_merged: bool = True) -> pd.DataFrame:
+    """Grid of one TABLE block; merged-cell text is copied into every spanned cell"""
+    cells = [block for block in graph.children(table) if block.get('BlockType') == 'CELL']
+    if not cells:
+        return pd.DataFrame()
+
+    n_rows = max(cell['RowIndex'] + cell.get('RowSpan', 1) - 1 for cell in cells)
+    n_cols = max(cell['ColumnIndex'] + cell.get('ColumnSpan', 1) - 1 for cell in cells)
+    grid = [[''] * n_cols for _ in range(n_rows)]
+    for cell in cells:
+        grid[cell['RowIndex'] - 1][cell['ColumnIndex'] - 1] = graph.text(cell)
+
+    if fill_merged:
+        # MERGED_CELL blocks are linked from the TABLE (newer responses) or only
+        # reference the table's cells as children (older ones)
+        merged = graph.related(table, 'MERGED_CELL')
+        if not merged:
+            cell_ids = {cell['Id'] for cell in cells}
+            merged = [
+                block for block in graph.of_type('MERGED_CELL')
+                if any(child.get('Id') in cell_ids for child in graph.children(block))
+            ]
+        for block in merged:
+            text = ' '.join(t for t in (graph.text(child) for child in graph.children(block)) if t)
+            for row in range(block['RowIndex'] - 1, block['RowIndex'] - 1 + block.get('RowSpan', 1)):
+                for col in range(block['ColumnIndex'] - 1, block['ColumnIndex'] - 1 + block.get('ColumnSpan', 1)):
+                    if row < n_rows and col < n_cols:
+                        grid[row][col] = text
+
+    return pd.DataFrame(grid)
+
+
+def tables_from_blocks(source: BlockSource, fill_merged: bool = True) -> List[Dict[str, Any]]:
+    """
+    Reconstruct every table in a Textract response, page by page
+
+    Returns a list of dicts with page, table index on that page, DataFrame,
+    Textract confidence and the normalized bounding box of the table.
+    """
+    tables = []
+    for page, graph in iter_page_graphs(source, block_types=TABLE_BLOCK_TYPES):
+        for index, table in enumerate(graph.of_type('TABLE'), start=1):
+            df = _table_from_graph(graph, table, fill_merged)
+            if df.empty:
+                continue
+            tables.append({
+                'page': page,
+                'index': index,
+                'dataframe': df,
+                'confidence': table.get('Confidence'),
+                'entity_types': table.get('EntityTypes', []),
+                'bbox': table.get('Geometry', {}).get('BoundingBox')
+            })
+    logger.info(f"Reconstructed {len(tables)} Textract table(s)")
+    return tables
+
+
+def save_tables(tables: List[Dict[str, Any]], tables_dir: str) -> List[Dict[str, Any]]:
+    """Write tables as table_<n>.csv / .xlsx and return entries shaped like the Camelot path's"""
+    os.makedirs(tables_dir, exist_ok=True)
+    tables_data = []
+    for table_num, table in enumerate(tables, start=1):
+        df = table['dataframe']
+        csv_filename = f'table_{table_num}.csv'
+        df.to_csv(os.path.join(tables_dir, csv_filename), index=False)
+
+        confidence = table.get('confidence')
+        table_info = {
+            'table_num': table_num,
+            'csv_file': csv_filename,
+            'rows': len(df),
+            'columns': len(df.columns),
+            'page': table['page'],
+            'accuracy': f"{confidence:.1f}%" if isinstance(confidence, (int, float)) else 'n/a',
+            'extraction_method': 'textract'
+        }
+
+        excel_filename = f'table_{table_num}.xlsx'
+        try:
+            df.to_excel(os.path.join(tables_dir, excel_filename), index=False)
+            table_info['excel_file'] = excel_filename
+        except ImportError:
+            logger.warning("openpyxl not available, skipping Excel export")
+
+        tables_data.append(table_info)
+    return tables_data
+
+
+def _number(text: str) -> Optional[float]:
+    if ',' in text:
+        if '.' in text:
+            # Both separators: the last one is the decimal point ("1,234.5", "1.234,5")
+            if text.rfind(',') > text.rfind('.'):
+                text = text.replace('.', '').replace(',', '.')
+            else:
+                text = text.replace(',', '')
+        elif THOUSANDS_PATTERN.search(text):
+            # Thousands separator, e.g. "1,234" or "12,500,000"
+            text = text.replace(',', '')
+        else:
+            # Decimal comma, e.g. "0,25" or "0,250"
+            text = text.replace(',', '.')
+    match = NUMBER_PATTERN.search(text)
+    return float(match.group(0)) if match else None
+
+
+def _find_header(df: pd.DataFrame, patterns: Dict[str, str]) -> Optional[Dict[str, int]]:
+    """First row in which every pattern matches a cell; returns {name: column}"""
+    for row in range(min(len(df), 5)):
+        columns = {}
+        for name, pattern in patterns.items():
+            for col in range(len(df.columns)):
+                if re.search(pattern, str(df.iat[row, col]), re.IGNORECASE):
+                    columns[name] = col
+                    break
+        if len(columns) == len(patterns):
+            columns['_header_row'] = row
+            return columns
+    return None
+
+
+def _id_column(df: pd.DataFrame, header_row: int) -> Optional[int]:
+    for col in range(len(df.columns)):
+        if re.search(r'sample|heat|serial|specimen|\bid\b', str(df.iat[header_row, col]), re.IGNORECASE):
+            return col
+    return None
+
+
+def specimen_data_from_tables(tables: List[Dict[str, Any]], serial_number: str) -> Dict[str, Any]:
+    """
+    Length, diameter and stress-strain points for one specimen
+
+    Stress-strain tables are those with Stress and Strain header cells; their
+    rows are filtered by a Sample/Heat/ID column when one exists, otherwise the
+    table is used when it mentions the serial number. Dimensions come from a
+    table with Len(gth) and Dia(meter) headers.
+    """
+    serial = serial_number.strip().upper()
+    result = {'length': None, 'diameter': None, 'stress_strain': []}
+
+    for table in tables:
+        df = table['dataframe']
+        mentions_serial = df.apply(lambda column: column.astype(str).str.upper().str.contains(serial, regex=False)).values.any()
+
+        header = _find_header(df, {'stress': r'stress', 'strain': r'strain'})
+        if header and not result['stress_strain']:
+            id_col = _id_column(df, header['_header_row'])
+            if id_col is not None or mentions_serial:
+                points = []
+                for row in range(header['_header_row'] + 1, len(df)):
+                    if id_col is not None and str(df.iat[row, id_col]).strip().upper() != serial:
+                        continue
+                    stress = _number(str(df.iat[row, header['stress']]))
+                    strain = _number(str(df.iat[row, header['strain']]))
+                    if stress is not None and strain is not None:
+                        points.append({'stress': stress, 'strain': strain})
+                result['stress_strain'] = points
+
+        header = _find_header(df, {'length': r'\blen', 'diameter': r'\bdia'})
+        if header and result['length'] is None:
+            id_col = _id_column(df, header['_header_row'])
+            for row in range(header['_header_row'] + 1, len(df)):
+                if id_col is not None and str(df.iat[row, id_col]).strip().upper() != serial:
+                    continue
+                if id_col is None and not mentions_serial:
+                    break
+                result['length'] = _number(str(df.iat[row, header['length']]))
+                result['diameter'] = _number(str(df.iat[row, header['diameter']]))
+                break
+
+    return result
+
+
+def format_specimen_data(serial_number: str, data: Dict[str, Any]) -> str:
+    """Render specimen data in the DIMENSIONS / STRESS_STRAIN_DATA format the GLM prompt asks for"""
+    lines = ['DIMENSIONS:']
+    if data['length'] is not None:
+        lines.append(f"Length: {data['length']:g} mm")
+    if data['diameter'] is not None:
+        lines.append(f"Diameter: {data['diameter']:g} mm")
+    lines.extend(['', 'STRESS_STRAIN_DATA:'])
+    lines.extend(f"{serial_number},{point['stress']:g},{point['strain']:g}" for point in data['stress_strain'])
+    return '\n'.join(lines)
@@ -0,0 +1,17 @@
+"""
+WSGI entry point for production servers
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+    uvicorn --interface wsgi --workers 4 --port 5001 wsgi:application
+
+Config comes from FLASK_CONFIG (default: production). With gunicorn's
+preload_app this module is imported once in the master, so warm_up() runs
+before the workers are forked.
+"""
+
+import os
+
+from app import create_app, warm_up
+
+application = create_app(os.getenv('FLASK_CONFIG', 'production'))
+warm_up(application)
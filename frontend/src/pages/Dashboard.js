@@ -71,11 +71,14 @@ const Dashboard = () => {
           setSimStatus(data.status);
           setOutputFiles(data.output_files || null);
           
-          if (data.status === 'running') {
+          if (data.status === 'running' || data.status === 'queued') {
             simPollRef.current = setTimeout(pollSimulation, 2000);
           } else if (data.status === 'completed') {
             setSimRunning(false);
             toast.success('ABAQUS simulation completed successfully!');
+          } else if (data.status === 'cancelled') {
+            setSimRunning(false);
+            toast(data.message || 'Simulation cancelled');
           } else if (data.status === 'error') {
             setSimRunning(false);
             toast.error(data.message || 'Simulation failed');
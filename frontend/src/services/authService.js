@@ -74,9 +74,12 @@ export const ocrService = {
     });
   },
 
-  uploadFileOCRmyPDF: async (file) => {
+  uploadFileOCRmyPDF: async (file, pages = '') => {
     const formData = new FormData();
     formData.append('file', file);
+    if (pages) {
+      formData.append('pages', pages);
+    }
 
     return await api.post('/upload_ocrmypdf', formData, {
       headers: {
@@ -96,12 +99,15 @@ export const ocrService = {
     });
   },
 
-  uploadFileGLMTableExtraction: async (file, customPrompt = '') => {
+  uploadFileGLMTableExtraction: async (file, customPrompt = '', pages = '') => {
     const formData = new FormData();
     formData.append('file', file);
     if (customPrompt) {
       formData.append('custom_prompt', customPrompt);
     }
+    if (pages) {
+      formData.append('pages', pages);
+    }
 
     return await api.post('/upload_glm_table_extraction', formData, {
       headers: {
@@ -110,10 +116,13 @@ export const ocrService = {
     });
   },
 
-  uploadFileGLMAbaqusGenerator: async (file, serialNumber) => {
+  uploadFileGLMAbaqusGenerator: async (file, serialNumber, pages = '') => {
     const formData = new FormData();
     formData.append('file', file);
     formData.append('serial_number', serialNumber);
+    if (pages) {
+      formData.append('pages', pages);
+    }
 
     return await api.post('/upload_glm_abaqus_generator', formData, {
       headers: {
@@ -122,10 +131,13 @@ export const ocrService = {
     });
   },
 
-  uploadFileGLMCustomQuery: async (file, customQuery) => {
+  uploadFileGLMCustomQuery: async (file, customQuery, pages = '') => {
     const formData = new FormData();
     formData.append('file', file);
     formData.append('custom_query', customQuery);
+    if (pages) {
+      formData.append('pages', pages);
+    }
 
     return await api.post('/upload_glm_custom_query', formData, {
       headers: {
@@ -134,6 +146,43 @@ export const ocrService = {
     });
   },
 
+  // Resumable upload for large scans: returns an upload_id that any upload
+  // route accepts in place of 'file'. Chunks are sent a few at a time and
+  // retried; a reload can resume with the same uploadId.
+  uploadLargeFile: async (file, { uploadId = null, parallel = 3, retries = 3, onProgress } = {}) => {
+    let session = uploadId
+      ? await api.get(`/uploads/${uploadId}`)
+      : await api.post('/uploads', { filename: file.name, length: file.size });
+    const chunkSize = session.chunk_size;
+
+    const pending = [];
+    session.missing.forEach(([start, end]) => {
+      for (let offset = start; offset < end; offset += chunkSize) {
+        pending.push([offset, Math.min(offset + chunkSize, end)]);
+      }
+    });
+
+    const sendNext = async () => {
+      while (pending.length) {
+        const [start, end] = pending.shift();
+        for (let attempt = 1; ; attempt++) {
+          try {
+            session = await api.patch(`/uploads/${session.upload_id}`, file.slice(start, end), {
+              headers: { 'Content-Type': 'application/offset+octet-stream', 'Upload-Offset': String(start) },
+            });
+            break;
+          } catch (error) {
+            if (attempt >= retries) throw error;
+          }
+        }
+        if (onProgress) onProgress(session.received / session.length);
+      }
+    };
+    await Promise.all(Array.from({ length: parallel }, sendNext));
+
+    return await api.post(`/uploads/${session.upload_id}/finalize`);
+  },
+
   getStatus: async (taskId) => {
     const response = await axios.get(`${API_BASE_URL}/download_inp/${taskId}`, {
       headers: {
@@ -162,6 +211,12 @@ export const ocrService = {
     return await api.get(`/simulation_status/${simTaskId}`);
   },
 
+  getSimulationResults: async (simTaskId, offset = 0, limit = 500, columns = 'strain,stress') => {
+    return await api.get(`/simulation_results/${simTaskId}`, {
+      params: { offset, limit, columns },
+    });
+  },
+
   downloadResultFile: async (simTaskId, fileType) => {
     const response = await axios.get(`${API_BASE_URL}/download_result/${simTaskId}/${fileType}`, {
       headers: {
@@ -180,6 +235,37 @@ export const ocrService = {
     return await api.get(`/status/${taskId}`);
   },
 
+  uploadBatch: async (files, method = 'ocr', options = {}) => {
+    const formData = new FormData();
+    files.forEach(file => {
+      formData.append(file.name.toLowerCase().endsWith('.zip') ? 'archive' : 'files', file);
+    });
+    formData.append('method', method);
+    Object.keys(options).forEach(key => {
+      formData.append(key, options[key]);
+    });
+
+    return await api.post('/upload_batch', formData, {
+      headers: {
+        'Content-Type': 'multipart/form-data',
+      },
+    });
+  },
+
+  getBatchStatus: async (batchId) => {
+    return await api.get(`/batch/${batchId}`);
+  },
+
+  downloadBatch: async (batchId) => {
+    const response = await axios.get(`${API_BASE_URL}/download_batch/${batchId}`, {
+      headers: {
+        Authorization: `Bearer ${localStorage.getItem('token')}`,
+      },
+      responseType: 'blob',
+    });
+    return response;
+  },
+
   downloadFile: async (taskId) => {
     const response = await axios.get(`${API_BASE_URL}/download/${taskId}`, {
       headers: {
@@ -201,6 +287,18 @@ export const ocrService = {
     return response;
   },
 
+  // Pages finished so far of a running OCR task (format: 'pdf' or 'txt')
+  downloadPartial: async (taskId, format = 'pdf') => {
+    const response = await axios.get(`${API_BASE_URL}/download_partial/${taskId}`, {
+      headers: {
+        Authorization: `Bearer ${localStorage.getItem('token')}`,
+      },
+      params: { format },
+      responseType: 'blob',
+    });
+    return response;
+  },
+
   downloadAll: async (taskId) => {
     const response = await axios.get(`${API_BASE_URL}/download_all/${taskId}`, {
       headers: {
@@ -215,6 +313,10 @@ export const ocrService = {
     return await api.get('/jobs');
   },
 
+  getStorageUsage: async () => {
+    return await api.get('/storage');
+  },
+
   testSystem: async () => {
     return await api.get('/test');
   },